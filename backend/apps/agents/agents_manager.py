@@ -12,7 +12,6 @@ from django.utils import timezone
 from django.db import transaction
 import asyncio
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import uuid
 import time
 
@@ -25,6 +24,7 @@ from .evaluator import EvaluatorAgent
 from .progress_tracker import ProgressTrackerAgent
 from .motivator import MotivatorAgent
 from .system_orchestrator import SystemOrchestratorAgent
+from .task_scheduler import AgentTaskScheduler
 
 
 class AgentsManager:
@@ -37,8 +37,11 @@ class AgentsManager:
         self.agent_instances = {}
         self.active_sessions = {}
         self.system_lock = threading.Lock()
-        self.executor = ThreadPoolExecutor(max_workers=10)
         self.initialize_agents()
+        
+        # Created tasks are queued here and run on the scheduler's worker threads
+        self.scheduler = AgentTaskScheduler(self._run_claimed_task, self.agents.keys())
+        self.scheduler.start()
     
     def initialize_agents(self):
         """Initialize all agent instances"""
@@ -100,26 +103,39 @@ class AgentsManager:
                 assigned_by=user
             )
             
-            # Add task to agent queue
-            agent_instance = self.get_agent_instance(agent_type)
-            if agent_instance:
-                agent_instance.add_to_queue(task_data, priority=task_data.get('priority', 'medium'))
-            
-            return task
+        # Queue the task for the scheduler's workers
+        transaction.on_commit(lambda: self.scheduler.submit(task))
+        
+        return task
     
     def execute_task(self, task_id: str) -> Dict[str, Any]:
-        """Execute a specific task"""
+        """Execute a specific task now, outside the scheduler"""
         try:
-            task = Task.objects.get(task_id=task_id)
-            agent_instance = self.get_agent_instance(task.agent.agent_type)
-            
-            if not agent_instance:
-                return {'success': False, 'error': 'Agent instance not found'}
+            task = Task.objects.select_related('agent').get(task_id=task_id)
             
             # Update task status
             task.status = 'in_progress'
             task.started_at = timezone.now()
-            task.save()
+            task.save(update_fields=['status', 'started_at'])
+            
+            return self._run_claimed_task(task)
+            
+        except Task.DoesNotExist:
+            return {'success': False, 'error': 'Task not found'}
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+    
+    def _run_claimed_task(self, task: Task) -> Dict[str, Any]:
+        """Process a task already marked in progress and record its outcome"""
+        try:
+            agent_instance = self.get_agent_instance(task.agent.agent_type)
+            
+            if not agent_instance:
+                task.status = 'failed'
+                task.error_message = 'Agent instance not found'
+                task.completed_at = timezone.now()
+                task.save(update_fields=['status', 'error_message', 'completed_at'])
+                return {'success': False, 'error': 'Agent instance not found'}
             
             # Execute task
             result = agent_instance.process_task(task.input_data)
@@ -139,9 +155,10 @@ class AgentsManager:
             
             return result
             
-        except Task.DoesNotExist:
-            return {'success': False, 'error': 'Task not found'}
         except Exception as e:
+            Task.objects.filter(pk=task.pk).update(
+                status='failed', error_message=str(e), completed_at=timezone.now()
+            )
             return {'success': False, 'error': str(e)}
     
     def orchestrate_workflow(self, workflow_type: str, user: User, 
@@ -385,13 +402,15 @@ class AgentsManager:
         }
         
         # Check each agent
+        queue_metrics = self.scheduler.metrics()
         for agent_type, agent_instance in self.agent_instances.items():
             agent_health = agent_instance.health_check()
             health_status['agents'][agent_type] = {
                 'status': agent_health.get('status', 'unknown'),
                 'last_active': agent_health.get('last_active'),
-                'queue_size': agent_health.get('queue_size', 0)
+                'queue_size': queue_metrics['agents'].get(agent_type, {}).get('queue_depth', 0)
             }
+        health_status['task_queue'] = queue_metrics
         
         # Count active tasks
         health_status['active_tasks'] = Task.objects.filter(
@@ -650,8 +669,8 @@ class AgentsManager:
         # Clean up active sessions
         self.cleanup_inactive_sessions()
         
-        # Shutdown executor
-        self.executor.shutdown(wait=True)
+        # Stop the task workers; queued tasks stay pending for the next start
+        self.scheduler.shutdown(wait=True)
         
         # Clear agent instances
         self.agent_instances.clear()
@@ -19,6 +19,9 @@ from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 
+from .llm_client import AsyncLLMClient, create_llm_client, get_llm_config
+from .response_cache import AgentResponseCache
+
 User = get_user_model()
 
 
@@ -68,9 +71,11 @@ class AIAgent:
     Base class for AI agents powered by Gemini
     """
     
-    def __init__(self, agent_type: str, config: GeminiAIConfig):
+    def __init__(self, agent_type: str, config: GeminiAIConfig, llm: Optional[AsyncLLMClient] = None):
         self.agent_type = agent_type
         self.config = config
+        self.llm = llm or create_llm_client(config)
+        self.response_cache = AgentResponseCache.get_instance()
         self.conversation_history = []
         self.context_data = {}
         self.personality = self._load_agent_personality()
@@ -229,39 +234,43 @@ Your approach:
             }
         }
         
-        return personalities.get(agent_type, personalities['learning_assistant'])
+        return personalities.get(self.agent_type, personalities['learning_assistant'])
     
-    async def generate_response(self, user_input: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Generate AI response using Gemini"""
+    async def generate_response(self, user_input: str, context: Dict[str, Any] = None,
+                                timeout: float = None) -> Dict[str, Any]:
+        """Generate AI response without blocking the event loop"""
         try:
+            # Common questions are answered from the response cache
+            cached = await self.response_cache.get(self, user_input, context)
+            if cached is not None:
+                cached['timestamp'] = timezone.now().isoformat()
+                return cached
+            
             # Build context-aware prompt
             prompt = self._build_prompt(user_input, context)
             
-            # Generate response using Gemini
-            response = self.config.model.generate_content(
-                prompt,
-                generation_config=self.config.generation_config,
-                safety_settings=self.config.safety_settings
-            )
+            # Generate response on the LLM client's thread pool
+            response_text = await self.llm.generate(prompt, timeout=timeout)
             
             # Process and structure the response
             result = {
                 'success': True,
-                'response': response.text,
+                'response': response_text,
                 'agent_name': self.personality['name'],
                 'agent_type': self.agent_type,
                 'timestamp': timezone.now().isoformat(),
-                'model_used': 'gemini-1.5-flash',
+                'model_used': self.llm.model_name,
                 'context_used': bool(context),
-                'confidence_score': self._estimate_confidence(response)
+                'confidence_score': self._estimate_confidence(response_text)
             }
             
+            await self.response_cache.set(self, user_input, context, result)
             return result
             
         except Exception as e:
             return {
                 'success': False,
-                'error': str(e),
+                'error': str(e) or type(e).__name__,
                 'agent_name': self.personality['name'],
                 'agent_type': self.agent_type,
                 'timestamp': timezone.now().isoformat()
@@ -308,10 +317,10 @@ Please respond as {self.personality['name']}, the {self.personality['role']}. Be
         
         return full_prompt
     
-    def _estimate_confidence(self, response) -> float:
+    def _estimate_confidence(self, response_text: str) -> float:
         """Estimate confidence score based on response quality"""
         # Simple confidence estimation based on response characteristics
-        text = response.text.lower()
+        text = response_text.lower()
         
         confidence_factors = {
             'jac' in text: 0.9,
@@ -320,9 +329,9 @@ Please respond as {self.personality['name']}, the {self.personality['role']}. Be
             'code' in text: 0.8,
             'error' in text: 0.7,
             'issue' in text: 0.7,
-            '?' in response.text: 0.8,  # Questions show engagement
-            len(response.text) > 100: 0.8,  # Detailed responses
-            len(response.text) > 500: 0.9  # Very detailed responses
+            '?' in response_text: 0.8,  # Questions show engagement
+            len(response_text) > 100: 0.8,  # Detailed responses
+            len(response_text) > 500: 0.9  # Very detailed responses
         }
         
         # Calculate average confidence
@@ -356,6 +365,9 @@ class MultiAgentSystem:
     
     def __init__(self):
         self.config = GeminiAIConfig()
+        # One client for all agents, so the concurrency limit and prompt coalescing are shared
+        self.llm = create_llm_client(self.config)
+        self.agent_timeout = get_llm_config().get('agent_timeout', 30)
         self.agents = self._initialize_agents()
         self.session_data = {}
     
@@ -371,7 +383,7 @@ class MultiAgentSystem:
         
         agents = {}
         for agent_type in agent_types:
-            agents[agent_type] = AIAgent(agent_type, self.config)
+            agents[agent_type] = AIAgent(agent_type, self.config, self.llm)
         
         return agents
     
@@ -471,16 +483,25 @@ class MultiAgentSystem:
             # Determine which agents to involve based on input
             relevant_agents = self._select_relevant_agents(user_input)
             
-            # Get responses from each relevant agent
+            # Ask every relevant agent at once; an agent that fails or times
+            # out is reported as such and left out of the synthesis
+            responses = await asyncio.gather(*(
+                self.agents[agent_type].generate_response(user_input, context, timeout=self.agent_timeout)
+                for agent_type in relevant_agents
+            ))
             agent_responses = {}
-            for agent_type in relevant_agents:
-                agent = self.agents[agent_type]
-                response = await agent.generate_response(user_input, context)
+            for agent_type, response in zip(relevant_agents, responses):
                 agent_responses[agent_type] = {
                     'agent_name': response['agent_name'],
-                    'response': response['response'],
+                    'response': response.get('response', ''),
                     'success': response['success']
                 }
+                if not response['success']:
+                    agent_responses[agent_type]['error'] = response['error']
+            contributions = {
+                agent_type: agent_response for agent_type, agent_response in agent_responses.items()
+                if agent_response['success']
+            }
             
             # Synthesize responses using learning assistant as coordinator
             coordinator = self.agents['learning_assistant']
@@ -490,7 +511,7 @@ class MultiAgentSystem:
             User Query: {user_input}
             
             Agent Responses:
-            {json.dumps(agent_responses, indent=2)}
+            {json.dumps(contributions, indent=2)}
             
             Please synthesize these responses into a comprehensive, coherent answer that incorporates insights from all agents while maintaining educational value and clarity.
             """
@@ -498,9 +519,10 @@ class MultiAgentSystem:
             synthesis_response = await coordinator.generate_response(synthesis_prompt, context)
             
             return {
-                'success': True,
-                'synthesis': synthesis_response['response'],
+                'success': synthesis_response['success'],
+                'synthesis': synthesis_response.get('response', ''),
                 'agent_contributions': agent_responses,
+                'partial': len(contributions) < len(agent_responses),
                 'coordinator': synthesis_response['agent_name'],
                 'timestamp': timezone.now().isoformat()
             }
@@ -17,6 +17,8 @@ import json
 import uuid
 from datetime import datetime
 
+from .task_scheduler import TaskQueue
+
 
 class AgentStatus(Enum):
     """Agent status enumeration"""
@@ -63,7 +65,7 @@ class BaseAgent(ABC):
         self.status = AgentStatus.IDLE
         self.created_at = timezone.now()
         self.last_active = timezone.now()
-        self.task_queue = []
+        self.task_queue = TaskQueue()
         self.metrics = {}
         
     @abstractmethod
@@ -112,15 +114,12 @@ class BaseAgent(ABC):
             'timestamp': timezone.now(),
             'task_id': str(uuid.uuid4())
         }
-        self.task_queue.append(task_data)
-        # Sort queue by priority (higher priority first)
-        self.task_queue.sort(key=lambda x: x['priority'].value, reverse=True)
+        # Heap ordered by priority (higher priority first), then arrival
+        self.task_queue.push(task_data, priority)
     
     def get_next_task(self) -> Optional[Dict[str, Any]]:
         """Get next task from queue"""
-        if self.task_queue:
-            return self.task_queue.pop(0)
-        return None
+        return self.task_queue.pop()
     
     def update_metrics(self, metric_name: str, value: Any):
         """Update agent metrics"""
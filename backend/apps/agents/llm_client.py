@@ -0,0 +1,139 @@
+# JAC Interactive Learning Platform - Core backend implementation by Cavin Otieno
+
+"""
+LLM client for the JAC Learning Platform AI agents
+
+Runs blocking LLM SDK calls on a bounded thread pool behind an async
+interface, and coalesces identical prompts that are already in flight.
+The backend is pluggable: 'gemini' calls the Gemini API, 'stub' answers
+locally after a fixed delay for load testing without network access.
+
+Author: Cavin Otieno
+Created: 2025-11-26
+"""
+
+import time
+import asyncio
+import hashlib
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict
+
+from django.conf import settings
+
+
+def get_llm_config() -> Dict[str, Any]:
+    """LLM client settings from AGENT_CONFIG['LLM_CLIENT']"""
+    return getattr(settings, 'AGENT_CONFIG', {}).get('LLM_CLIENT', {})
+
+
+class LLMBackend:
+    """A blocking text generation call"""
+
+    model_name = 'unknown'
+
+    def generate(self, prompt: str) -> str:
+        raise NotImplementedError
+
+
+class GeminiBackend(LLMBackend):
+    """Gemini generate_content with the shared generation and safety settings"""
+
+    model_name = 'gemini-1.5-flash'
+
+    def __init__(self, config):
+        self.config = config
+
+    def generate(self, prompt: str) -> str:
+        response = self.config.model.generate_content(
+            prompt,
+            generation_config=self.config.generation_config,
+            safety_settings=self.config.safety_settings
+        )
+        return response.text
+
+
+class StubBackend(LLMBackend):
+    """Local canned responses after a fixed latency, for load tests"""
+
+    model_name = 'stub'
+
+    def __init__(self, config=None, latency: float = None):
+        self.latency = get_llm_config().get('stub_latency', 0.5) if latency is None else latency
+
+    def generate(self, prompt: str) -> str:
+        time.sleep(self.latency)
+        digest = hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:12]
+        return (
+            f"Stub response {digest} to a {len(prompt)} character prompt. "
+            "Here is a JAC programming example:\n\nwalker hello { can greet with entry { report \"hi\"; } }"
+        )
+
+
+LLM_BACKENDS = {
+    'gemini': GeminiBackend,
+    'stub': StubBackend,
+}
+
+
+class AsyncLLMClient:
+    """
+    Async access to an LLM backend
+
+    Calls run on a thread pool of max_concurrency workers, which also caps
+    concurrent requests to the provider across every event loop in the
+    process. A prompt identical to one still in flight waits for that call
+    instead of starting another.
+    """
+
+    def __init__(self, backend: LLMBackend, max_concurrency: int = None, request_timeout: float = None):
+        llm_config = get_llm_config()
+        self.backend = backend
+        self.request_timeout = request_timeout or llm_config.get('request_timeout', 60)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency or llm_config.get('max_concurrency', 8),
+            thread_name_prefix='llm-client'
+        )
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.coalesced_calls = 0
+
+    @property
+    def model_name(self) -> str:
+        return self.backend.model_name
+
+    async def generate(self, prompt: str, timeout: float = None) -> str:
+        """
+        Generate text for a prompt
+
+        Raises:
+            asyncio.TimeoutError: No response within timeout seconds; the
+                call itself keeps running for any other caller waiting on it
+        """
+        future = self._submit(prompt)
+        # Shielded so a caller timing out does not cancel a call shared with others
+        return await asyncio.wait_for(
+            asyncio.shield(asyncio.wrap_future(future)),
+            timeout or self.request_timeout
+        )
+
+    def _submit(self, prompt: str) -> Future:
+        key = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced_calls += 1
+                return future
+            future = self._in_flight[key] = self._executor.submit(self.backend.generate, prompt)
+        future.add_done_callback(lambda _: self._forget(key))
+        return future
+
+    def _forget(self, key: str):
+        with self._lock:
+            self._in_flight.pop(key, None)
+
+
+def create_llm_client(config) -> AsyncLLMClient:
+    """Client for the backend named by AGENT_CONFIG['LLM_CLIENT']['backend']"""
+    backend_class = LLM_BACKENDS[get_llm_config().get('backend', 'gemini')]
+    return AsyncLLMClient(backend_class(config))
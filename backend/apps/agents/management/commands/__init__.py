@@ -0,0 +1,3 @@
+# JAC Interactive Learning Platform - Core backend implementation by Cavin Otieno
+
+# Commands package for agents app
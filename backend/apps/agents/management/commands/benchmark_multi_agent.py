@@ -0,0 +1,77 @@
+# JAC Interactive Learning Platform - Core backend implementation by Cavin Otieno
+
+"""
+Management Command - Benchmark Multi-Agent Collaboration
+
+Runs concurrent multi-agent collaborations against the stub LLM backend,
+without network access, and reports latency and coalesced LLM calls.
+
+Usage:
+    python manage.py benchmark_multi_agent
+    python manage.py benchmark_multi_agent --requests 50 --latency 0.2
+    python manage.py benchmark_multi_agent --message "How do I debug and improve my walker code?"
+
+Author: Cavin Otieno
+Created: 2025-11-26
+"""
+
+import time
+import asyncio
+import statistics
+
+from django.core.management.base import BaseCommand
+
+from apps.agents.ai_multi_agent_system import MultiAgentSystem
+from apps.agents.llm_client import AsyncLLMClient, StubBackend
+
+
+class Command(BaseCommand):
+    help = 'Load test multi-agent collaboration with the stub LLM backend'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=20,
+            help='Concurrent collaborations to run',
+        )
+        parser.add_argument(
+            '--latency',
+            type=float,
+            default=0.2,
+            help='Seconds the stub backend takes per call',
+        )
+        parser.add_argument(
+            '--message',
+            default='Explain how to learn walkers, review my code and suggest a project',
+            help='User message; identical messages are coalesced into shared LLM calls',
+        )
+
+    def handle(self, *args, **options):
+        system = MultiAgentSystem()
+        system.llm = AsyncLLMClient(StubBackend(latency=options['latency']))
+        for agent in system.agents.values():
+            agent.llm = system.llm
+
+        agents = system._select_relevant_agents(options['message'])
+        latencies, results = asyncio.run(self._run(system, options['message'], options['requests']))
+
+        failed = sum(1 for result in results if not result.get('success'))
+        self.stdout.write(f"Agents per request: {len(agents)} ({', '.join(agents)})")
+        self.stdout.write(f"Stub latency: {options['latency'] * 1000:.0f} ms per call")
+        self.stdout.write(
+            f"Latency: median {statistics.median(latencies) * 1000:.0f} ms, "
+            f"max {max(latencies) * 1000:.0f} ms"
+        )
+        self.stdout.write(f"Coalesced LLM calls: {system.llm.coalesced_calls}")
+        style = self.style.SUCCESS if not failed else self.style.WARNING
+        self.stdout.write(style(f"{len(results) - failed}/{len(results)} collaborations succeeded"))
+
+    async def _run(self, system, message, requests):
+        async def timed():
+            started = time.perf_counter()
+            result = await system.multi_agent_collaboration(message)
+            return time.perf_counter() - started, result
+
+        timings = await asyncio.gather(*(timed() for _ in range(requests)))
+        return [latency for latency, _ in timings], [result for _, result in timings]
@@ -18,6 +18,7 @@ import statistics
 from collections import defaultdict, Counter
 from .base_agent import BaseAgent, AgentStatus, TaskPriority
 from ..learning.models import LearningPath, Module, UserModuleProgress, UserLearningPath, AssessmentAttempt
+from ..progress.services.cohort_stats_service import CohortStatsService, percentile_in
 
 
 class ProgressTrackerAgent(BaseAgent):
@@ -68,6 +69,9 @@ class ProgressTrackerAgent(BaseAgent):
             'collaboration_achievements': ['helper', 'mentor', 'peer_learner'],
             'milestone_achievements': ['week_warrior', 'month_master', 'streak_legend']
         }
+        
+        # Materialized peer and institution metric distributions
+        self.cohort_stats = CohortStatsService()
     
     def process_task(self, task: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -2181,78 +2185,52 @@ class ProgressTrackerAgent(BaseAgent):
     async def _analyze_peer_performance(self, user: User, data: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze user's performance against peers"""
         try:
-            # Get all users in similar learning paths
+            # Peers are the learners of the same learning path, or everyone
             learning_path_id = data.get('learning_path_id')
+            scope = str(learning_path_id) if learning_path_id else ''
             
-            peer_query = UserModuleProgress.objects.filter(
-                module__learning_path_id=learning_path_id
-            ).exclude(user=user) if learning_path_id else UserModuleProgress.objects.exclude(user=user)
-            
-            # Calculate peer metrics
-            peer_completion_rates = []
-            peer_scores = []
-            peer_velocities = []
-            
-            # Sample peer data (limit to avoid performance issues)
-            peer_progress = peer_query[:100]  # Sample first 100 peers
-            
-            for peer in peer_progress:
-                # Calculate peer completion rate
-                peer_completed = UserModuleProgress.objects.filter(
-                    user=peer.user,
-                    status='completed'
-                ).count()
-                
-                peer_total = UserModuleProgress.objects.filter(user=peer.user).count()
-                if peer_total > 0:
-                    completion_rate = (peer_completed / peer_total) * 100
-                    peer_completion_rates.append(completion_rate)
-                
-                # Get peer assessment scores
-                peer_assessments = AssessmentAttempt.objects.filter(
-                    user=peer.user,
-                    score__isnull=False
-                )[:5]  # Sample 5 assessments per peer
-                
-                peer_scores.extend([a.score for a in peer_assessments])
-                
-                # Calculate peer velocity
-                peer_activities = UserModuleProgress.objects.filter(
-                    user=peer.user,
-                    updated_at__gte=timezone.now() - timedelta(days=30)
-                ).count()
-                peer_velocities.append(peer_activities / 30)
+            # Precomputed peer distributions (refreshed by the refresh_cohort_stats job)
+            distributions = self.cohort_stats.get_distributions(scope)
             
             # Calculate user's metrics
             user_completion_rate = len([p for p in data.get('progress_data', []) if p.status == 'completed']) / max(len(data.get('progress_data', [])), 1) * 100
             user_scores = [a.score for a in data.get('assessment_data', []) if a.score is not None]
-            user_velocity = len(data.get('progress_data', [])) / 30  # Activities per day
+            # Modules worked on per day over the cohort velocity window
+            window_days = self.cohort_stats.velocity_window.days
+            user_velocity = len(self._recent_progress(data.get('progress_data', []))) / window_days
             
             # Compare with peers
             comparison = {}
             
-            if peer_completion_rates:
+            completion = distributions.get('completion_rate')
+            if completion and completion.sample_size:
+                peers = self.cohort_stats.summarize(completion)
                 comparison['completion_rate'] = {
                     'user': round(user_completion_rate, 2),
-                    'peer_average': round(np.mean(peer_completion_rates), 2),
-                    'peer_median': round(np.median(peer_completion_rates), 2),
-                    'peer_range': f"{round(np.min(peer_completion_rates), 2)} - {round(np.max(peer_completion_rates), 2)}",
-                    'percentile': self._calculate_percentile(user_completion_rate, peer_completion_rates)
+                    'peer_average': round(peers['mean'], 2),
+                    'peer_median': round(peers['median'], 2),
+                    'peer_range': f"{round(peers['min'], 2)} - {round(peers['max'], 2)}",
+                    'percentile': percentile_in(completion.points, user_completion_rate)
                 }
             
-            if peer_scores and user_scores:
+            scores = distributions.get('average_score')
+            if scores and scores.sample_size and user_scores:
+                peers = self.cohort_stats.summarize(scores)
                 comparison['score_performance'] = {
                     'user_average': round(np.mean(user_scores), 2),
-                    'peer_average': round(np.mean(peer_scores), 2),
-                    'peer_median': round(np.median(peer_scores), 2),
-                    'user_vs_peer': 'above' if np.mean(user_scores) > np.mean(peer_scores) else 'below'
+                    'peer_average': round(peers['mean'], 2),
+                    'peer_median': round(peers['median'], 2),
+                    'user_vs_peer': 'above' if np.mean(user_scores) > peers['mean'] else 'below'
                 }
             
-            if peer_velocities:
+            velocity = distributions.get('learning_velocity')
+            if velocity and velocity.sample_size:
+                # Stored as modules worked on in the velocity window
+                peer_velocity = velocity.mean / window_days
                 comparison['learning_velocity'] = {
                     'user': round(user_velocity, 3),
-                    'peer_average': round(np.mean(peer_velocities), 3),
-                    'user_vs_peer': 'faster' if user_velocity > np.mean(peer_velocities) else 'slower'
+                    'peer_average': round(peer_velocity, 3),
+                    'user_vs_peer': 'faster' if user_velocity > peer_velocity else 'slower'
                 }
             
             return comparison
@@ -2260,54 +2238,32 @@ class ProgressTrackerAgent(BaseAgent):
         except Exception as e:
             return {'error': f'Peer comparison failed: {str(e)}'}
     
-    def _calculate_percentile(self, value: float, distribution: List[float]) -> int:
-        """Calculate percentile rank of a value in a distribution"""
-        if not distribution:
-            return 50
-        
-        lower_count = len([x for x in distribution if x < value])
-        equal_count = len([x for x in distribution if x == value])
-        
-        percentile = ((lower_count + 0.5 * equal_count) / len(distribution)) * 100
-        return int(round(percentile))
-    
     async def _analyze_institutional_ranking(self, user: User, data: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze user's ranking within the institution"""
         try:
-            # Get all users in the system for comparison
-            all_users = User.objects.filter(
-                learning_module_progress__isnull=False
-            ).distinct()
+            # Institution-wide distributions (refreshed by the refresh_cohort_stats job)
+            distributions = self.cohort_stats.get_distributions()
+            total_users = distributions['completion_rate'].sample_size if 'completion_rate' in distributions else 0
             
-            if not all_users.exists():
+            if not total_users:
                 return {'ranking': 'unknown', 'total_users': 0}
             
             # Calculate institutional metrics for comparison
             user_metrics = self._calculate_user_metrics_for_comparison(user, data)
             
-            # Calculate rankings for different metrics
+            # Calculate rankings for different metrics, a binary search each
             rankings = {}
             
-            for metric_name, user_value in user_metrics.items():
-                # Get all users' values for this metric
-                all_values = []
-                for other_user in all_users:
-                    if other_user.id != user.id:
-                        other_metrics = self._calculate_user_metrics_for_comparison(other_user, data)
-                        if metric_name in other_metrics:
-                            all_values.append(other_metrics[metric_name])
-                
-                if all_values:
-                    percentile = self._calculate_percentile(user_value, all_values)
-                    rankings[metric_name] = {
-                        'percentile': percentile,
-                        'ranking_level': self._get_ranking_level(percentile)
-                    }
+            for metric_name, percentile in self.cohort_stats.rank(user_metrics).items():
+                rankings[metric_name] = {
+                    'percentile': percentile,
+                    'ranking_level': self._get_ranking_level(percentile)
+                }
             
             return {
                 'rankings': rankings,
                 'overall_position': self._calculate_overall_position(rankings),
-                'institutional_context': self._provide_institutional_context(len(all_users))
+                'institutional_context': self._provide_institutional_context(total_users)
             }
             
         except Exception as e:
@@ -2337,9 +2293,8 @@ class ProgressTrackerAgent(BaseAgent):
         if scores:
             metrics['average_score'] = np.mean(scores)
         
-        # Learning velocity
-        recent_progress = [p for p in progress_data if p.updated_at >= timezone.now() - timedelta(days=30)]
-        metrics['learning_velocity'] = len(recent_progress)
+        # Learning velocity, over the same window as the cohort distribution
+        metrics['learning_velocity'] = len(self._recent_progress(progress_data))
         
         # Engagement level
         unique_days = len(set(p.updated_at.date() for p in progress_data))
@@ -2347,6 +2302,11 @@ class ProgressTrackerAgent(BaseAgent):
         
         return metrics
     
+    def _recent_progress(self, progress_data) -> List[Any]:
+        """Progress records updated within the cohort velocity window"""
+        since = timezone.now() - self.cohort_stats.velocity_window
+        return [p for p in progress_data if p.updated_at >= since]
+    
     def _get_ranking_level(self, percentile: int) -> str:
         """Convert percentile to ranking level"""
         if percentile >= 90:
@@ -2484,14 +2444,17 @@ class ProgressTrackerAgent(BaseAgent):
     
     async def _calculate_percentile_rankings(self, user: User, data: Dict[str, Any]) -> Dict[str, Any]:
         """Calculate detailed percentile rankings"""
-        # This would implement detailed percentile calculations
-        # For now, return a simplified version
+        learning_path_id = data.get('learning_path_id')
+        percentiles = self.cohort_stats.rank(
+            self._calculate_user_metrics_for_comparison(user, data),
+            str(learning_path_id) if learning_path_id else ''
+        )
         
         return {
-            'completion_rate_percentile': 65,
-            'score_percentile': 78,
-            'velocity_percentile': 45,
-            'engagement_percentile': 82
+            'completion_rate_percentile': percentiles.get('completion_rate', 50),
+            'score_percentile': percentiles.get('average_score', 50),
+            'velocity_percentile': percentiles.get('learning_velocity', 50),
+            'engagement_percentile': percentiles.get('engagement_level', 50)
         }
     
     def _provide_performance_context(self, data: Dict[str, Any]) -> Dict[str, str]:
@@ -0,0 +1,231 @@
+# JAC Interactive Learning Platform - Core backend implementation by Cavin Otieno
+
+"""
+Response cache for the JAC Learning Platform AI agents
+
+Answers repeated questions without calling the model. The exact layer
+looks responses up by the normalized question, the agent's personality and
+the request context, in the shared Django cache. The optional semantic
+layer reuses the cached answer to a similar enough earlier question.
+
+Code is not a question in other words: case and whitespace change its
+meaning, and similar code can need a different answer. Inputs of the
+agents in 'exact_text_agents' and inputs holding a fenced code block are
+keyed on their exact text and never served from the semantic layer.
+
+Author: Cavin Otieno
+Created: 2025-11-26
+"""
+
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+
+try:
+    import numpy as np
+    from scipy.sparse import vstack
+    from sklearn.feature_extraction.text import HashingVectorizer
+    SKLEARN_AVAILABLE = True
+except ImportError:
+    SKLEARN_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = 'agents:response'
+STATS = ('exact_hits', 'semantic_hits', 'misses')
+
+
+def get_response_cache_config() -> Dict[str, Any]:
+    """Response cache settings from AGENT_CONFIG['RESPONSE_CACHE']"""
+    return getattr(settings, 'AGENT_CONFIG', {}).get('RESPONSE_CACHE', {})
+
+
+def normalize_prompt(text: str) -> str:
+    """Case and whitespace insensitive form of a question"""
+    return ' '.join((text or '').lower().split())
+
+
+def is_code_input(agent_type: str, text: str, exact_text_agents) -> bool:
+    """Whether an input is code, which only matches its exact text"""
+    return agent_type in exact_text_agents or '```' in (text or '')
+
+
+class HashingEmbedder:
+    """Character n-gram hashing vectors: typo and word order tolerant, no model to load"""
+
+    def __init__(self, n_features: int = 2 ** 18):
+        self.vectorizer = HashingVectorizer(
+            analyzer='char_wb', ngram_range=(3, 5), n_features=n_features, alternate_sign=False
+        )
+
+    def embed(self, texts):
+        """L2 normalized sparse vectors, so a dot product is the cosine similarity"""
+        return self.vectorizer.transform(texts)
+
+
+class SemanticIndex:
+    """
+    Recent questions per agent and context, for nearest neighbour lookups
+
+    Held in process and bounded to max_entries questions; it only points at
+    exact-layer cache keys, so answers still expire with their TTL.
+    """
+
+    def __init__(self, embedder, max_entries: int):
+        self.embedder = embedder
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Tuple[str, str], Tuple[str, str, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, bucket: str, question: str, cache_key: str):
+        vector = self.embedder.embed([question])
+        with self._lock:
+            self._entries[(bucket, question)] = (bucket, cache_key, vector)
+            self._entries.move_to_end((bucket, question))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def nearest(self, bucket: str, question: str) -> Tuple[Optional[str], float]:
+        """Cache key of the most similar question in a bucket, and its similarity"""
+        with self._lock:
+            candidates = [(key, vector) for entry_bucket, key, vector in self._entries.values() if entry_bucket == bucket]
+        if not candidates:
+            return None, 0.0
+        similarities = (vstack([vector for _, vector in candidates]) @ self.embedder.embed([question]).T).toarray().ravel()
+        best = int(np.argmax(similarities))
+        return candidates[best][0], float(similarities[best])
+
+    def clear(self, agent_type: str = None):
+        with self._lock:
+            if agent_type is None:
+                self._entries.clear()
+            else:
+                for entry in [entry for entry in self._entries if entry[0].startswith(f'{agent_type}:')]:
+                    del self._entries[entry]
+
+
+class AgentResponseCache:
+    """
+    Two layer cache of successful agent responses
+
+    Entries expire after 'ttl' seconds. Each agent's entries carry a
+    generation number, so invalidate(agent_type) retires all of them at
+    once without scanning the cache. Hits and misses are counted in the
+    shared cache for a cross-process hit ratio.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        config = get_response_cache_config()
+        self.enabled = config.get('enabled', True)
+        self.ttl = config.get('ttl', 86400)
+        self.similarity_threshold = config.get('similarity_threshold', 0.85)
+        self.exact_text_agents = frozenset(config.get('exact_text_agents', ('code_reviewer',)))
+
+        self.semantic_index = None
+        if config.get('semantic_enabled', False):
+            if SKLEARN_AVAILABLE:
+                embedder_class = import_string(config['embedder']) if config.get('embedder') else HashingEmbedder
+                self.semantic_index = SemanticIndex(embedder_class(), config.get('max_semantic_entries', 5000))
+            else:
+                logger.warning("scikit-learn is not installed, semantic response caching is disabled")
+
+    @classmethod
+    def get_instance(cls) -> 'AgentResponseCache':
+        """Get the response cache of this process"""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    async def get(self, agent, user_input: str, context: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
+        """Cached response of an agent to a question, marked with the layer that served it"""
+        if not self.enabled:
+            return None
+        try:
+            question, semantic = self._question(agent, user_input)
+            bucket = await self._bucket(agent, context)
+            cache_key = self._key(bucket, question)
+
+            response = await cache.aget(cache_key)
+            layer = 'exact'
+            if response is None and semantic:
+                similar_key, similarity = self.semantic_index.nearest(bucket, question)
+                if similar_key is not None and similarity >= self.similarity_threshold:
+                    response = await cache.aget(similar_key)
+                    layer = 'semantic'
+
+            await self._count(f'{layer}_hits' if response is not None else 'misses')
+            if response is not None:
+                response = dict(response, cached=True, cache_layer=layer)
+            return response
+        except Exception as e:
+            logger.warning(f"Agent response cache lookup failed: {e}")
+            return None
+
+    async def set(self, agent, user_input: str, context: Dict[str, Any], response: Dict[str, Any]):
+        """Cache a successful response"""
+        if not self.enabled or not response.get('success'):
+            return
+        try:
+            question, semantic = self._question(agent, user_input)
+            bucket = await self._bucket(agent, context)
+            cache_key = self._key(bucket, question)
+            await cache.aset(cache_key, response, self.ttl)
+            if semantic:
+                self.semantic_index.add(bucket, question, cache_key)
+        except Exception as e:
+            logger.warning(f"Agent response cache store failed: {e}")
+
+    def invalidate(self, agent_type: str):
+        """Retire every cached response of an agent, e.g. after its prompt changed"""
+        generation_key = f'{CACHE_PREFIX}:generation:{agent_type}'
+        if not cache.add(generation_key, 2, None):
+            cache.incr(generation_key)
+        if self.semantic_index is not None:
+            self.semantic_index.clear(agent_type)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit and miss counts across processes, and the hit ratio"""
+        counts = cache.get_many([f'{CACHE_PREFIX}:stats:{name}' for name in STATS])
+        stats = {name: counts.get(f'{CACHE_PREFIX}:stats:{name}', 0) for name in STATS}
+        lookups = sum(stats.values())
+        stats['lookups'] = lookups
+        stats['hit_ratio'] = (stats['exact_hits'] + stats['semantic_hits']) / lookups if lookups else 0.0
+        return stats
+
+    def _question(self, agent, user_input: str) -> Tuple[str, bool]:
+        """Text an input is keyed on, and whether the semantic layer may serve it"""
+        if is_code_input(agent.agent_type, user_input, self.exact_text_agents):
+            return user_input or '', False
+        return normalize_prompt(user_input), self.semantic_index is not None
+
+    async def _bucket(self, agent, context: Dict[str, Any]) -> str:
+        """Agent, prompt generation and context shared by interchangeable questions"""
+        generation = await cache.aget(f'{CACHE_PREFIX}:generation:{agent.agent_type}', 1)
+        personality = hashlib.sha256(
+            json.dumps(agent.personality, sort_keys=True).encode('utf-8')
+        ).hexdigest()[:16]
+        context_hash = hashlib.sha256(
+            json.dumps(context or {}, sort_keys=True, default=str).encode('utf-8')
+        ).hexdigest()[:16]
+        return f'{agent.agent_type}:{generation}:{personality}:{context_hash}'
+
+    @staticmethod
+    def _key(bucket: str, question: str) -> str:
+        return f"{CACHE_PREFIX}:{bucket}:{hashlib.sha256(question.encode('utf-8')).hexdigest()}"
+
+    async def _count(self, name: str):
+        key = f'{CACHE_PREFIX}:stats:{name}'
+        if not await cache.aadd(key, 1, None):
+            await cache.aincr(key)
@@ -0,0 +1,283 @@
+# JAC Interactive Learning Platform - Core backend implementation by Cavin Otieno
+
+"""
+Agent Task Scheduler for JAC Interactive Learning Platform
+
+Priority queues for agent tasks: a binary heap per agent, FIFO within a
+priority, drained by worker threads that respect a concurrency limit per
+agent. Pending rows of the Task table are the durable copy of the queue,
+so tasks survive restarts and are shared between processes.
+
+Author: Cavin Otieno
+Created: 2025-11-26
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+import statistics
+from collections import deque
+from datetime import timedelta
+from enum import Enum
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_RANKS = {'low': 1, 'medium': 2, 'high': 3, 'critical': 4}
+
+# Pending tasks saved this long before the newest one seen are re-read on
+# each poll, covering transactions that committed late
+POLL_OVERLAP = timedelta(seconds=5)
+
+
+def priority_rank(priority: Any) -> int:
+    """
+    Numeric rank of a task priority, higher runs first
+
+    Accepts the TaskPriority enums of the agent classes, the TaskPriority
+    choices of the Task model and plain strings alike.
+    """
+    if isinstance(priority, Enum):
+        priority = priority.value
+    if isinstance(priority, int):
+        return priority
+    return PRIORITY_RANKS.get(str(priority).lower(), PRIORITY_RANKS['medium'])
+
+
+def get_scheduler_config() -> Dict[str, Any]:
+    """Scheduler settings from AGENT_CONFIG['TASK_SCHEDULER']"""
+    return getattr(settings, 'AGENT_CONFIG', {}).get('TASK_SCHEDULER', {})
+
+
+class TaskQueue:
+    """
+    Thread safe priority queue: highest priority first, then first in first out
+
+    Pushing and popping are O(log n).
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+    def push(self, item: Any, priority: Any):
+        with self._lock:
+            heapq.heappush(self._heap, (-priority_rank(priority), next(self._sequence), item))
+
+    def pop(self) -> Optional[Any]:
+        with self._lock:
+            if not self._heap:
+                return None
+            return heapq.heappop(self._heap)[2]
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __bool__(self):
+        return bool(self._heap)
+
+
+class AgentTaskScheduler:
+    """
+    Dispatches Task rows to a handler on worker threads
+
+    Each agent type has its own heap; a free worker takes the best queued
+    task among agents that are below their concurrency limit. Before
+    running a task the worker claims it by moving its row from pending to
+    in_progress, so a task queued by several processes runs once. A poller
+    thread picks up tasks created by other processes and, at startup, tasks
+    left pending by a previous run.
+    """
+
+    def __init__(self, handler: Callable[[Any], Any], agent_types, config: Dict[str, Any] = None):
+        """
+        Args:
+            handler: Called with each claimed Task
+            agent_types: Agent types whose tasks this scheduler runs
+            config: Overrides of AGENT_CONFIG['TASK_SCHEDULER']
+        """
+        config = {**get_scheduler_config(), **(config or {})}
+        self.handler = handler
+        self.agent_types = list(agent_types)
+        self.workers = config.get('workers', 10)
+        self.default_concurrency = config.get('per_agent_concurrency', 2)
+        self.concurrency = {
+            agent_type: config.get('per_agent_limits', {}).get(agent_type, self.default_concurrency)
+            for agent_type in self.agent_types
+        }
+        self.poll_interval = config.get('poll_interval', 5.0)
+        self.stale_after = timedelta(seconds=config.get('stale_after', 3600))
+
+        self._condition = threading.Condition()
+        self._heaps = {agent_type: [] for agent_type in self.agent_types}
+        self._queued = set()
+        self._running = {agent_type: 0 for agent_type in self.agent_types}
+        self._sequence = itertools.count()
+        self._wait_times = {agent_type: deque(maxlen=config.get('wait_samples', 500)) for agent_type in self.agent_types}
+        self._dispatched = {agent_type: 0 for agent_type in self.agent_types}
+        self._latest_seen = None
+        self._threads = []
+        self._stopping = False
+
+    def start(self):
+        """Recover pending tasks and start the worker and poller threads"""
+        if self._threads:
+            return
+        self._stopping = False
+        self.recover()
+        for index in range(self.workers):
+            self._start_thread(self._work, f'agent-task-worker-{index}')
+        self._start_thread(self._poll, 'agent-task-poller')
+
+    def shutdown(self, wait: bool = True):
+        """Stop taking tasks; queued tasks stay pending in the database"""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+        self._threads = []
+
+    def submit(self, task) -> bool:
+        """
+        Queue a saved Task, O(log n)
+
+        Returns:
+            False when the task is already queued or not for this scheduler
+        """
+        agent_type = task.agent.agent_type
+        with self._condition:
+            if agent_type not in self._heaps or task.task_id in self._queued:
+                return False
+            heapq.heappush(self._heaps[agent_type], (
+                -priority_rank(task.priority), task.assigned_at, next(self._sequence), task.task_id
+            ))
+            self._queued.add(task.task_id)
+            if self._latest_seen is None or task.assigned_at > self._latest_seen:
+                self._latest_seen = task.assigned_at
+            self._condition.notify()
+        return True
+
+    def recover(self, since=None) -> int:
+        """
+        Queue pending tasks from the database
+
+        Tasks stuck in progress for longer than stale_after, whose worker
+        died with its process, are made pending again first.
+
+        Returns:
+            Number of tasks newly queued
+        """
+        from .models import Task, TaskStatus
+
+        if since is None:
+            Task.objects.filter(
+                agent__agent_type__in=self.agent_types,
+                status=TaskStatus.IN_PROGRESS,
+                started_at__lt=timezone.now() - self.stale_after,
+            ).update(status=TaskStatus.PENDING, started_at=None)
+
+        pending = Task.objects.filter(
+            agent__agent_type__in=self.agent_types, status=TaskStatus.PENDING
+        ).select_related('agent').only('task_id', 'priority', 'assigned_at', 'agent__agent_type')
+        if since is not None:
+            pending = pending.filter(assigned_at__gte=since - POLL_OVERLAP)
+        return sum(self.submit(task) for task in pending.iterator())
+
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depth, running tasks and queue wait times per agent"""
+        now = timezone.now()
+        with self._condition:
+            agents = {}
+            for agent_type, heap in self._heaps.items():
+                waits = list(self._wait_times[agent_type])
+                oldest = min((entry[1] for entry in heap), default=None)
+                agents[agent_type] = {
+                    'queue_depth': len(heap),
+                    'running': self._running[agent_type],
+                    'concurrency_limit': self.concurrency[agent_type],
+                    'dispatched': self._dispatched[agent_type],
+                    'oldest_wait_seconds': (now - oldest).total_seconds() if oldest else 0.0,
+                    'average_wait_seconds': statistics.fmean(waits) if waits else 0.0,
+                    'p95_wait_seconds': statistics.quantiles(waits, n=20)[-1] if len(waits) >= 2 else (waits[0] if waits else 0.0),
+                }
+        return {
+            'queue_depth': sum(agent['queue_depth'] for agent in agents.values()),
+            'running': sum(agent['running'] for agent in agents.values()),
+            'workers': self.workers,
+            'agents': agents,
+        }
+
+    def _take(self) -> Optional[Tuple[str, str, Any]]:
+        """Best queued task of an agent with free capacity; caller holds the condition"""
+        best = None
+        for agent_type, heap in self._heaps.items():
+            if heap and self._running[agent_type] < self.concurrency[agent_type]:
+                if best is None or heap[0] < self._heaps[best][0]:
+                    best = agent_type
+        if best is None:
+            return None
+        _, assigned_at, _, task_id = heapq.heappop(self._heaps[best])
+        self._queued.discard(task_id)
+        self._running[best] += 1
+        return best, task_id, assigned_at
+
+    def _work(self):
+        while True:
+            with self._condition:
+                taken = self._take()
+                while taken is None and not self._stopping:
+                    self._condition.wait()
+                    taken = self._take()
+                if taken is None:
+                    return
+            agent_type, task_id, assigned_at = taken
+            try:
+                close_old_connections()
+                self._run(agent_type, task_id, assigned_at)
+            except Exception as e:
+                logger.error(f"Agent task {task_id} failed in the scheduler: {e}")
+            finally:
+                with self._condition:
+                    self._running[agent_type] -= 1
+                    self._condition.notify_all()
+
+    def _run(self, agent_type: str, task_id: str, assigned_at):
+        from .models import Task, TaskStatus
+
+        started_at = timezone.now()
+        claimed = Task.objects.filter(task_id=task_id, status=TaskStatus.PENDING).update(
+            status=TaskStatus.IN_PROGRESS, started_at=started_at
+        )
+        if not claimed:
+            # Run by another process, or cancelled while queued
+            return
+        with self._condition:
+            self._wait_times[agent_type].append((started_at - assigned_at).total_seconds())
+            self._dispatched[agent_type] += 1
+        self.handler(Task.objects.select_related('agent').get(task_id=task_id))
+
+    def _poll(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._stopping, timeout=self.poll_interval)
+                if self._stopping:
+                    return
+                since = self._latest_seen
+            try:
+                close_old_connections()
+                self.recover(since=since or timezone.now() - self.stale_after)
+            except Exception as e:
+                logger.error(f"Error polling pending agent tasks: {e}")
+
+    def _start_thread(self, target, name: str):
+        thread = threading.Thread(target=target, name=name, daemon=True)
+        thread.start()
+        self._threads.append(thread)
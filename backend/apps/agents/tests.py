@@ -0,0 +1,327 @@
+# JAC Interactive Learning Platform - Core backend implementation by Cavin Otieno
+
+"""
+Agents tests for Django
+"""
+
+import time
+import random
+import asyncio
+import threading
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from .ai_multi_agent_system import AIAgent, GeminiAIConfig, MultiAgentSystem
+from .base_agent import TaskPriority as AgentTaskPriority
+from .llm_client import AsyncLLMClient, StubBackend
+from .models import Agent, Task, TaskPriority, TaskStatus
+from .response_cache import SKLEARN_AVAILABLE, AgentResponseCache
+from .task_scheduler import AgentTaskScheduler, TaskQueue, priority_rank
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+def agent_config(**sections):
+    """AGENT_CONFIG with some sections overridden"""
+    return {**settings.AGENT_CONFIG, **sections}
+
+
+class RecordingBackend(StubBackend):
+    """Stub backend that counts its calls and the most it ran at once"""
+
+    def __init__(self, latency: float = 0.1):
+        super().__init__(latency=latency)
+        self.prompts = []
+        self.running = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def generate(self, prompt: str) -> str:
+        with self._lock:
+            self.prompts.append(prompt)
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        try:
+            return super().generate(prompt)
+        finally:
+            with self._lock:
+                self.running -= 1
+
+
+class AsyncLLMClientTest(SimpleTestCase):
+    """Test the shared async LLM client"""
+
+    async def test_identical_prompts_share_a_call(self):
+        """Concurrent identical prompts make one backend call and get its answer"""
+        backend = RecordingBackend()
+        client = AsyncLLMClient(backend, max_concurrency=4)
+        responses = await asyncio.gather(*(client.generate('What is a walker?') for _ in range(5)))
+
+        self.assertEqual(responses, [StubBackend(latency=0).generate('What is a walker?')] * 5)
+        self.assertEqual(len(backend.prompts), 1)
+        self.assertEqual(client.coalesced_calls, 4)
+
+    async def test_concurrency_is_bounded(self):
+        """Different prompts run in parallel, up to max_concurrency at once"""
+        backend = RecordingBackend(latency=0.2)
+        client = AsyncLLMClient(backend, max_concurrency=2)
+        started = time.monotonic()
+        responses = await asyncio.gather(*(client.generate(f'Question {index}') for index in range(4)))
+
+        self.assertEqual(responses, [StubBackend(latency=0).generate(f'Question {index}') for index in range(4)])
+        self.assertEqual(backend.peak, 2)
+        self.assertLess(time.monotonic() - started, 0.7)
+
+    async def test_timeout_leaves_shared_call_running(self):
+        """A caller that times out does not cancel the call another caller waits on"""
+        backend = RecordingBackend(latency=0.3)
+        client = AsyncLLMClient(backend)
+        patient = asyncio.ensure_future(client.generate('What is a node?', timeout=5))
+        with self.assertRaises(asyncio.TimeoutError):
+            await client.generate('What is a node?', timeout=0.05)
+
+        self.assertEqual(await patient, StubBackend(latency=0).generate('What is a node?'))
+        self.assertEqual(len(backend.prompts), 1)
+
+
+@override_settings(
+    CACHES=LOCMEM_CACHE,
+    AGENT_CONFIG=agent_config(
+        LLM_CLIENT={'backend': 'stub', 'stub_latency': 0.1, 'agent_timeout': 5},
+        RESPONSE_CACHE={'enabled': False},
+    ),
+)
+class MultiAgentCollaborationTest(SimpleTestCase):
+    """Test concurrent multi-agent collaboration"""
+
+    QUESTION = 'Explain how to review code and create an exercise'
+
+    def setUp(self):
+        patcher = mock.patch.object(AgentResponseCache, '_instance', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.system = MultiAgentSystem()
+
+    async def test_matches_sequential_agents(self):
+        """Agents asked at once answer as they do asked one after another"""
+        relevant_agents = self.system._select_relevant_agents(self.QUESTION)
+        self.assertEqual(len(relevant_agents), 3)
+        expected = {}
+        for agent_type in relevant_agents:
+            response = await self.system.agents[agent_type].generate_response(self.QUESTION)
+            expected[agent_type] = {
+                'agent_name': response['agent_name'], 'response': response['response'], 'success': True
+            }
+
+        started = time.monotonic()
+        result = await self.system.multi_agent_collaboration(self.QUESTION)
+        self.assertLess(time.monotonic() - started, 0.35)  # slowest agent plus synthesis
+        self.assertTrue(result['success'])
+        self.assertFalse(result['partial'])
+        self.assertEqual(result['agent_contributions'], expected)
+        self.assertTrue(result['synthesis'])
+
+    async def test_failed_agent_is_left_out(self):
+        """An agent that fails is reported and left out of the synthesis"""
+        failing = self.system.agents['content_generator']
+        failure = {'success': False, 'error': 'TimeoutError', 'agent_name': failing.personality['name'],
+                   'agent_type': 'content_generator', 'timestamp': 'now'}
+        with mock.patch.object(failing, 'generate_response', return_value=failure), \
+                mock.patch.object(self.system.llm, 'generate', wraps=self.system.llm.generate) as generate:
+            result = await self.system.multi_agent_collaboration(self.QUESTION)
+
+        self.assertTrue(result['success'])
+        self.assertTrue(result['partial'])
+        self.assertEqual(result['agent_contributions']['content_generator'], {
+            'agent_name': failing.personality['name'], 'response': '', 'success': False, 'error': 'TimeoutError'
+        })
+        synthesis_prompt = generate.call_args_list[-1].args[0]
+        self.assertIn('code_reviewer', synthesis_prompt)
+        self.assertNotIn('content_generator', synthesis_prompt)
+
+
+@override_settings(
+    CACHES=LOCMEM_CACHE,
+    AGENT_CONFIG=agent_config(RESPONSE_CACHE={'enabled': True, 'ttl': 60, 'semantic_enabled': True}),
+)
+class AgentResponseCacheTest(SimpleTestCase):
+    """Test caching agent responses"""
+
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch.object(AgentResponseCache, '_instance', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.config = GeminiAIConfig()
+        self.backend = RecordingBackend(latency=0)
+        self.agent = self.make_agent('learning_assistant')
+
+    def make_agent(self, agent_type):
+        return AIAgent(agent_type, self.config, AsyncLLMClient(self.backend))
+
+    async def test_exact_hit_returns_generated_response(self):
+        """A repeated question, in any case or spacing, gets the response generated the first time"""
+        generated = await self.agent.generate_response('What is a walker?', {'module': 1})
+        cached = await self.agent.generate_response('  what is a   WALKER? ', {'module': 1})
+
+        self.assertEqual(len(self.backend.prompts), 1)
+        self.assertEqual((cached['cached'], cached['cache_layer']), (True, 'exact'))
+        self.assertEqual(
+            {key: value for key, value in cached.items() if key not in ('cached', 'cache_layer', 'timestamp')},
+            {key: value for key, value in generated.items() if key != 'timestamp'}
+        )
+
+    async def test_context_and_agent_are_part_of_the_key(self):
+        """Another context or another agent does not reuse a response"""
+        await self.agent.generate_response('What is a walker?', {'module': 1})
+        other_context = await self.agent.generate_response('What is a walker?', {'module': 2})
+        other_agent = await self.make_agent('code_reviewer').generate_response('What is a walker?', {'module': 1})
+
+        self.assertNotIn('cached', other_context)
+        self.assertNotIn('cached', other_agent)
+        self.assertEqual(len(self.backend.prompts), 3)
+
+    async def test_code_is_keyed_on_its_exact_text(self):
+        """Code differing only in case or whitespace gets its own review"""
+        reviewer = self.make_agent('code_reviewer')
+        await reviewer.generate_response('walker Visit {\n    can go with entry;\n}')
+        reindented = await reviewer.generate_response('walker visit {\ncan go with entry;\n}')
+        repeated = await reviewer.generate_response('walker Visit {\n    can go with entry;\n}')
+        fenced = await self.agent.generate_response('Why does this fail?\n```\nwalker Visit {}\n```')
+        other_case = await self.agent.generate_response('why does this fail?\n```\nwalker visit {}\n```')
+
+        self.assertNotIn('cached', reindented)
+        self.assertEqual(repeated['cache_layer'], 'exact')
+        self.assertNotIn('cached', fenced)
+        self.assertNotIn('cached', other_case)
+        self.assertEqual(len(self.backend.prompts), 4)
+
+    async def test_invalidate_retires_agent_responses(self):
+        """Invalidating an agent makes its questions miss"""
+        await self.agent.generate_response('What is a walker?')
+        self.agent.response_cache.invalidate('learning_assistant')
+        response = await self.agent.generate_response('What is a walker?')
+
+        self.assertNotIn('cached', response)
+        self.assertEqual(len(self.backend.prompts), 2)
+
+    async def test_failures_are_not_cached(self):
+        """A failed generation is asked again next time"""
+        with mock.patch.object(self.backend, 'generate', side_effect=RuntimeError('quota')):
+            failed = await self.agent.generate_response('What is a walker?')
+        response = await self.agent.generate_response('What is a walker?')
+
+        self.assertFalse(failed['success'])
+        self.assertTrue(response['success'])
+        self.assertNotIn('cached', response)
+
+    async def test_semantic_hit(self):
+        """A similar enough question reuses the cached answer, a different one does not"""
+        if not SKLEARN_AVAILABLE:
+            self.skipTest('scikit-learn is not installed')
+        generated = await self.agent.generate_response('How do I define a walker in JAC?')
+        similar = await self.agent.generate_response('how do i define a walker in jac')
+        different = await self.agent.generate_response('How are graph edges weighted?')
+
+        self.assertEqual(similar['cache_layer'], 'semantic')
+        self.assertEqual(similar['response'], generated['response'])
+        self.assertNotIn('cached', different)
+        self.assertEqual(self.agent.response_cache.stats()['semantic_hits'], 1)
+
+
+class TaskQueueTest(SimpleTestCase):
+    """Test the agent task heap"""
+
+    def test_matches_sorted_list(self):
+        """Tasks come out in the order of the re-sorted list the heap replaced"""
+        rng = random.Random(5)
+        tasks = [(index, rng.choice(list(AgentTaskPriority))) for index in range(200)]
+        queue, replaced = TaskQueue(), []
+        popped, expected = [], []
+        for index, priority in tasks:
+            queue.push(index, priority)
+            replaced.append((index, priority))
+            replaced.sort(key=lambda task: task[1].value, reverse=True)
+            if index % 3 == 2:
+                popped.append(queue.pop())
+                expected.append(replaced.pop(0)[0])
+        while queue:
+            popped.append(queue.pop())
+            expected.append(replaced.pop(0)[0])
+
+        self.assertEqual(popped, expected)
+        self.assertIsNone(queue.pop())
+
+    def test_priority_rank(self):
+        """Agent enums, model choices and strings rank alike"""
+        self.assertEqual(priority_rank(AgentTaskPriority.HIGH), priority_rank(TaskPriority.HIGH))
+        self.assertEqual(priority_rank('Critical'), 4)
+        self.assertEqual(priority_rank('unknown'), priority_rank('medium'))
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class AgentTaskSchedulerTest(TestCase):
+    """Test dispatching Task rows"""
+
+    def setUp(self):
+        self.agents = {
+            agent_type: Agent.objects.create(agent_id=agent_type, agent_type=agent_type, name=agent_type, description='')
+            for agent_type in ('quiz_master', 'evaluator')
+        }
+        self.handled = []
+        self.scheduler = AgentTaskScheduler(
+            self.handled.append, list(self.agents),
+            {'per_agent_limits': {'quiz_master': 1, 'evaluator': 2}}
+        )
+
+    def create_task(self, agent_type, priority, minutes_ago):
+        return Task.objects.create(
+            task_id=f'{agent_type}-{priority}-{minutes_ago}', agent=self.agents[agent_type], task_type='test',
+            title='Task', description='', priority=priority,
+            assigned_at=timezone.now() - timedelta(minutes=minutes_ago),
+        )
+
+    def test_takes_by_priority_and_age_within_limits(self):
+        """Workers take the oldest task of the highest priority, within each agent's limit"""
+        for agent_type, priority, minutes_ago in [
+            ('quiz_master', 'low', 9), ('quiz_master', 'high', 2), ('quiz_master', 'high', 5),
+            ('evaluator', 'medium', 8), ('evaluator', 'critical', 1), ('evaluator', 'low', 7),
+        ]:
+            self.create_task(agent_type, priority, minutes_ago)
+        self.assertEqual(self.scheduler.recover(), 6)
+        self.assertEqual(self.scheduler.recover(), 0)
+
+        taken = [self.scheduler._take() for _ in range(4)]
+        self.assertEqual([task_id for _, task_id, _ in taken[:3]], [
+            'evaluator-critical-1', 'quiz_master-high-5', 'evaluator-medium-8',
+        ])
+        # quiz_master is at its limit of 1 and evaluator at 2
+        self.assertIsNone(taken[3])
+        self.assertEqual(self.scheduler.metrics()['running'], 3)
+
+    def test_task_runs_once(self):
+        """A task claimed by one worker is not run again by another"""
+        task = self.create_task('quiz_master', 'medium', 1)
+        self.scheduler._run('quiz_master', task.task_id, task.assigned_at)
+        self.scheduler._run('quiz_master', task.task_id, task.assigned_at)
+
+        self.assertEqual([handled.task_id for handled in self.handled], [task.task_id])
+        task.refresh_from_db()
+        self.assertEqual(task.status, TaskStatus.IN_PROGRESS)
+
+    def test_recover_requeues_stale_tasks(self):
+        """Tasks left in progress by a dead worker are queued again"""
+        stale = self.create_task('evaluator', 'high', 120)
+        Task.objects.filter(pk=stale.pk).update(
+            status=TaskStatus.IN_PROGRESS, started_at=timezone.now() - timedelta(hours=2)
+        )
+        running = self.create_task('evaluator', 'high', 1)
+        Task.objects.filter(pk=running.pk).update(status=TaskStatus.IN_PROGRESS, started_at=timezone.now())
+
+        self.assertEqual(self.scheduler.recover(), 1)
+        self.assertEqual(self.scheduler._take()[1], stale.task_id)
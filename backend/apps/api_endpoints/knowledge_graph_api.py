@@ -17,6 +17,7 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 
+from asgiref.sync import async_to_sync
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib.auth import get_user_model
@@ -29,6 +30,7 @@ from apps.knowledge_graph.models import (
 )
 from apps.knowledge_graph.services.jac_populator import JACKnowledgeGraphPopulator
 from apps.agents.ai_multi_agent_system import get_multi_agent_system, MultiAgentSystem
+from apps.agents.response_cache import AgentResponseCache
 
 User = get_user_model()
 
@@ -408,6 +410,56 @@ class AIAgentAPIViewSet(viewsets.ViewSet):
                 'error': str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
+    @action(detail=False, methods=['get'])
+    def response_cache_stats(self, request):
+        """Get hit ratio of the AI agent response cache"""
+        try:
+            return Response({
+                'success': True,
+                'data': AgentResponseCache.get_instance().stats()
+            })
+            
+        except Exception as e:
+            return Response({
+                'success': False,
+                'error': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    @action(detail=False, methods=['post'])
+    def invalidate_response_cache(self, request):
+        """Discard cached responses of one or all AI agents"""
+        try:
+            # Only allow admin users to invalidate
+            if not request.user.is_staff:
+                return Response({
+                    'success': False,
+                    'error': 'Permission denied. Admin access required.'
+                }, status=status.HTTP_403_FORBIDDEN)
+            
+            agent_system = get_multi_agent_system()
+            agent_type = request.data.get('agent_type')
+            if agent_type and agent_type not in agent_system.agents:
+                return Response({
+                    'success': False,
+                    'error': f'Unknown agent type: {agent_type}'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            agent_types = [agent_type] if agent_type else list(agent_system.agents)
+            response_cache = AgentResponseCache.get_instance()
+            for invalidated_type in agent_types:
+                response_cache.invalidate(invalidated_type)
+            
+            return Response({
+                'success': True,
+                'data': {'invalidated_agents': agent_types}
+            })
+            
+        except Exception as e:
+            return Response({
+                'success': False,
+                'error': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
     @action(detail=False, methods=['post'])
     def chat(self, request):
         """Chat with AI agents"""
@@ -424,7 +476,7 @@ class AIAgentAPIViewSet(viewsets.ViewSet):
             }
             
             # Process the request
-            result = agent_system.process_request(chat_request)
+            result = async_to_sync(agent_system.process_request)(chat_request)
             
             return Response({
                 'success': True,
@@ -451,7 +503,7 @@ class AIAgentAPIViewSet(viewsets.ViewSet):
             }
             
             # Process multi-agent collaboration
-            result = agent_system.multi_agent_collaboration(
+            result = async_to_sync(agent_system.multi_agent_collaboration)(
                 collaboration_request['message'],
                 collaboration_request['context']
             )
@@ -493,7 +545,7 @@ Requirements:
                 }
             }
             
-            result = agent_system.process_request(content_request)
+            result = async_to_sync(agent_system.process_request)(content_request)
             
             return Response({
                 'success': True,
@@ -538,7 +590,7 @@ Areas to focus on:
                 }
             }
             
-            result = agent_system.process_request(review_request)
+            result = async_to_sync(agent_system.process_request)(review_request)
             
             return Response({
                 'success': True,
@@ -596,7 +648,7 @@ Please provide:
                 'context': knowledge_context
             }
             
-            result = agent_system.process_request(path_request)
+            result = async_to_sync(agent_system.process_request)(path_request)
             
             return Response({
                 'success': True,
@@ -0,0 +1,3 @@
+# JAC Interactive Learning Platform - Core backend implementation by Cavin Otieno
+
+# Management module for gamification app
\ No newline at end of file
@@ -0,0 +1,69 @@
+# JAC Interactive Learning Platform - Core backend implementation by Cavin Otieno
+
+"""
+Management Command - Process Gamification Events
+
+Worker that drains the gamification event outbox: points, streaks and
+achievements of completed modules and assessments, in batches. Run one or
+more as long-lived processes; workers skip the events another worker has
+claimed. With --once it drains the outbox and exits, as the
+gamification.process_events Celery task does.
+
+Usage:
+    python manage.py process_gamification_events
+    python manage.py process_gamification_events --once
+    python manage.py process_gamification_events --batch-size 500
+
+Author: Cavin Otieno
+Created: 2025-11-26
+"""
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.gamification.services.event_processor import GamificationEventProcessor
+
+
+class Command(BaseCommand):
+    help = 'Apply queued gamification events in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Drain the pending events and exit instead of polling',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Events applied per transaction (default: GAMIFICATION_EVENT_CONFIG BATCH_SIZE)',
+        )
+
+    def handle(self, *args, **options):
+        """Handle the management command"""
+        processor = GamificationEventProcessor(options['batch_size'])
+        if options['once']:
+            processed = processor.drain()
+            purged = processor.purge()
+            self.stdout.write(self.style.SUCCESS(f'Processed {processed} events, purged {purged}'))
+            return
+
+        poll_interval = getattr(settings, 'GAMIFICATION_EVENT_CONFIG', {}).get('POLL_INTERVAL', 2.0)
+        self.stdout.write(self.style.SUCCESS('Processing gamification events (Ctrl+C to stop)'))
+        last_purge = 0.0
+        try:
+            while True:
+                close_old_connections()
+                processed = processor.drain()
+                if processed:
+                    self.stdout.write(f'Processed {processed} events')
+                if time.monotonic() - last_purge > 3600:
+                    processor.purge()
+                    last_purge = time.monotonic()
+                time.sleep(poll_interval)
+        except KeyboardInterrupt:
+            self.stdout.write('Stopped')
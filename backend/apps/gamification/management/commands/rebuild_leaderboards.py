@@ -0,0 +1,36 @@
+# JAC Interactive Learning Platform - Core backend implementation by Cavin Otieno
+
+"""
+Management Command - Rebuild Leaderboards
+
+Repopulates the leaderboard sorted sets (points, streak, level, this
+week's points and points per learning path) from the gamification tables.
+The boards are normally updated as points, XP and streaks change; run this
+after deploying, after a Redis flush or outage, or on a schedule through
+the gamification.rebuild_leaderboards Celery task.
+
+Usage:
+    python manage.py rebuild_leaderboards
+
+Author: Cavin Otieno
+Created: 2025-11-26
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.gamification.services.leaderboard_service import LeaderboardService
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the gamification leaderboards from the database'
+
+    def handle(self, *args, **options):
+        """Handle the management command"""
+        sizes = LeaderboardService.get_instance().rebuild()
+        if not sizes:
+            self.stdout.write(self.style.WARNING('No leaderboard Redis URL configured, nothing to rebuild'))
+            return
+
+        for board, size in sizes.items():
+            self.stdout.write(f'{board}: {size} learners')
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {len(sizes)} leaderboards'))
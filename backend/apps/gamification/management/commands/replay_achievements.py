@@ -0,0 +1,48 @@
+# JAC Interactive Learning Platform - Core backend implementation by Cavin Otieno
+
+"""
+Management Command - Replay Achievements
+
+Recomputes achievement progress from learners' history (completed modules,
+completed assessments and perfect scores) and unlocks every achievement a
+learner has earned but not received, with its points, badge and XP. Run it
+after adding or changing achievements, or to backfill progress recorded
+before the achievement engine.
+
+Usage:
+    python manage.py replay_achievements
+    python manage.py replay_achievements --user <id> --user <id>
+
+Author: Cavin Otieno
+Created: 2025-11-26
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.gamification.services.achievement_engine import AchievementEngine
+
+
+class Command(BaseCommand):
+    help = 'Recompute achievement progress from learning history and unlock earned achievements'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            action='append',
+            type=int,
+            default=None,
+            help='Replay only this learner (repeatable)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Learners replayed per transaction',
+        )
+
+    def handle(self, *args, **options):
+        """Handle the management command"""
+        result = AchievementEngine.get_instance().replay(options['user'], options['chunk_size'])
+        self.stdout.write(
+            self.style.SUCCESS(f"Replayed {result['learners']} learners, unlocked {result['unlocked']} achievements")
+        )
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.8 on 2026-10-16 21:04
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gamification', '0002_fix_missing_fields'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GamificationEvent',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('event_type', models.CharField(choices=[('module_completed', 'Module Completed'), ('assessment_completed', 'Assessment Completed')], max_length=30)),
+                ('dedupe_key', models.CharField(help_text='Event type and the id of the object it is about', max_length=100, unique=True)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='gamification_events', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'gamification_event',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['processed_at', 'created_at'], name='gamificatio_process_70c3df_idx')],
+            },
+        ),
+    ]
@@ -16,6 +16,7 @@ Models:
 - PointTransaction: Point earning/spending history
 - LevelRequirement: Level progression requirements
 - AchievementProgress: Progress tracking for achievements
+- GamificationEvent: Outbox of learning events awaiting gamification
 
 Author: Cavin Otieno
 Created: 2025-11-26
@@ -73,6 +74,7 @@ class Badge(models.Model):
         ('epic', 'Epic'),
         ('legendary', 'Legendary'),
     ], default='common')
+    usage_count = models.PositiveIntegerField(default=0, help_text='How many times this badge has been awarded')
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -211,6 +213,7 @@ class UserAchievement(models.Model):
     # Progress History
     progress_history = models.JSONField(default=list, blank=True)
     last_progress_update = models.DateTimeField(default=timezone.now)
+    last_updated = models.DateTimeField(auto_now=True, help_text='When progress was last updated')
     
     class Meta:
         db_table = 'user_achievement'
@@ -298,54 +301,20 @@ class UserPoints(models.Model):
         return f"{self.user.username}: {self.total_points} points"
     
     def add_points(self, amount: int, source: str, metadata: dict = None):
-        """Add points to user account"""
-        self.total_points += amount
-        self.available_points += amount
-        self.lifetime_points += amount
-        self.last_earned = timezone.now()
-        
-        # Categorize points
-        if source in ['module_completion', 'assessment_perfect', 'knowledge_graph']:
-            self.learning_points += amount
-        elif source in ['code_execution', 'ai_chat']:
-            self.coding_points += amount
-        elif source in ['achievement']:
-            self.engagement_points += amount
-        
-        self.save()
-        
-        # Record transaction
-        PointTransaction.objects.create(
-            user=self.user,
-            amount=amount,
-            transaction_type='earned',
-            source=source,
-            metadata=metadata or {},
-            balance_after=self.total_points
-        )
-        
+        """Add points to user account, atomically with concurrent awards"""
+        from .services.points_ledger import PointsLedger
+        self._refresh_balance(PointsLedger().award(self.user_id, amount, source, metadata))
         return self.total_points
     
     def spend_points(self, amount: int, purpose: str, metadata: dict = None):
-        """Spend points from user account"""
-        if self.available_points < amount:
-            raise ValueError("Insufficient points")
-        
-        self.available_points -= amount
-        self.last_spent = timezone.now()
-        self.save()
-        
-        # Record transaction
-        PointTransaction.objects.create(
-            user=self.user,
-            amount=amount,
-            transaction_type='spent',
-            source=purpose,
-            metadata=metadata or {},
-            balance_after=self.total_points
-        )
-        
+        """Spend points from user account, atomically with concurrent purchases"""
+        from .services.points_ledger import PointsLedger
+        self._refresh_balance(PointsLedger().spend(self.user_id, amount, purpose, metadata))
         return self.available_points
+    
+    def _refresh_balance(self, balance: dict):
+        for field_name, value in balance.items():
+            setattr(self, field_name, value)
 
 
 class PointTransaction(models.Model):
@@ -428,6 +397,9 @@ class UserLevel(models.Model):
             self.level_up()
         
         self.save()
+        
+        from .services.leaderboard_service import LeaderboardService
+        LeaderboardService.get_instance().record_level(self.user_id, self.current_level, self.total_xp)
     
     def level_up(self):
         """Handle level up progression"""
@@ -538,6 +510,9 @@ class LearningStreak(models.Model):
         self.last_activity_date = activity_date
         self.save()
         
+        from .services.leaderboard_service import LeaderboardService
+        LeaderboardService.get_instance().record_streak(self.user_id, self.current_streak)
+        
         return self.current_streak
     
     def break_streak(self):
@@ -552,6 +527,9 @@ class LearningStreak(models.Model):
         self.current_streak = 0
         self.streak_multiplier = 1.0
         self.save()
+        
+        from .services.leaderboard_service import LeaderboardService
+        LeaderboardService.get_instance().record_streak(self.user_id, self.current_streak)
 
 
 class LevelRequirement(models.Model):
@@ -641,4 +619,41 @@ class AchievementProgress(models.Model):
             )
             user_achievement.update_progress(self.current_count)
         
-        return self.current_count
\ No newline at end of file
+        return self.current_count
+
+
+class GamificationEvent(models.Model):
+    """
+    Learning event awaiting its gamification side effects
+    
+    Written in the same transaction as the activity that caused it and
+    drained by the process_gamification_events worker. dedupe_key keeps one
+    event per completed module or assessment attempt, however often it is
+    saved; processed_at makes processing happen once per event.
+    """
+    EVENT_TYPES = [
+        ('module_completed', 'Module Completed'),
+        ('assessment_completed', 'Assessment Completed'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='gamification_events')
+    event_type = models.CharField(max_length=30, choices=EVENT_TYPES)
+    dedupe_key = models.CharField(max_length=100, unique=True, help_text='Event type and the id of the object it is about')
+    payload = models.JSONField(default=dict, blank=True)
+    
+    # Processing State
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    
+    class Meta:
+        db_table = 'gamification_event'
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['processed_at', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.event_type} for user {self.user_id}"
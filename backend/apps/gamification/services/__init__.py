@@ -0,0 +1,26 @@
+# JAC Interactive Learning Platform - Core backend implementation by Cavin Otieno
+
+"""
+Gamification Services Package
+
+Services:
+- LeaderboardService: Precomputed leaderboards in Redis sorted sets
+- PointsLedger: Atomic point balances backed by the transaction ledger
+- GamificationEventProcessor: Batched processing of queued learning events
+- AchievementEngine: Indexed achievement rules with bulk progress updates
+
+Author: Cavin Otieno
+Created: 2025-11-26
+"""
+
+from .leaderboard_service import LeaderboardService
+from .points_ledger import PointsLedger
+from .event_processor import GamificationEventProcessor
+from .achievement_engine import AchievementEngine
+
+__all__ = [
+    'LeaderboardService',
+    'PointsLedger',
+    'GamificationEventProcessor',
+    'AchievementEngine',
+]
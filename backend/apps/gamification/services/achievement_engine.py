@@ -0,0 +1,354 @@
+# JAC Interactive Learning Platform - Core backend implementation by Cavin Otieno
+
+"""
+Achievement Engine - JAC Learning Platform
+
+Evaluates achievement rules against learners' activity counts. Active
+achievements are indexed in process by criteria_type, so an event only
+looks at the rules of its own counters, without querying achievements.
+Saving or deleting an Achievement retires the index in every process
+through a version number in the shared cache.
+
+apply() takes the counter increments of a whole batch of learners and
+evaluates them in one pass:
+
+- missing AchievementProgress rows are inserted, then one query locks
+  the affected rows, and one bulk upsert writes the new counts,
+- newly met rules are unlocked together: UserAchievement and UserBadge
+  rows in bulk, reward points in one points ledger batch, and XP once
+  per learner.
+
+The number of queries grows with the number of learners, not with the
+number of achievements. A batch runs in a savepoint; if it fails, each
+learner's part is retried in a savepoint of its own, so one learner's
+bad data does not hold back everyone else's progress.
+
+replay() recomputes every learner's counters from their history and
+unlocks whatever they have earned but not received.
+
+Author: Cavin Otieno
+Created: 2025-11-26
+"""
+
+import logging
+import threading
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from ..models import Achievement, AchievementProgress, Badge, UserAchievement, UserBadge, UserLevel
+from .points_ledger import PointAward, PointsLedger
+
+logger = logging.getLogger(__name__)
+
+RULES_VERSION_KEY = 'gamification:achievement-rules:version'
+
+
+@dataclass(frozen=True)
+class AchievementRule:
+    """An active achievement, as evaluated by the engine"""
+    achievement_id: Any
+    title: str
+    criteria_type: str
+    criteria_value: int
+    criteria_operator: str
+    points_reward: int
+    badge_id: Any
+
+    def is_met(self, count: int) -> bool:
+        if self.criteria_operator == 'gt':
+            return count > self.criteria_value
+        if self.criteria_operator == 'eq':
+            return count == self.criteria_value
+        return count >= self.criteria_value
+
+
+def _completed_modules():
+    from apps.learning.models import UserModuleProgress
+    return UserModuleProgress.objects.filter(status='completed')
+
+
+def _completed_assessments():
+    from apps.assessments.models import AssessmentAttempt
+    return AssessmentAttempt.objects.filter(status='completed', score__isnull=False)
+
+
+# Counters replay() can recompute from history, as querysets of one row per counted activity
+HISTORY_COUNTERS = {
+    'modules_completed': _completed_modules,
+    'assessments_completed': _completed_assessments,
+    'perfect_scores': lambda: _completed_assessments().filter(score__gte=100),
+}
+
+
+class AchievementEngine:
+    """
+    Indexed achievement rules and batched progress updates
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        self._rules: Optional[Dict[str, List[AchievementRule]]] = None
+        self._rules_version = None
+        self._rules_lock = threading.Lock()
+        self.ledger = PointsLedger()
+
+    @classmethod
+    def get_instance(cls) -> 'AchievementEngine':
+        """Get the achievement engine of this process"""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    @staticmethod
+    def invalidate_rules():
+        """Retire the rule index of every process, e.g. after an achievement changed"""
+        if not cache.add(RULES_VERSION_KEY, 2, None):
+            cache.incr(RULES_VERSION_KEY)
+
+    def record(self, user_id, criteria_type: str, increment_by: int = 1) -> List[Dict[str, Any]]:
+        """Count one learner's activity; see apply()"""
+        return self.apply({(user_id, criteria_type): increment_by})
+
+    def apply(self, increments: Dict[Tuple[Any, str], int]) -> List[Dict[str, Any]]:
+        """
+        Add to learners' counters and unlock the achievements they meet
+
+        Args:
+            increments: Increment of each (user id, criteria_type) counter
+
+        Returns:
+            Progress of every achievement whose count changed
+        """
+        index = self._index()
+        increments = {key: amount for key, amount in increments.items() if amount and index.get(key[1])}
+        if not increments:
+            return []
+
+        def store(increments):
+            current = self._locked_counts({
+                (user_id, rule) for user_id, criteria_type in increments for rule in index[criteria_type]
+            })
+            return self._store({
+                (user_id, rule): current.get((user_id, rule.achievement_id), 0) + amount
+                for (user_id, criteria_type), amount in increments.items()
+                for rule in index[criteria_type]
+            })
+
+        with transaction.atomic():
+            return self._isolated(increments, store)
+
+    def replay(self, user_ids: Iterable[Any] = None, chunk_size: int = 1000) -> Dict[str, int]:
+        """
+        Recompute progress of every rule with a history counter from
+        learners' activity, and unlock what they earned
+
+        Args:
+            user_ids: Learners to replay, default everyone with activity
+
+        Returns:
+            Number of learners replayed and achievements unlocked
+        """
+        index = self._index()
+        criteria_types = [criteria_type for criteria_type in HISTORY_COUNTERS if index.get(criteria_type)]
+        if user_ids is None:
+            user_ids = set()
+            for criteria_type in criteria_types:
+                user_ids.update(HISTORY_COUNTERS[criteria_type]().values_list('user_id', flat=True).distinct())
+        user_ids = sorted(user_ids)
+
+        unlocked = 0
+        for start in range(0, len(user_ids), chunk_size):
+            chunk = user_ids[start:start + chunk_size]
+            history = defaultdict(int)
+            for criteria_type in criteria_types:
+                for row in (
+                    HISTORY_COUNTERS[criteria_type]().filter(user_id__in=chunk)
+                    .values('user_id').annotate(count=Count('pk')).order_by()
+                ):
+                    history[row['user_id'], criteria_type] = row['count']
+
+            with transaction.atomic():
+                progress = self._isolated({
+                    (user_id, rule): history[user_id, criteria_type]
+                    for user_id in chunk
+                    for criteria_type in criteria_types
+                    for rule in index[criteria_type]
+                }, self._store)
+            unlocked += sum(1 for entry in progress if entry['unlocked'])
+        return {'learners': len(user_ids), 'unlocked': unlocked}
+
+    def _index(self) -> Dict[str, List[AchievementRule]]:
+        """Rules by criteria_type, rebuilt when an achievement changed in any process"""
+        version = cache.get(RULES_VERSION_KEY, 1)
+        if self._rules is None or version != self._rules_version:
+            with self._rules_lock:
+                if self._rules is None or version != self._rules_version:
+                    rules = defaultdict(list)
+                    for achievement in Achievement.objects.filter(is_active=True).values(
+                        'id', 'title', 'criteria_type', 'criteria_value', 'criteria_operator',
+                        'points_reward', 'badge_id'
+                    ):
+                        rules[achievement['criteria_type']].append(AchievementRule(
+                            achievement_id=achievement.pop('id'), **achievement
+                        ))
+                    self._rules, self._rules_version = dict(rules), version
+        return self._rules
+
+    @staticmethod
+    def _isolated(items: Dict[Tuple[Any, Any], Any], store) -> List[Dict[str, Any]]:
+        """
+        Store a batch keyed by (user id, ...) in a savepoint; if it fails,
+        store each learner's part in a savepoint of its own, so one
+        learner's failure does not undo the others'
+        """
+        try:
+            with transaction.atomic():
+                return store(items)
+        except Exception as e:
+            logger.warning(f"Achievement batch failed, storing its learners one by one: {e}")
+
+        progress = []
+        for user_id in sorted({key[0] for key in items}, key=str):
+            try:
+                with transaction.atomic():
+                    progress += store({key: value for key, value in items.items() if key[0] == user_id})
+            except Exception as e:
+                logger.error(f"Achievement progress of user {user_id} failed: {e}")
+        return progress
+
+    @staticmethod
+    def _locked_counts(keys: Iterable[Tuple[Any, AchievementRule]]) -> Dict[Tuple[Any, Any], int]:
+        """Counts of (user id, rule) progress rows, locked; rows a learner does not have yet are created first"""
+        keys = list(keys)
+        # A row that does not exist cannot be locked, so concurrent first increments would both start at 0
+        AchievementProgress.objects.bulk_create(
+            [
+                AchievementProgress(user_id=user_id, achievement_id=rule.achievement_id,
+                                    current_count=0, target_count=rule.criteria_value)
+                for user_id, rule in keys
+            ],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+        return {
+            (user_id, achievement_id): current_count
+            for user_id, achievement_id, current_count in AchievementProgress.objects.select_for_update().filter(
+                user_id__in={user_id for user_id, _ in keys},
+                achievement_id__in={rule.achievement_id for _, rule in keys},
+            ).order_by('user_id', 'achievement_id').values_list('user_id', 'achievement_id', 'current_count')
+        }
+
+    def _store(self, counts: Dict[Tuple[Any, AchievementRule], int]) -> List[Dict[str, Any]]:
+        """Upsert progress counts and unlock the rules they meet; caller holds a transaction"""
+        now = timezone.now()
+        AchievementProgress.objects.bulk_create(
+            [
+                AchievementProgress(
+                    user_id=user_id, achievement_id=rule.achievement_id,
+                    current_count=count, target_count=rule.criteria_value, last_update=now
+                )
+                for (user_id, rule), count in counts.items()
+            ],
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['user', 'achievement'],
+            update_fields=['current_count', 'target_count', 'last_update'],
+        )
+
+        met = [(user_id, rule) for (user_id, rule), count in counts.items() if rule.is_met(count)]
+        completed = set()
+        if met:
+            completed = set(UserAchievement.objects.filter(
+                user_id__in={user_id for user_id, _ in met},
+                achievement_id__in={rule.achievement_id for _, rule in met},
+                is_completed=True,
+            ).values_list('user_id', 'achievement_id'))
+        unlocking = [(user_id, rule) for user_id, rule in met if (user_id, rule.achievement_id) not in completed]
+        self._unlock(unlocking, now)
+
+        unlocked = {(user_id, rule.achievement_id) for user_id, rule in unlocking}
+        return [
+            {
+                'user_id': user_id,
+                'achievement': rule.title,
+                'current_count': count,
+                'target_count': rule.criteria_value,
+                'completed': rule.is_met(count) or (user_id, rule.achievement_id) in completed,
+                'unlocked': (user_id, rule.achievement_id) in unlocked,
+            }
+            for (user_id, rule), count in counts.items()
+        ]
+
+    def _unlock(self, unlocking: List[Tuple[Any, AchievementRule]], now):
+        """Complete achievements, with their badges, points and XP"""
+        if not unlocking:
+            return
+
+        badge_rules = [(user_id, rule) for user_id, rule in unlocking if rule.badge_id]
+        owned = set()
+        if badge_rules:
+            owned = set(UserBadge.objects.filter(
+                user_id__in={user_id for user_id, _ in badge_rules},
+                badge_id__in={rule.badge_id for _, rule in badge_rules},
+            ).values_list('user_id', 'badge_id'))
+        badges = {}
+        for user_id, rule in badge_rules:
+            if (user_id, rule.badge_id) not in owned:
+                owned.add((user_id, rule.badge_id))
+                badges[user_id, rule.achievement_id] = UserBadge(
+                    user_id=user_id, badge_id=rule.badge_id,
+                    earned_through='achievement_unlock', is_verified=True, verified_at=now
+                )
+        UserBadge.objects.bulk_create(badges.values())
+        awarded = Counter(user_badge.badge_id for user_badge in badges.values())
+        for badge_id, count in awarded.items():
+            Badge.objects.filter(id=badge_id).update(usage_count=F('usage_count') + count)
+
+        UserAchievement.objects.bulk_create(
+            [
+                UserAchievement(
+                    user_id=user_id,
+                    achievement_id=rule.achievement_id,
+                    target_progress=rule.criteria_value,
+                    current_progress=rule.criteria_value,
+                    progress_percentage=100.0,
+                    is_completed=True,
+                    completed_at=now,
+                    points_earned=rule.points_reward,
+                    badge_earned=badges.get((user_id, rule.achievement_id)),
+                    last_progress_update=now,
+                )
+                for user_id, rule in unlocking
+            ],
+            update_conflicts=True,
+            unique_fields=['user', 'achievement'],
+            update_fields=[
+                'target_progress', 'current_progress', 'progress_percentage', 'is_completed',
+                'completed_at', 'points_earned', 'badge_earned', 'last_progress_update', 'last_updated',
+            ],
+        )
+
+        self.ledger.award_many([
+            PointAward(user_id, rule.points_reward, 'achievement', {
+                'achievement_id': str(rule.achievement_id),
+                'achievement_title': rule.title
+            })
+            for user_id, rule in unlocking
+        ])
+
+        xp = defaultdict(int)
+        for user_id, rule in unlocking:
+            xp[user_id] += rule.points_reward
+        for user_id, amount in xp.items():
+            if amount:
+                UserLevel.objects.get_or_create(user_id=user_id)[0].add_xp(amount)
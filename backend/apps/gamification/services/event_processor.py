@@ -0,0 +1,187 @@
+# JAC Interactive Learning Platform - Core backend implementation by Cavin Otieno
+
+"""
+Gamification Event Processor - JAC Learning Platform
+
+Moves the gamification side effects of completing a module or an
+assessment out of the saving request. The post_save signals only record a
+GamificationEvent in the same transaction as the save. The
+process_gamification_events worker drains the outbox in batches:
+
+- points for the whole batch are awarded through the points ledger in one
+  grouped write, with the learning path of every completed module looked
+  up in one query,
+- each learner's streak is recorded once per batch, and the achievement
+  engine applies every learner's counter increments in one pass,
+- the batch's events are marked processed in the transaction that applied
+  them, so an event's side effects happen once.
+
+A batch that fails is retried one event at a time, so one bad event
+cannot hold up the others. An event that keeps failing is parked after
+MAX_ATTEMPTS tries, with its last error.
+
+Author: Cavin Otieno
+Created: 2025-11-26
+"""
+
+import logging
+from collections import Counter
+from datetime import timedelta
+from typing import Any, Dict, List
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from ..models import GamificationEvent, LearningStreak
+from .achievement_engine import AchievementEngine
+from .points_ledger import PointAward, PointsLedger
+
+logger = logging.getLogger(__name__)
+
+
+def assessment_points(score: float):
+    """Points and point source of an assessment score"""
+    if score >= 90:
+        return 100, 'assessment_perfect'
+    if score >= 70:
+        return 75, 'assessment_good'
+    if score >= 50:
+        return 50, 'assessment_passed'
+    return 25, 'assessment_attempted'
+
+
+def record_event(user_id, event_type: str, object_id, payload: Dict[str, Any] = None):
+    """
+    Queue a gamification event in the current transaction
+
+    Events about an object already queued, e.g. a completed module saved
+    again, are ignored.
+    """
+    GamificationEvent.objects.bulk_create(
+        [GamificationEvent(
+            user_id=user_id,
+            event_type=event_type,
+            dedupe_key=f'{event_type}:{object_id}',
+            payload=payload or {},
+        )],
+        ignore_conflicts=True,
+    )
+
+
+class GamificationEventProcessor:
+    """
+    Drains the gamification event outbox
+    """
+
+    def __init__(self, batch_size: int = None):
+        event_config = getattr(settings, 'GAMIFICATION_EVENT_CONFIG', {})
+        self.batch_size = batch_size or event_config.get('BATCH_SIZE', 200)
+        self.max_attempts = event_config.get('MAX_ATTEMPTS', 5)
+        self.retention = timedelta(days=event_config.get('RETENTION_DAYS', 7))
+        self.ledger = PointsLedger()
+
+    def process_batch(self) -> int:
+        """
+        Apply the oldest pending events
+
+        Returns:
+            Number of events processed
+        """
+        events = []
+        try:
+            with transaction.atomic():
+                events = self._claim()
+                if not events:
+                    return 0
+                self._apply(events)
+                self._mark_processed(events)
+            return len(events)
+        except Exception as e:
+            logger.warning(f"Gamification event batch failed, retrying its events one by one: {e}")
+
+        processed = 0
+        for event_id in [event.id for event in events]:
+            try:
+                with transaction.atomic():
+                    claimed = self._claim(event_id)
+                    if claimed:
+                        self._apply(claimed)
+                        self._mark_processed(claimed)
+                        processed += 1
+            except Exception as e:
+                logger.error(f"Gamification event {event_id} failed: {e}")
+                GamificationEvent.objects.filter(id=event_id).update(attempts=F('attempts') + 1, last_error=str(e))
+        return processed
+
+    def drain(self) -> int:
+        """Process batches until no pending events are left; returns the number processed"""
+        processed = 0
+        while True:
+            count = self.process_batch()
+            processed += count
+            if count < self.batch_size:
+                return processed
+
+    def purge(self) -> int:
+        """Delete events processed longer ago than RETENTION_DAYS"""
+        deleted, _ = GamificationEvent.objects.filter(
+            processed_at__lt=timezone.now() - self.retention
+        ).delete()
+        return deleted
+
+    def _claim(self, event_id=None) -> List[GamificationEvent]:
+        """Lock pending events; skip those another worker holds"""
+        pending = GamificationEvent.objects.select_for_update(skip_locked=True).filter(
+            processed_at__isnull=True, attempts__lt=self.max_attempts
+        )
+        if event_id is not None:
+            pending = pending.filter(id=event_id)
+        return list(pending.order_by('created_at')[:self.batch_size])
+
+    def _apply(self, events: List[GamificationEvent]):
+        learning_paths = self._learning_paths(events)
+        awards = []
+        progress = Counter()
+        for event in events:
+            payload = event.payload
+            if event.event_type == 'module_completed':
+                if 'learning_path_id' not in payload:
+                    payload = {**payload, 'learning_path_id': learning_paths.get(payload['module_id'])}
+                awards.append(PointAward(event.user_id, 50, 'module_completion', payload))
+                progress[event.user_id, 'modules_completed'] += 1
+            elif event.event_type == 'assessment_completed':
+                points, source = assessment_points(payload['score'])
+                awards.append(PointAward(event.user_id, points, source, payload))
+                progress[event.user_id, 'assessments_completed'] += 1
+                if payload['score'] >= 100:  # Perfect score
+                    progress[event.user_id, 'perfect_scores'] += 1
+
+        self.ledger.award_many(awards)
+
+        for user_id in {event.user_id for event in events}:
+            LearningStreak.objects.get_or_create(user_id=user_id)[0].record_activity()
+        AchievementEngine.get_instance().apply(progress)
+
+    @staticmethod
+    def _learning_paths(events: List[GamificationEvent]) -> Dict[str, Any]:
+        """Learning path id of each completed module of a batch, in one query"""
+        from apps.learning.models import Module
+        module_ids = {
+            event.payload['module_id'] for event in events
+            if event.event_type == 'module_completed' and 'learning_path_id' not in event.payload
+        }
+        if not module_ids:
+            return {}
+        return {
+            str(module_id): str(learning_path_id) if learning_path_id else None
+            for module_id, learning_path_id in Module.objects.filter(id__in=module_ids).values_list(
+                'id', 'learning_path_id'
+            )
+        }
+
+    def _mark_processed(self, events: List[GamificationEvent]):
+        GamificationEvent.objects.filter(id__in=[event.id for event in events]).update(
+            processed_at=timezone.now(), attempts=F('attempts') + 1, last_error=''
+        )
@@ -0,0 +1,345 @@
+# JAC Interactive Learning Platform - Core backend implementation by Cavin Otieno
+
+"""
+Leaderboard Service - JAC Learning Platform
+
+Keeps the gamification leaderboards precomputed in Redis sorted sets: all
+time points, streaks and levels, points earned this week, and points
+earned in each learning path. UserPoints, UserLevel and LearningStreak
+update them as they change, once their transaction commits, so ranks and
+windows are read in O(log n) without scanning or ordering the tables.
+
+The database stays the source of truth. rebuild() repopulates every board
+from it, and a board that has not been built yet (a new week or learning
+path) is copied from it by its first reader. A Redis outage makes reads
+fall back to ordering the database directly.
+
+Author: Cavin Otieno
+Created: 2025-11-26
+"""
+
+import uuid
+import logging
+import threading
+from datetime import date, datetime, time, timedelta
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple
+
+import redis
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from ..models import UserPoints, UserLevel, LearningStreak, PointTransaction
+
+logger = logging.getLogger(__name__)
+
+BOARD_TYPES = ('points', 'streak', 'level')
+PERIODS = ('all', 'weekly')
+
+# Seconds a reader may spend building a board that was never built
+BUILD_LOCK_TIMEOUT = 60
+
+# Level boards order by level, then total XP, packed into one exact float score
+LEVEL_SCORE_FACTOR = 2 ** 31
+
+
+def get_leaderboard_config() -> Dict[str, Any]:
+    """Leaderboard settings from GAMIFICATION_LEADERBOARD_CONFIG"""
+    return getattr(settings, 'GAMIFICATION_LEADERBOARD_CONFIG', {})
+
+
+def week_label(moment: datetime = None) -> str:
+    """ISO week of a moment (default now) in the platform time zone, e.g. 2025-W48"""
+    year, week, _ = timezone.localdate(moment).isocalendar()
+    return f'{year}-W{week:02d}'
+
+
+def week_bounds(label: str) -> Tuple[datetime, datetime]:
+    """Start and end of an ISO week label"""
+    year, week = label.split('-W')
+    start = timezone.make_aware(datetime.combine(date.fromisocalendar(int(year), int(week), 1), time.min))
+    return start, start + timedelta(weeks=1)
+
+
+def level_score(current_level: int, total_xp: int) -> int:
+    return current_level * LEVEL_SCORE_FACTOR + total_xp
+
+
+class LeaderboardService:
+    """
+    Reads and maintains the leaderboards
+
+    Boards are named 'points', 'streak', 'level', 'points:week:<ISO week>'
+    and 'points:path:<learning path id>'; board_name() builds the name from
+    request parameters.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, client: redis.Redis = None):
+        config = get_leaderboard_config()
+        self.prefix = config.get('KEY_PREFIX', 'gamification:leaderboard')
+        self.max_page_size = config.get('MAX_PAGE_SIZE', 100)
+        self.weekly_ttl = int(timedelta(weeks=config.get('WEEKLY_RETENTION_WEEKS', 5)).total_seconds())
+        self.client = client
+        if client is None and config.get('REDIS_URL'):
+            self.client = redis.Redis.from_url(
+                config['REDIS_URL'],
+                socket_timeout=config.get('SOCKET_TIMEOUT', 0.5),
+                socket_connect_timeout=config.get('SOCKET_TIMEOUT', 0.5),
+            )
+
+    @classmethod
+    def get_instance(cls) -> 'LeaderboardService':
+        """Get the leaderboard service of this process"""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    @staticmethod
+    def board_name(board_type: str = 'points', period: str = None, learning_path: str = None) -> str:
+        """
+        Board for a leaderboard type, period and learning path
+
+        Raises:
+            ValueError: Unknown type or period, or a weekly or learning path
+                board of anything other than points
+        """
+        period = period or 'all'
+        if board_type not in BOARD_TYPES:
+            raise ValueError('Invalid leaderboard type')
+        if period not in PERIODS:
+            raise ValueError('Invalid leaderboard period')
+        if (period == 'weekly' or learning_path) and board_type != 'points':
+            raise ValueError('Weekly and learning path leaderboards rank points only')
+        if period == 'weekly' and learning_path:
+            raise ValueError('Weekly leaderboards cover every learning path')
+
+        if period == 'weekly':
+            return f'points:week:{week_label()}'
+        if learning_path:
+            return f'points:path:{uuid.UUID(str(learning_path))}'
+        return board_type
+
+    def window(self, board: str, offset: int = 0, limit: int = 10) -> List[Tuple[Any, float]]:
+        """(user id, score) of the ranks after offset, best first, O(log n + limit)"""
+        try:
+            key = self._live_key(board)
+            if key:
+                return [
+                    (int(member), score)
+                    for member, score in self.client.zrevrange(key, offset, offset + limit - 1, withscores=True)
+                ]
+        except redis.RedisError as e:
+            logger.warning(f"Leaderboard {board} unavailable in Redis, reading the database: {e}")
+
+        return [(row['user_id'], row['score']) for row in self._board_queryset(board)[offset:offset + limit]]
+
+    def rank(self, board: str, user_id) -> Optional[Tuple[int, float]]:
+        """1-based rank and score of a learner, O(log n); None if not ranked"""
+        try:
+            key = self._live_key(board)
+            if key:
+                pipe = self.client.pipeline(transaction=False)
+                pipe.zrevrank(key, user_id)
+                pipe.zscore(key, user_id)
+                position, score = pipe.execute()
+                return None if position is None else (position + 1, score)
+        except redis.RedisError as e:
+            logger.warning(f"Leaderboard {board} unavailable in Redis, reading the database: {e}")
+
+        queryset = self._board_queryset(board)
+        row = queryset.filter(user_id=user_id).first()
+        if row is None:
+            return None
+        return queryset.filter(score__gt=row['score']).count() + 1, row['score']
+
+    def around(self, board: str, user_id, limit: int = 10) -> Tuple[int, List[Tuple[Any, float]]]:
+        """Window of limit ranks centred on a learner, with the offset it starts at"""
+        ranked = self.rank(board, user_id)
+        offset = max(ranked[0] - 1 - limit // 2, 0) if ranked else 0
+        return offset, self.window(board, offset, limit)
+
+    def size(self, board: str) -> int:
+        """Number of learners on a board"""
+        try:
+            key = self._live_key(board)
+            if key:
+                return self.client.zcard(key)
+        except redis.RedisError as e:
+            logger.warning(f"Leaderboard {board} unavailable in Redis, reading the database: {e}")
+        return self._board_queryset(board).count()
+
+    def entries(self, board: str, rows: List[Tuple[Any, float]], offset: int = 0) -> List[Dict[str, Any]]:
+        """Ranked rows with each learner's name, points, level and streak, in one query"""
+        profiles = {
+            profile['id']: profile
+            for profile in get_user_model().objects.filter(id__in=[user_id for user_id, _ in rows]).values(
+                'id', 'username',
+                board_points=F('user_points__total_points'),
+                board_level=F('user_levels__current_level'),
+                board_streak=F('learning_streaks__current_streak'),
+            )
+        }
+
+        entries = []
+        for rank, (user_id, score) in enumerate(rows, offset + 1):
+            profile = profiles.get(user_id)
+            if profile is None:
+                continue
+            entries.append({
+                'user': profile['username'],
+                'rank': rank,
+                'score': self.display_score(board, score),
+                'total_points': profile['board_points'] or 0,
+                'current_level': profile['board_level'] or 1,
+                'current_streak': profile['board_streak'] or 0,
+            })
+        return entries
+
+    @staticmethod
+    def display_score(board: str, score: float) -> int:
+        """Board score as shown to learners: points, streak days or level"""
+        if board == 'level':
+            return int(score // LEVEL_SCORE_FACTOR)
+        return int(score)
+
+    def record_points(self, user_id, total_points: int, amount: int, metadata: Dict[str, Any] = None):
+        """Update the points boards for points earned, once the transaction commits"""
+        learning_path_id = (metadata or {}).get('learning_path_id')
+        self._on_commit(self._apply_points, user_id, total_points, amount, week_label(), learning_path_id)
+
+    def record_level(self, user_id, current_level: int, total_xp: int):
+        """Update the level board, once the transaction commits"""
+        self._on_commit(self._apply_score, 'level', user_id, level_score(current_level, total_xp), True)
+
+    def record_streak(self, user_id, current_streak: int):
+        """Update the streak board, once the transaction commits"""
+        self._on_commit(self._apply_score, 'streak', user_id, current_streak)
+
+    def rebuild(self) -> Dict[str, int]:
+        """
+        Repopulate every board from the database
+
+        Each board is written under a temporary key and swapped in, so
+        readers never see a partial board. Updates committed while a board
+        is being copied may be overwritten until the learner's next one.
+
+        Returns:
+            Number of learners on each board
+        """
+        if self.client is None:
+            return {}
+
+        boards = ['points', 'streak', 'level', f'points:week:{week_label()}']
+        learning_paths = PointTransaction.objects.filter(
+            transaction_type='earned', metadata__has_key='learning_path_id'
+        ).values_list('metadata__learning_path_id', flat=True).distinct()
+        boards += sorted(f'points:path:{learning_path}' for learning_path in learning_paths if learning_path)
+
+        sizes = {board: self._build(board) for board in boards}
+
+        pipe = self.client.pipeline()
+        pipe.delete(self._key('built'))
+        pipe.sadd(self._key('built'), *boards)
+        pipe.execute()
+        return sizes
+
+    def _build(self, board: str, building: str = None) -> int:
+        """Copy one board from the database and swap it in; returns its size"""
+        key = self._key(board)
+        building = building or f'{key}:rebuild'
+        self.client.delete(building)
+        size = 0
+        batch = {}
+        for row in self._board_queryset(board).iterator(chunk_size=2000):
+            batch[row['user_id']] = row['score']
+            if len(batch) >= 2000:
+                size += self.client.zadd(building, batch)
+                batch = {}
+        if batch:
+            size += self.client.zadd(building, batch)
+
+        if size:
+            pipe = self.client.pipeline()
+            pipe.rename(building, key)
+            if board.startswith('points:week:'):
+                pipe.expire(key, self.weekly_ttl)
+            pipe.execute()
+        else:
+            self.client.delete(key)
+        return size
+
+    def _live_key(self, board: str) -> Optional[str]:
+        """
+        Redis key of a board, None to read the database
+
+        A board that has not been built yet (a new week or learning path,
+        or before the first rebuild()) is built by the first reader, while
+        concurrent readers use the database.
+        """
+        if self.client is None:
+            return None
+        if self.client.sismember(self._key('built'), board):
+            return self._key(board)
+
+        lock = f'{self._key(board)}:building'
+        if not self.client.set(lock, 1, nx=True, ex=BUILD_LOCK_TIMEOUT):
+            return None
+        try:
+            self._build(board, f'{lock}:{uuid.uuid4().hex}')
+            self.client.sadd(self._key('built'), board)
+        finally:
+            self.client.delete(lock)
+        return self._key(board)
+
+    def _key(self, board: str) -> str:
+        return f'{self.prefix}:{board}'
+
+    def _board_queryset(self, board: str):
+        """Learners and scores of a board, best first, computed by the database"""
+        if board == 'points':
+            queryset = UserPoints.objects.annotate(score=F('total_points'))
+        elif board == 'streak':
+            queryset = LearningStreak.objects.annotate(score=F('current_streak'))
+        elif board == 'level':
+            queryset = UserLevel.objects.annotate(score=F('current_level') * LEVEL_SCORE_FACTOR + F('total_xp'))
+        else:
+            earned = PointTransaction.objects.filter(transaction_type='earned')
+            if board.startswith('points:week:'):
+                start, end = week_bounds(board.rsplit(':', 1)[1])
+                earned = earned.filter(created_at__gte=start, created_at__lt=end)
+            else:
+                earned = earned.filter(metadata__learning_path_id=board.rsplit(':', 1)[1])
+            return earned.values('user_id').annotate(score=Sum('amount')).order_by('-score', 'user_id')
+        return queryset.values('user_id', 'score').order_by('-score', 'user_id')
+
+    def _on_commit(self, apply, *args):
+        if self.client is not None:
+            transaction.on_commit(partial(apply, *args))
+
+    def _apply_points(self, user_id, total_points: int, amount: int, week: str, learning_path_id: Optional[str]):
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            # Totals only grow, so GT keeps the newest total when commits land out of order
+            pipe.zadd(self._key('points'), {user_id: total_points}, gt=True)
+            weekly = self._key(f'points:week:{week}')
+            pipe.zincrby(weekly, amount, user_id)
+            pipe.expire(weekly, self.weekly_ttl)
+            if learning_path_id:
+                pipe.zincrby(self._key(f'points:path:{learning_path_id}'), amount, user_id)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Could not update the points leaderboards of user {user_id}: {e}")
+
+    def _apply_score(self, board: str, user_id, score: int, only_growing: bool = False):
+        try:
+            self.client.zadd(self._key(board), {user_id: score}, gt=only_growing)
+        except redis.RedisError as e:
+            logger.warning(f"Could not update the {board} leaderboard of user {user_id}: {e}")
@@ -0,0 +1,217 @@
+# JAC Interactive Learning Platform - Core backend implementation by Cavin Otieno
+
+"""
+Points Ledger - JAC Learning Platform
+
+Applies point awards and spending to UserPoints balances without reading
+them into Python first. Balances change by F() expressions in one UPDATE
+per learner, so concurrent awards from signals and API calls never
+overwrite each other. Each award or purchase is appended to the
+PointTransaction ledger, with bulk inserts.
+
+A burst of awards goes through award_many(), which groups them by learner.
+That makes one balance UPDATE per learner for the whole burst instead of
+one per award, and holds each row lock for one short transaction.
+
+Balances are read from a cached snapshot that is dropped when a
+transaction changing them commits.
+
+Author: Cavin Otieno
+Created: 2025-11-26
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from ..models import UserPoints, PointTransaction
+
+BALANCE_CACHE_PREFIX = 'gamification:points'
+BALANCE_FIELDS = (
+    'total_points', 'available_points', 'lifetime_points',
+    'learning_points', 'coding_points', 'assessment_points', 'engagement_points',
+    'points_from_achievements', 'last_earned', 'last_spent',
+)
+
+# Category counter each point source adds to
+SOURCE_CATEGORIES = {
+    'module_completion': 'learning_points',
+    'assessment_perfect': 'learning_points',
+    'knowledge_graph': 'learning_points',
+    'code_execution': 'coding_points',
+    'ai_chat': 'coding_points',
+    'achievement': 'engagement_points',
+}
+
+
+@dataclass
+class PointAward:
+    """Points earned by a learner from one source"""
+    user_id: Any
+    amount: int
+    source: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+class PointsLedger:
+    """
+    Atomic point balances backed by the PointTransaction ledger
+    """
+
+    def __init__(self):
+        points_config = getattr(settings, 'GAMIFICATION_POINTS_CONFIG', {})
+        self.balance_ttl = points_config.get('BALANCE_CACHE_TTL', 300)
+        self.batch_size = points_config.get('TRANSACTION_BATCH_SIZE', 1000)
+
+    def award(self, user_id, amount: int, source: str, metadata: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Add earned points to a learner's balance
+
+        Returns:
+            The learner's balance after the award; a zero award changes
+            nothing and returns the current balance (empty without a points
+            account)
+        """
+        balances = self.award_many([PointAward(user_id, amount, source, metadata or {})])
+        if user_id in balances:
+            return balances[user_id]
+        return self.balance(user_id) or {}
+
+    def award_many(self, awards: Iterable[PointAward]) -> Dict[Any, Dict[str, Any]]:
+        """
+        Apply a batch of awards: one balance UPDATE per learner and bulk
+        inserted transactions
+
+        Returns:
+            The balance of each awarded learner after the batch
+        """
+        awards = [award for award in awards if award.amount]
+        if not awards:
+            return {}
+
+        now = timezone.now()
+        increments = defaultdict(lambda: defaultdict(int))
+        for award in awards:
+            totals = increments[award.user_id]
+            for counter in ('total_points', 'available_points', 'lifetime_points'):
+                totals[counter] += award.amount
+            if award.source in SOURCE_CATEGORIES:
+                totals[SOURCE_CATEGORIES[award.source]] += award.amount
+            if award.source == 'achievement':
+                totals['points_from_achievements'] += award.amount
+
+        with transaction.atomic():
+            # Learners in a fixed order, so concurrent batches lock rows without deadlocking
+            missing = [
+                user_id for user_id in sorted(increments)
+                if not self._increment(user_id, increments[user_id], last_earned=now)
+            ]
+            if missing:
+                UserPoints.objects.bulk_create(
+                    [UserPoints(user_id=user_id) for user_id in missing], ignore_conflicts=True
+                )
+                for user_id in missing:
+                    self._increment(user_id, increments[user_id], last_earned=now)
+
+            balances = self._read(increments)
+
+            # balance_after of each award: the final total less the awards after it
+            running = {user_id: balance['total_points'] for user_id, balance in balances.items()}
+            transactions = []
+            for award in reversed(awards):
+                transactions.append(PointTransaction(
+                    user_id=award.user_id,
+                    amount=award.amount,
+                    transaction_type='earned',
+                    source=award.source,
+                    metadata=award.metadata,
+                    balance_after=running[award.user_id],
+                ))
+                running[award.user_id] -= award.amount
+            transactions.reverse()
+            PointTransaction.objects.bulk_create(transactions, batch_size=self.batch_size)
+
+            # One leaderboard update per learner and learning path of the batch
+            from .leaderboard_service import LeaderboardService
+            leaderboards = LeaderboardService.get_instance()
+            path_amounts = defaultdict(int)
+            for award in awards:
+                path_amounts[award.user_id, award.metadata.get('learning_path_id')] += award.amount
+            for (user_id, learning_path_id), amount in path_amounts.items():
+                leaderboards.record_points(
+                    user_id, balances[user_id]['total_points'], amount,
+                    {'learning_path_id': learning_path_id}
+                )
+            self._invalidate_on_commit(balances)
+        return balances
+
+    def spend(self, user_id, amount: int, purpose: str, metadata: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Take points from a learner's available balance
+
+        The balance is checked and decremented by the same UPDATE, so
+        concurrent purchases cannot overspend.
+
+        Raises:
+            ValueError: The available balance is below amount
+
+        Returns:
+            The learner's balance after spending
+        """
+        with transaction.atomic():
+            spent = UserPoints.objects.filter(user_id=user_id, available_points__gte=amount).update(
+                available_points=F('available_points') - amount,
+                last_spent=timezone.now(),
+                updated_at=timezone.now(),
+            )
+            if not spent:
+                raise ValueError("Insufficient points")
+
+            balance = self._read([user_id])[user_id]
+            PointTransaction.objects.create(
+                user_id=user_id,
+                amount=amount,
+                transaction_type='spent',
+                source=purpose,
+                metadata=metadata or {},
+                balance_after=balance['total_points'],
+            )
+            self._invalidate_on_commit([user_id])
+        return balance
+
+    def balance(self, user_id) -> Optional[Dict[str, Any]]:
+        """A learner's balance from the cached snapshot, None without a points account"""
+        key = self._key(user_id)
+        balance = cache.get(key)
+        if balance is None:
+            balance = self._read([user_id]).get(user_id)
+            if balance is not None:
+                cache.set(key, balance, self.balance_ttl)
+        return balance
+
+    def _increment(self, user_id, totals: Dict[str, int], **values) -> int:
+        return UserPoints.objects.filter(user_id=user_id).update(
+            **{counter: F(counter) + amount for counter, amount in totals.items()},
+            **values,
+            updated_at=timezone.now(),
+        )
+
+    def _read(self, user_ids: Iterable[Any]) -> Dict[Any, Dict[str, Any]]:
+        return {
+            row.pop('user_id'): row
+            for row in UserPoints.objects.filter(user_id__in=list(user_ids)).values('user_id', *BALANCE_FIELDS)
+        }
+
+    def _invalidate_on_commit(self, user_ids: Iterable[Any]):
+        keys = [self._key(user_id) for user_id in user_ids]
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+    @staticmethod
+    def _key(user_id) -> str:
+        return f'{BALANCE_CACHE_PREFIX}:{user_id}'
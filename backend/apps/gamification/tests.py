@@ -0,0 +1,549 @@
+# JAC Interactive Learning Platform - Core backend implementation by Cavin Otieno
+
+"""
+Gamification tests for Django
+"""
+
+import uuid
+import random
+from collections import defaultdict
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.learning.models import LearningPath, Module, UserModuleProgress
+from .models import (
+    Achievement, AchievementProgress, Badge, GamificationEvent, PointTransaction, UserAchievement, UserBadge,
+    UserLevel, UserPoints,
+)
+from .services.achievement_engine import AchievementEngine
+from .services.event_processor import GamificationEventProcessor, record_event
+from .services.leaderboard_service import LeaderboardService, week_label
+from .services.points_ledger import BALANCE_FIELDS, PointAward, PointsLedger
+
+User = get_user_model()
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+# Leaderboards without a Redis server; tests hand the service their own client
+LEADERBOARD_CONFIG = {'KEY_PREFIX': 'test:leaderboard', 'WEEKLY_RETENTION_WEEKS': 5}
+
+
+class InMemoryRedis:
+    """The set and sorted set commands of the leaderboards, kept in process"""
+
+    def __init__(self):
+        self.data = {}
+
+    @staticmethod
+    def _member(member):
+        return str(member).encode()
+
+    def pipeline(self, transaction=True):
+        return InMemoryPipeline(self)
+
+    def delete(self, *keys):
+        return sum(1 for key in keys if self.data.pop(key, None) is not None)
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def expire(self, key, seconds):
+        return key in self.data
+
+    def rename(self, source, destination):
+        self.data[destination] = self.data.pop(source)
+        return True
+
+    def sadd(self, key, *members):
+        members = {self._member(member) for member in members}
+        added = members - self.data.setdefault(key, set())
+        self.data[key] |= members
+        return len(added)
+
+    def sismember(self, key, member):
+        return self._member(member) in self.data.get(key, set())
+
+    def zadd(self, key, mapping, gt=False):
+        scores = self.data.setdefault(key, {})
+        added = 0
+        for member, score in mapping.items():
+            member = self._member(member)
+            added += member not in scores
+            if not gt or member not in scores or score > scores[member]:
+                scores[member] = float(score)
+        return added
+
+    def zincrby(self, key, amount, member):
+        scores = self.data.setdefault(key, {})
+        member = self._member(member)
+        scores[member] = scores.get(member, 0.0) + amount
+        return scores[member]
+
+    def _ranked(self, key):
+        return sorted(self.data.get(key, {}).items(), key=lambda item: (item[1], item[0]), reverse=True)
+
+    def zrevrange(self, key, start, end, withscores=False):
+        ranked = self._ranked(key)[start:end + 1]
+        return ranked if withscores else [member for member, _ in ranked]
+
+    def zrevrank(self, key, member):
+        members = [ranked for ranked, _ in self._ranked(key)]
+        member = self._member(member)
+        return members.index(member) if member in members else None
+
+    def zscore(self, key, member):
+        return self.data.get(key, {}).get(self._member(member))
+
+    def zcard(self, key):
+        return len(self.data.get(key, {}))
+
+
+class InMemoryPipeline:
+    """Queued commands of an InMemoryRedis, run by execute()"""
+
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        commands, self.commands = self.commands, []
+        return [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in commands]
+
+
+@override_settings(CACHES=LOCMEM_CACHE, GAMIFICATION_LEADERBOARD_CONFIG=LEADERBOARD_CONFIG)
+class LeaderboardServiceTest(TestCase):
+    """Test the precomputed leaderboards"""
+
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(username=f'learner{index}', email=f'learner{index}@example.com', password='x')
+            for index in range(5)
+        ]
+        self.learning_path_id = str(uuid.uuid4())
+        self.ledger = PointsLedger()
+        # Points earned before the leaderboards were kept in Redis
+        with mock.patch.object(LeaderboardService, '_instance', LeaderboardService()):
+            self.award(amount_step=10)
+
+        self.service = LeaderboardService(client=InMemoryRedis())
+        patcher = mock.patch.object(LeaderboardService, '_instance', self.service)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.boards = [
+            'points',
+            LeaderboardService.board_name('points', 'weekly'),
+            LeaderboardService.board_name('points', learning_path=self.learning_path_id),
+        ]
+
+    def award(self, amount_step):
+        """Points for every learner, some of them in the learning path"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ledger.award_many([
+                PointAward(user.id, amount_step * (index + 1), 'module_completion',
+                           {'learning_path_id': self.learning_path_id} if index % 2 else {})
+                for index, user in enumerate(self.users)
+            ])
+
+    def database_board(self, board):
+        return [(row['user_id'], row['score']) for row in self.service._board_queryset(board)]
+
+    def test_new_boards_built_on_first_read(self):
+        """A board that was never built is copied from the database by its first reader"""
+        self.assertEqual(self.boards[1], f'points:week:{week_label()}')
+        for board in self.boards:
+            with self.subTest(board=board):
+                expected = self.database_board(board)
+                self.assertEqual(self.service.window(board, 0, 10), expected)
+                with self.assertNumQueries(0):
+                    self.assertEqual(self.service.window(board, 0, 10), expected)
+                    self.assertEqual(self.service.size(board), len(expected))
+
+    def test_built_boards_follow_new_points(self):
+        """Points earned after a board was built update it as the database changes"""
+        for board in self.boards:
+            self.service.window(board)
+        self.award(amount_step=7)
+        for board in self.boards:
+            with self.subTest(board=board):
+                expected = self.database_board(board)
+                with self.assertNumQueries(0):
+                    self.assertEqual(self.service.window(board, 0, 10), expected)
+                    self.assertEqual(self.service.rank(board, expected[-1][0]), (len(expected), expected[-1][1]))
+
+    def test_concurrent_first_read_uses_database(self):
+        """While one reader builds a board, others read the database"""
+        board = self.boards[2]
+        self.service.client.set(f'{self.service._key(board)}:building', 1)
+        self.assertEqual(self.service.window(board), self.database_board(board))
+        self.assertFalse(self.service.client.sismember(self.service._key('built'), board))
+
+    def test_rebuild_matches_database(self):
+        """rebuild() copies every board from the database"""
+        sizes = self.service.rebuild()
+        for board in self.boards:
+            with self.subTest(board=board):
+                expected = self.database_board(board)
+                self.assertEqual(sizes[board], len(expected))
+                with self.assertNumQueries(0):
+                    self.assertEqual(self.service.window(board, 0, 10), expected)
+
+
+@override_settings(CACHES=LOCMEM_CACHE, GAMIFICATION_LEADERBOARD_CONFIG=LEADERBOARD_CONFIG)
+class PointsLedgerTest(TestCase):
+    """Test atomic point balances and the transaction ledger"""
+
+    SOURCES = ['module_completion', 'assessment_perfect', 'code_execution', 'ai_chat', 'achievement', 'daily_login']
+
+    def setUp(self):
+        patcher = mock.patch.object(LeaderboardService, '_instance', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.users = [
+            User.objects.create_user(username=f'learner{index}', email=f'learner{index}@example.com', password='x')
+            for index in range(4)
+        ]
+        self.ledger = PointsLedger()
+
+    def sequential_awards(self, awards):
+        """Balances and transactions of the per-award read-modify-write the ledger replaced"""
+        balances = defaultdict(lambda: defaultdict(int))
+        transactions = []
+        for award in awards:
+            balance = balances[award.user_id]
+            balance['total_points'] += award.amount
+            balance['available_points'] += award.amount
+            balance['lifetime_points'] += award.amount
+            if award.source in ['module_completion', 'assessment_perfect', 'knowledge_graph']:
+                balance['learning_points'] += award.amount
+            elif award.source in ['code_execution', 'ai_chat']:
+                balance['coding_points'] += award.amount
+            elif award.source in ['achievement']:
+                balance['engagement_points'] += award.amount
+                # Not counted by the old code; the ledger also tracks it
+                balance['points_from_achievements'] += award.amount
+            transactions.append((award.user_id, award.amount, 'earned', award.source, balance['total_points']))
+        return balances, sorted(transactions)
+
+    def stored_balances(self):
+        counters = [field for field in BALANCE_FIELDS if field not in ('last_earned', 'last_spent')]
+        return {
+            row.pop('user_id'): {counter: value for counter, value in row.items() if value}
+            for row in UserPoints.objects.values('user_id', *counters)
+        }
+
+    def test_award_many_matches_sequential_awards(self):
+        """A batch of awards leaves the balances and ledger of the same awards applied one by one"""
+        rng = random.Random(7)
+        awards = [
+            PointAward(rng.choice(self.users).id, rng.randint(1, 50), rng.choice(self.SOURCES))
+            for _ in range(60)
+        ]
+        returned = self.ledger.award_many(awards)
+
+        balances, transactions = self.sequential_awards(awards)
+        expected = {user.id: dict(balances[user.id]) for user in self.users}
+        self.assertEqual(self.stored_balances(), expected)
+        self.assertEqual(
+            {user_id: balance['total_points'] for user_id, balance in returned.items()},
+            {user_id: balance['total_points'] for user_id, balance in expected.items() if balance}
+        )
+        self.assertEqual(sorted(PointTransaction.objects.values_list(
+            'user_id', 'amount', 'transaction_type', 'source', 'balance_after'
+        )), transactions)
+
+    def test_stale_instances_do_not_lose_points(self):
+        """Awards through an instance read before another award add to the stored balance"""
+        stale = UserPoints.objects.get(user=self.users[0])
+        self.ledger.award(self.users[0].id, 30, 'module_completion')
+        self.assertEqual(stale.add_points(20, 'code_execution'), 50)
+        self.assertEqual(UserPoints.objects.get(user=self.users[0]).total_points, 50)
+
+    def test_spending_cannot_overdraw(self):
+        """Two purchases through instances read at the same balance cannot both spend it"""
+        self.ledger.award(self.users[0].id, 100, 'module_completion')
+        first, second = UserPoints.objects.get(user=self.users[0]), UserPoints.objects.get(user=self.users[0])
+        self.assertEqual(first.spend_points(60, 'badge'), 40)
+        with self.assertRaises(ValueError):
+            second.spend_points(60, 'badge')
+
+        points = UserPoints.objects.get(user=self.users[0])
+        self.assertEqual((points.total_points, points.available_points), (100, 40))
+        self.assertEqual(list(PointTransaction.objects.filter(transaction_type='spent').values_list(
+            'amount', 'balance_after'
+        )), [(60, 100)])
+
+    def test_missing_account_is_created(self):
+        """A learner without a points row gets one on their first award"""
+        UserPoints.objects.filter(user=self.users[1]).delete()
+        self.assertEqual(self.ledger.award(self.users[1].id, 15, 'ai_chat')['coding_points'], 15)
+
+    def test_zero_award_returns_the_balance(self):
+        """An award of no points changes nothing and returns the current balance"""
+        self.ledger.award(self.users[0].id, 30, 'module_completion')
+        self.assertEqual(self.ledger.award(self.users[0].id, 0, 'module_completion')['total_points'], 30)
+        self.assertEqual(PointTransaction.objects.filter(user=self.users[0]).count(), 1)
+        self.assertEqual(UserPoints.objects.get(user=self.users[0]).add_points(0, 'ai_chat'), 30)
+
+    def test_award_points_endpoint_requires_a_positive_amount(self):
+        """The integration endpoint rejects missing, zero and negative amounts with a clear error"""
+        self.client.force_login(self.users[0])
+        for data in ({}, {'amount': 0}, {'amount': -5}, {'amount': 'many'}):
+            with self.subTest(data=data):
+                response = self.client.post('/api/gamification/integration/award_points/', data,
+                                            content_type='application/json')
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {'error': 'amount must be a positive whole number of points'})
+
+        response = self.client.post('/api/gamification/integration/award_points/', {'amount': 10},
+                                    content_type='application/json')
+        self.assertEqual(response.json()['new_total'], 10)
+        self.assertFalse(PointTransaction.objects.filter(user=self.users[0], amount__lte=0).exists())
+
+    def test_balance_snapshot(self):
+        """Balances are read from a cached snapshot that is dropped when an award commits"""
+        self.assertEqual(self.ledger.balance(self.users[0].id)['total_points'], 0)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.ledger.balance(self.users[0].id)['total_points'], 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ledger.award(self.users[0].id, 25, 'daily_login')
+        self.assertEqual(self.ledger.balance(self.users[0].id)['total_points'], 25)
+        self.assertIsNone(self.ledger.balance(0))
+
+
+@override_settings(
+    CACHES=LOCMEM_CACHE, GAMIFICATION_LEADERBOARD_CONFIG=LEADERBOARD_CONFIG,
+    GAMIFICATION_EVENT_CONFIG={'BATCH_SIZE': 10, 'MAX_ATTEMPTS': 2},
+)
+class GamificationEventTest(TestCase):
+    """Test the gamification event outbox and its worker"""
+
+    def setUp(self):
+        patcher = mock.patch.object(LeaderboardService, '_instance', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.users = [
+            User.objects.create_user(username=f'learner{index}', email=f'learner{index}@example.com', password='x')
+            for index in range(3)
+        ]
+        self.learning_path = LearningPath.objects.create(name='JAC Basics', estimated_duration=10, created_by=self.users[0])
+        self.modules = [
+            Module.objects.create(learning_path=self.learning_path, title=f'Module {order}', description='',
+                                  order=order, duration_minutes=30, difficulty_rating=1)
+            for order in range(4)
+        ]
+        self.processor = GamificationEventProcessor()
+
+    def complete(self, user, module):
+        """Save a completed module, as the learning views do"""
+        progress, _ = UserModuleProgress.objects.get_or_create(
+            user=user, module=module, defaults={'time_spent': timedelta(minutes=10)}
+        )
+        progress = UserModuleProgress.objects.get(pk=progress.pk)
+        progress.status = 'completed'
+        progress.completed_at = timezone.now()
+        progress.save()
+        return progress
+
+    def test_completion_queues_event_with_save(self):
+        """Completing a module writes one event in the save's transaction, without loading the module"""
+        with CaptureQueriesContext(connection) as queries:
+            progress = self.complete(self.users[0], self.modules[0])
+        gamification = [query['sql'] for query in queries if 'gamification' in query['sql']]
+        self.assertEqual(len(gamification), 1)
+        self.assertFalse([query['sql'] for query in queries if query['sql'].startswith('SELECT "jac_module"')])
+        self.assertEqual(GamificationEvent.objects.get().payload, {'module_id': str(self.modules[0].id)})
+
+        # Saving the completed module again queues nothing more
+        progress.save()
+        self.assertEqual(GamificationEvent.objects.count(), 1)
+
+        # A save that rolls back takes its event with it
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            self.complete(self.users[1], self.modules[0])
+            raise RuntimeError('request failed')
+        self.assertEqual(GamificationEvent.objects.count(), 1)
+
+    def test_drain_applies_events_once(self):
+        """Draining awards every event's points once, with its learning path"""
+        for user in self.users:
+            for module in self.modules[:2]:
+                self.complete(user, module)
+        self.complete(self.users[0], self.modules[2])
+
+        self.assertEqual(self.processor.drain(), 7)
+        self.assertEqual(self.processor.drain(), 0)
+        self.assertFalse(GamificationEvent.objects.filter(processed_at__isnull=True).exists())
+        self.assertEqual(
+            dict(UserPoints.objects.values_list('user_id', 'total_points')),
+            {self.users[0].id: 150, self.users[1].id: 100, self.users[2].id: 100}
+        )
+        self.assertEqual(
+            set(PointTransaction.objects.values_list('metadata__learning_path_id', flat=True)),
+            {str(self.learning_path.id)}
+        )
+
+    def test_failed_batch_is_retried_event_by_event(self):
+        """A bad event fails alone, and the rest of its batch is applied"""
+        record_event(self.users[0].id, 'assessment_completed', uuid.uuid4(), {'module_id': str(self.modules[0].id)})
+        for user in self.users:
+            self.complete(user, self.modules[0])
+
+        self.assertEqual(self.processor.process_batch(), 3)
+        failed = GamificationEvent.objects.get(processed_at__isnull=True)
+        self.assertEqual((failed.event_type, failed.attempts), ('assessment_completed', 1))
+        self.assertIn('score', failed.last_error)
+        self.assertEqual(sum(UserPoints.objects.values_list('total_points', flat=True)), 150)
+
+    def test_failing_event_is_parked(self):
+        """An event that keeps failing is left alone after MAX_ATTEMPTS tries"""
+        record_event(self.users[0].id, 'assessment_completed', uuid.uuid4(), {})
+        self.assertEqual(self.processor.process_batch(), 0)
+        self.assertEqual(self.processor.process_batch(), 0)
+        self.assertEqual(GamificationEvent.objects.get().attempts, 2)
+
+        with mock.patch.object(self.processor, '_apply') as apply:
+            self.assertEqual(self.processor.drain(), 0)
+        apply.assert_not_called()
+
+
+@override_settings(CACHES=LOCMEM_CACHE, GAMIFICATION_LEADERBOARD_CONFIG=LEADERBOARD_CONFIG)
+class AchievementEngineTest(TestCase):
+    """Test evaluating achievement rules against learners' counters"""
+
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch.object(LeaderboardService, '_instance', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.users = [
+            User.objects.create_user(username=f'learner{index}', email=f'learner{index}@example.com', password='x')
+            for index in range(6)
+        ]
+        self.badge = Badge.objects.create(name='Explorer', category='learning')
+        for title, criteria_type, criteria_value, operator, points, badge in [
+            ('First Module', 'modules_completed', 1, 'gte', 10, self.badge),
+            ('More Than Two', 'modules_completed', 2, 'gt', 20, self.badge),
+            ('Five Modules', 'modules_completed', 5, 'gte', 50, None),
+            ('Exactly Three', 'assessments_completed', 3, 'eq', 30, None),
+        ]:
+            Achievement.objects.create(title=title, criteria_type=criteria_type, criteria_value=criteria_value,
+                                       criteria_operator=operator, points_reward=points, badge=badge)
+        self.engine = AchievementEngine()
+
+    def completed_titles(self, user):
+        return set(UserAchievement.objects.filter(user=user, is_completed=True).values_list(
+            'achievement__title', flat=True
+        ))
+
+    def state(self, users):
+        """Counters, unlocked achievements, points and XP of some learners, in their order"""
+        return [
+            (
+                dict(AchievementProgress.objects.filter(user=user).values_list('achievement__title', 'current_count')),
+                self.completed_titles(user),
+                UserPoints.objects.get(user=user).total_points,
+                UserLevel.objects.get(user=user).total_xp,
+            )
+            for user in users
+        ]
+
+    def test_unlock_thresholds(self):
+        """Each rule unlocks once, when its operator first holds"""
+        user = self.users[0]
+        unlocked = []
+        for _ in range(6):
+            unlocked.append({entry['achievement'] for entry in self.engine.record(user.id, 'modules_completed')
+                             if entry['unlocked']})
+        self.assertEqual(unlocked, [{'First Module'}, set(), {'More Than Two'}, set(), {'Five Modules'}, set()])
+
+        unlocked = [
+            {entry['achievement'] for entry in self.engine.record(user.id, 'assessments_completed') if entry['unlocked']}
+            for _ in range(4)
+        ]
+        self.assertEqual(unlocked, [set(), set(), {'Exactly Three'}, set()])
+
+        self.assertEqual(self.state([user]), [(
+            {'First Module': 6, 'More Than Two': 6, 'Five Modules': 6, 'Exactly Three': 4},
+            {'First Module', 'More Than Two', 'Five Modules', 'Exactly Three'},
+            110, 110,
+        )])
+        self.assertFalse(UserAchievement.objects.filter(last_updated__isnull=True).exists())
+        # Two achievements share the badge, which is awarded once
+        self.assertEqual(UserBadge.objects.filter(user=user, badge=self.badge).count(), 1)
+        self.assertEqual(Badge.objects.get(pk=self.badge.pk).usage_count, 1)
+
+    def test_batch_matches_single_records(self):
+        """Applying a batch of learners' increments at once unlocks what recording them one by one does"""
+        rng = random.Random(11)
+        increments = {index: rng.randint(1, 6) for index in range(3)}
+        for index, amount in increments.items():
+            for _ in range(amount):
+                self.engine.record(self.users[index].id, 'modules_completed')
+        self.engine.apply({
+            (self.users[3 + index].id, 'modules_completed'): amount for index, amount in increments.items()
+        })
+        self.assertEqual(self.state(self.users[3:]), self.state(self.users[:3]))
+
+    def test_first_increments_lock_new_rows(self):
+        """Progress rows a learner does not have yet are created before they are locked"""
+        rules = self.engine._index()['modules_completed']
+        counts = self.engine._locked_counts({(self.users[0].id, rule) for rule in rules})
+        self.assertEqual(counts, {(self.users[0].id, rule.achievement_id): 0 for rule in rules})
+        self.assertEqual(AchievementProgress.objects.filter(user=self.users[0]).count(), len(rules))
+
+    def test_failing_learner_is_isolated(self):
+        """A learner whose update fails does not undo the other learners of the batch"""
+        good, bad = self.users[:2]
+        add_xp = UserLevel.add_xp
+
+        def failing_add_xp(level, amount):
+            if level.user_id == bad.id:
+                raise ValueError('corrupt level')
+            return add_xp(level, amount)
+
+        with mock.patch.object(UserLevel, 'add_xp', failing_add_xp):
+            progress = self.engine.apply({(good.id, 'modules_completed'): 1, (bad.id, 'modules_completed'): 1})
+
+        self.assertEqual({entry['user_id'] for entry in progress}, {good.id})
+        self.assertEqual(self.completed_titles(good), {'First Module'})
+        self.assertEqual(UserPoints.objects.get(user=good).total_points, 10)
+        self.assertFalse(AchievementProgress.objects.filter(user=bad).exists())
+        self.assertEqual(UserPoints.objects.get(user=bad).total_points, 0)
+
+    def test_replay_unlocks_earned_achievements(self):
+        """replay() rebuilds counters from completed modules and unlocks what was earned once"""
+        learning_path = LearningPath.objects.create(name='JAC Basics', estimated_duration=10, created_by=self.users[0])
+        modules = [
+            Module.objects.create(learning_path=learning_path, title=f'Module {order}', description='',
+                                  order=order, duration_minutes=30, difficulty_rating=1)
+            for order in range(6)
+        ]
+        for index, user in enumerate(self.users[:3]):
+            for module in modules[:1 + index * 2]:
+                UserModuleProgress.objects.create(user=user, module=module, status='completed',
+                                                  completed_at=timezone.now(), time_spent=timedelta(minutes=5))
+
+        self.assertEqual(self.engine.replay(chunk_size=2), {'learners': 3, 'unlocked': 1 + 2 + 3})
+        self.assertEqual([self.completed_titles(user) for user in self.users[:3]], [
+            {'First Module'}, {'First Module', 'More Than Two'}, {'First Module', 'More Than Two', 'Five Modules'},
+        ])
+        self.assertEqual(
+            AchievementProgress.objects.get(user=self.users[2], achievement__title='Five Modules').current_count, 5
+        )
+        self.assertEqual(self.engine.replay(), {'learners': 3, 'unlocked': 0})
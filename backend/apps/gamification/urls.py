@@ -30,6 +30,7 @@ urlpatterns = [
     # Core gamification endpoints
     path('overview/', views.GamificationOverviewView.as_view(), name='overview'),
     path('leaderboard/', views.LeaderboardView.as_view(), name='leaderboard'),
+    path('leaderboard/me/', views.LeaderboardRankView.as_view(), name='leaderboard-rank'),
     path('stats/', views.GamificationStatsView.as_view(), name='stats'),
     
     # Integration endpoints
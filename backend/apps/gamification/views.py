@@ -33,6 +33,9 @@ from .serializers import (
     AddPointsSerializer, SpendPointsSerializer,
     UpdateAchievementProgressSerializer, RecordStreakActivitySerializer
 )
+from .services.achievement_engine import AchievementEngine
+from .services.leaderboard_service import LeaderboardService
+from .services.points_ledger import PointsLedger
 
 
 class BadgeViewSet(viewsets.ModelViewSet):
@@ -75,8 +78,8 @@ class BadgeViewSet(viewsets.ModelViewSet):
             )
         
         # Check if user meets requirements
-        user_points = UserPoints.objects.filter(user=user).first()
-        if user_points and user_points.total_points < badge.minimum_points:
+        balance = PointsLedger().balance(user.id)
+        if balance and balance['total_points'] < badge.minimum_points:
             return Response(
                 {'error': f'Need {badge.minimum_points} points to claim this badge'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -88,6 +91,7 @@ class BadgeViewSet(viewsets.ModelViewSet):
             badge=badge,
             earned_through='manual_claim'
         )
+        Badge.objects.filter(pk=badge.pk).update(usage_count=F('usage_count') + 1)
         
         return Response(UserBadgeSerializer(user_badge).data, status=status.HTTP_201_CREATED)
 
@@ -358,7 +362,7 @@ class GamificationOverviewView(APIView):
         user = request.user
         
         # Get or create gamification records
-        user_points = UserPoints.objects.get_or_create(user=user)[0]
+        balance = PointsLedger().balance(user.id)
         user_level = UserLevel.objects.get_or_create(user=user)[0]
         streak = LearningStreak.objects.get_or_create(user=user)[0]
         
@@ -380,7 +384,7 @@ class GamificationOverviewView(APIView):
         ).select_related('badge').order_by('-earned_at')[:5]
         
         data = {
-            'total_points': user_points.total_points,
+            'total_points': balance['total_points'] if balance else 0,
             'current_level': user_level.current_level,
             'current_streak': streak.current_streak,
             'total_achievements': total_achievements,
@@ -401,47 +405,50 @@ class LeaderboardView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get(self, request):
-        """Get platform leaderboard"""
-        leaderboard_type = request.query_params.get('type', 'points')
-        limit = int(request.query_params.get('limit', 10))
-        
-        if leaderboard_type == 'points':
-            users = UserPoints.objects.select_related('user').order_by('-total_points')[:limit]
-        elif leaderboard_type == 'streak':
-            users = LearningStreak.objects.select_related('user').order_by('-current_streak')[:limit]
-        elif leaderboard_type == 'level':
-            users = UserLevel.objects.select_related('user').order_by('-current_level', '-total_xp')[:limit]
+        """Get platform leaderboard, all time or weekly, optionally for a learning path"""
+        leaderboards = LeaderboardService.get_instance()
+        try:
+            board = leaderboards.board_name(
+                request.query_params.get('type', 'points'),
+                request.query_params.get('period'),
+                request.query_params.get('learning_path')
+            )
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), leaderboards.max_page_size)
+            offset = max(int(request.query_params.get('offset', 0)), 0)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Window around the requesting learner instead of a fixed page
+        if request.query_params.get('around') == 'me':
+            offset, rows = leaderboards.around(board, request.user.id, limit)
         else:
-            return Response({'error': 'Invalid leaderboard type'}, status=status.HTTP_400_BAD_REQUEST)
-        
-        leaderboard = []
-        for rank, user in enumerate(users, 1):
-            if leaderboard_type == 'points':
-                leaderboard.append({
-                    'user': user.user.username,
-                    'rank': rank,
-                    'total_points': user.total_points,
-                    'current_level': UserLevel.objects.get_or_create(user=user.user)[0].current_level,
-                    'current_streak': LearningStreak.objects.get_or_create(user=user.user)[0].current_streak
-                })
-            elif leaderboard_type == 'streak':
-                leaderboard.append({
-                    'user': user.user.username,
-                    'rank': rank,
-                    'total_points': UserPoints.objects.get_or_create(user=user.user)[0].total_points,
-                    'current_level': UserLevel.objects.get_or_create(user=user.user)[0].current_level,
-                    'current_streak': user.current_streak
-                })
-            elif leaderboard_type == 'level':
-                leaderboard.append({
-                    'user': user.user.username,
-                    'rank': rank,
-                    'total_points': UserPoints.objects.get_or_create(user=user.user)[0].total_points,
-                    'current_level': user.current_level,
-                    'current_streak': LearningStreak.objects.get_or_create(user=user.user)[0].current_streak
-                })
+            rows = leaderboards.window(board, offset, limit)
         
-        return Response(leaderboard)
+        return Response(leaderboards.entries(board, rows, offset))
+
+
+class LeaderboardRankView(APIView):
+    """Current user's position on a leaderboard"""
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get(self, request):
+        """Get the current user's rank and score"""
+        leaderboards = LeaderboardService.get_instance()
+        try:
+            board = leaderboards.board_name(
+                request.query_params.get('type', 'points'),
+                request.query_params.get('period'),
+                request.query_params.get('learning_path')
+            )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        ranked = leaderboards.rank(board, request.user.id)
+        return Response({
+            'rank': ranked[0] if ranked else None,
+            'score': leaderboards.display_score(board, ranked[1]) if ranked else 0,
+            'total_ranked': leaderboards.size(board)
+        })
 
 
 class GamificationStatsView(APIView):
@@ -465,9 +472,10 @@ class GamificationStatsView(APIView):
         avg_streak = LearningStreak.objects.aggregate(avg_streak=Avg('current_streak'))['avg_streak'] or 0
         total_points_earned = UserPoints.objects.aggregate(total_points=Sum('total_points'))['total_points'] or 0
         
-        # Top performers
-        top_users_points = UserPoints.objects.select_related('user').order_by('-total_points')[:10]
-        top_users_streak = LearningStreak.objects.select_related('user').order_by('-current_streak')[:10]
+        # Top performers, from the precomputed leaderboards
+        leaderboards = LeaderboardService.get_instance()
+        top_users_points = leaderboards.entries('points', leaderboards.window('points', 0, 10))
+        top_users_streak = leaderboards.entries('streak', leaderboards.window('streak', 0, 10))
         
         # Recent activity
         recent_achievements = UserAchievement.objects.filter(
@@ -485,26 +493,8 @@ class GamificationStatsView(APIView):
             'total_badges_earned': total_badges_earned,
             'average_streak': round(avg_streak, 1),
             'total_points_earned': total_points_earned,
-            'top_users_by_points': [
-                {
-                    'user': user.user.username,
-                    'rank': i + 1,
-                    'total_points': user.total_points,
-                    'current_level': UserLevel.objects.get_or_create(user=user.user)[0].current_level,
-                    'current_streak': LearningStreak.objects.get_or_create(user=user.user)[0].current_streak
-                }
-                for i, user in enumerate(top_users_points)
-            ],
-            'top_users_by_streak': [
-                {
-                    'user': user.user.username,
-                    'rank': i + 1,
-                    'total_points': UserPoints.objects.get_or_create(user=user.user)[0].total_points,
-                    'current_level': UserLevel.objects.get_or_create(user=user.user)[0].current_level,
-                    'current_streak': user.current_streak
-                }
-                for i, user in enumerate(top_users_streak)
-            ],
+            'top_users_by_points': top_users_points,
+            'top_users_by_streak': top_users_streak,
             'recent_achievements': UserAchievementSerializer(recent_achievements, many=True).data,
             'recent_badges': UserBadgeSerializer(recent_badges, many=True).data
         }
@@ -529,7 +519,15 @@ class GamificationIntegrationView(APIView):
     
     def award_points(self, request):
         """Award points for an action"""
-        amount = request.data.get('amount', 0)
+        try:
+            amount = int(request.data.get('amount'))
+        except (TypeError, ValueError):
+            amount = 0
+        if amount <= 0:
+            return Response(
+                {'error': 'amount must be a positive whole number of points'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         source = request.data.get('source', 'unknown')
         metadata = request.data.get('metadata', {})
         
@@ -559,32 +557,14 @@ class GamificationIntegrationView(APIView):
         achievement_type = request.data.get('type')
         value = request.data.get('value', 0)
         
-        # Find relevant achievements
-        achievements = Achievement.objects.filter(
-            criteria_type=achievement_type,
-            is_active=True
-        )
-        
-        updated_achievements = []
-        
-        for achievement in achievements:
-            # Create or get achievement progress
-            progress, created = AchievementProgress.objects.get_or_create(
-                user=request.user,
-                achievement=achievement,
-                defaults={'target_count': achievement.criteria_value}
-            )
-            
-            # Update progress
-            old_count = progress.current_count
-            new_count = progress.increment(value)
-            
-            if new_count > old_count:
-                updated_achievements.append({
-                    'achievement': achievement.title,
-                    'progress': f"{new_count}/{achievement.criteria_value}",
-                    'completed': progress.current_count >= progress.target_count
-                })
+        updated_achievements = [
+            {
+                'achievement': progress['achievement'],
+                'progress': f"{progress['current_count']}/{progress['target_count']}",
+                'completed': progress['completed']
+            }
+            for progress in AchievementEngine.get_instance().record(request.user.id, achievement_type, value)
+        ]
         
         return Response({
             'message': 'Achievement progress updated',
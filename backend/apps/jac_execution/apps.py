@@ -17,7 +17,7 @@ class JacExecutionConfig(AppConfig):
     
     def ready(self):
         """Initialize execution environment when Django starts."""
-        # import apps.jac_execution.signals  # No signals defined yet
+        import apps.jac_execution.signals
         
         # Initialize execution environment
         self._setup_execution_environment()
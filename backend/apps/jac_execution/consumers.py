@@ -0,0 +1,104 @@
+# JAC Interactive Learning Platform - Core backend implementation by Cavin Otieno
+
+"""
+WebSocket Consumers for JAC Code Execution
+
+Streams the stdout/stderr of a queued execution to its owner while it runs.
+"""
+
+import json
+from channels.generic.websocket import AsyncWebsocketConsumer
+from channels.db import database_sync_to_async
+from django.contrib.auth.models import AnonymousUser
+
+from .models import CodeExecution
+from .services.execution_queue import get_job_state, job_group_name
+
+
+class ExecutionStreamConsumer(AsyncWebsocketConsumer):
+    """
+    WebSocket consumer for the live output of one execution.
+    
+    On connect the client receives a snapshot with the output so far and its
+    sequence number, then every later chunk and status change. Messages carry
+    increasing 'seq' values so a client can drop anything already covered by
+    the snapshot.
+    """
+    
+    async def connect(self):
+        """Handle WebSocket connection"""
+        self.user = self.scope["user"]
+        self.execution_id = str(self.scope["url_route"]["kwargs"]["execution_id"])
+        
+        if isinstance(self.user, AnonymousUser):
+            await self.close()
+            return
+        
+        # Join the group before reading the snapshot so no chunk falls in between
+        self.room_group_name = job_group_name(self.execution_id)
+        await self.channel_layer.group_add(
+            self.room_group_name,
+            self.channel_name
+        )
+        
+        snapshot = await self.get_snapshot()
+        if snapshot is None:
+            await self.close()
+            return
+        
+        await self.accept()
+        await self.send(text_data=json.dumps({
+            'type': 'snapshot',
+            **snapshot
+        }))
+        
+        if snapshot['status'] not in ('pending', 'running'):
+            await self.close()
+    
+    async def disconnect(self, close_code):
+        """Handle WebSocket disconnection"""
+        if hasattr(self, 'room_group_name'):
+            await self.channel_layer.group_discard(
+                self.room_group_name,
+                self.channel_name
+            )
+    
+    async def execution_output(self, event):
+        """Relay an output chunk"""
+        await self.send(text_data=json.dumps({
+            'type': 'output',
+            'seq': event['seq'],
+            'stream': event['stream'],
+            'data': event['data']
+        }))
+    
+    async def execution_status(self, event):
+        """Relay a status change, closing the stream once the job is done"""
+        await self.send(text_data=json.dumps({
+            'type': 'status',
+            'seq': event['seq'],
+            'status': event['status'],
+            'result': event.get('result')
+        }))
+        if event['status'] not in ('pending', 'running'):
+            await self.close()
+    
+    @database_sync_to_async
+    def get_snapshot(self):
+        """Live job state, or the stored result once the job has finished."""
+        job = get_job_state(self.execution_id)
+        if job is not None:
+            return job if job['user_id'] == self.user.id else None
+        
+        execution = CodeExecution.objects.filter(id=self.execution_id, user=self.user).first()
+        if execution is None:
+            return None
+        return {
+            'id': str(execution.id),
+            'status': execution.status,
+            'stdout': execution.stdout,
+            'stderr': execution.stderr,
+            'return_code': execution.return_code,
+            'execution_time': execution.execution_time,
+            'seq': None,
+        }
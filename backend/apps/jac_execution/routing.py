@@ -0,0 +1,18 @@
+# JAC Interactive Learning Platform - Core backend implementation by Cavin Otieno
+
+"""
+WebSocket URL Routing for JAC Code Execution
+
+URL Patterns:
+- /ws/executions/<execution_id>/ - Live output of a queued execution
+"""
+
+from django.urls import re_path
+from . import consumers
+
+websocket_urlpatterns = [
+    re_path(
+        r'ws/executions/(?P<execution_id>[0-9a-f-]{36})/$',
+        consumers.ExecutionStreamConsumer.as_asgi()
+    ),
+]
@@ -7,6 +7,7 @@ This module defines the DRF serializers for converting Django model instances
 to JSON and validating input data for the code execution API.
 """
 
+from django.conf import settings
 from rest_framework import serializers
 from .models import CodeExecution, ExecutionTemplate, CodeExecutionSession, SecuritySettings
 import re
@@ -18,9 +19,12 @@ class CodeExecutionCreateSerializer(serializers.ModelSerializer):
     Serializer for creating code execution requests.
     """
     
+    # Set to false for programs whose output changes between identical runs
+    use_cache = serializers.BooleanField(required=False, default=True, write_only=True)
+    
     class Meta:
         model = CodeExecution
-        fields = ['language', 'code', 'stdin']
+        fields = ['language', 'code', 'stdin', 'use_cache']
         extra_kwargs = {
             'code': {'required': True, 'min_length': 1},
             'language': {'required': False, 'default': 'python'},
@@ -219,6 +223,7 @@ class QuickExecutionSerializer(serializers.Serializer):
     language = serializers.ChoiceField(choices=[('jac', 'JAC'), ('python', 'Python')])
     code = serializers.CharField()
     stdin = serializers.CharField(required=False, allow_blank=True)
+    use_cache = serializers.BooleanField(required=False, default=True)
     
     def validate_code(self, value):
         """Validate code for quick execution."""
@@ -232,6 +237,23 @@ class QuickExecutionSerializer(serializers.Serializer):
         return value
 
 
+class TestEvaluationOptionsSerializer(serializers.Serializer):
+    """
+    Serializer for the test case options of a code evaluation request.
+    """
+    
+    language = serializers.ChoiceField(choices=[('jac', 'JAC'), ('python', 'Python')], default='jac')
+    test_cases = serializers.ListField(child=serializers.DictField(), required=False, default=list)
+    case_timeout = serializers.FloatField(
+        required=False, allow_null=True, min_value=0.1,
+        max_value=settings.JAC_EXECUTION_CONFIG.get('MAX_EXECUTION_TIME', 30)
+    )
+    max_failures = serializers.IntegerField(
+        required=False, allow_null=True, min_value=0,
+        max_value=settings.JAC_EXECUTION_CONFIG.get('TEST_MAX_CASES', 50)
+    )
+
+
 class ExecutionHistorySerializer(serializers.ModelSerializer):
     """
     Serializer for execution history with filtering options.
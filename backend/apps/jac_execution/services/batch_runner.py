@@ -0,0 +1,150 @@
+# JAC Interactive Learning Platform - Core backend implementation by Cavin Otieno
+
+"""
+Batch Test Case Runner
+
+Grades a submission against a list of test cases. On the sandbox worker
+pool the submission is loaded once and all cases run in a single sandboxed
+child (see SandboxWorkerPool.evaluate), so a 20-case exercise costs one
+fork of a warm interpreter instead of twenty processes. Without the pool
+each case falls back to CodeExecutor.execute_code.
+"""
+
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+
+from .executor import CodeExecutor, CodeExecutionError, SecurityViolationError
+from .worker_pool import SandboxWorkerPool, normalize_output
+
+logger = logging.getLogger(__name__)
+
+
+def as_text(value: Any) -> Optional[str]:
+    """Test inputs and expected outputs may be given as JSON values."""
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value)
+
+
+class BatchTestRunner:
+    """
+    Runs one submission against many test cases.
+    """
+
+    def __init__(self, executor: Optional[CodeExecutor] = None):
+        execution_config = getattr(settings, 'JAC_EXECUTION_CONFIG', {})
+        self.executor = executor or CodeExecutor()
+        self.max_cases = execution_config.get('TEST_MAX_CASES', 50)
+        self.default_max_failures = execution_config.get('TEST_MAX_FAILURES', 0)
+
+    def run(self, language: str, code: str, test_cases: List[Dict],
+            case_timeout: Optional[float] = None, max_failures: Optional[int] = None) -> List[Dict]:
+        """
+        Evaluate code against test cases.
+
+        Args:
+            language: Programming language
+            code: Submitted code
+            test_cases: List of {'input', 'expected_output'} dictionaries;
+                a case without expected_output passes when the program exits cleanly
+            case_timeout: Time budget per case in seconds (defaults to the
+                security settings' max_execution_time)
+            max_failures: Skip the remaining cases after this many failures
+                (0 runs every case)
+
+        Returns:
+            One result per test case with pass/fail status and actual output
+        """
+        test_cases = test_cases[:self.max_cases]
+        cases = [
+            {
+                'stdin': as_text(test_case.get('input')) or '',
+                'expected_output': as_text(test_case.get('expected_output')),
+            }
+            for test_case in test_cases
+        ]
+        security_settings = self.executor.security_settings
+        case_timeout = min(case_timeout or security_settings.max_execution_time,
+                           security_settings.max_execution_time)
+        if max_failures is None:
+            max_failures = self.default_max_failures
+
+        try:
+            self.executor.validate_request(language, code)
+        except (CodeExecutionError, SecurityViolationError) as e:
+            return [self._build_result(index, test_case, self._error_case(str(e)))
+                    for index, test_case in enumerate(test_cases)]
+
+        outcomes = None
+        if self.executor.use_worker_pool and cases:
+            batch = SandboxWorkerPool.get_instance().evaluate(
+                language, code, cases,
+                case_timeout=case_timeout,
+                max_memory=security_settings.max_memory,
+                max_output=security_settings.max_output_size,
+                max_failures=max_failures
+            )
+            if batch is not None:
+                outcomes = batch.get('cases') or [self._error_case(batch.get('stderr', 'Execution failed'))
+                                                  for _ in cases]
+
+        # None means the workers cannot run this language; run case by case
+        if outcomes is None:
+            outcomes = self._run_each(language, code, cases, max_failures)
+
+        return [self._build_result(index, test_case, outcome)
+                for index, (test_case, outcome) in enumerate(zip(test_cases, outcomes))]
+
+    def _run_each(self, language: str, code: str, cases: List[Dict], max_failures: int) -> List[Dict]:
+        """Fallback: one execution per case, with the same early-abort policy."""
+        outcomes = []
+        failures = 0
+        for case in cases:
+            if max_failures and failures >= max_failures:
+                outcomes.append({'status': 'skipped', 'passed': False, 'actual_output': '',
+                                 'stderr': '', 'return_code': None, 'execution_time': 0})
+                continue
+
+            result = self.executor.execute_code(language, code, case['stdin'])
+            status = result.get('status', 'error')
+            passed = status == 'completed' and (
+                case['expected_output'] is None
+                or normalize_output(result.get('stdout', '')) == normalize_output(case['expected_output'])
+            )
+            failures += not passed
+            outcomes.append({
+                'status': 'passed' if passed else 'failed' if status == 'completed' else status,
+                'passed': passed,
+                'actual_output': result.get('stdout', ''),
+                'stderr': result.get('stderr', ''),
+                'return_code': result.get('return_code'),
+                'execution_time': result.get('execution_time', 0),
+            })
+        return outcomes
+
+    @staticmethod
+    def _error_case(message: str) -> Dict:
+        return {'status': 'error', 'passed': False, 'actual_output': '', 'stderr': message,
+                'return_code': None, 'execution_time': 0}
+
+    @staticmethod
+    def _build_result(index: int, test_case: Dict, outcome: Dict) -> Dict:
+        error = None
+        if not outcome['passed'] and outcome['status'] != 'failed':
+            error = outcome.get('stderr') or outcome['status']
+        elif outcome['return_code']:
+            error = outcome.get('stderr')
+        return {
+            'test_case': index + 1,
+            'input': test_case.get('input', {}),
+            'expected_output': test_case.get('expected_output', {}),
+            'actual_output': outcome['actual_output'],
+            'passed': outcome['passed'],
+            'status': outcome['status'],
+            'stderr': outcome.get('stderr', ''),
+            'execution_time': outcome.get('execution_time', 0),
+            'error': error
+        }
@@ -0,0 +1,243 @@
+# JAC Interactive Learning Platform - Core backend implementation by Cavin Otieno
+
+"""
+Asynchronous Execution Queue
+
+Accepts code execution jobs, returns an execution id straight away and runs
+the jobs on a small pool of runner threads in the web process. Each runner
+hands its job to the SandboxWorkerPool and forwards stdout/stderr chunks as
+the sandbox produces them.
+
+- Live job state (status, output so far, chunk sequence number) is kept in
+  the cache under jac_execution:job:<id> so any web process can answer a
+  status poll while the job runs.
+- Every chunk is also sent to the Channels group execution_<id>, which
+  ExecutionStreamConsumer relays to WebSocket clients.
+- The CodeExecution row is written exactly once, when the job finishes,
+  with the job id as its primary key.
+"""
+
+import uuid
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .executor import ExecutionService
+from .worker_pool import ExecutionQueueFullError
+
+try:
+    from asgiref.sync import async_to_sync
+    from channels.layers import get_channel_layer
+    CHANNELS_AVAILABLE = True
+except ImportError:
+    CHANNELS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+JOB_CACHE_PREFIX = 'jac_execution:job'
+
+
+def job_cache_key(execution_id) -> str:
+    return f'{JOB_CACHE_PREFIX}:{execution_id}'
+
+
+def job_group_name(execution_id) -> str:
+    """Channels group that receives the output of one execution."""
+    return f'execution_{execution_id}'
+
+
+def get_job_state(execution_id) -> Optional[Dict]:
+    """Live state of a queued or running execution, or None once it has expired."""
+    try:
+        return cache.get(job_cache_key(execution_id))
+    except Exception as e:
+        logger.warning(f'Execution job cache unavailable: {str(e)}')
+        return None
+
+
+class ExecutionJob:
+    """
+    One queued execution and its live state.
+    """
+
+    def __init__(self, user, language: str, code: str, stdin: str, ttl: int, use_cache: bool = True):
+        self.id = uuid.uuid4()
+        self.user = user
+        self.language = language
+        self.code = code
+        self.stdin = stdin
+        self.use_cache = use_cache
+        self.ttl = ttl
+        self.created_at = timezone.now()
+        self._lock = threading.Lock()
+        self.state = {
+            'id': str(self.id),
+            'user_id': user.id,
+            'language': language,
+            'status': 'pending',
+            'stdout': '',
+            'stderr': '',
+            'seq': 0,
+            'return_code': None,
+            'execution_time': None,
+            'created_at': self.created_at.isoformat(),
+            'started_at': None,
+            'completed_at': None,
+        }
+
+    def update(self, **fields):
+        """Change the job status fields, store them and notify stream listeners."""
+        with self._lock:
+            self.state.update(fields)
+            self.state['seq'] += 1
+            message = {
+                'type': 'execution.status',
+                'seq': self.state['seq'],
+                'status': self.state['status'],
+            }
+            if self.state['status'] not in ('pending', 'running'):
+                message['result'] = {
+                    key: self.state[key]
+                    for key in ('return_code', 'execution_time', 'completed_at')
+                }
+            self._store()
+        self._publish(message)
+
+    def append_output(self, stream: str, data: str):
+        """Record an output chunk and forward it to stream listeners."""
+        with self._lock:
+            self.state[stream] += data
+            self.state['seq'] += 1
+            message = {
+                'type': 'execution.output',
+                'seq': self.state['seq'],
+                'stream': stream,
+                'data': data,
+            }
+            self._store()
+        self._publish(message)
+
+    def _store(self):
+        try:
+            cache.set(job_cache_key(self.id), self.state, self.ttl)
+        except Exception as e:
+            logger.warning(f'Could not store execution job {self.id}: {str(e)}')
+
+    def _publish(self, message: Dict):
+        if not CHANNELS_AVAILABLE:
+            return
+        channel_layer = get_channel_layer()
+        if channel_layer is None:
+            return
+        try:
+            async_to_sync(channel_layer.group_send)(job_group_name(self.id), message)
+        except Exception as e:
+            logger.warning(f'Could not publish output of execution {self.id}: {str(e)}')
+
+
+class ExecutionQueue:
+    """
+    Process-wide queue of asynchronous code executions.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        execution_config = getattr(settings, 'JAC_EXECUTION_CONFIG', {})
+        self.runners = execution_config.get('EXECUTION_QUEUE_RUNNERS', 4)
+        self.queue_size = execution_config.get('EXECUTION_QUEUE_SIZE', 32)
+        self.job_ttl = execution_config.get('EXECUTION_JOB_TTL', 3600)
+
+        self._executor = ThreadPoolExecutor(max_workers=self.runners, thread_name_prefix='jac-execution')
+        self._admission = threading.BoundedSemaphore(self.runners + self.queue_size)
+
+    @classmethod
+    def get_instance(cls) -> 'ExecutionQueue':
+        """Get the execution queue for this process, starting it on first use."""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def submit(self, user, language: str, code: str, stdin: str = '', use_cache: bool = True) -> Dict:
+        """
+        Validate and enqueue an execution.
+
+        Args:
+            user: Django user object
+            language: Programming language
+            code: Code to execute
+            stdin: Standard input data
+            use_cache: Whether an identical earlier run may answer the request
+
+        Returns:
+            Initial job state, including the execution id
+
+        Raises:
+            SecurityViolationError, CodeExecutionError: If the code is rejected
+            ExecutionQueueFullError: If the queue is saturated
+        """
+        service = ExecutionService()
+        service.executor.validate_request(language, code)
+
+        if not self._admission.acquire(blocking=False):
+            raise ExecutionQueueFullError('Code execution queue is full, please retry shortly')
+
+        job = ExecutionJob(user, language, code, stdin, self.job_ttl, use_cache)
+        try:
+            job.update(status='pending')
+            initial_state = dict(job.state)
+            self._executor.submit(self._run, job, service)
+        except Exception:
+            self._admission.release()
+            raise
+        return initial_state
+
+    def _run(self, job: ExecutionJob, service: ExecutionService):
+        """Runner thread body: execute, stream, then persist the result once."""
+        try:
+            job.update(status='running', started_at=timezone.now().isoformat())
+            try:
+                result = service.executor.execute_code(
+                    job.language, job.code, job.stdin,
+                    on_output=job.append_output, use_cache=job.use_cache
+                )
+            except Exception as e:
+                result = {
+                    'stdout': '',
+                    'stderr': str(e),
+                    'return_code': 1,
+                    'execution_time': 0,
+                    'status': 'error'
+                }
+
+            try:
+                service.record_execution(
+                    job.user, job.language, job.code, job.stdin, result,
+                    execution_id=job.id, created_at=job.created_at
+                )
+            except Exception as e:
+                logger.error(f'Could not save execution {job.id}: {str(e)}')
+
+            # The final output replaces the streamed copy, which may have been cut at the limit
+            job.update(
+                status=result.get('status', 'error'),
+                stdout=result.get('stdout', ''),
+                stderr=result.get('stderr', ''),
+                return_code=result.get('return_code', 1),
+                execution_time=result.get('execution_time', 0),
+                completed_at=timezone.now().isoformat(),
+            )
+        except Exception as e:
+            logger.error(f'Execution job {job.id} failed: {str(e)}')
+        finally:
+            self._admission.release()
+            close_old_connections()
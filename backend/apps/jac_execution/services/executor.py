@@ -14,11 +14,14 @@ import json
 import subprocess
 import tempfile
 import shutil
+import threading
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 from django.conf import settings
 from django.utils import timezone
 from ..models import SecuritySettings
+from .worker_pool import SandboxWorkerPool, ExecutionQueueFullError
+from .result_cache import ExecutionResultCache
 
 # Try to import psutil, but make it optional
 try:
@@ -43,69 +46,176 @@ class SecurityViolationError(Exception):
     pass
 
 
+# Security settings are read from the database at most once per TTL per process
+_security_settings = None
+_security_settings_loaded_at = 0.0
+_security_settings_lock = threading.Lock()
+
+# Parent directory for execution workspaces, created once per process
+_workspace_root = None
+
+
+def get_security_settings() -> SecuritySettings:
+    """Get the global security settings, cached in this process."""
+    global _security_settings, _security_settings_loaded_at
+    
+    execution_config = getattr(settings, 'JAC_EXECUTION_CONFIG', {})
+    ttl = execution_config.get('SECURITY_SETTINGS_TTL', 60)
+    
+    with _security_settings_lock:
+        if _security_settings is None or time.monotonic() - _security_settings_loaded_at > ttl:
+            try:
+                _security_settings = SecuritySettings.objects.get(pk=1)
+            except SecuritySettings.DoesNotExist:
+                # Create default settings if none exist
+                _security_settings = SecuritySettings.objects.create(
+                    max_execution_time=5.0,
+                    max_memory=64,
+                    max_output_size=10240,
+                    max_code_size=102400,
+                    allowed_languages=['jac', 'python'],
+                    enable_sandboxing=True,
+                    max_executions_per_minute=60,
+                    blocked_imports=['os', 'sys', 'subprocess', 'importlib'],
+                    blocked_functions=['eval', 'exec', 'open', '__import__']
+                )
+            _security_settings_loaded_at = time.monotonic()
+        return _security_settings
+
+
+def invalidate_security_settings():
+    """Force the next get_security_settings() call to reload from the database."""
+    global _security_settings
+    with _security_settings_lock:
+        _security_settings = None
+
+
+def get_workspace_root() -> Path:
+    """Get the per-process directory that holds execution workspaces."""
+    global _workspace_root
+    if _workspace_root is None or not _workspace_root.exists():
+        _workspace_root = Path(tempfile.mkdtemp(prefix='jac_execution_'))
+    return _workspace_root
+
+
 class CodeExecutor:
     """
     Secure code executor with sandboxing and resource controls.
+    
+    Runs code on the warm SandboxWorkerPool when it is enabled and
+    supported, and falls back to one subprocess per execution otherwise.
     """
     
     def __init__(self):
         """Initialize the code executor with security settings."""
         self.security_settings = self._load_security_settings()
-        self.temp_dir = Path(tempfile.mkdtemp(prefix='jac_execution_'))
+        self.temp_dir = get_workspace_root()
         self.jac_path = getattr(settings, 'JAC_EXECUTOR_PATH', None)
         self.python_path = sys.executable
         
+        execution_config = getattr(settings, 'JAC_EXECUTION_CONFIG', {})
+        self.use_worker_pool = (
+            execution_config.get('WORKER_POOL_ENABLED', True) and SandboxWorkerPool.is_supported()
+        )
+        
     def _load_security_settings(self) -> SecuritySettings:
-        """Load security settings from database or use defaults."""
-        try:
-            return SecuritySettings.objects.get(pk=1)
-        except SecuritySettings.DoesNotExist:
-            # Create default settings if none exist
-            return SecuritySettings.objects.create(
-                max_execution_time=5.0,
-                max_memory=64,
-                max_output_size=10240,
-                max_code_size=102400,
-                allowed_languages=['jac', 'python'],
-                enable_sandboxing=True,
-                max_executions_per_minute=60,
-                blocked_imports=['os', 'sys', 'subprocess', 'importlib'],
-                blocked_functions=['eval', 'exec', 'open', '__import__']
-            )
+        """Load security settings from the process cache or database."""
+        return get_security_settings()
     
-    def execute_code(self, language: str, code: str, stdin: str = '') -> Dict:
+    def validate_request(self, language: str, code: str) -> None:
+        """
+        Check a request against the security settings without running it.
+        
+        Raises:
+            SecurityViolationError: If the language or code is not allowed
+            CodeExecutionError: If the code is empty or too large
+        """
+        if language not in self.security_settings.allowed_languages:
+            raise SecurityViolationError(f"Language '{language}' is not allowed")
+        
+        # Validate and clean code
+        self._validate_code(language, code)
+    
+    def execute_code(self, language: str, code: str, stdin: str = '',
+                     on_output: Optional[Callable[[str, str], None]] = None,
+                     use_cache: bool = True) -> Dict:
         """
         Execute code with security controls and resource limits.
         
+        Identical runs of deterministic code are answered from the
+        ExecutionResultCache without starting the sandbox.
+        
         Args:
             language: Programming language ('jac' or 'python')
             code: Code to execute
             stdin: Standard input data
+            on_output: Optional callback receiving (stream, data) chunks of
+                stdout/stderr as they are produced
+            use_cache: False to always run the code (nondeterministic programs)
             
         Returns:
             Dictionary containing execution results
         """
-        if language not in self.security_settings.allowed_languages:
-            raise SecurityViolationError(f"Language '{language}' is not allowed")
+        self.validate_request(language, code)
+        
+        result_cache = ExecutionResultCache.get_instance()
+        cache_key = None
+        if use_cache and result_cache.is_cacheable(code):
+            cache_key = result_cache.make_key(language, code, stdin, self.security_settings)
+            result = result_cache.get(cache_key)
+            if result is not None:
+                result['cached'] = True
+                self._emit_output(result, on_output)
+                return result
+        else:
+            result_cache.record_bypass()
         
-        # Validate and clean code
-        self._validate_code(language, code)
+        result = self._run_code(language, code, stdin, on_output)
+        if cache_key is not None:
+            result_cache.set(cache_key, result)
+        return result
+    
+    def _run_code(self, language: str, code: str, stdin: str,
+                  on_output: Optional[Callable[[str, str], None]]) -> Dict:
+        """Run code on the worker pool, or in a subprocess as a fallback."""
+        if self.use_worker_pool:
+            result = SandboxWorkerPool.get_instance().execute(
+                language, code, stdin,
+                timeout=self.security_settings.max_execution_time,
+                max_memory=self.security_settings.max_memory,
+                max_output=self.security_settings.max_output_size,
+                on_output=on_output
+            )
+            # None means the workers cannot run this language; use a subprocess
+            if result is not None:
+                return result
         
         # Create temporary workspace
-        workspace_path = self.temp_dir / f"workspace_{int(time.time())}"
-        workspace_path.mkdir(exist_ok=True)
+        workspace_path = Path(tempfile.mkdtemp(prefix='workspace_', dir=self.temp_dir))
         
         try:
             if language == 'python':
-                return self._execute_python(code, stdin, workspace_path)
+                result = self._execute_python(code, stdin, workspace_path)
             elif language == 'jac':
-                return self._execute_jac(code, stdin, workspace_path)
+                result = self._execute_jac(code, stdin, workspace_path)
             else:
                 raise CodeExecutionError(f"Unsupported language: {language}")
                 
         finally:
             # Clean up temporary files
             self._cleanup_workspace(workspace_path)
+        
+        # The subprocess path only has the output once the process exits
+        self._emit_output(result, on_output)
+        return result
+    
+    @staticmethod
+    def _emit_output(result: Dict, on_output: Optional[Callable[[str, str], None]]) -> None:
+        """Send a finished result's output to a streaming callback in one piece."""
+        if on_output:
+            for stream in ('stdout', 'stderr'):
+                if result.get(stream):
+                    on_output(stream, result[stream])
     
     def _validate_code(self, language: str, code: str) -> None:
         """Validate code against security rules."""
@@ -338,14 +448,6 @@ print(sys.stderr.getvalue(), file=sys.stderr, end="")
         except Exception as e:
             # Log cleanup error but don't raise exception
             print(f"Warning: Failed to clean up workspace {workspace_path}: {e}")
-    
-    def __del__(self):
-        """Cleanup when executor is destroyed."""
-        try:
-            if self.temp_dir.exists():
-                shutil.rmtree(self.temp_dir)
-        except Exception:
-            pass  # Ignore cleanup errors in destructor
 
 
 class ExecutionService:
@@ -358,7 +460,8 @@ class ExecutionService:
         self.executor = CodeExecutor()
     
     def execute_with_tracking(self, user, language: str, code: str, 
-                             stdin: str = '', save_result: bool = True) -> Dict:
+                             stdin: str = '', save_result: bool = True,
+                             use_cache: bool = True) -> Dict:
         """
         Execute code with user tracking and optional database storage.
         
@@ -368,61 +471,76 @@ class ExecutionService:
             code: Code to execute
             stdin: Standard input data
             save_result: Whether to save result to database
+            use_cache: Whether an identical earlier run may answer the request
             
         Returns:
             Dictionary with execution results
         """
-        execution_record = None
-        
-        if save_result:
-            # Create execution record
-            from ..models import CodeExecution
-            execution_record = CodeExecution.objects.create(
-                user=user,
-                language=language,
-                code=code,
-                stdin=stdin,
-                status='running',
-                max_execution_time=self.executor.security_settings.max_execution_time,
-                max_memory=self.executor.security_settings.max_memory,
-                max_output_size=self.executor.security_settings.max_output_size
-            )
-        
         try:
             # Execute code
-            result = self.executor.execute_code(language, code, stdin)
-            
-            if execution_record:
-                # Update execution record with results
-                execution_record.status = result.get('status', 'error')
-                execution_record.stdout = result.get('stdout', '')
-                execution_record.stderr = result.get('stderr', '')
-                execution_record.return_code = result.get('return_code', 1)
-                execution_record.execution_time = result.get('execution_time', 0)
-                execution_record.completed_at = timezone.now()
-                execution_record.save()
-                
-                # Update user session statistics
-                self._update_user_session(user, execution_record)
-            
-            return result
-            
+            result = self.executor.execute_code(language, code, stdin, use_cache=use_cache)
+        except ExecutionQueueFullError:
+            # Rejected before running; let the caller ask the client to retry
+            raise
         except Exception as e:
-            error_result = {
+            result = {
                 'stdout': '',
                 'stderr': str(e),
                 'return_code': 1,
                 'execution_time': 0,
                 'status': 'error'
             }
+        
+        if save_result:
+            execution_record = self.record_execution(user, language, code, stdin, result)
+            result['execution_id'] = str(execution_record.id)
+        
+        return result
+    
+    def record_execution(self, user, language: str, code: str, stdin: str, result: Dict,
+                         execution_id=None, created_at=None):
+        """
+        Store a finished execution as a single CodeExecution row.
+        
+        Args:
+            user: Django user object
+            language: Programming language
+            code: Executed code
+            stdin: Standard input data
+            result: Result dictionary from CodeExecutor.execute_code
+            execution_id: Primary key to use (the queued job id), if any
+            created_at: When the execution was requested, if not now
             
-            if execution_record:
-                execution_record.status = 'error'
-                execution_record.stderr = str(e)
-                execution_record.completed_at = timezone.now()
-                execution_record.save()
-            
-            return error_result
+        Returns:
+            The saved CodeExecution
+        """
+        from ..models import CodeExecution
+        
+        fields = {
+            'user': user,
+            'language': language,
+            'code': code,
+            'stdin': stdin,
+            'status': result.get('status', 'error'),
+            'stdout': result.get('stdout', ''),
+            'stderr': result.get('stderr', ''),
+            'return_code': result.get('return_code', 1),
+            'execution_time': result.get('execution_time', 0),
+            'completed_at': timezone.now(),
+            'max_execution_time': self.executor.security_settings.max_execution_time,
+            'max_memory': self.executor.security_settings.max_memory,
+            'max_output_size': self.executor.security_settings.max_output_size,
+        }
+        if execution_id is not None:
+            fields['id'] = execution_id
+        if created_at is not None:
+            fields['created_at'] = created_at
+        
+        execution_record = CodeExecution.objects.create(**fields)
+        
+        # Update user session statistics
+        self._update_user_session(user, execution_record)
+        return execution_record
     
     def _update_user_session(self, user, execution_record):
         """Update user's execution session statistics."""
@@ -0,0 +1,210 @@
+# JAC Interactive Learning Platform - Core backend implementation by Cavin Otieno
+
+"""
+Execution Result Cache
+
+Content-addressed cache of execution results. Re-running the same code with
+the same stdin under the same interpreter and security limits returns the
+stored result instead of starting the sandbox again.
+
+- Keys hash the language, the code, stdin, the interpreter version and a
+  fingerprint of the security settings, so changing any of them simply
+  misses. The code is used as written, apart from one final newline:
+  blank lines shift traceback line numbers and trailing whitespace can sit
+  inside string literals.
+- Two tiers: a small in-process LRU (L1) in front of the shared Django cache
+  (L2, Redis), which applies the TTL and its own LRU eviction.
+- Programs that import nondeterministic modules (random, time, ...) are
+  never cached, and callers can opt out per request.
+- Only results that ran to completion are stored; timeouts and sandbox
+  errors depend on load and are always re-run.
+"""
+
+import re
+import sys
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+RESULT_CACHE_PREFIX = 'jac_execution:result'
+
+# Statuses whose result depends only on the program and its input
+CACHEABLE_STATUSES = ('completed', 'failed')
+
+# Modules whose use makes a program's output vary between runs
+DEFAULT_NONDETERMINISTIC_MODULES = [
+    'random', 'time', 'datetime', 'uuid', 'secrets', 'os', 'threading',
+    'multiprocessing', 'asyncio', 'socket', 'urllib', 'requests',
+]
+
+METRIC_NAMES = ('l1_hits', 'l2_hits', 'misses', 'stores', 'bypassed')
+
+
+def normalize_code(code: str) -> str:
+    """Drop the final newline, the only edit that can never change the output."""
+    return code[:-1] if code.endswith('\n') else code
+
+
+def interpreter_version(language: str) -> str:
+    """Version string of the runtime that executes the language."""
+    if language == 'python':
+        return sys.version
+    try:
+        from importlib.metadata import version
+        return f"jaclang {version('jaclang')}"
+    except Exception:
+        return f"jac {getattr(settings, 'JAC_EXECUTOR_PATH', None)}"
+
+
+def security_fingerprint(security_settings) -> str:
+    """Hash of the security settings that can change an execution's result."""
+    fields = {
+        'max_execution_time': security_settings.max_execution_time,
+        'max_memory': security_settings.max_memory,
+        'max_output_size': security_settings.max_output_size,
+        'enable_sandboxing': security_settings.enable_sandboxing,
+        'enable_network_access': security_settings.enable_network_access,
+        'blocked_imports': sorted(security_settings.blocked_imports or []),
+        'blocked_functions': sorted(security_settings.blocked_functions or []),
+    }
+    return hashlib.sha256(json.dumps(fields, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+class ExecutionResultCache:
+    """
+    Two-tier cache of deterministic execution results.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        execution_config = getattr(settings, 'JAC_EXECUTION_CONFIG', {})
+        self.enabled = execution_config.get('RESULT_CACHE_ENABLED', True)
+        self.ttl = execution_config.get('RESULT_CACHE_TTL', 86400)
+        self.l1_size = execution_config.get('RESULT_CACHE_L1_SIZE', 512)
+        self.l1_ttl = execution_config.get('RESULT_CACHE_L1_TTL', 300)
+        modules = execution_config.get('RESULT_CACHE_NONDETERMINISTIC_MODULES', DEFAULT_NONDETERMINISTIC_MODULES)
+        self._nondeterministic = re.compile(
+            r'^\s*(?:import|from|include)\b.*\b(?:%s)\b' % '|'.join(re.escape(module) for module in modules),
+            re.MULTILINE
+        )
+
+        self._l1 = OrderedDict()
+        self._lock = threading.Lock()
+        self._metrics = dict.fromkeys(METRIC_NAMES, 0)
+
+    @classmethod
+    def get_instance(cls) -> 'ExecutionResultCache':
+        """Get the result cache for this process."""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def make_key(self, language: str, code: str, stdin: str, security_settings) -> str:
+        """Content address of an execution request."""
+        content = json.dumps([
+            language,
+            normalize_code(code),
+            stdin or '',
+            interpreter_version(language),
+            security_fingerprint(security_settings),
+        ])
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def is_cacheable(self, code: str) -> bool:
+        """Whether the program's output can be expected to repeat."""
+        return self.enabled and not self._nondeterministic.search(code)
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        Look up a stored result.
+
+        Returns:
+            A copy of the stored result, or None on a miss
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._l1.get(key)
+            if entry is not None and entry[0] > now:
+                self._l1.move_to_end(key)
+                self._metrics['l1_hits'] += 1
+                return dict(entry[1])
+            if entry is not None:
+                del self._l1[key]
+
+        try:
+            result = cache.get(f'{RESULT_CACHE_PREFIX}:{key}')
+        except Exception as e:
+            logger.warning(f'Execution result cache unavailable: {str(e)}')
+            result = None
+
+        if result is None:
+            self._count('misses')
+            return None
+
+        self._remember(key, result)
+        self._count('l2_hits')
+        return dict(result)
+
+    def set(self, key: str, result: Dict):
+        """Store a result if it ran to completion."""
+        if result.get('status') not in CACHEABLE_STATUSES:
+            return
+        stored = {
+            field: result.get(field)
+            for field in ('stdout', 'stderr', 'return_code', 'execution_time', 'status')
+        }
+        self._remember(key, stored)
+        try:
+            cache.set(f'{RESULT_CACHE_PREFIX}:{key}', stored, self.ttl)
+        except Exception as e:
+            logger.warning(f'Could not store execution result: {str(e)}')
+        self._count('stores')
+
+    def record_bypass(self):
+        """Count an execution that skipped the cache."""
+        self._count('bypassed')
+
+    def stats(self) -> Dict:
+        """Hit/miss counters for this process."""
+        with self._lock:
+            metrics = dict(self._metrics)
+            l1_entries = len(self._l1)
+        lookups = metrics['l1_hits'] + metrics['l2_hits'] + metrics['misses']
+        hits = metrics['l1_hits'] + metrics['l2_hits']
+        return {
+            **metrics,
+            'hit_rate': (hits / lookups * 100) if lookups else 0,
+            'l1_entries': l1_entries,
+            'l1_size': self.l1_size,
+            'enabled': self.enabled,
+        }
+
+    def clear_local(self):
+        """Empty this process's L1 tier and reset its counters."""
+        with self._lock:
+            self._l1.clear()
+            self._metrics = dict.fromkeys(METRIC_NAMES, 0)
+
+    def _remember(self, key: str, result: Dict):
+        with self._lock:
+            self._l1[key] = (time.monotonic() + self.l1_ttl, result)
+            self._l1.move_to_end(key)
+            while len(self._l1) > self.l1_size:
+                self._l1.popitem(last=False)
+
+    def _count(self, metric: str):
+        with self._lock:
+            self._metrics[metric] += 1
@@ -0,0 +1,491 @@
+# JAC Interactive Learning Platform - Core backend implementation by Cavin Otieno
+
+"""
+Sandbox Worker Process
+
+Long-lived interpreter started by SandboxWorkerPool. It imports the standard
+library modules (and the JAC runtime, when installed) once at startup, then
+serves jobs read from stdin as JSON lines. Each job runs in a child forked
+from this warm interpreter, so user code starts in milliseconds, cannot see
+state left behind by earlier jobs and is confined by its own rlimits.
+
+This file runs as a plain script and must only depend on the standard
+library: it never imports Django or the rest of the platform.
+
+Protocol (one JSON object per line):
+    startup:  worker -> {"ready": true, "pid": ..., "jac_available": ...}
+    request:  parent -> {"language", "code", "stdin", "timeout", "max_memory",
+                         "max_output", "max_open_files"}
+    chunk:    worker -> {"chunk": {"stream": "stdout" | "stderr", "data": ...}}
+              (only for requests with "stream": true, sent while the job runs)
+    response: worker -> {"stdout", "stderr", "return_code", "execution_time",
+                         "status", "violation"}
+
+Batch requests also carry "cases" ([{"stdin"}]), "case_timeout" and
+"max_failures". The code is compiled once and every case runs in the same
+job child with its own stdin, output buffers and time budget; the response
+then has a "cases" list with the output of each case. Expected outputs
+never reach the worker: the job child is forked from it and runs student
+code, so cases are graded by the pool in the web process.
+"""
+
+import io
+import os
+import sys
+import json
+import math
+import time
+import signal
+import codecs
+import shutil
+import tempfile
+import importlib
+import traceback
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+# Exit code reported by a job child that ran out of memory
+MEMORY_EXIT_CODE = 137
+
+# Seconds between output checks while streaming a running job
+STREAM_INTERVAL = 0.05
+
+
+class CaseTimeout(BaseException):
+    """Raised inside a batch child when a test case exceeds its time budget."""
+
+
+# Signals that mean the job child hit one of its limits
+LIMIT_SIGNALS = {
+    getattr(signal, 'SIGXCPU', None): 'CPU time limit exceeded',
+    getattr(signal, 'SIGXFSZ', None): 'Output size limit exceeded',
+    signal.SIGKILL: 'Process killed',
+    signal.SIGSEGV: 'Segmentation fault',
+}
+
+
+def preload(modules):
+    """Import modules once so forked jobs find them in sys.modules."""
+    loaded = []
+    for name in modules:
+        try:
+            importlib.import_module(name)
+            loaded.append(name)
+        except Exception:
+            pass
+    return loaded
+
+
+def apply_limits(job):
+    """Apply per-job rlimits inside the job child."""
+    if not RESOURCE_AVAILABLE:
+        return
+
+    cpu_seconds = int(math.ceil(job['timeout'])) + 1
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+    resource.setrlimit(resource.RLIMIT_NOFILE, (job['max_open_files'], job['max_open_files']))
+    max_file_size = job.get('max_file_size', job['max_output'])
+    resource.setrlimit(resource.RLIMIT_FSIZE, (max_file_size, max_file_size))
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+
+    # The address space limit is on top of what the warm interpreter already maps
+    try:
+        with open('/proc/self/statm') as statm:
+            baseline = int(statm.read().split()[0]) * resource.getpagesize()
+    except (OSError, ValueError, IndexError):
+        baseline = 0
+    address_space = baseline + job['max_memory'] * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (address_space, address_space))
+
+
+def isolate_child(workspace):
+    """Move the job child into its workspace with only fds 0-2 open."""
+    os.setsid()
+    os.chdir(workspace)
+
+    stdin_fd = os.open('stdin.txt', os.O_RDONLY)
+    stdout_fd = os.open('stdout.txt', os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    stderr_fd = os.open('stderr.txt', os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    for source, target in ((stdin_fd, 0), (stdout_fd, 1), (stderr_fd, 2)):
+        os.dup2(source, target)
+        os.close(source)
+
+    # Drop every other descriptor, including the worker's protocol pipes
+    os.closerange(3, 65536)
+
+
+def load_program(job):
+    """Compile the job's code once; returns a callable that runs it."""
+    if job['language'] == 'jac':
+        from jaclang.cli import cli
+        return lambda: cli.run('script.jac')
+    code = compile(job['code'], 'script.py', 'exec')
+    return lambda: exec(code, {'__name__': '__main__', '__builtins__': __builtins__})
+
+
+def exit_code_of(error):
+    """Exit code for a SystemExit raised by user code."""
+    if error.code is None:
+        return 0
+    if isinstance(error.code, int):
+        return error.code
+    print(error.code, file=sys.stderr)
+    return 1
+
+
+def run_child(job, workspace):
+    """Body of the forked job child. Never returns."""
+    exit_code = 1
+    try:
+        isolate_child(workspace)
+
+        # Line buffered so streamed output shows up as it is printed
+        sys.stdin = open(0, 'r', closefd=False)
+        sys.stdout = open(1, 'w', buffering=1, closefd=False)
+        sys.stderr = open(2, 'w', buffering=1, closefd=False)
+
+        apply_limits(job)
+
+        load_program(job)()
+        exit_code = 0
+    except SystemExit as e:
+        exit_code = exit_code_of(e)
+    except MemoryError:
+        print('MemoryError: memory limit exceeded', file=sys.stderr)
+        exit_code = MEMORY_EXIT_CODE
+    except BaseException:
+        traceback.print_exc()
+        exit_code = 1
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        except BaseException:
+            pass
+        os._exit(exit_code)
+
+
+def run_case(program, case, job):
+    """Run one test case in the batch child and capture its output."""
+    stdout, stderr = io.StringIO(), io.StringIO()
+    sys.stdin = io.StringIO(case.get('stdin') or '')
+    sys.stdout, sys.stderr = stdout, stderr
+    status, return_code = 'completed', 0
+    started = time.monotonic()
+    try:
+        try:
+            signal.setitimer(signal.ITIMER_REAL, job['case_timeout'])
+            program()
+        except SystemExit as e:
+            return_code = exit_code_of(e)
+        except MemoryError:
+            print('MemoryError: memory limit exceeded', file=sys.stderr)
+            return_code = MEMORY_EXIT_CODE
+        except CaseTimeout:
+            raise
+        except BaseException:
+            traceback.print_exc()
+            return_code = 1
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    except CaseTimeout:
+        status, return_code = 'timeout', 124
+        stderr.write('Execution timeout exceeded')
+    finally:
+        sys.stdin, sys.stdout, sys.stderr = sys.__stdin__, sys.__stdout__, sys.__stderr__
+
+    return {
+        'status': status,
+        'actual_output': stdout.getvalue()[:job['max_output']],
+        'stderr': stderr.getvalue()[:job['max_output']],
+        'return_code': return_code,
+        'execution_time': time.monotonic() - started,
+    }
+
+
+def run_batch_child(job, workspace):
+    """Body of a forked batch child: one program load, every case. Never returns."""
+    exit_code = 1
+    try:
+        isolate_child(workspace)
+
+        def on_case_timeout(signum, frame):
+            raise CaseTimeout()
+
+        signal.signal(signal.SIGALRM, on_case_timeout)
+        outputs = open('cases.jsonl', 'w', buffering=1)
+        apply_limits(job)
+
+        # Only crashes and timeouts are known here; the pool counts wrong
+        # output too, so it never needs a case this loop skipped
+        program = load_program(job)
+        failures = 0
+        for case in job['cases']:
+            if job.get('max_failures') and failures >= job['max_failures']:
+                outcome = skipped_case()
+            else:
+                outcome = run_case(program, case, job)
+                failures += outcome['status'] != 'completed' or outcome['return_code'] != 0
+            outputs.write(json.dumps(outcome) + '\n')
+        exit_code = 0
+    except MemoryError:
+        exit_code = MEMORY_EXIT_CODE
+    except BaseException:
+        # Compile errors and the like end up on the real stderr
+        traceback.print_exc(file=sys.__stderr__)
+        exit_code = 1
+    finally:
+        os._exit(exit_code)
+
+
+class OutputTail:
+    """Follows the job's output files and returns what was appended since the last poll."""
+
+    def __init__(self, workspace, limit):
+        self.limit = limit
+        self.streams = {
+            name: [os.path.join(workspace, f'{name}.txt'), 0, codecs.getincrementaldecoder('utf-8')('replace')]
+            for name in ('stdout', 'stderr')
+        }
+
+    def poll(self, final=False):
+        chunks = []
+        for name, state in self.streams.items():
+            path, offset, decoder = state
+            if offset >= self.limit or not os.path.exists(path):
+                continue
+            with open(path, 'rb') as output:
+                output.seek(offset)
+                data = output.read(self.limit - offset)
+            state[1] = offset + len(data)
+            text = decoder.decode(data, final=final)
+            if text:
+                chunks.append({'stream': name, 'data': text})
+        return chunks
+
+
+def wait_for_child(pid, timeout, on_poll=None):
+    """Wait for the job child, killing its process group on timeout."""
+    deadline = time.monotonic() + timeout
+    next_poll = time.monotonic() + STREAM_INTERVAL
+    delay = 0.001
+    while True:
+        finished, wait_status = os.waitpid(pid, os.WNOHANG)
+        if finished:
+            return wait_status, False
+        if on_poll and time.monotonic() >= next_poll:
+            on_poll()
+            next_poll = time.monotonic() + STREAM_INTERVAL
+        if time.monotonic() >= deadline:
+            try:
+                os.killpg(pid, signal.SIGKILL)
+            except OSError:
+                pass
+            _, wait_status = os.waitpid(pid, 0)
+            return wait_status, True
+        time.sleep(delay)
+        delay = min(delay * 2, 0.01)
+
+
+def read_output(path, limit):
+    """Read captured output; also report whether it reached the size limit."""
+    with open(path, 'rb') as output:
+        data = output.read(limit)
+    return data.decode('utf-8', errors='replace'), len(data) >= limit
+
+
+def run_job(job, base_dir, send):
+    """Run one job in a forked child and build its result."""
+    workspace = tempfile.mkdtemp(prefix='job_', dir=base_dir)
+    started = time.monotonic()
+    try:
+        with open(os.path.join(workspace, 'stdin.txt'), 'w', encoding='utf-8') as stdin_file:
+            stdin_file.write(job.get('stdin') or '')
+        if job['language'] == 'jac':
+            with open(os.path.join(workspace, 'script.jac'), 'w', encoding='utf-8') as script:
+                script.write(job['code'])
+
+        batch = job.get('cases') is not None
+        pid = os.fork()
+        if pid == 0:
+            if batch:
+                run_batch_child(job, workspace)
+            run_child(job, workspace)
+
+        on_poll = None
+        if job.get('stream'):
+            tail = OutputTail(workspace, job['max_output'])
+
+            def on_poll(final=False):
+                for chunk in tail.poll(final):
+                    send({'chunk': chunk})
+
+        wait_status, timed_out = wait_for_child(pid, job['timeout'], on_poll)
+        execution_time = time.monotonic() - started
+        if on_poll:
+            on_poll(final=True)
+
+        stdout, stdout_full = read_output(os.path.join(workspace, 'stdout.txt'), job['max_output'])
+        stderr, stderr_full = read_output(os.path.join(workspace, 'stderr.txt'), job['max_output'])
+        if batch:
+            return batch_result(job, workspace, wait_status, timed_out, execution_time, stderr)
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+
+    if timed_out:
+        return {
+            'stdout': '',
+            'stderr': 'Execution timeout exceeded',
+            'return_code': 124,
+            'execution_time': job['timeout'],
+            'status': 'timeout',
+            'violation': 'timeout',
+        }
+
+    violation = 'Output size limit exceeded' if stdout_full or stderr_full else None
+    if os.WIFSIGNALED(wait_status):
+        signal_number = os.WTERMSIG(wait_status)
+        violation = LIMIT_SIGNALS.get(signal_number, f'Terminated by signal {signal_number}')
+        stderr = (stderr + '\n' + violation).lstrip('\n')
+        return_code = 128 + signal_number
+    else:
+        return_code = os.WEXITSTATUS(wait_status)
+        if return_code == MEMORY_EXIT_CODE:
+            violation = 'Memory limit exceeded'
+
+    return {
+        'stdout': stdout,
+        'stderr': stderr,
+        'return_code': return_code,
+        'execution_time': execution_time,
+        'status': 'completed' if return_code == 0 else 'failed',
+        'violation': violation,
+    }
+
+
+def skipped_case():
+    return {'status': 'skipped', 'actual_output': '', 'stderr': '', 'return_code': None, 'execution_time': 0}
+
+
+def case_outcome(line, job):
+    """
+    Parse one case line written by the batch child, or None if it is malformed.
+
+    The child runs student code, which can write to this file too, so only
+    the fields of a case outcome are kept and nothing in it says whether the
+    case passed.
+    """
+    try:
+        outcome = json.loads(line)
+        if outcome['status'] == 'skipped':
+            return skipped_case()
+        if outcome['status'] not in ('completed', 'timeout'):
+            return None
+        return {
+            'status': outcome['status'],
+            'actual_output': str(outcome['actual_output'])[:job['max_output']],
+            'stderr': str(outcome['stderr'])[:job['max_output']],
+            'return_code': int(outcome['return_code']),
+            'execution_time': min(float(outcome['execution_time']), job['case_timeout']),
+        }
+    except (ValueError, TypeError, KeyError):
+        return None
+
+
+def batch_result(job, workspace, wait_status, timed_out, execution_time, stderr):
+    """Collect the case outputs of a batch child; cases it never reached are reported too."""
+    cases = []
+    outputs_path = os.path.join(workspace, 'cases.jsonl')
+    if os.path.exists(outputs_path):
+        with open(outputs_path, encoding='utf-8', errors='replace') as outputs:
+            for line in outputs:
+                outcome = case_outcome(line, job)
+                if outcome is None or len(cases) == len(job['cases']):
+                    break
+                cases.append(outcome)
+
+    violation = None
+    if timed_out:
+        violation = 'timeout'
+    elif os.WIFSIGNALED(wait_status):
+        signal_number = os.WTERMSIG(wait_status)
+        violation = LIMIT_SIGNALS.get(signal_number, f'Terminated by signal {signal_number}')
+    elif os.WEXITSTATUS(wait_status) == MEMORY_EXIT_CODE:
+        violation = 'Memory limit exceeded'
+
+    # The case that was running when the child died gets the reason and the
+    # rest are skipped; if the program never loaded, every case gets the reason
+    reached = len(cases)
+    reason = stderr.strip() or (
+        'Execution timeout exceeded' if timed_out else violation or 'Execution stopped'
+    )
+    for index in range(reached, len(job['cases'])):
+        failed_here = index == reached or reached == 0
+        cases.append({
+            'status': 'error' if failed_here else 'skipped',
+            'actual_output': '',
+            'stderr': reason if failed_here else '',
+            'return_code': None,
+            'execution_time': 0,
+        })
+
+    return {
+        'cases': cases,
+        'stdout': '',
+        'stderr': reason if reached < len(cases) else stderr,
+        'return_code': 0 if reached == len(cases) else 1,
+        'execution_time': execution_time,
+        'status': 'timeout' if timed_out else 'completed' if reached == len(cases) else 'error',
+        'violation': violation,
+    }
+
+
+def main():
+    options = json.loads(sys.argv[1]) if len(sys.argv) > 1 else {}
+    base_dir = tempfile.mkdtemp(prefix='jac_worker_')
+
+    # Keep the protocol streams private; stray writes go to /dev/null
+    requests = os.fdopen(os.dup(0), 'r', encoding='utf-8')
+    responses = os.fdopen(os.dup(1), 'w', encoding='utf-8')
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1):
+        os.dup2(devnull, fd)
+
+    def send(message):
+        responses.write(json.dumps(message) + '\n')
+        responses.flush()
+
+    loaded = preload(options.get('preload', []))
+    send({
+        'ready': True,
+        'pid': os.getpid(),
+        'preloaded': loaded,
+        'jac_available': 'jaclang.cli.cli' in loaded,
+    })
+
+    try:
+        for line in requests:
+            if not line.strip():
+                continue
+            try:
+                result = run_job(json.loads(line), base_dir, send)
+            except Exception as e:
+                result = {
+                    'stdout': '',
+                    'stderr': f'Sandbox worker error: {e}',
+                    'return_code': 1,
+                    'execution_time': 0,
+                    'status': 'error',
+                    'violation': 'worker_error',
+                }
+            send(result)
+    finally:
+        shutil.rmtree(base_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,396 @@
+# JAC Interactive Learning Platform - Core backend implementation by Cavin Otieno
+
+"""
+Sandbox Worker Pool
+
+Keeps a fixed number of warm sandbox_worker.py interpreters per web process
+so short student snippets do not pay interpreter start-up on every request.
+
+- Workers are started ahead of use and replaced after WORKER_MAX_RUNS jobs,
+  after any policy violation (timeout, memory, CPU or output limit) and
+  after any protocol error.
+- Admission is bounded: at most WORKER_POOL_SIZE jobs run and
+  WORKER_QUEUE_SIZE wait per process. Anything beyond that, or a job that
+  waits longer than WORKER_QUEUE_TIMEOUT for a worker, is rejected with
+  ExecutionQueueFullError instead of forking yet another interpreter.
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import atexit
+import logging
+import selectors
+import threading
+import subprocess
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+WORKER_SCRIPT = Path(__file__).with_name('sandbox_worker.py')
+
+# Modules imported once by every worker before it serves jobs
+DEFAULT_PRELOAD_MODULES = [
+    'math', 'random', 're', 'json', 'collections', 'itertools', 'functools',
+    'string', 'datetime', 'statistics', 'decimal', 'fractions', 'heapq',
+    'bisect', 'dataclasses', 'typing', 'traceback', 'jaclang.cli.cli',
+]
+
+# Extra seconds a worker gets to answer after the job timeout
+RESPONSE_GRACE_SECONDS = 5.0
+
+
+def normalize_output(text: Optional[str]) -> str:
+    """Ignore trailing whitespace when comparing program output."""
+    return '\n'.join(line.rstrip() for line in (text or '').splitlines()).rstrip('\n')
+
+
+def grade_cases(cases: List[Dict], outcomes: List[Dict], max_failures: int = 0) -> List[Dict]:
+    """
+    Grade the captured output of each case against its expected output.
+
+    Cases after max_failures failures are skipped (0 grades every case).
+    """
+    graded = []
+    failures = 0
+    for case, outcome in zip(cases, outcomes):
+        status = outcome['status']
+        if status == 'skipped' or (max_failures and failures >= max_failures):
+            graded.append({'status': 'skipped', 'passed': False, 'actual_output': '', 'stderr': '',
+                           'return_code': None, 'execution_time': 0})
+            continue
+
+        expected = case.get('expected_output')
+        passed = status == 'completed' and outcome['return_code'] == 0 and (
+            expected is None or normalize_output(outcome['actual_output']) == normalize_output(expected)
+        )
+        failures += not passed
+        if status == 'completed':
+            status = 'passed' if passed else 'failed'
+        graded.append({**outcome, 'status': status, 'passed': passed})
+    return graded
+
+
+class ExecutionQueueFullError(Exception):
+    """Raised when the worker pool cannot accept another job (backpressure)."""
+    pass
+
+
+class SandboxWorker:
+    """
+    One warm sandbox interpreter and its JSON-lines pipe.
+    """
+
+    def __init__(self, preload_modules):
+        self.runs = 0
+        self.info = None
+        # Bytes read from the worker that do not yet form a whole line
+        self._buffer = b''
+        self.process = subprocess.Popen(
+            [sys.executable, '-u', str(WORKER_SCRIPT), json.dumps({'preload': preload_modules})],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            start_new_session=True,
+            close_fds=True,
+        )
+
+    @property
+    def jac_available(self) -> bool:
+        return bool(self.info and self.info.get('jac_available'))
+
+    def wait_ready(self, timeout: float) -> bool:
+        """Read the worker's startup message (only the first call blocks)."""
+        if self.info is None:
+            self.info = self._read_message(timeout)
+        return self.info is not None and self.info.get('ready', False)
+
+    def run(self, job: Dict, timeout: float,
+            on_output: Optional[Callable[[str, str], None]] = None) -> Optional[Dict]:
+        """
+        Send a job and wait for its result.
+
+        Args:
+            job: Job request
+            timeout: Seconds to wait for the result
+            on_output: Called with (stream, data) for each output chunk the
+                worker streams while the job runs
+
+        Returns:
+            Result dictionary, or None if the worker did not answer in time
+        """
+        self.runs += 1
+        self.process.stdin.write(json.dumps(job) + '\n')
+        self.process.stdin.flush()
+
+        deadline = time.monotonic() + timeout
+        while True:
+            message = self._read_message(max(deadline - time.monotonic(), 0))
+            if message is None or 'chunk' not in message:
+                return message
+            if on_output:
+                on_output(message['chunk']['stream'], message['chunk']['data'])
+
+    def is_alive(self) -> bool:
+        return self.process.poll() is None
+
+    def stop(self):
+        """Kill the worker and its job children."""
+        try:
+            os.killpg(self.process.pid, 9)
+        except OSError:
+            pass
+        try:
+            self.process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            pass
+        for stream in (self.process.stdin, self.process.stdout):
+            try:
+                stream.close()
+            except Exception:
+                pass
+
+    def _read_message(self, timeout: float) -> Optional[Dict]:
+        """
+        Read the next JSON line from the worker.
+
+        The pipe is read with os.read into our own buffer rather than with
+        readline(), so a line that arrived with the previous one is returned
+        straight away instead of waiting on a select() that will not fire.
+        """
+        deadline = time.monotonic() + timeout
+        fd = self.process.stdout.fileno()
+        with selectors.DefaultSelector() as selector:
+            selector.register(fd, selectors.EVENT_READ)
+            while b'\n' not in self._buffer:
+                if not selector.select(max(deadline - time.monotonic(), 0)):
+                    return None
+                data = os.read(fd, 65536)
+                if not data:
+                    return None
+                self._buffer += data
+        line, _, self._buffer = self._buffer.partition(b'\n')
+        return json.loads(line)
+
+
+class SandboxWorkerPool:
+    """
+    Process-wide pool of warm sandbox workers with a bounded queue.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        execution_config = getattr(settings, 'JAC_EXECUTION_CONFIG', {})
+        self.size = execution_config.get('WORKER_POOL_SIZE', 4)
+        self.max_runs = execution_config.get('WORKER_MAX_RUNS', 200)
+        self.queue_size = execution_config.get('WORKER_QUEUE_SIZE', 16)
+        self.queue_timeout = execution_config.get('WORKER_QUEUE_TIMEOUT', 10)
+        self.startup_timeout = execution_config.get('WORKER_STARTUP_TIMEOUT', 10)
+        self.max_open_files = execution_config.get('WORKER_MAX_OPEN_FILES', 32)
+        self.preload_modules = execution_config.get('WORKER_PRELOAD_MODULES', DEFAULT_PRELOAD_MODULES)
+
+        self._idle = queue.LifoQueue()
+        self._admission = threading.BoundedSemaphore(self.size + self.queue_size)
+        self._lock = threading.Lock()
+        self._workers = set()
+        self._closed = False
+
+        for _ in range(self.size):
+            self._idle.put(self._spawn())
+
+        atexit.register(self.shutdown)
+
+    @classmethod
+    def get_instance(cls) -> 'SandboxWorkerPool':
+        """Get the worker pool for this process, starting it on first use."""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    @staticmethod
+    def is_supported() -> bool:
+        """The workers fork per job, so the pool needs a POSIX platform."""
+        return os.name == 'posix' and hasattr(os, 'fork')
+
+    def execute(self, language: str, code: str, stdin: str, timeout: float,
+                max_memory: int, max_output: int,
+                on_output: Optional[Callable[[str, str], None]] = None) -> Optional[Dict]:
+        """
+        Run code on a warm worker.
+
+        Args:
+            language: 'python' or 'jac'
+            code: Source code
+            stdin: Standard input data
+            timeout: Wall-clock limit in seconds
+            max_memory: Memory limit in MB
+            max_output: Limit for each of stdout and stderr in bytes
+            on_output: Optional (stream, data) callback for output produced
+                while the job runs
+
+        Returns:
+            Execution result dictionary, or None for JAC code when the JAC
+            runtime is not installed in the workers (use the CLI instead)
+
+        Raises:
+            ExecutionQueueFullError: If the pool is saturated
+        """
+        job = {
+            'language': language,
+            'code': code,
+            'stdin': stdin,
+            'timeout': timeout,
+            'max_memory': max_memory,
+            'max_output': max_output,
+            'max_open_files': self.max_open_files,
+            'stream': on_output is not None,
+        }
+        return self._dispatch(job, on_output)
+
+    def evaluate(self, language: str, code: str, cases: List[Dict], case_timeout: float,
+                 max_memory: int, max_output: int, max_failures: int = 0) -> Optional[Dict]:
+        """
+        Run code against a batch of test cases on one warm worker.
+
+        The code is loaded once and every case runs in the same sandboxed
+        child, each with its own stdin, output buffers and time budget. Only
+        the stdin of each case is sent to the worker; the output is graded
+        here, out of reach of the submitted code.
+
+        Args:
+            language: 'python' or 'jac'
+            code: Source code
+            cases: List of {'stdin', 'expected_output'} dictionaries
+            case_timeout: Wall-clock limit per case in seconds
+            max_memory: Memory limit in MB
+            max_output: Output limit per case in bytes
+            max_failures: Skip the remaining cases after this many failures
+                (0 runs every case)
+
+        Returns:
+            Batch result with one entry per case in 'cases', or None for JAC
+            code when the JAC runtime is not installed in the workers
+
+        Raises:
+            ExecutionQueueFullError: If the pool is saturated
+        """
+        job = {
+            'language': language,
+            'code': code,
+            'stdin': '',
+            'cases': [{'stdin': case.get('stdin') or ''} for case in cases],
+            'case_timeout': case_timeout,
+            'max_failures': max_failures,
+            'timeout': case_timeout * len(cases) + 1,
+            'max_memory': max_memory,
+            'max_output': max_output,
+            'max_file_size': max_output * (2 * len(cases) + 1) + 65536,
+            'max_open_files': self.max_open_files,
+        }
+        batch = self._dispatch(job)
+        if batch and batch.get('cases'):
+            batch['cases'] = grade_cases(cases, batch['cases'], max_failures)
+            batch['return_code'] = 0 if all(case['passed'] for case in batch['cases']) else 1
+        return batch
+
+    def _dispatch(self, job: Dict, on_output: Optional[Callable[[str, str], None]] = None) -> Optional[Dict]:
+        """Check out a worker, run the job on it and return or replace the worker."""
+        if not self._admission.acquire(blocking=False):
+            raise ExecutionQueueFullError('Code execution queue is full, please retry shortly')
+
+        timeout = job['timeout']
+        try:
+            try:
+                worker = self._idle.get(timeout=self.queue_timeout)
+            except queue.Empty:
+                raise ExecutionQueueFullError('Timed out waiting for a free code execution worker')
+
+            recycle = True
+            try:
+                if not worker.is_alive() or not worker.wait_ready(self.startup_timeout):
+                    logger.warning('Sandbox worker failed to start, replacing it')
+                    self._forget(worker)
+                    worker.stop()
+                    worker = self._spawn()
+                    if not worker.wait_ready(self.startup_timeout):
+                        return self._error_result('Execution worker failed to start')
+
+                if job['language'] == 'jac' and not worker.jac_available:
+                    recycle = False
+                    return None
+
+                result = worker.run(job, timeout + RESPONSE_GRACE_SECONDS, on_output)
+                if result is None:
+                    logger.error(f'Sandbox worker {worker.process.pid} stopped responding')
+                    return self._error_result('Execution worker stopped responding', timeout)
+
+                violation = result.pop('violation', None)
+                if violation:
+                    logger.info(f'Recycling sandbox worker {worker.process.pid} after policy violation: {violation}')
+                recycle = bool(violation) or worker.runs >= self.max_runs
+                return result
+            except (OSError, ValueError) as e:
+                logger.error(f'Sandbox worker error: {str(e)}')
+                return self._error_result(f'Execution worker error: {str(e)}')
+            finally:
+                self._release(worker, recycle)
+        finally:
+            self._admission.release()
+
+    def stats(self) -> Dict:
+        """Pool size and current load."""
+        return {
+            'size': self.size,
+            'idle': self._idle.qsize(),
+            'queue_size': self.queue_size,
+            'max_runs': self.max_runs,
+        }
+
+    def shutdown(self):
+        """Stop all workers."""
+        with self._lock:
+            self._closed = True
+            workers = list(self._workers)
+            self._workers.clear()
+        for worker in workers:
+            worker.stop()
+
+    @staticmethod
+    def _error_result(message: str, execution_time: float = 0) -> Dict:
+        return {
+            'stdout': '',
+            'stderr': message,
+            'return_code': 1,
+            'execution_time': execution_time,
+            'status': 'error'
+        }
+
+    def _spawn(self) -> SandboxWorker:
+        worker = SandboxWorker(self.preload_modules)
+        with self._lock:
+            self._workers.add(worker)
+        return worker
+
+    def _forget(self, worker: SandboxWorker):
+        with self._lock:
+            self._workers.discard(worker)
+
+    def _release(self, worker: SandboxWorker, recycle: bool):
+        """Return a worker to the idle queue, replacing it first if needed."""
+        if recycle or not worker.is_alive():
+            self._forget(worker)
+            worker.stop()
+            if self._closed:
+                return
+            worker = self._spawn()
+        self._idle.put(worker)
@@ -0,0 +1,21 @@
+# JAC Interactive Learning Platform - Core backend implementation by Cavin Otieno
+
+"""
+JAC Execution Signals - JAC Learning Platform
+
+Drops the process-local copy of the security settings when an admin changes
+them, so new limits apply to the next execution in this process.
+"""
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import SecuritySettings
+from .services.executor import invalidate_security_settings
+
+
+@receiver(post_save, sender=SecuritySettings)
+@receiver(post_delete, sender=SecuritySettings)
+def reload_security_settings(sender, instance, **kwargs):
+    """Reload security settings on the next execution"""
+    invalidate_security_settings()
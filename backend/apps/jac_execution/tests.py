@@ -0,0 +1,455 @@
+# JAC Interactive Learning Platform - Core backend implementation by Cavin Otieno
+
+"""
+JAC execution tests for Django
+"""
+
+import sys
+import json
+import time
+import uuid
+import threading
+import subprocess
+from types import SimpleNamespace
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from asgiref.testing import ApplicationCommunicator
+from channels.layers import get_channel_layer
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from .consumers import ExecutionStreamConsumer
+from .models import SecuritySettings
+from .services.batch_runner import BatchTestRunner
+from .services.execution_queue import ExecutionQueue, get_job_state, job_cache_key, job_group_name
+from .services.executor import CodeExecutor
+from .services.result_cache import ExecutionResultCache, normalize_code
+from .services.worker_pool import ExecutionQueueFullError, SandboxWorker, SandboxWorkerPool
+from .views import JACLearningEvaluationAPIView
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+IN_MEMORY_CHANNEL_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+POOL_CONFIG = {'WORKER_POOL_SIZE': 1, 'WORKER_QUEUE_SIZE': 0, 'WORKER_PRELOAD_MODULES': ['math']}
+QUEUE_CONFIG = {'EXECUTION_QUEUE_RUNNERS': 1, 'EXECUTION_QUEUE_SIZE': 0, 'EXECUTION_JOB_TTL': 60}
+
+
+def make_security_settings(**overrides):
+    values = dict(
+        max_execution_time=2.0, max_memory=64, max_output_size=10240,
+        allowed_languages=['python'], blocked_imports=['os'], blocked_functions=['eval']
+    )
+    values.update(overrides)
+    return SecuritySettings(**values)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ExecutionResultCacheTest(SimpleTestCase):
+    """Test the content-addressed execution result cache"""
+
+    def setUp(self):
+        self.result_cache = ExecutionResultCache()
+        self.security_settings = SecuritySettings(
+            max_execution_time=5.0, max_memory=64, max_output_size=10240,
+            blocked_imports=['os'], blocked_functions=['eval']
+        )
+
+    def test_key_is_the_exact_code_and_input(self):
+        """Only a final newline is ignored; whitespace, stdin and limits change the key"""
+        key = self.result_cache.make_key('python', 'print(1)\n', '', self.security_settings)
+
+        self.assertEqual(normalize_code('print(1)\n'), 'print(1)')
+        self.assertEqual(key, self.result_cache.make_key('python', 'print(1)', '', self.security_settings))
+        for code in ('\nprint(1)\n', 'print(1)  \n', 'print(1)\n\n', 'print(1)\r\n'):
+            self.assertNotEqual(key, self.result_cache.make_key('python', code, '', self.security_settings))
+        self.assertNotEqual(key, self.result_cache.make_key('python', 'print(1)\n', 'x', self.security_settings))
+
+        self.security_settings.max_memory = 128
+        self.assertNotEqual(key, self.result_cache.make_key('python', 'print(1)\n', '', self.security_settings))
+
+    def test_nondeterministic_code_is_not_cacheable(self):
+        """Programs importing random, time, ... always run"""
+        self.assertTrue(self.result_cache.is_cacheable('print(sum(range(10)))'))
+        self.assertFalse(self.result_cache.is_cacheable('import random\nprint(random.random())'))
+        self.assertFalse(self.result_cache.is_cacheable('import math, time\nprint(time.time())'))
+        self.assertFalse(self.result_cache.is_cacheable('import:py random;\nwith entry { print(random.random()); }'))
+
+    def test_tiers_and_metrics(self):
+        """Results are served from L1, then the shared cache, and counted"""
+        key = self.result_cache.make_key('python', 'print(1)', '', self.security_settings)
+        self.assertIsNone(self.result_cache.get(key))
+
+        self.result_cache.set(key, {'stdout': '1\n', 'stderr': '', 'return_code': 0,
+                                    'execution_time': 0.01, 'status': 'completed', 'execution_id': 'x'})
+        cached = self.result_cache.get(key)
+        self.assertEqual(cached['stdout'], '1\n')
+        self.assertNotIn('execution_id', cached)
+
+        # Callers get copies, and a fresh process still finds the result in L2
+        cached['stdout'] = 'changed'
+        other_process = ExecutionResultCache()
+        self.assertEqual(other_process.get(key)['stdout'], '1\n')
+
+        stats = self.result_cache.stats()
+        self.assertEqual((stats['l1_hits'], stats['misses'], stats['stores']), (1, 1, 1))
+        self.assertEqual(other_process.stats()['l2_hits'], 1)
+
+    def test_timeouts_are_not_stored(self):
+        """Load-dependent outcomes are always re-run"""
+        key = self.result_cache.make_key('python', 'while True: pass', '', self.security_settings)
+        self.result_cache.set(key, {'stdout': '', 'stderr': 'Execution timeout exceeded',
+                                    'return_code': 124, 'execution_time': 5, 'status': 'timeout'})
+        self.assertIsNone(self.result_cache.get(key))
+
+
+class SandboxWorkerReadTest(SimpleTestCase):
+    """Test the JSON-lines protocol reader of a sandbox worker"""
+
+    def setUp(self):
+        self.worker = SandboxWorker.__new__(SandboxWorker)
+        self.worker.runs = 0
+        self.worker.info = None
+        self.worker._buffer = b''
+        self.worker.process = subprocess.Popen(
+            [sys.executable, '-c',
+             'import sys, time\n'
+             'sys.stdout.write(\'{"n": 1}\\n{"n": 2}\\n{"n": \')\n'
+             'sys.stdout.flush()\n'
+             'time.sleep(1)\n'
+             'sys.stdout.write(\'3}\\n\')\n'
+             'sys.stdout.flush()\n'
+             'time.sleep(30)\n'],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, start_new_session=True
+        )
+
+    def tearDown(self):
+        self.worker.stop()
+
+    def test_lines_written_together_are_all_read(self):
+        """A line that arrived with the previous one does not wait for the timeout"""
+        started = time.monotonic()
+        self.assertEqual(self.worker._read_message(2.0), {'n': 1})
+        self.assertEqual(self.worker._read_message(2.0), {'n': 2})
+        self.assertLess(time.monotonic() - started, 0.5)
+
+        # A line split across writes is joined
+        self.assertEqual(self.worker._read_message(2.0), {'n': 3})
+
+    def test_timeout_without_a_whole_line(self):
+        """Nothing more is written, so the reader gives up after its timeout"""
+        for _ in range(3):
+            self.worker._read_message(2.0)
+        self.assertIsNone(self.worker._read_message(0.2))
+
+
+@override_settings(JAC_EXECUTION_CONFIG=POOL_CONFIG)
+class SandboxWorkerPoolTest(SimpleTestCase):
+    """Test running jobs on warm sandbox workers"""
+
+    def setUp(self):
+        if not SandboxWorkerPool.is_supported():
+            self.skipTest('The sandbox worker pool needs a POSIX platform')
+        self.pool = SandboxWorkerPool()
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def test_execute_streams_output(self):
+        """Output chunks reach the callback and the final result"""
+        chunks = []
+        result = self.pool.execute('python', 'print(input() * 2)', 'ab', 5, 64, 10240,
+                                   on_output=lambda stream, data: chunks.append((stream, data)))
+
+        self.assertEqual(result['status'], 'completed')
+        self.assertEqual(result['stdout'], 'abab\n')
+        self.assertEqual(''.join(data for stream, data in chunks if stream == 'stdout'), 'abab\n')
+
+    def test_worker_is_reused_until_a_violation(self):
+        """Clean runs keep the warm worker; a timeout replaces it"""
+        worker = self.pool._idle.queue[0]
+        self.pool.execute('python', 'print(1)', '', 5, 64, 10240)
+        self.assertIs(self.pool._idle.queue[0], worker)
+
+        result = self.pool.execute('python', 'while True: pass', '', 0.5, 64, 10240)
+        self.assertEqual(result['status'], 'timeout')
+        self.assertIsNot(self.pool._idle.queue[0], worker)
+        self.assertFalse(worker.is_alive())
+
+        self.assertEqual(self.pool.execute('python', 'print(2)', '', 5, 64, 10240)['stdout'], '2\n')
+
+    def test_evaluate_runs_every_case(self):
+        """One batch grades each case and stops after max_failures"""
+        cases = [
+            {'stdin': '2', 'expected_output': '4'},
+            {'stdin': '3', 'expected_output': '7'},
+            {'stdin': '4', 'expected_output': '8'},
+        ]
+        code = 'print(int(input()) * 2)'
+
+        batch = self.pool.evaluate('python', code, cases, 2, 64, 10240, max_failures=0)
+        self.assertEqual([case['status'] for case in batch['cases']], ['passed', 'failed', 'passed'])
+        self.assertEqual(batch['cases'][1]['actual_output'], '6\n')
+
+        batch = self.pool.evaluate('python', code, cases, 2, 64, 10240, max_failures=1)
+        self.assertEqual([case['status'] for case in batch['cases']], ['passed', 'failed', 'skipped'])
+
+    def test_expected_output_is_out_of_reach(self):
+        """The submission cannot find the expected outputs or write its own results"""
+        code = (
+            'import gc\n'
+            'key = "expected" + "_output"\n'
+            'print(any(key in o for o in gc.get_objects() if isinstance(o, dict)))\n'
+            'with open("cases.jsonl", "a") as forged:\n'
+            '    forged.write(\'{"status": "passed", "passed": true}\\n\' * 3)\n'
+        )
+        cases = [{'stdin': '', 'expected_output': 'False'}, {'stdin': '', 'expected_output': 'secret'}]
+
+        batch = self.pool.evaluate('python', code, cases, 2, 64, 10240)
+        self.assertEqual([case['status'] for case in batch['cases']], ['passed', 'failed'])
+        self.assertEqual(batch['cases'][1]['actual_output'], 'False\n')
+
+
+@override_settings(JAC_EXECUTION_CONFIG=POOL_CONFIG, CACHES=LOCMEM_CACHE)
+class BatchTestRunnerTest(SimpleTestCase):
+    """Test grading a submission against its test cases"""
+
+    test_cases = [
+        {'input': '2', 'expected_output': '4'},
+        {'input': 3, 'expected_output': 7},
+        {'input': '5'},
+    ]
+
+    def setUp(self):
+        # The per-case fallback compares output, so run it without the legacy stdout wrapper
+        patcher = mock.patch.object(CodeExecutor, '_load_security_settings',
+                                    return_value=make_security_settings(enable_sandboxing=False))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.executor = CodeExecutor()
+
+    def run_tests(self, use_worker_pool, **kwargs):
+        self.executor.use_worker_pool = use_worker_pool
+        code = 'import sys\nprint(int(sys.stdin.read()) * 2)'
+        return BatchTestRunner(self.executor).run('python', code, self.test_cases, **kwargs)
+
+    def test_pool_and_fallback_agree(self):
+        """A batch on the pool grades like one execution per case"""
+        if not SandboxWorkerPool.is_supported():
+            self.skipTest('The sandbox worker pool needs a POSIX platform')
+        pool = SandboxWorkerPool()
+        self.addCleanup(pool.shutdown)
+
+        with mock.patch.object(SandboxWorkerPool, 'get_instance', return_value=pool):
+            batch = self.run_tests(True)
+        one_by_one = self.run_tests(False)
+
+        fields = ('test_case', 'passed', 'status', 'actual_output', 'error')
+        self.assertEqual([[result[field] for field in fields] for result in batch],
+                         [[result[field] for field in fields] for result in one_by_one])
+        self.assertEqual([result['passed'] for result in batch], [True, False, True])
+
+    def test_max_failures_skips_the_rest(self):
+        """Cases after the failure budget are reported as skipped"""
+        results = self.run_tests(False, max_failures=1)
+        self.assertEqual([result['status'] for result in results], ['passed', 'failed', 'skipped'])
+
+    def test_rejected_code_fails_every_case(self):
+        """Code that breaks the security settings is not run at all"""
+        self.executor.use_worker_pool = False
+        results = BatchTestRunner(self.executor).run('python', 'eval("1")', self.test_cases)
+        self.assertEqual([result['status'] for result in results], ['error'] * 3)
+
+
+class FakeExecutionService:
+    """ExecutionService stand-in that streams scripted output and records saves"""
+
+    def __init__(self, execute_code):
+        self.executor = SimpleNamespace(validate_request=mock.Mock(), execute_code=execute_code)
+        self.saved = []
+
+    def record_execution(self, user, language, code, stdin, result, execution_id=None, created_at=None):
+        self.saved.append((execution_id, result))
+
+
+@override_settings(JAC_EXECUTION_CONFIG=QUEUE_CONFIG, CACHES=LOCMEM_CACHE,
+                   CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS)
+class ExecutionQueueTest(SimpleTestCase):
+    """Test queued executions, their live state and their stream messages"""
+
+    def setUp(self):
+        self.user = SimpleNamespace(id=7)
+        self.execution_queue = ExecutionQueue()
+        self.addCleanup(self.execution_queue._executor.shutdown, wait=True)
+
+    def submit(self, execute_code):
+        service = FakeExecutionService(execute_code)
+        with mock.patch('apps.jac_execution.services.execution_queue.ExecutionService', return_value=service):
+            job = self.execution_queue.submit(self.user, 'python', 'print(1)')
+        return job, service
+
+    def wait_for(self, execution_id):
+        self.execution_queue._executor.shutdown(wait=True)
+        return get_job_state(execution_id)
+
+    def test_job_streams_then_saves_once(self):
+        """Every status change and output chunk reaches the cache and the group, in order"""
+        execution_id = uuid.uuid4()
+        channel_layer = get_channel_layer()
+        channel = async_to_sync(channel_layer.new_channel)()
+        async_to_sync(channel_layer.group_add)(job_group_name(execution_id), channel)
+
+        def execute_code(language, code, stdin, on_output=None, use_cache=True):
+            on_output('stdout', '1\n')
+            return {'stdout': '1\n', 'stderr': '', 'return_code': 0, 'execution_time': 0.1, 'status': 'completed'}
+
+        with mock.patch('apps.jac_execution.services.execution_queue.uuid.uuid4', return_value=execution_id):
+            job, service = self.submit(execute_code)
+        self.assertEqual(job['id'], str(execution_id))
+        self.assertEqual(job['status'], 'pending')
+
+        state = self.wait_for(job['id'])
+        self.assertEqual((state['status'], state['stdout'], state['return_code']), ('completed', '1\n', 0))
+        self.assertEqual(service.saved[0][0], execution_id)
+        self.assertEqual(len(service.saved), 1)
+
+        messages = [async_to_sync(channel_layer.receive)(channel) for _ in range(4)]
+        self.assertEqual([(message['type'], message.get('status')) for message in messages], [
+            ('execution.status', 'pending'), ('execution.status', 'running'),
+            ('execution.output', None), ('execution.status', 'completed'),
+        ])
+        self.assertEqual([message['seq'] for message in messages], [1, 2, 3, 4])
+        self.assertEqual(messages[2]['data'], '1\n')
+        self.assertEqual(messages[3]['result']['return_code'], 0)
+
+    def test_executor_failure_is_reported(self):
+        """An exception in the runner ends the job as an error and is still saved"""
+        def execute_code(language, code, stdin, on_output=None, use_cache=True):
+            raise RuntimeError('sandbox exploded')
+
+        job, service = self.submit(execute_code)
+
+        state = self.wait_for(job['id'])
+        self.assertEqual((state['status'], state['stderr'], state['return_code']), ('error', 'sandbox exploded', 1))
+        self.assertEqual(service.saved[0][1]['status'], 'error')
+
+    def test_full_queue_rejects_and_recovers(self):
+        """Past runners + queue size, submit raises until a slot frees"""
+        release = threading.Event()
+
+        def execute_code(language, code, stdin, on_output=None, use_cache=True):
+            release.wait(5)
+            return {'stdout': '', 'stderr': '', 'return_code': 0, 'execution_time': 0, 'status': 'completed'}
+
+        job, _ = self.submit(execute_code)
+        with self.assertRaises(ExecutionQueueFullError):
+            self.submit(execute_code)
+
+        release.set()
+        self.assertEqual(self.wait_for(job['id'])['status'], 'completed')
+        self.assertTrue(self.execution_queue._admission.acquire(blocking=False))
+
+
+@override_settings(CACHES=LOCMEM_CACHE, CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS)
+class ExecutionStreamConsumerTest(SimpleTestCase):
+    """Test the WebSocket stream of a running execution"""
+
+    execution_id = '6f1c0a52-8a8e-4d5a-9d1e-3f4b8f0f1a11'
+
+    def setUp(self):
+        cache.clear()
+        cache.set(job_cache_key(self.execution_id), {
+            'id': self.execution_id, 'user_id': 7, 'status': 'running', 'stdout': 'a', 'stderr': '', 'seq': 2,
+        })
+
+    async def connect(self, user):
+        """Open the stream as user; returns the communicator and whether it was accepted"""
+        communicator = ApplicationCommunicator(ExecutionStreamConsumer.as_asgi(), {
+            'type': 'websocket',
+            'path': f'/ws/execution/{self.execution_id}/',
+            'user': user,
+            'url_route': {'kwargs': {'execution_id': self.execution_id}},
+        })
+        await communicator.send_input({'type': 'websocket.connect'})
+        response = await communicator.receive_output()
+        return communicator, response['type'] == 'websocket.accept'
+
+    @staticmethod
+    async def receive_json(communicator):
+        return json.loads((await communicator.receive_output())['text'])
+
+    @async_to_sync
+    async def test_snapshot_then_chunks_until_done(self):
+        """The owner gets the output so far, later chunks, and a close on completion"""
+        communicator, accepted = await self.connect(SimpleNamespace(id=7))
+        self.assertTrue(accepted)
+        snapshot = await self.receive_json(communicator)
+        self.assertEqual((snapshot['type'], snapshot['stdout'], snapshot['seq']), ('snapshot', 'a', 2))
+
+        channel_layer = get_channel_layer()
+        group = job_group_name(self.execution_id)
+        await channel_layer.group_send(group, {'type': 'execution.output', 'seq': 3, 'stream': 'stdout', 'data': 'b'})
+        await channel_layer.group_send(group, {'type': 'execution.status', 'seq': 4, 'status': 'completed',
+                                               'result': {'return_code': 0}})
+
+        self.assertEqual(await self.receive_json(communicator),
+                         {'type': 'output', 'seq': 3, 'stream': 'stdout', 'data': 'b'})
+        self.assertEqual((await self.receive_json(communicator))['status'], 'completed')
+        self.assertEqual((await communicator.receive_output())['type'], 'websocket.close')
+        await communicator.send_input({'type': 'websocket.disconnect', 'code': 1000})
+        await communicator.wait()
+
+    @async_to_sync
+    async def test_other_users_are_rejected(self):
+        """Anonymous users and other learners cannot watch the execution"""
+        for user in (AnonymousUser(), SimpleNamespace(id=8)):
+            communicator, accepted = await self.connect(user)
+            self.assertFalse(accepted)
+            await communicator.send_input({'type': 'websocket.disconnect', 'code': 1000})
+            await communicator.wait()
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class JACLearningEvaluationAPIViewTest(SimpleTestCase):
+    """Test the test case options of the evaluation endpoint"""
+
+    def post(self, **data):
+        request = APIRequestFactory().post('/api/jac-learning/evaluate/', {'code': 'print(1)', **data}, format='json')
+        force_authenticate(request, user=SimpleNamespace(id=7, pk=7, is_authenticated=True))
+        return JACLearningEvaluationAPIView.as_view()(request)
+
+    def test_invalid_options_are_rejected(self):
+        """Unparseable or out-of-range options answer 400 without running anything"""
+        with mock.patch('apps.jac_execution.views.jac_executor') as jac_executor:
+            for options in (
+                {'case_timeout': 'soon'},
+                {'case_timeout': 0},
+                {'case_timeout': 3600},
+                {'max_failures': 'many'},
+                {'max_failures': -1},
+                {'max_failures': 1000},
+                {'test_cases': 'all'},
+            ):
+                with self.subTest(options=options):
+                    response = self.post(**{'test_cases': [{'input': '', 'expected_output': '1'}], **options})
+                    self.assertEqual(response.status_code, 400)
+                    self.assertIn(next(iter(options)), response.data)
+            jac_executor.execute_code.assert_not_called()
+
+    def test_valid_options_reach_the_runner(self):
+        """Parsed options are passed on to the batch runner"""
+        test_cases = [{'input': '', 'expected_output': '1'}]
+        with mock.patch('apps.jac_execution.views.jac_executor') as jac_executor, \
+                mock.patch('apps.jac_execution.views.BatchTestRunner') as runner:
+            jac_executor.execute_code.return_value = {'success': True}
+            jac_executor._generate_suggestions.return_value = []
+            runner.return_value.run.return_value = [{'test_case': 1, 'passed': True}]
+
+            response = self.post(language='python', test_cases=test_cases, case_timeout='1.5', max_failures='2')
+
+        self.assertEqual(response.status_code, 200)
+        runner.return_value.run.assert_called_once_with(
+            'python', 'print(1)', test_cases, case_timeout=1.5, max_failures=2
+        )
+        self.assertEqual(response.data['test_results'], [{'test_case': 1, 'passed': True}])
@@ -16,6 +16,7 @@ from django.views.decorators.csrf import csrf_exempt
 from django.db.models import Q
 from django.core.paginator import Paginator
 from django.utils import timezone
+from django.urls import reverse
 import time
 
 from .models import CodeExecution, ExecutionTemplate, CodeExecutionSession, SecuritySettings
@@ -24,9 +25,25 @@ from .serializers import (
     CodeExecutionStatusSerializer, ExecutionTemplateListSerializer,
     ExecutionTemplateDetailSerializer, ExecutionTemplateCreateSerializer,
     CodeExecutionSessionSerializer, SecuritySettingsSerializer,
-    QuickExecutionSerializer, ExecutionHistorySerializer
+    QuickExecutionSerializer, ExecutionHistorySerializer, TestEvaluationOptionsSerializer
 )
-from .services.executor import ExecutionService, CodeExecutionError, SecurityViolationError
+from .services.executor import (
+    ExecutionService, CodeExecutionError, SecurityViolationError, ExecutionQueueFullError
+)
+from .services.execution_queue import ExecutionQueue, get_job_state
+from .services.result_cache import ExecutionResultCache
+from .services.batch_runner import BatchTestRunner
+
+
+def execution_queue_full_response(error):
+    """Ask the client to retry when the sandbox workers are saturated."""
+    response = Response({
+        'success': False,
+        'error': str(error),
+        'status': 'queue_full'
+    }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    response['Retry-After'] = '2'
+    return response
 
 
 class CodeExecutionViewSet(viewsets.ModelViewSet):
@@ -63,6 +80,7 @@ class CodeExecutionViewSet(viewsets.ModelViewSet):
         language = serializer.validated_data['language']
         code = serializer.validated_data['code']
         stdin = serializer.validated_data.get('stdin', '')
+        use_cache = serializer.validated_data.get('use_cache', True)
         
         try:
             # Execute code
@@ -72,15 +90,12 @@ class CodeExecutionViewSet(viewsets.ModelViewSet):
                 language=language,
                 code=code,
                 stdin=stdin,
-                save_result=True
+                save_result=True,
+                use_cache=use_cache
             )
             
             # Get the created execution record
-            execution = CodeExecution.objects.filter(
-                user=request.user,
-                language=language,
-                code=code
-            ).order_by('-created_at').first()
+            execution = CodeExecution.objects.get(id=result.pop('execution_id'))
             
             # Serialize result
             result_serializer = CodeExecutionResultSerializer(execution)
@@ -96,6 +111,8 @@ class CodeExecutionViewSet(viewsets.ModelViewSet):
                 }
             })
             
+        except ExecutionQueueFullError as e:
+            return execution_queue_full_response(e)
         except CodeExecutionError as e:
             return Response({
                 'success': False,
@@ -115,6 +132,49 @@ class CodeExecutionViewSet(viewsets.ModelViewSet):
                 'status': 'server_error'
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
+    @action(detail=False, methods=['post'])
+    def submit(self, request):
+        """
+        Queue code for execution and return its id without waiting.
+        
+        Poll api/execution/<id>/ or connect to ws/executions/<id>/ to
+        follow the output while it runs.
+        """
+        serializer = CodeExecutionCreateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            job = ExecutionQueue.get_instance().submit(
+                user=request.user,
+                language=serializer.validated_data['language'],
+                code=serializer.validated_data['code'],
+                stdin=serializer.validated_data.get('stdin', ''),
+                use_cache=serializer.validated_data.get('use_cache', True)
+            )
+        except ExecutionQueueFullError as e:
+            return execution_queue_full_response(e)
+        except CodeExecutionError as e:
+            return Response({
+                'success': False,
+                'error': str(e),
+                'status': 'error'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        except SecurityViolationError as e:
+            return Response({
+                'success': False,
+                'error': f'Security violation: {str(e)}',
+                'status': 'security_error'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            'success': True,
+            'execution_id': job['id'],
+            'status': job['status'],
+            'status_url': reverse('jac_execution:execution-status', kwargs={'execution_id': job['id']}),
+            'stream_url': f"/ws/executions/{job['id']}/"
+        }, status=status.HTTP_202_ACCEPTED)
+    
     @action(detail=False, methods=['post'])
     def quick_execute(self, request):
         """
@@ -127,6 +187,7 @@ class CodeExecutionViewSet(viewsets.ModelViewSet):
         language = serializer.validated_data['language']
         code = serializer.validated_data['code']
         stdin = serializer.validated_data.get('stdin', '')
+        use_cache = serializer.validated_data.get('use_cache', True)
         
         try:
             execution_service = ExecutionService()
@@ -135,7 +196,8 @@ class CodeExecutionViewSet(viewsets.ModelViewSet):
                 language=language,
                 code=code,
                 stdin=stdin,
-                save_result=False
+                save_result=False,
+                use_cache=use_cache
             )
             
             return Response({
@@ -143,6 +205,8 @@ class CodeExecutionViewSet(viewsets.ModelViewSet):
                 'output': result
             })
             
+        except ExecutionQueueFullError as e:
+            return execution_queue_full_response(e)
         except Exception as e:
             return Response({
                 'success': False,
@@ -290,6 +354,8 @@ class ExecutionTemplateViewSet(viewsets.ModelViewSet):
                 'output': result
             })
             
+        except ExecutionQueueFullError as e:
+            return execution_queue_full_response(e)
         except Exception as e:
             return Response({
                 'success': False,
@@ -345,6 +411,7 @@ class QuickExecutionView(APIView):
         language = serializer.validated_data['language']
         code = serializer.validated_data['code']
         stdin = serializer.validated_data.get('stdin', '')
+        use_cache = serializer.validated_data.get('use_cache', True)
         
         try:
             execution_service = ExecutionService()
@@ -353,7 +420,8 @@ class QuickExecutionView(APIView):
                 language=language,
                 code=code,
                 stdin=stdin,
-                save_result=False
+                save_result=False,
+                use_cache=use_cache
             )
             
             return Response({
@@ -361,6 +429,8 @@ class QuickExecutionView(APIView):
                 'output': result
             })
             
+        except ExecutionQueueFullError as e:
+            return execution_queue_full_response(e)
         except CodeExecutionError as e:
             return Response({
                 'success': False,
@@ -425,6 +495,19 @@ class SecuritySettingsViewSet(viewsets.ReadOnlyModelViewSet):
             return Response(serializer.data)
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    @action(detail=False, methods=['get'])
+    def result_cache(self, request):
+        """
+        Execution result cache hit/miss statistics for this process (admin only).
+        """
+        if not request.user.is_staff:
+            return Response(
+                {'error': 'Admin permissions required'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        return Response(ExecutionResultCache.get_instance().stats())
 
 
 class ExecutionStatusView(APIView):
@@ -435,6 +518,11 @@ class ExecutionStatusView(APIView):
     
     def get(self, request, execution_id):
         """Get execution status and results."""
+        # Queued and running jobs only exist in the live job state
+        job = get_job_state(execution_id)
+        if job and job['user_id'] == request.user.id and job['status'] in ('pending', 'running'):
+            return Response(job)
+        
         try:
             execution = CodeExecution.objects.get(
                 id=execution_id,
@@ -849,7 +937,6 @@ class JACLearningEvaluationAPIView(APIView):
         POST /api/jac-learning/evaluate/
         """
         code = request.data.get('code', '')
-        test_cases = request.data.get('test_cases', [])
         
         if not code:
             return Response({
@@ -857,6 +944,11 @@ class JACLearningEvaluationAPIView(APIView):
                 'timestamp': timezone.now().isoformat()
             }, status=status.HTTP_400_BAD_REQUEST)
         
+        options = TestEvaluationOptionsSerializer(data=request.data)
+        if not options.is_valid():
+            return Response(options.errors, status=status.HTTP_400_BAD_REQUEST)
+        test_cases = options.validated_data['test_cases']
+        
         try:
             # Execute the code first
             execution_result = jac_executor.execute_code(code)
@@ -864,10 +956,17 @@ class JACLearningEvaluationAPIView(APIView):
             # Generate AI feedback based on code analysis
             feedback = self._generate_code_feedback(code, execution_result, test_cases)
             
+            test_results = self._evaluate_test_cases(
+                code, test_cases,
+                language=options.validated_data['language'],
+                case_timeout=options.validated_data.get('case_timeout'),
+                max_failures=options.validated_data.get('max_failures')
+            ) if test_cases else []
+            
             return Response({
                 'execution_result': execution_result,
                 'ai_feedback': feedback,
-                'test_results': self._evaluate_test_cases(code, test_cases) if test_cases else [],
+                'test_results': test_results,
                 'score': self._calculate_code_score(execution_result, feedback),
                 'timestamp': timezone.now().isoformat()
             })
@@ -972,23 +1071,12 @@ class JACLearningEvaluationAPIView(APIView):
         
         return list(recommendations)[:3]
     
-    def _evaluate_test_cases(self, code: str, test_cases: list) -> list:
-        """Evaluate code against test cases"""
-        results = []
-        
-        for i, test_case in enumerate(test_cases):
-            # Simplified test case evaluation
-            result = {
-                'test_case': i + 1,
-                'input': test_case.get('input', {}),
-                'expected_output': test_case.get('expected_output', {}),
-                'actual_output': {},
-                'passed': False,
-                'error': None
-            }
-            results.append(result)
-        
-        return results
+    def _evaluate_test_cases(self, code: str, test_cases: list, language: str = 'jac',
+                             case_timeout=None, max_failures=None) -> list:
+        """Evaluate code against test cases in one sandboxed batch run"""
+        return BatchTestRunner().run(
+            language, code, test_cases, case_timeout=case_timeout, max_failures=max_failures
+        )
     
     def _calculate_code_score(self, execution_result: dict, feedback: dict) -> int:
         """Calculate overall code score"""
@@ -5,4 +5,8 @@ from django.apps import AppConfig
 
 class KnowledgeGraphConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'apps.knowledge_graph'
\ No newline at end of file
+    name = 'apps.knowledge_graph'
+
+    def ready(self):
+        """Import signals when the app is ready"""
+        import apps.knowledge_graph.signals
@@ -0,0 +1,60 @@
+# JAC Interactive Learning Platform - Core backend implementation by Cavin Otieno
+
+"""
+Management Command - Build Learning Path Index
+
+Precomputes the prerequisite closure and shortest-path trees for the current
+knowledge graph and publishes them to the shared cache, so web workers can
+answer learning path requests without running graph algorithms.
+
+Usage:
+    python manage.py build_learning_path_index
+    python manage.py build_learning_path_index --max-trees 1000
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.knowledge_graph.services.path_index import PathIndexService
+
+
+class Command(BaseCommand):
+    help = 'Precompute the learning path index for the current knowledge graph'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-trees',
+            type=int,
+            default=None,
+            help='Maximum number of shortest-path trees to precompute (default: PATH_INDEX_MAX_TREES)',
+        )
+        parser.add_argument(
+            '--no-publish',
+            action='store_true',
+            help='Build the index without storing it in the shared cache',
+        )
+
+    def handle(self, *args, **options):
+        """Handle the management command"""
+        started = time.perf_counter()
+
+        service = PathIndexService.get_instance()
+        if options['max_trees'] is not None:
+            service.max_trees = options['max_trees']
+
+        index = service.get_index()
+        index.max_trees = service.max_trees
+        computed = index.precompute_trees()
+
+        if not options['no_publish']:
+            service.publish(index)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Learning path index v{index.version} ready: '
+                f'{index.snapshot.node_count} nodes, {len(index.pairs)} prerequisite edges, '
+                f'{index.tree_count} path trees ({computed} computed) '
+                f'in {time.perf_counter() - started:.2f}s'
+            )
+        )
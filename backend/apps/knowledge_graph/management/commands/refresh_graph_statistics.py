@@ -0,0 +1,48 @@
+# JAC Interactive Learning Platform - Core backend implementation by Cavin Otieno
+
+"""
+Management Command - Refresh Graph Statistics
+
+Computes statistics for the current knowledge graph version and stores them
+in the shared cache. Web workers refresh stale statistics in the background
+on their own; this command is useful after deployments or bulk imports.
+
+Usage:
+    python manage.py refresh_graph_statistics
+    python manage.py refresh_graph_statistics --epsilon 0.05
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.knowledge_graph.services.graph_statistics import GraphStatisticsService
+
+
+class Command(BaseCommand):
+    help = 'Compute and store statistics for the current knowledge graph'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--epsilon',
+            type=float,
+            default=None,
+            help='Betweenness error bound (default: STATISTICS_BETWEENNESS_EPSILON, 0 for exact)',
+        )
+
+    def handle(self, *args, **options):
+        """Handle the management command"""
+        service = GraphStatisticsService.get_instance()
+        if options['epsilon'] is not None:
+            service.epsilon = options['epsilon']
+
+        record = service.refresh()
+        approximation = record['statistics'].get('approximation', {})
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Graph statistics v{record['version']} stored: "
+                f"{record['statistics']['node_count']} nodes, "
+                f"{approximation.get('pivots', 0)} pivots "
+                f"({'exact' if approximation.get('exact', True) else 'sampled'}) "
+                f"in {record['compute_seconds']:.2f}s"
+            )
+        )
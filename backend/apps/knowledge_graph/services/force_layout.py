@@ -0,0 +1,367 @@
+# JAC Interactive Learning Platform - Core backend implementation by Cavin Otieno
+
+"""
+Vectorized Force-Directed Layout Engine.
+
+NumPy implementation of the force-directed layout used by OSPProcessor.
+It keeps the original force model (inverse-square repulsion between every
+pair of nodes, linear attraction along edges) but works on position arrays
+instead of per-node dictionaries.
+
+Small graphs use exact pairwise repulsion computed in row blocks. Larger
+graphs use a single-level grid approximation in the spirit of Barnes-Hut:
+nodes are binned into cells, pairs from nearby cells are handled exactly and
+far cells act through their centroids. With the default cutoff the net
+repulsion stays within a few percent of the exact value.
+"""
+
+import logging
+from typing import Optional, Tuple
+
+import numpy as np
+
+try:
+    from scipy.sparse import csr_matrix
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Rows per block when evaluating exact pairwise forces (bounds memory use)
+FORCE_BLOCK_SIZE = 512
+
+
+class ForceDirectedLayout:
+    """
+    Force-directed layout over NumPy position arrays.
+
+    Positions are an (n, 3) float array, edges an (m, 2) integer array of
+    node indices. Each iteration moves every node by ``step`` times the net
+    force, capped by a cooling temperature; iteration stops early once the
+    largest move drops below ``tolerance``.
+    """
+
+    def __init__(self, max_iterations: int = 50, repulsion: float = 1000.0,
+                 attraction: float = 0.001, step: float = 0.1, tolerance: float = 0.5,
+                 seed: int = 42, exact_max_nodes: int = 500, cutoff_factor: float = 1.5,
+                 nodes_per_cell: int = 8,
+                 initial_temperature: float = 100.0, cooling: float = 0.95):
+        self.max_iterations = max_iterations
+        self.repulsion = repulsion
+        self.attraction = attraction
+        self.step = step
+        self.tolerance = tolerance
+        self.seed = seed
+        self.exact_max_nodes = exact_max_nodes
+        self.cutoff_factor = cutoff_factor
+        self.nodes_per_cell = nodes_per_cell
+        self.initial_temperature = initial_temperature
+        self.cooling = cooling
+        self.iterations_run = 0
+        self._grid = None
+
+    def initial_positions(self, node_count: int, positions: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Build starting positions, reusing stored ones where available.
+
+        Nodes without a stored position (all coordinates zero) are placed
+        randomly using the configured seed, so the same graph always produces
+        the same layout.
+
+        Args:
+            node_count: Number of nodes
+            positions: Optional (n, 3) array of stored x/y/z positions
+
+        Returns:
+            (n, 3) float array of starting positions
+        """
+        rng = np.random.default_rng(self.seed)
+        start = np.column_stack([
+            rng.uniform(-400, 400, node_count),
+            rng.uniform(-300, 300, node_count),
+            rng.uniform(-10, 10, node_count),
+        ])
+
+        if positions is not None and len(positions):
+            positions = np.asarray(positions, dtype=np.float64)
+            stored = np.any(positions != 0.0, axis=1)
+            start[stored] = positions[stored]
+
+            # Break exact ties between stored positions with a tiny jitter
+            start[stored] += rng.uniform(-1e-3, 1e-3, (int(stored.sum()), 3))
+
+        return start
+
+    def run(self, positions: np.ndarray, edges: np.ndarray) -> np.ndarray:
+        """
+        Run the layout until convergence or the iteration limit.
+
+        Args:
+            positions: (n, 3) starting positions
+            edges: (m, 2) array of (source index, target index)
+
+        Returns:
+            (n, 3) array of final positions
+        """
+        positions = np.array(positions, dtype=np.float64)
+        edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+        node_count = len(positions)
+        self.iterations_run = 0
+        self._grid = None
+
+        if node_count < 2:
+            return positions
+
+        temperature = self.initial_temperature
+        for iteration in range(self.max_iterations):
+            forces = self._repulsive_forces(positions) + self._attractive_forces(positions, edges)
+            displacement = forces * self.step
+
+            lengths = np.linalg.norm(displacement, axis=1)
+            too_long = lengths > temperature
+            if np.any(too_long):
+                displacement[too_long] *= (temperature / lengths[too_long])[:, None]
+                lengths[too_long] = temperature
+
+            positions += displacement
+            temperature *= self.cooling
+            self.iterations_run = iteration + 1
+
+            if lengths.max() < self.tolerance:
+                break
+
+        return positions
+
+    def _attractive_forces(self, positions: np.ndarray, edges: np.ndarray) -> np.ndarray:
+        """Linear spring attraction along edges (force = attraction * distance)."""
+        forces = np.zeros_like(positions)
+        if not len(edges):
+            return forces
+
+        sources, targets = edges[:, 0], edges[:, 1]
+        pull = (positions[targets] - positions[sources]) * self.attraction
+        node_count = len(positions)
+
+        for axis in range(3):
+            forces[:, axis] += np.bincount(sources, weights=pull[:, axis], minlength=node_count)
+            forces[:, axis] -= np.bincount(targets, weights=pull[:, axis], minlength=node_count)
+
+        return forces
+
+    def _repulsive_forces(self, positions: np.ndarray) -> np.ndarray:
+        if len(positions) <= self.exact_max_nodes:
+            return self._exact_repulsion(positions)
+
+        if self._grid is None or self._grid.is_stale(positions):
+            self._grid = self._build_grid(positions)
+        return self._grid_repulsion(positions, self._grid)
+
+    def _exact_repulsion(self, positions: np.ndarray) -> np.ndarray:
+        """Exact inverse-square repulsion between every pair, in row blocks."""
+        node_count = len(positions)
+        forces = np.empty_like(positions)
+
+        for start in range(0, node_count, FORCE_BLOCK_SIZE):
+            stop = min(start + FORCE_BLOCK_SIZE, node_count)
+            delta = positions[start:stop, None, :] - positions[None, :, :]
+            distance_sq = np.einsum('ijk,ijk->ij', delta, delta)
+            distance_sq[np.arange(stop - start), np.arange(start, stop)] = np.inf
+            np.maximum(distance_sq, 1e-6, out=distance_sq)
+            scale = self.repulsion / (distance_sq * np.sqrt(distance_sq))
+            forces[start:stop] = np.einsum('ij,ijk->ik', scale, delta)
+
+        return forces
+
+    def _build_grid(self, positions: np.ndarray) -> 'RepulsionGrid':
+        """
+        Bin nodes into cells and split cell pairs into near and far.
+
+        Args:
+            positions: (n, 3) current positions
+
+        Returns:
+            RepulsionGrid describing the cells and the exact near-field pairs
+        """
+        cell_size, cell_of_node = self._assign_cells(positions)
+        cell_count = int(cell_of_node.max()) + 1
+        mass = np.bincount(cell_of_node, minlength=cell_count)
+        centroids = self._centroids(positions, cell_of_node, mass)
+
+        delta = centroids[:, None, :] - centroids[None, :, :]
+        cutoff = self.cutoff_factor * cell_size
+        near_cells = np.einsum('ijk,ijk->ij', delta, delta) < cutoff * cutoff
+        first, second = self._near_pairs(cell_of_node, mass, near_cells)
+
+        return RepulsionGrid(positions, cell_size, cell_of_node, mass, near_cells, first, second)
+
+    def _grid_repulsion(self, positions: np.ndarray, grid: 'RepulsionGrid') -> np.ndarray:
+        """
+        Grid-approximated repulsion.
+
+        Node pairs from nearby cells interact exactly. Every other pair of
+        cells interacts through their centroids, expanded to first order so
+        each node feels the far field at its own position rather than at its
+        cell's centroid. Each node pair is counted exactly once.
+        """
+        centroids = self._centroids(positions, grid.cell_of_node, grid.mass)
+        offsets = positions - centroids[grid.cell_of_node]
+        centroids -= centroids.mean(axis=0)
+        cell_count = len(centroids)
+
+        # Far field. Sums over cells j of s_ij * (c_i - c_j) and
+        # w_ij * (c_i - c_j)(c_i - c_j)^T are expanded into matrix products so
+        # the (c, c, 3) difference array is never built.
+        squared = np.einsum('ij,ij->i', centroids, centroids)
+        distance_sq = squared[:, None] + squared[None, :] - 2.0 * (centroids @ centroids.T)
+        distance_sq[grid.near_cells] = np.inf
+        np.maximum(distance_sq, 1e-6, out=distance_sq)
+        scale = grid.mass[None, :] * self.repulsion / (distance_sq * np.sqrt(distance_sq))
+        weight = scale / distance_sq
+
+        scale_sum = scale.sum(axis=1)
+        weight_sum = weight.sum(axis=1)
+        weighted = weight @ centroids
+        outer = (centroids[:, :, None] * centroids[:, None, :]).reshape(cell_count, 9)
+        second_moment = (weight @ outer).reshape(cell_count, 3, 3)
+
+        field = centroids * scale_sum[:, None] - scale @ centroids
+        spread = (
+            second_moment
+            + centroids[:, :, None] * centroids[:, None, :] * weight_sum[:, None, None]
+            - centroids[:, :, None] * weighted[:, None, :]
+            - weighted[:, :, None] * centroids[:, None, :]
+        )
+        gradient = np.eye(3)[None, :, :] * scale_sum[:, None, None] - 3.0 * spread
+
+        forces = field[grid.cell_of_node] + np.einsum('nkl,nl->nk', gradient[grid.cell_of_node], offsets)
+
+        # Near field
+        if grid.pair_count:
+            delta = grid.pair_deltas(positions)
+            distance_sq = np.maximum(np.einsum('ij,ij->i', delta, delta), 1e-6)
+            push = delta * (self.repulsion / (distance_sq * np.sqrt(distance_sq)))[:, None]
+            forces += grid.scatter(push)
+
+        return forces
+
+    def _assign_cells(self, positions: np.ndarray) -> Tuple[float, np.ndarray]:
+        """
+        Bin nodes into cubic cells holding about ``nodes_per_cell`` nodes each.
+
+        The first guess assumes nodes fill their bounding box; layouts tend to
+        leave empty space, so the cell size grows until the number of occupied
+        cells is close to the target.
+
+        Returns:
+            Tuple of (cell size, dense cell index of every node)
+        """
+        target_cells = max(1, len(positions) // self.nodes_per_cell)
+        origin = positions.min(axis=0)
+        extent = np.maximum(np.ptp(positions, axis=0), 1.0)
+        cell_size = float(np.cbrt(np.prod(extent) / target_cells))
+
+        while True:
+            cells = np.floor((positions - origin) / cell_size).astype(np.int64)
+            cell_keys = np.ravel_multi_index(cells.T, tuple(cells.max(axis=0) + 1))
+            _, cell_of_node = np.unique(cell_keys, return_inverse=True)
+            if cell_of_node.max() + 1 <= 1.5 * target_cells:
+                return cell_size, cell_of_node.reshape(-1)
+            cell_size *= 1.25
+
+    @staticmethod
+    def _centroids(positions: np.ndarray, cell_of_node: np.ndarray, mass: np.ndarray) -> np.ndarray:
+        cell_count = len(mass)
+        return np.column_stack([
+            np.bincount(cell_of_node, weights=positions[:, axis], minlength=cell_count) / mass
+            for axis in range(3)
+        ])
+
+    @staticmethod
+    def _near_pairs(cell_of_node: np.ndarray, cell_sizes: np.ndarray,
+                    near_cells: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Expand near cell pairs into node index pairs (each unordered pair once).
+
+        Args:
+            cell_of_node: Cell index of every node
+            cell_sizes: Number of nodes in each cell
+            near_cells: (c, c) boolean matrix of cells that interact exactly
+
+        Returns:
+            Two arrays of node indices (first, second)
+        """
+        members = np.argsort(cell_of_node, kind='stable')
+        cell_start = np.concatenate([[0], np.cumsum(cell_sizes)[:-1]])
+
+        cell_a, cell_b = np.nonzero(np.triu(near_cells))
+        pair_counts = cell_sizes[cell_a] * cell_sizes[cell_b]
+        total = int(pair_counts.sum())
+        if total == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+        owner = np.repeat(np.arange(len(cell_a)), pair_counts)
+        offset = np.arange(total) - np.repeat(np.cumsum(pair_counts) - pair_counts, pair_counts)
+        width = cell_sizes[cell_b][owner]
+        first = members[cell_start[cell_a][owner] + offset // width]
+        second = members[cell_start[cell_b][owner] + offset % width]
+
+        # Within a single cell keep each unordered pair once
+        same_cell = cell_a[owner] == cell_b[owner]
+        keep = ~same_cell | (offset // width < offset % width)
+        return first[keep], second[keep]
+
+
+class RepulsionGrid:
+    """
+    Cell assignment and near-field pair list for grid repulsion.
+
+    Building the pair list costs more than evaluating it, so a grid is reused
+    across iterations until some node has drifted half a cell from where it
+    was binned. Stale membership only loosens the far-field approximation;
+    every pair of nodes is still counted exactly once.
+    """
+
+    def __init__(self, positions: np.ndarray, cell_size: float, cell_of_node: np.ndarray,
+                 mass: np.ndarray, near_cells: np.ndarray, first: np.ndarray, second: np.ndarray):
+        self.anchor = positions.copy()
+        self.cell_size = cell_size
+        self.cell_of_node = cell_of_node
+        self.mass = mass.astype(np.float64)
+        self.near_cells = near_cells
+        self.first = first
+        self.second = second
+        self.pair_count = len(first)
+
+        # Signed incidence matrix: row p is +1 at first[p] and -1 at second[p]
+        self.incidence = None
+        if SCIPY_AVAILABLE and self.pair_count:
+            rows = np.repeat(np.arange(self.pair_count), 2)
+            cols = np.column_stack([first, second]).reshape(-1)
+            signs = np.tile([1.0, -1.0], self.pair_count)
+            self.incidence = csr_matrix((signs, (rows, cols)), shape=(self.pair_count, len(positions)))
+            self.incidence_t = self.incidence.T.tocsr()
+
+    def is_stale(self, positions: np.ndarray) -> bool:
+        drift = np.einsum('ij,ij->i', positions - self.anchor, positions - self.anchor)
+        return float(drift.max()) > (self.cell_size / 2.0) ** 2
+
+    def pair_deltas(self, positions: np.ndarray) -> np.ndarray:
+        """Position differences (first - second) for every near pair."""
+        if self.incidence is not None:
+            return self.incidence @ positions
+        return positions[self.first] - positions[self.second]
+
+    def scatter(self, push: np.ndarray) -> np.ndarray:
+        """Accumulate pair forces: +push on the first node, -push on the second."""
+        if self.incidence is not None:
+            return self.incidence_t @ push
+
+        node_count = len(self.anchor)
+        forces = np.empty((node_count, 3))
+        for axis in range(3):
+            forces[:, axis] = (
+                np.bincount(self.first, weights=push[:, axis], minlength=node_count)
+                - np.bincount(self.second, weights=push[:, axis], minlength=node_count)
+            )
+        return forces
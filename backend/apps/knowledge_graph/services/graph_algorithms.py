@@ -9,11 +9,17 @@ and implementing Object-Spatial Programming (OSP) concepts.
 
 import uuid
 import json
+import hashlib
 import networkx as nx
 from typing import List, Dict, Any, Optional, Tuple
 from collections import defaultdict, deque
+from django.core.cache import cache
 from django.db.models import Q, Count, Avg
+from django.utils import timezone
 from ..models import KnowledgeNode, KnowledgeEdge, LearningGraph, LearningPath, UserKnowledgeState
+from .graph_snapshot import GraphSnapshotService, calculate_path_weight
+from .graph_statistics import GraphStatisticsService, calculate_graph_statistics
+from .path_index import PathIndexService
 
 
 class GraphAnalyzer:
@@ -22,12 +28,17 @@ class GraphAnalyzer:
     """
     
     def __init__(self):
-        self.graph_cache = {}
+        self.snapshot_service = GraphSnapshotService.get_instance()
+        self.statistics_service = GraphStatisticsService.get_instance()
     
     def build_networkx_graph(self, nodes_queryset=None, edges_queryset=None) -> nx.DiGraph:
         """
         Build a NetworkX directed graph from Django models.
         
+        When no querysets are given, the shared graph snapshot is returned
+        instead of reloading every active node and edge. That graph is frozen;
+        call ``copy()`` on it before making changes.
+        
         Args:
             nodes_queryset: QuerySet of KnowledgeNode instances
             edges_queryset: QuerySet of KnowledgeEdge instances
@@ -35,6 +46,9 @@ class GraphAnalyzer:
         Returns:
             NetworkX DiGraph representing the knowledge graph
         """
+        if nodes_queryset is None and edges_queryset is None:
+            return self.snapshot_service.get_snapshot().to_networkx()
+        
         graph = nx.DiGraph()
         
         # Get nodes if not provided
@@ -64,11 +78,11 @@ class GraphAnalyzer:
         
         # Add edges
         for edge in edges_queryset:
-            if (str(edge.source_node.id) in graph.nodes and 
-                str(edge.target_node.id) in graph.nodes):
+            if (str(edge.source_node_id) in graph.nodes and 
+                str(edge.target_node_id) in graph.nodes):
                 graph.add_edge(
-                    str(edge.source_node.id),
-                    str(edge.target_node.id),
+                    str(edge.source_node_id),
+                    str(edge.target_node_id),
                     edge_type=edge.edge_type,
                     strength=edge.strength,
                     edge_weight=edge.edge_weight,
@@ -93,11 +107,8 @@ class GraphAnalyzer:
             )
             edges = KnowledgeEdge.objects.filter(is_active=True)
             
-            # Build NetworkX graph
-            nx_graph = self.build_networkx_graph(nodes, edges)
-            
-            # Calculate graph statistics
-            stats = self._calculate_graph_statistics(nx_graph)
+            # Stored statistics; recomputed in the background when the graph changes
+            stats = self.statistics_service.get_statistics()
             
             # Serialize data for frontend
             node_serializer = self._get_node_serializer()
@@ -109,7 +120,8 @@ class GraphAnalyzer:
                 'meta': {
                     'total_nodes': len(nodes),
                     'total_edges': len(edges),
-                    'statistics': stats,
+                    'statistics': stats['statistics'],
+                    'statistics_freshness': stats['freshness'],
                     'generated_at': timezone.now().isoformat()
                 }
             }
@@ -145,11 +157,14 @@ class GraphAnalyzer:
                 is_active=True
             )
             
-            # Build filtered NetworkX graph
-            nx_graph = self.build_networkx_graph(nodes, edges)
-            
-            # Calculate topic-specific statistics
-            stats = self._calculate_topic_statistics(nx_graph, topic)
+            # Topic statistics are cached per graph version
+            topic_hash = hashlib.md5(topic.lower().encode('utf-8')).hexdigest()
+            cache_key = f"knowledge_graph:topic_statistics:{self.snapshot_service.get_snapshot().version}:{topic_hash}"
+            stats = cache.get(cache_key)
+            if stats is None:
+                nx_graph = self.build_networkx_graph(nodes, edges)
+                stats = self._calculate_topic_statistics(nx_graph, topic)
+                cache.set(cache_key, stats, self.statistics_service.cache_timeout)
             
             return {
                 'topic': topic,
@@ -266,58 +281,10 @@ class GraphAnalyzer:
             raise Exception(f"Error analyzing edge paths: {str(e)}")
     
     def _calculate_graph_statistics(self, graph: nx.DiGraph) -> Dict[str, Any]:
-        """Calculate comprehensive graph statistics."""
-        if len(graph.nodes) == 0:
-            return {
-                'node_count': 0,
-                'edge_count': 0,
-                'density': 0.0,
-                'connected_components': 0,
-                'average_degree': 0.0
-            }
-        
-        stats = {
-            'node_count': len(graph.nodes),
-            'edge_count': len(graph.edges),
-            'density': nx.density(graph),
-            'connected_components': nx.number_weakly_connected_components(graph),
-            'average_degree': sum(dict(graph.degree()).values()) / len(graph.nodes),
-            'is_connected': nx.is_weakly_connected(graph),
-            'diameter': None,
-            'average_shortest_path_length': None
-        }
-        
-        # Calculate diameter and average shortest path length if graph is connected
-        if stats['is_connected'] and len(graph.nodes) > 1:
-            try:
-                stats['diameter'] = nx.diameter(graph.to_undirected())
-                stats['average_shortest_path_length'] = nx.average_shortest_path_length(graph.to_undirected())
-            except (nx.NetworkXError, nx.NodeNotFound):
-                pass
-        
-        # Calculate centrality measures
-        try:
-            in_centrality = nx.in_degree_centrality(graph)
-            out_centrality = nx.out_degree_centrality(graph)
-            betweenness_centrality = nx.betweenness_centrality(graph)
-            
-            # Get top nodes by centrality
-            top_in_central = sorted(in_centrality.items(), key=lambda x: x[1], reverse=True)[:5]
-            top_out_central = sorted(out_centrality.items(), key=lambda x: x[1], reverse=True)[:5]
-            top_betweenness = sorted(betweenness_centrality.items(), key=lambda x: x[1], reverse=True)[:5]
-            
-            stats.update({
-                'top_in_central_nodes': [{'node_id': nid, 'centrality': centrality} 
-                                       for nid, centrality in top_in_central],
-                'top_out_central_nodes': [{'node_id': nid, 'centrality': centrality} 
-                                        for nid, centrality in top_out_central],
-                'top_betweenness_central_nodes': [{'node_id': nid, 'centrality': centrality} 
-                                                 for nid, centrality in top_betweenness]
-            })
-        except (nx.NetworkXError, ZeroDivisionError):
-            pass
-        
-        return stats
+        """Calculate comprehensive graph statistics (betweenness and path lengths are sampled)."""
+        return calculate_graph_statistics(
+            graph, self.statistics_service.epsilon, self.statistics_service.delta
+        )
     
     def _calculate_topic_statistics(self, graph: nx.DiGraph, topic: str) -> Dict[str, Any]:
         """Calculate statistics specific to a topic graph."""
@@ -378,7 +345,7 @@ class PathFinder:
     """
     
     def __init__(self):
-        self.graph_cache = {}
+        self.path_index_service = PathIndexService.get_instance()
     
     def find_learning_path(self, start_node_id: uuid.UUID, end_node_id: uuid.UUID, 
                           user_knowledge: Dict[str, Any] = None) -> List[Dict[str, Any]]:
@@ -394,43 +361,36 @@ class PathFinder:
             List of dictionaries representing the learning path
         """
         try:
-            # Get all active nodes and edges
-            nodes = KnowledgeNode.objects.filter(is_active=True)
-            edges = KnowledgeEdge.objects.filter(is_active=True)
-            
-            # Build NetworkX graph
-            graph = self._build_path_graph(nodes, edges)
+            index = self.path_index_service.get_index()
             
-            # Find path using NetworkX algorithms
             start_id = str(start_node_id)
             end_id = str(end_node_id)
             
-            if start_id not in graph.nodes or end_id not in graph.nodes:
+            if start_id not in index.snapshot.node_index or end_id not in index.snapshot.node_index:
                 raise ValueError("Start or end node not found in graph")
             
-            # Use Dijkstra's algorithm for weighted shortest path
-            try:
-                path = nx.shortest_path(graph, start_id, end_id, weight='weight')
-            except nx.NetworkXNoPath:
+            # Walk the precomputed shortest-path tree of the target
+            path = index.path(start_id, end_id)
+            if path is None:
                 raise ValueError("No path found between start and end nodes")
             
-            # Convert path to detailed learning path
+            # Convert path to detailed learning path with one bulk fetch
+            nodes = KnowledgeNode.objects.in_bulk(path)
             learning_path = []
             for node_id in path:
-                try:
-                    node = KnowledgeNode.objects.get(id=node_id)
-                    learning_path.append({
-                        'node_id': str(node.id),
-                        'title': node.title,
-                        'node_type': node.node_type,
-                        'difficulty_level': node.difficulty_level,
-                        'description': node.description,
-                        'estimated_time': self._estimate_learning_time(node),
-                        'prerequisites': node.prerequisites,
-                        'learning_objectives': node.learning_objectives
-                    })
-                except KnowledgeNode.DoesNotExist:
+                node = nodes.get(uuid.UUID(node_id))
+                if node is None:
                     continue
+                learning_path.append({
+                    'node_id': str(node.id),
+                    'title': node.title,
+                    'node_type': node.node_type,
+                    'difficulty_level': node.difficulty_level,
+                    'description': node.description,
+                    'estimated_time': self._estimate_learning_time(node),
+                    'prerequisites': node.prerequisites,
+                    'learning_objectives': node.learning_objectives
+                })
             
             return learning_path
         except Exception as e:
@@ -440,51 +400,45 @@ class PathFinder:
         """
         Find all prerequisite nodes for a target node.
         
+        Uses the transitive closure of prerequisite, leads_to and depends_on
+        edges, so indirect prerequisites are included.
+        
         Args:
             target_node_id: Target knowledge node UUID
             
         Returns:
-            List of prerequisite nodes ordered by importance
+            List of prerequisite nodes in learning order
         """
         try:
+            index = self.path_index_service.get_index()
             target_id = str(target_node_id)
             
-            # Get all nodes and edges
-            nodes = KnowledgeNode.objects.filter(is_active=True)
-            edges = KnowledgeEdge.objects.filter(is_active=True)
-            
-            # Build graph
-            graph = self._build_path_graph(nodes, edges)
-            
-            if target_id not in graph.nodes:
+            if target_id not in index.snapshot.node_index:
                 raise ValueError("Target node not found in graph")
             
-            # Find all nodes that can reach the target
-            prerequisites = []
+            prerequisite_ids = index.prerequisite_ids(target_id)
+            nodes = KnowledgeNode.objects.in_bulk(prerequisite_ids)
             
-            try:
-                # Use reverse BFS to find all prerequisites
-                predecessors = nx.predecessors(graph, target_id)
-                
-                for pred_id in predecessors:
-                    try:
-                        node = KnowledgeNode.objects.get(id=pred_id)
-                        prerequisites.append({
-                            'node_id': str(node.id),
-                            'title': node.title,
-                            'node_type': node.node_type,
-                            'difficulty_level': node.difficulty_level,
-                            'description': node.description,
-                            'estimated_time': self._estimate_learning_time(node)
-                        })
-                    except KnowledgeNode.DoesNotExist:
-                        continue
-            except nx.NetworkXError:
-                pass
+            prerequisites = []
+            for node_id in prerequisite_ids:
+                node = nodes.get(uuid.UUID(node_id))
+                if node is None:
+                    continue
+                prerequisites.append({
+                    'node_id': str(node.id),
+                    'title': node.title,
+                    'node_type': node.node_type,
+                    'difficulty_level': node.difficulty_level,
+                    'description': node.description,
+                    'estimated_time': self._estimate_learning_time(node)
+                })
             
-            # Sort by difficulty (easier prerequisites first)
+            # Learning order first, then easier prerequisites first
+            depth = {node_id: index.prerequisite_depth(node_id) for node_id in prerequisite_ids}
             difficulty_order = {'beginner': 1, 'intermediate': 2, 'advanced': 3, 'expert': 4}
-            prerequisites.sort(key=lambda x: difficulty_order.get(x['difficulty_level'], 99))
+            prerequisites.sort(key=lambda x: (
+                depth[x['node_id']], difficulty_order.get(x['difficulty_level'], 99)
+            ))
             
             return prerequisites
         except Exception as e:
@@ -500,8 +454,8 @@ class PathFinder:
         
         # Add edges with weights
         for edge in edges:
-            source_id = str(edge.source_node.id)
-            target_id = str(edge.target_node.id)
+            source_id = str(edge.source_node_id)
+            target_id = str(edge.target_node_id)
             
             # Calculate edge weight based on type and strength
             weight = self._calculate_edge_weight(edge)
@@ -513,29 +467,7 @@ class PathFinder:
     
     def _calculate_edge_weight(self, edge: KnowledgeEdge) -> float:
         """Calculate edge weight for path finding."""
-        base_weight = {
-            'prerequisite': 1.0,
-            'related': 2.0,
-            'example': 1.5,
-            'depends_on': 1.0,
-            'leads_to': 1.0,
-            'contradicts': 3.0,
-            'similar_to': 2.0,
-            'part_of': 1.0,
-            'contains': 1.0
-        }
-        
-        strength_multiplier = {
-            'weak': 1.5,
-            'moderate': 1.0,
-            'strong': 0.8,
-            'essential': 0.5
-        }
-        
-        base = base_weight.get(edge.edge_type, 2.0)
-        multiplier = strength_multiplier.get(edge.strength, 1.0)
-        
-        return base * multiplier
+        return calculate_path_weight(edge.edge_type, edge.strength)
     
     def _estimate_learning_time(self, node: KnowledgeNode) -> int:
         """
@@ -0,0 +1,398 @@
+# JAC Interactive Learning Platform - Core backend implementation by Cavin Otieno
+
+"""
+Shared Knowledge Graph Snapshot.
+
+This module keeps one in-memory copy of the active knowledge graph per worker
+process. The snapshot is loaded once and reused by GraphAnalyzer, PathFinder
+and the other graph services until the graph version changes.
+
+The graph version is a counter stored in the shared cache (Redis). It is bumped
+by the post_save/post_delete signals on KnowledgeNode and KnowledgeEdge, so
+every worker notices the change on its next access and reloads lazily.
+"""
+
+import time
+import logging
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+import networkx as nx
+from django.conf import settings
+from django.core.cache import cache
+
+try:
+    from scipy.sparse import csr_matrix, csgraph
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+from ..models import KnowledgeNode, KnowledgeEdge
+
+logger = logging.getLogger(__name__)
+
+GRAPH_VERSION_CACHE_KEY = 'knowledge_graph:version'
+
+# Node attributes copied into the snapshot (the same set build_networkx_graph uses)
+SNAPSHOT_NODE_FIELDS = (
+    'id', 'title', 'node_type', 'difficulty_level',
+    'x_position', 'y_position', 'z_position', 'width', 'height',
+    'content_uri', 'jac_code', 'view_count',
+)
+
+SNAPSHOT_EDGE_FIELDS = (
+    'id', 'source_node_id', 'target_node_id', 'edge_type', 'strength',
+    'edge_weight', 'traversal_count', 'curve_points', 'description',
+)
+
+EDGE_TYPE_WEIGHTS = {
+    'prerequisite': 1.0,
+    'related': 2.0,
+    'example': 1.5,
+    'depends_on': 1.0,
+    'leads_to': 1.0,
+    'contradicts': 3.0,
+    'similar_to': 2.0,
+    'part_of': 1.0,
+    'contains': 1.0
+}
+
+STRENGTH_MULTIPLIERS = {
+    'weak': 1.5,
+    'moderate': 1.0,
+    'strong': 0.8,
+    'essential': 0.5
+}
+
+# Fallback counter used when the shared cache is unreachable
+_local_version = 1
+_local_version_lock = threading.Lock()
+
+
+def calculate_path_weight(edge_type: str, strength: str) -> float:
+    """
+    Calculate the pathfinding weight of an edge from its type and strength.
+
+    Args:
+        edge_type: KnowledgeEdge.edge_type value
+        strength: KnowledgeEdge.strength value
+
+    Returns:
+        Positive edge cost (lower is preferred)
+    """
+    return EDGE_TYPE_WEIGHTS.get(edge_type, 2.0) * STRENGTH_MULTIPLIERS.get(strength, 1.0)
+
+
+def get_graph_version() -> int:
+    """Get the current knowledge graph version from the shared cache."""
+    try:
+        version = cache.get(GRAPH_VERSION_CACHE_KEY)
+        if version is None:
+            cache.add(GRAPH_VERSION_CACHE_KEY, _local_version, timeout=None)
+            version = cache.get(GRAPH_VERSION_CACHE_KEY, _local_version)
+        return int(version)
+    except Exception as e:
+        logger.warning(f"Graph version cache unavailable, using local version: {str(e)}")
+        return _local_version
+
+
+def bump_graph_version() -> int:
+    """
+    Increment the knowledge graph version.
+
+    Called whenever a node or edge changes. The local counter is always bumped
+    so the current process sees its own writes even without Redis.
+
+    Returns:
+        The new graph version
+    """
+    global _local_version
+
+    with _local_version_lock:
+        _local_version += 1
+
+    try:
+        try:
+            return int(cache.incr(GRAPH_VERSION_CACHE_KEY))
+        except ValueError:
+            # Key missing or evicted - re-seed it above any version seen so far
+            cache.add(GRAPH_VERSION_CACHE_KEY, _local_version, timeout=None)
+            return int(cache.get(GRAPH_VERSION_CACHE_KEY, _local_version))
+    except Exception as e:
+        logger.warning(f"Could not bump graph version in cache: {str(e)}")
+        return _local_version
+
+
+class GraphSnapshot:
+    """
+    Immutable view of the active knowledge graph at a given version.
+
+    Nodes are assigned dense integer indices so the graph can be stored in
+    compressed sparse row (CSR) form for the pathfinding hot path:
+    the outgoing edges of node i are indices[indptr[i]:indptr[i + 1]], with
+    matching pathfinding costs in weights.
+    """
+
+    def __init__(self, version: int, nodes: List[Dict[str, Any]], edges: List[Dict[str, Any]]):
+        self.version = version
+        self.loaded_at = time.time()
+
+        self.node_ids: List[str] = []
+        self.node_index: Dict[str, int] = {}
+        self.nodes: Dict[str, Dict[str, Any]] = {}
+
+        for node in nodes:
+            node_id = str(node['id'])
+            self.node_index[node_id] = len(self.node_ids)
+            self.node_ids.append(node_id)
+            self.nodes[node_id] = node
+
+        # Keep only edges between active nodes; later duplicates of the same
+        # (source, target) pair replace earlier ones, as in nx.DiGraph
+        self.edges: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for edge in edges:
+            source_id = str(edge['source_node_id'])
+            target_id = str(edge['target_node_id'])
+            if source_id in self.node_index and target_id in self.node_index:
+                self.edges[(source_id, target_id)] = edge
+
+        self.indptr, self.indices, self.weights = self._build_csr()
+        self._reverse_csr = None
+        self._sparse_matrix = None
+        self._reverse_sparse_matrix = None
+        self._networkx_graph = None
+        self._lock = threading.Lock()
+
+    @property
+    def node_count(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.edges)
+
+    def _build_csr(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Build CSR arrays (indptr, indices, weights) for outgoing edges."""
+        node_count = self.node_count
+        edge_count = self.edge_count
+
+        sources = np.empty(edge_count, dtype=np.int32)
+        targets = np.empty(edge_count, dtype=np.int32)
+        weights = np.empty(edge_count, dtype=np.float64)
+
+        for position, ((source_id, target_id), edge) in enumerate(self.edges.items()):
+            sources[position] = self.node_index[source_id]
+            targets[position] = self.node_index[target_id]
+            weights[position] = calculate_path_weight(edge['edge_type'], edge['strength'])
+
+        order = np.argsort(sources, kind='stable')
+        indptr = np.zeros(node_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=node_count), out=indptr[1:])
+
+        return indptr, targets[order], weights[order]
+
+    def reverse_csr(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """CSR arrays for incoming edges (the transposed graph), built on first use."""
+        if self._reverse_csr is None:
+            with self._lock:
+                if self._reverse_csr is None:
+                    node_count = self.node_count
+                    sources = np.repeat(np.arange(node_count, dtype=np.int32), np.diff(self.indptr))
+                    order = np.argsort(self.indices, kind='stable')
+                    indptr = np.zeros(node_count + 1, dtype=np.int64)
+                    np.cumsum(np.bincount(self.indices, minlength=node_count), out=indptr[1:])
+                    self._reverse_csr = (indptr, sources[order], self.weights[order])
+        return self._reverse_csr
+
+    def successors(self, index: int) -> np.ndarray:
+        """Integer indices of the direct successors of a node."""
+        return self.indices[self.indptr[index]:self.indptr[index + 1]]
+
+    def predecessors(self, index: int) -> np.ndarray:
+        """Integer indices of the direct predecessors of a node."""
+        indptr, indices, _ = self.reverse_csr()
+        return indices[indptr[index]:indptr[index + 1]]
+
+    def shortest_path(self, start_id: str, end_id: str) -> Optional[List[str]]:
+        """
+        Find the cheapest path between two nodes using the CSR arrays.
+
+        Args:
+            start_id: Starting node UUID string
+            end_id: Target node UUID string
+
+        Returns:
+            List of node UUID strings from start to end, or None if unreachable
+        """
+        start = self.node_index[start_id]
+        end = self.node_index[end_id]
+
+        if SCIPY_AVAILABLE:
+            _, predecessors = csgraph.dijkstra(
+                self.sparse_matrix(), directed=True, indices=start, return_predecessors=True
+            )
+            if start != end and predecessors[end] < 0:
+                return None
+            path = [end]
+            while path[-1] != start:
+                path.append(int(predecessors[path[-1]]))
+        else:
+            try:
+                path = nx.shortest_path(self.to_networkx(), start_id, end_id, weight='weight')
+            except nx.NetworkXNoPath:
+                return None
+            return path
+
+        path.reverse()
+        return [self.node_ids[index] for index in path]
+
+    def sparse_matrix(self):
+        """SciPy CSR matrix sharing the snapshot arrays, built on first use."""
+        if self._sparse_matrix is None:
+            self._sparse_matrix = csr_matrix(
+                (self.weights, self.indices, self.indptr),
+                shape=(self.node_count, self.node_count)
+            )
+        return self._sparse_matrix
+
+    def reverse_sparse_matrix(self):
+        """SciPy CSR matrix of the transposed graph, built on first use."""
+        if self._reverse_sparse_matrix is None:
+            indptr, indices, weights = self.reverse_csr()
+            self._reverse_sparse_matrix = csr_matrix(
+                (weights, indices, indptr),
+                shape=(self.node_count, self.node_count)
+            )
+        return self._reverse_sparse_matrix
+
+    def to_networkx(self) -> nx.DiGraph:
+        """
+        Get the snapshot as a NetworkX DiGraph.
+
+        The graph is built once per snapshot and frozen, since it is shared by
+        every caller in the process. Use ``graph.copy()`` before mutating it.
+        """
+        if self._networkx_graph is None:
+            with self._lock:
+                if self._networkx_graph is None:
+                    graph = nx.DiGraph()
+                    for node_id, node in self.nodes.items():
+                        graph.add_node(
+                            node_id,
+                            **{field: node[field] for field in SNAPSHOT_NODE_FIELDS if field != 'id'}
+                        )
+                    for (source_id, target_id), edge in self.edges.items():
+                        graph.add_edge(
+                            source_id,
+                            target_id,
+                            edge_type=edge['edge_type'],
+                            strength=edge['strength'],
+                            edge_weight=edge['edge_weight'],
+                            traversal_count=edge['traversal_count'],
+                            curve_points=edge['curve_points'],
+                            description=edge['description'],
+                            weight=calculate_path_weight(edge['edge_type'], edge['strength'])
+                        )
+                    self._networkx_graph = nx.freeze(graph)
+        return self._networkx_graph
+
+
+class GraphSnapshotService:
+    """
+    Process-wide holder of the current GraphSnapshot.
+
+    Use ``GraphSnapshotService.get_instance().get_snapshot()`` to obtain an
+    up-to-date snapshot. The shared version is re-checked at most once per
+    ``SNAPSHOT_VERSION_CHECK_INTERVAL`` seconds; changes made in the current
+    process are picked up immediately.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        graph_config = getattr(settings, 'KNOWLEDGE_GRAPH_CONFIG', {})
+        self.version_check_interval = graph_config.get('SNAPSHOT_VERSION_CHECK_INTERVAL', 1.0)
+        self._snapshot: Optional[GraphSnapshot] = None
+        self._checked_at = 0.0
+        self._checked_local_version = 0
+        self._load_lock = threading.Lock()
+        self._listeners = []
+
+    @classmethod
+    def get_instance(cls) -> 'GraphSnapshotService':
+        """Get the snapshot service for this process."""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def add_listener(self, callback):
+        """
+        Register a callback invoked with each newly loaded snapshot.
+
+        Used by indexes derived from the graph to refresh themselves.
+        """
+        self._listeners.append(callback)
+
+    def get_snapshot(self) -> GraphSnapshot:
+        """Return the current snapshot, reloading it if the graph version changed."""
+        snapshot = self._snapshot
+        now = time.monotonic()
+
+        if (snapshot is not None
+                and self._checked_local_version == _local_version
+                and now - self._checked_at < self.version_check_interval):
+            return snapshot
+
+        local_version = _local_version
+        version = get_graph_version()
+        self._checked_at = now
+        self._checked_local_version = local_version
+
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+
+        with self._load_lock:
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.version != version:
+                snapshot = self._load_snapshot(version)
+                self._snapshot = snapshot
+                for callback in self._listeners:
+                    try:
+                        callback(snapshot)
+                    except Exception as e:
+                        logger.error(f"Graph snapshot listener failed: {str(e)}")
+
+        return snapshot
+
+    def invalidate(self):
+        """Drop the cached snapshot so the next access reloads it."""
+        self._snapshot = None
+        self._checked_at = 0.0
+
+    def _load_snapshot(self, version: int) -> GraphSnapshot:
+        """Load all active nodes and edges in two queries."""
+        started = time.perf_counter()
+
+        # Creation order keeps node indices stable when nodes are only added
+        nodes = list(
+            KnowledgeNode.objects.filter(is_active=True)
+            .order_by('created_at', 'id')
+            .values(*SNAPSHOT_NODE_FIELDS)
+        )
+        edges = list(KnowledgeEdge.objects.filter(is_active=True).values(*SNAPSHOT_EDGE_FIELDS))
+
+        snapshot = GraphSnapshot(version, nodes, edges)
+        logger.info(
+            f"Loaded knowledge graph snapshot v{version}: {snapshot.node_count} nodes, "
+            f"{snapshot.edge_count} edges in {(time.perf_counter() - started) * 1000:.1f}ms"
+        )
+        return snapshot
+
+
+def get_graph_snapshot() -> GraphSnapshot:
+    """Shortcut for GraphSnapshotService.get_instance().get_snapshot()."""
+    return GraphSnapshotService.get_instance().get_snapshot()
@@ -0,0 +1,359 @@
+# JAC Interactive Learning Platform - Core backend implementation by Cavin Otieno
+
+"""
+Knowledge Graph Statistics.
+
+Computing betweenness centrality, diameter and average shortest path length
+is O(V*E), far too slow for a request thread on a large graph. This module
+computes them off the request path and stores the result per graph version
+in the shared cache:
+
+- Betweenness is estimated from k sampled pivots (Brandes-Pich). k is chosen
+  from the configured error bound, and the exact algorithm is used whenever
+  k would cover every node anyway.
+- Diameter and average shortest path length are estimated from BFS runs
+  started at the same number of sampled pivots.
+- When the graph version changes, the most recent statistics keep being
+  served, marked as stale, while a background thread recomputes them.
+"""
+
+import math
+import time
+import logging
+import threading
+from datetime import datetime, timezone as dt_timezone
+from typing import Dict, Any, Optional
+
+import numpy as np
+import networkx as nx
+from django.conf import settings
+from django.core.cache import cache
+
+try:
+    from scipy.sparse import csgraph
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+from .graph_snapshot import GraphSnapshot, GraphSnapshotService, get_graph_version
+
+logger = logging.getLogger(__name__)
+
+GRAPH_STATISTICS_CACHE_KEY = 'knowledge_graph:statistics:{version}'
+GRAPH_STATISTICS_LATEST_KEY = 'knowledge_graph:statistics:latest'
+GRAPH_STATISTICS_LOCK_KEY = 'knowledge_graph:statistics:lock:{version}'
+
+
+def betweenness_pivot_count(node_count: int, epsilon: float, delta: float) -> int:
+    """
+    Number of pivots needed for sampled betweenness.
+
+    With k >= ln(2n / delta) / (2 * epsilon^2) uniformly sampled pivots, every
+    normalized betweenness estimate is within epsilon of the exact value with
+    probability at least 1 - delta (Hoeffding bound plus a union bound over
+    the n nodes).
+
+    Args:
+        node_count: Number of nodes in the graph
+        epsilon: Maximum absolute error of normalized betweenness
+        delta: Allowed failure probability
+
+    Returns:
+        Pivot count, capped at node_count (which means exact computation)
+    """
+    if node_count < 3 or epsilon <= 0:
+        return node_count
+    pivots = math.ceil(math.log(2 * node_count / delta) / (2 * epsilon ** 2))
+    return min(pivots, node_count)
+
+
+def calculate_graph_statistics(graph: nx.DiGraph, epsilon: float = 0.1, delta: float = 0.1,
+                               seed: int = 42) -> Dict[str, Any]:
+    """
+    Calculate graph statistics, sampling the expensive measures.
+
+    Args:
+        graph: Knowledge graph
+        epsilon: Betweenness error bound (see betweenness_pivot_count)
+        delta: Failure probability of the error bound
+        seed: Seed for pivot sampling, so results are reproducible
+
+    Returns:
+        Statistics dictionary; ``approximation`` describes any sampling used
+    """
+    node_count = len(graph.nodes)
+    if node_count == 0:
+        return {
+            'node_count': 0,
+            'edge_count': 0,
+            'density': 0.0,
+            'connected_components': 0,
+            'average_degree': 0.0
+        }
+
+    pivots = betweenness_pivot_count(node_count, epsilon, delta)
+    exact = pivots >= node_count
+
+    stats = {
+        'node_count': node_count,
+        'edge_count': len(graph.edges),
+        'density': nx.density(graph),
+        'connected_components': nx.number_weakly_connected_components(graph),
+        'average_degree': sum(dict(graph.degree()).values()) / node_count,
+        'is_connected': nx.is_weakly_connected(graph),
+        'diameter': None,
+        'average_shortest_path_length': None,
+        'approximation': {
+            'exact': exact,
+            'pivots': pivots,
+            'betweenness_error_bound': 0.0 if exact else epsilon,
+            'confidence': 1.0 if exact else 1.0 - delta,
+        }
+    }
+
+    # Diameter and average shortest path length if graph is connected
+    if stats['is_connected'] and node_count > 1:
+        diameter, average_length = _sampled_path_lengths(graph, pivots, seed)
+        stats['diameter'] = diameter
+        stats['average_shortest_path_length'] = average_length
+
+    # Calculate centrality measures
+    try:
+        in_centrality = nx.in_degree_centrality(graph)
+        out_centrality = nx.out_degree_centrality(graph)
+        betweenness_centrality = nx.betweenness_centrality(
+            graph, k=None if exact else pivots, seed=seed
+        )
+
+        # Get top nodes by centrality
+        top_in_central = sorted(in_centrality.items(), key=lambda x: x[1], reverse=True)[:5]
+        top_out_central = sorted(out_centrality.items(), key=lambda x: x[1], reverse=True)[:5]
+        top_betweenness = sorted(betweenness_centrality.items(), key=lambda x: x[1], reverse=True)[:5]
+
+        stats.update({
+            'top_in_central_nodes': [{'node_id': nid, 'centrality': centrality}
+                                   for nid, centrality in top_in_central],
+            'top_out_central_nodes': [{'node_id': nid, 'centrality': centrality}
+                                    for nid, centrality in top_out_central],
+            'top_betweenness_central_nodes': [{'node_id': nid, 'centrality': centrality}
+                                             for nid, centrality in top_betweenness]
+        })
+    except (nx.NetworkXError, ZeroDivisionError):
+        pass
+
+    return stats
+
+
+def _sampled_path_lengths(graph: nx.DiGraph, pivots: int, seed: int):
+    """
+    Diameter and average shortest path length of the undirected graph.
+
+    BFS runs from ``pivots`` sampled sources. The average over sampled
+    sources is an unbiased estimate of the all-pairs average; the largest
+    eccentricity seen is a lower bound on the diameter (exact when every
+    node is a source).
+
+    Returns:
+        Tuple of (diameter, average shortest path length)
+    """
+    nodelist = list(graph.nodes)
+    node_count = len(nodelist)
+    rng = np.random.default_rng(seed)
+    sources = np.arange(node_count) if pivots >= node_count else rng.choice(node_count, pivots, replace=False)
+
+    if SCIPY_AVAILABLE:
+        adjacency = nx.to_scipy_sparse_array(graph, nodelist=nodelist, weight=None, format='csr')
+        distances = csgraph.shortest_path(adjacency, directed=False, unweighted=True, indices=sources)
+        distances = distances[np.isfinite(distances)]
+        eccentricity = int(distances.max())
+        total, pairs = float(distances.sum()), len(distances) - len(sources)
+    else:
+        undirected = graph.to_undirected(as_view=True)
+        eccentricity, total, pairs = 0, 0.0, 0
+        for source in sources:
+            lengths = nx.single_source_shortest_path_length(undirected, nodelist[source])
+            eccentricity = max(eccentricity, max(lengths.values()))
+            total += sum(lengths.values())
+            pairs += len(lengths) - 1
+
+    return eccentricity, (total / pairs if pairs else 0.0)
+
+
+class GraphStatisticsService:
+    """
+    Process-wide access to statistics for the current knowledge graph.
+
+    ``get_statistics()`` never computes the expensive measures itself: it
+    returns the statistics stored for the current graph version, or the most
+    recent older ones together with a background refresh.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        graph_config = getattr(settings, 'KNOWLEDGE_GRAPH_CONFIG', {})
+        self.epsilon = graph_config.get('STATISTICS_BETWEENNESS_EPSILON', 0.1)
+        self.delta = graph_config.get('STATISTICS_BETWEENNESS_DELTA', 0.1)
+        self.cache_timeout = graph_config.get('STATISTICS_CACHE_TIMEOUT', 7 * 24 * 3600)
+        self.refresh_timeout = graph_config.get('STATISTICS_REFRESH_TIMEOUT', 600)
+        self.snapshot_service = GraphSnapshotService.get_instance()
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+        # Start recomputing as soon as this process sees a new graph version
+        self.snapshot_service.add_listener(self._on_snapshot)
+
+    @classmethod
+    def get_instance(cls) -> 'GraphStatisticsService':
+        """Get the statistics service for this process."""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get stored statistics for the current graph.
+
+        Returns:
+            Dictionary with ``statistics`` and ``freshness``. While nothing
+            has been computed yet, ``statistics`` holds only the cheap counts.
+        """
+        snapshot = self.snapshot_service.get_snapshot()
+        record = self._read(GRAPH_STATISTICS_CACHE_KEY.format(version=snapshot.version))
+
+        if record is None:
+            self.refresh_async(snapshot)
+            record = self._read(GRAPH_STATISTICS_LATEST_KEY)
+
+        if record is None:
+            return {
+                'statistics': self._basic_statistics(snapshot),
+                'freshness': {
+                    'status': 'pending',
+                    'graph_version': snapshot.version,
+                    'statistics_version': None,
+                    'refreshing': True,
+                }
+            }
+
+        versions_behind = max(snapshot.version - record['version'], 0)
+        return {
+            'statistics': record['statistics'],
+            'freshness': {
+                'status': 'stale' if versions_behind else 'current',
+                'graph_version': snapshot.version,
+                'statistics_version': record['version'],
+                'versions_behind': versions_behind,
+                'computed_at': datetime.fromtimestamp(record['computed_at'], dt_timezone.utc).isoformat(),
+                'age_seconds': round(time.time() - record['computed_at'], 3),
+                'compute_seconds': record['compute_seconds'],
+                'refreshing': snapshot.version in self._refreshing,
+            }
+        }
+
+    def refresh(self, snapshot: Optional[GraphSnapshot] = None) -> Dict[str, Any]:
+        """
+        Compute and store statistics for a snapshot (the current one by default).
+
+        Returns:
+            The stored record
+        """
+        snapshot = snapshot or self.snapshot_service.get_snapshot()
+        started = time.perf_counter()
+        statistics = calculate_graph_statistics(snapshot.to_networkx(), self.epsilon, self.delta)
+        record = {
+            'version': snapshot.version,
+            'computed_at': time.time(),
+            'compute_seconds': round(time.perf_counter() - started, 3),
+            'statistics': statistics,
+        }
+
+        try:
+            cache.set(GRAPH_STATISTICS_CACHE_KEY.format(version=snapshot.version), record, self.cache_timeout)
+            latest = cache.get(GRAPH_STATISTICS_LATEST_KEY)
+            if latest is None or latest['version'] <= snapshot.version:
+                cache.set(GRAPH_STATISTICS_LATEST_KEY, record, self.cache_timeout)
+        except Exception as e:
+            logger.warning(f"Could not store graph statistics: {str(e)}")
+
+        logger.info(
+            f"Computed knowledge graph statistics v{snapshot.version} "
+            f"in {record['compute_seconds']:.2f}s"
+        )
+        return record
+
+    def refresh_async(self, snapshot: GraphSnapshot) -> bool:
+        """
+        Recompute statistics for a snapshot in a background thread.
+
+        Only one process refreshes a given version: the others see the lock
+        in the shared cache and keep serving the previous statistics.
+
+        Returns:
+            True if a refresh was started
+        """
+        with self._lock:
+            if snapshot.version in self._refreshing:
+                return False
+            self._refreshing.add(snapshot.version)
+
+        lock_key = GRAPH_STATISTICS_LOCK_KEY.format(version=snapshot.version)
+        try:
+            acquired = cache.add(lock_key, True, self.refresh_timeout)
+        except Exception as e:
+            logger.warning(f"Graph statistics lock unavailable, refreshing locally: {str(e)}")
+            acquired = True
+
+        if not acquired:
+            with self._lock:
+                self._refreshing.discard(snapshot.version)
+            return False
+
+        thread = threading.Thread(
+            target=self._refresh_in_background,
+            args=(snapshot, lock_key),
+            name=f'graph-statistics-v{snapshot.version}',
+            daemon=True,
+        )
+        thread.start()
+        return True
+
+    def _refresh_in_background(self, snapshot: GraphSnapshot, lock_key: str):
+        try:
+            # A newer version may have arrived while the thread was queued
+            if snapshot.version >= get_graph_version():
+                self.refresh(snapshot)
+        except Exception as e:
+            logger.error(f"Graph statistics refresh failed: {str(e)}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(snapshot.version)
+            try:
+                cache.delete(lock_key)
+            except Exception:
+                pass
+
+    def _on_snapshot(self, snapshot: GraphSnapshot):
+        if self._read(GRAPH_STATISTICS_CACHE_KEY.format(version=snapshot.version)) is None:
+            self.refresh_async(snapshot)
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            return cache.get(key)
+        except Exception as e:
+            logger.warning(f"Graph statistics cache unavailable: {str(e)}")
+            return None
+
+    def _basic_statistics(self, snapshot: GraphSnapshot) -> Dict[str, Any]:
+        """Counts that are cheap enough to compute on every request."""
+        node_count = snapshot.node_count
+        edge_count = snapshot.edge_count
+        return {
+            'node_count': node_count,
+            'edge_count': edge_count,
+            'density': edge_count / (node_count * (node_count - 1)) if node_count > 1 else 0.0,
+            'average_degree': 2 * edge_count / node_count if node_count else 0.0,
+        }
@@ -12,8 +12,11 @@ import json
 import math
 from typing import List, Dict, Any, Optional, Tuple
 from collections import defaultdict
+import numpy as np
+from django.conf import settings
 from django.db.models import Q, Avg, Count
 from ..models import KnowledgeNode, KnowledgeEdge, LearningGraph
+from .force_layout import ForceDirectedLayout
 
 
 class OSPProcessor:
@@ -325,69 +328,47 @@ class OSPProcessor:
     
     def _generate_force_directed_layout(self, nodes: List[KnowledgeNode], 
                                       edges: List[KnowledgeEdge]) -> Dict[str, Dict[str, float]]:
-        """Generate force-directed spatial layout using simplified algorithm."""
+        """
+        Generate force-directed spatial layout.
+
+        Runs the vectorized ForceDirectedLayout engine. Stored node positions
+        are used as a warm start, so re-running the layout after small graph
+        changes converges in a few iterations.
+        """
+        if not nodes:
+            return {}
+
+        node_index = {str(node.id): i for i, node in enumerate(nodes)}
+        stored_positions = np.array(
+            [[node.x_position, node.y_position, node.z_position] for node in nodes],
+            dtype=np.float64,
+        )
+
+        # Use the raw foreign key ids so edges never lazy-load their nodes
+        edge_pairs = []
+        for edge in edges:
+            source = node_index.get(str(edge.source_node_id))
+            target = node_index.get(str(edge.target_node_id))
+            if source is not None and target is not None and source != target:
+                edge_pairs.append((source, target))
+
+        graph_config = getattr(settings, 'KNOWLEDGE_GRAPH_CONFIG', {})
+        engine = ForceDirectedLayout(
+            max_iterations=graph_config.get('LAYOUT_MAX_ITERATIONS', 50),
+            tolerance=graph_config.get('LAYOUT_TOLERANCE', 0.5),
+            seed=graph_config.get('LAYOUT_SEED', 42),
+            exact_max_nodes=graph_config.get('LAYOUT_EXACT_MAX_NODES', 500),
+        )
+        positions = engine.run(
+            engine.initial_positions(len(nodes), stored_positions),
+            np.array(edge_pairs, dtype=np.int64).reshape(-1, 2),
+        )
+
         layout = {}
-        
-        # Initialize positions randomly
-        import random
-        for node in nodes:
-            layout[str(node.id)] = {
-                'x': random.uniform(-400, 400),
-                'y': random.uniform(-300, 300),
-                'z': random.uniform(-10, 10)
-            }
-        
-        # Apply repulsive forces between all nodes
-        for _ in range(50):  # iterations
-            for i, node_a in enumerate(nodes):
-                for j, node_b in enumerate(nodes[i+1:], i+1):
-                    pos_a = layout[str(node_a.id)]
-                    pos_b = layout[str(node_b.id)]
-                    
-                    # Calculate distance
-                    dx = pos_b['x'] - pos_a['x']
-                    dy = pos_b['y'] - pos_a['y']
-                    dz = pos_b['z'] - pos_a['z']
-                    distance = math.sqrt(dx*dx + dy*dy + dz*dz)
-                    
-                    if distance > 0:
-                        # Apply repulsive force
-                        force = 1000 / (distance * distance)
-                        fx = force * dx / distance
-                        fy = force * dy / distance
-                        fz = force * dz / distance
-                        
-                        layout[str(node_a.id)]['x'] -= fx * 0.1
-                        layout[str(node_a.id)]['y'] -= fy * 0.1
-                        layout[str(node_a.id)]['z'] -= fz * 0.1
-                        layout[str(node_b.id)]['x'] += fx * 0.1
-                        layout[str(node_b.id)]['y'] += fy * 0.1
-                        layout[str(node_b.id)]['z'] += fz * 0.1
-            
-            # Apply attractive forces along edges
-            for edge in edges:
-                pos_source = layout[str(edge.source_node.id)]
-                pos_target = layout[str(edge.target_node.id)]
-                
-                dx = pos_target['x'] - pos_source['x']
-                dy = pos_target['y'] - pos_source['y']
-                dz = pos_target['z'] - pos_source['z']
-                distance = math.sqrt(dx*dx + dy*dy + dz*dz)
-                
-                if distance > 0:
-                    # Apply attractive force
-                    force = distance * 0.001
-                    fx = force * dx / distance
-                    fy = force * dy / distance
-                    fz = force * dz / distance
-                    
-                    layout[str(edge.source_node.id)]['x'] += fx * 0.1
-                    layout[str(edge.source_node.id)]['y'] += fy * 0.1
-                    layout[str(edge.source_node.id)]['z'] += fz * 0.1
-                    layout[str(edge.target_node.id)]['x'] -= fx * 0.1
-                    layout[str(edge.target_node.id)]['y'] -= fy * 0.1
-                    layout[str(edge.target_node.id)]['z'] -= fz * 0.1
-        
+        for node_id, i in node_index.items():
+            x, y, z = positions[i]
+            layout[node_id] = {'x': float(x), 'y': float(y), 'z': float(z)}
+
         return layout
     
     def _generate_clustered_layout(self, nodes: List[KnowledgeNode], 
@@ -501,8 +482,10 @@ class OSPProcessor:
         # Calculate edge length statistics
         edge_lengths = []
         for edge in edges:
-            source_pos = layout[str(edge.source_node.id)]
-            target_pos = layout[str(edge.target_node.id)]
+            source_pos = layout.get(str(edge.source_node_id))
+            target_pos = layout.get(str(edge.target_node_id))
+            if source_pos is None or target_pos is None:
+                continue
             
             dx = target_pos['x'] - source_pos['x']
             dy = target_pos['y'] - source_pos['y']
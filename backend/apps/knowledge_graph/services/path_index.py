@@ -0,0 +1,441 @@
+# JAC Interactive Learning Platform - Core backend implementation by Cavin Otieno
+
+"""
+Precomputed Learning Path Index.
+
+This module answers "what do I need before X" and "how do I get from A to B"
+without running NetworkX at request time. For each graph snapshot it keeps:
+
+- the transitive prerequisite closure of every node, stored as a bitset
+  (a Python int where bit i is set when node i must be learned first);
+- a shortest-path tree per target node, stored as a next-hop array where
+  tree[s] is the node to visit after s on the cheapest path to the target.
+
+The index is built offline by the ``build_learning_path_index`` management
+command and published to the shared cache. When edges change, workers update
+their copy incrementally from the previous index instead of starting over.
+"""
+
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+import numpy as np
+import networkx as nx
+from django.conf import settings
+from django.core.cache import cache
+
+from .graph_snapshot import (
+    GraphSnapshot, GraphSnapshotService, calculate_path_weight, SCIPY_AVAILABLE
+)
+
+if SCIPY_AVAILABLE:
+    from scipy.sparse import csgraph
+
+logger = logging.getLogger(__name__)
+
+PATH_INDEX_CACHE_KEY = 'knowledge_graph:path_index:{version}'
+
+# Edge types where the source node is learned before the target node
+PREREQUISITE_EDGE_TYPES = ('prerequisite', 'leads_to')
+
+# Edge types where the target node is learned before the source node
+REVERSED_PREREQUISITE_EDGE_TYPES = ('depends_on',)
+
+# Number of targets per batched Dijkstra run
+TREE_BATCH_SIZE = 256
+
+
+def prerequisite_pairs(snapshot: GraphSnapshot) -> Set[Tuple[int, int]]:
+    """
+    Get the (before, after) node index pairs implied by prerequisite edges.
+
+    Args:
+        snapshot: Graph snapshot to read edges from
+
+    Returns:
+        Set of (prerequisite index, dependent index) tuples
+    """
+    pairs = set()
+    for (source_id, target_id), edge in snapshot.edges.items():
+        source = snapshot.node_index[source_id]
+        target = snapshot.node_index[target_id]
+        if edge['edge_type'] in PREREQUISITE_EDGE_TYPES:
+            pairs.add((source, target))
+        elif edge['edge_type'] in REVERSED_PREREQUISITE_EDGE_TYPES:
+            pairs.add((target, source))
+    return pairs
+
+
+def compute_prerequisite_closure(node_count: int, pairs: Set[Tuple[int, int]]) -> List[int]:
+    """
+    Compute the transitive prerequisite closure of every node.
+
+    Cycles are collapsed into strongly connected components, so every member
+    of a cycle is a prerequisite of the others. A node is never its own
+    prerequisite.
+
+    Args:
+        node_count: Number of nodes in the snapshot
+        pairs: (before, after) node index pairs
+
+    Returns:
+        List of ancestor bitsets indexed by node index
+    """
+    graph = nx.DiGraph()
+    graph.add_nodes_from(range(node_count))
+    graph.add_edges_from(pairs)
+    condensed = nx.condensation(graph)
+
+    closure = [0] * node_count
+    component_bits = {}
+
+    for component in nx.topological_sort(condensed):
+        members = condensed.nodes[component]['members']
+        member_bits = 0
+        for member in members:
+            member_bits |= 1 << member
+
+        ancestors = 0
+        for predecessor in condensed.predecessors(component):
+            ancestors |= component_bits[predecessor]
+        component_bits[component] = ancestors | member_bits
+
+        if len(members) > 1:
+            ancestors |= member_bits
+        for member in members:
+            closure[member] = ancestors & ~(1 << member)
+
+    return closure
+
+
+def add_prerequisite_to_closure(closure: List[int], before: int, after: int):
+    """
+    Update a closure in place for a newly added prerequisite edge.
+
+    Every node that already depends on ``after`` (and ``after`` itself) gains
+    ``before`` and all of its prerequisites.
+    """
+    gained = closure[before] | (1 << before)
+    after_bit = 1 << after
+    for node in range(len(closure)):
+        if node == after or closure[node] & after_bit:
+            closure[node] = (closure[node] | gained) & ~(1 << node)
+
+
+def reachable_from(snapshot: GraphSnapshot, starts: Set[int]) -> Set[int]:
+    """Get every node index reachable from the given start indices (inclusive)."""
+    indptr = snapshot.indptr
+    indices = snapshot.indices
+    seen = set(starts)
+    frontier = list(starts)
+
+    while frontier:
+        node = frontier.pop()
+        for successor in indices[indptr[node]:indptr[node + 1]].tolist():
+            if successor not in seen:
+                seen.add(successor)
+                frontier.append(successor)
+
+    return seen
+
+
+class LearningPathIndex:
+    """
+    Prerequisite closure and shortest-path trees for one graph snapshot.
+    """
+
+    def __init__(self, snapshot: GraphSnapshot, closure: List[int], pairs: Set[Tuple[int, int]],
+                 max_trees: int = 4096):
+        self.snapshot = snapshot
+        self.version = snapshot.version
+        self.closure = closure
+        self.pairs = pairs
+        self.max_trees = max_trees
+        self.built_at = time.time()
+        self._trees: 'OrderedDict[int, np.ndarray]' = OrderedDict()
+        self._trees_lock = threading.Lock()
+
+    @classmethod
+    def build(cls, snapshot: GraphSnapshot, max_trees: int = 4096) -> 'LearningPathIndex':
+        """Build the index for a snapshot from scratch (path trees are computed lazily)."""
+        pairs = prerequisite_pairs(snapshot)
+        closure = compute_prerequisite_closure(snapshot.node_count, pairs)
+        return cls(snapshot, closure, pairs, max_trees)
+
+    @classmethod
+    def from_previous(cls, previous: 'LearningPathIndex', snapshot: GraphSnapshot,
+                      max_trees: int = 4096) -> 'LearningPathIndex':
+        """
+        Build the index for a new snapshot by updating the previous one.
+
+        Added prerequisite edges are folded into the existing closure; removals
+        trigger a closure recompute. Path trees are kept for every target the
+        changed edges cannot reach.
+
+        Args:
+            previous: Index built for an earlier snapshot
+            snapshot: New graph snapshot
+
+        Returns:
+            LearningPathIndex for the new snapshot
+        """
+        old_snapshot = previous.snapshot
+        if old_snapshot.node_ids != snapshot.node_ids:
+            # Node indices shifted - nothing can be reused
+            return cls.build(snapshot, max_trees)
+
+        pairs = prerequisite_pairs(snapshot)
+        removed_pairs = previous.pairs - pairs
+        added_pairs = pairs - previous.pairs
+
+        if removed_pairs:
+            closure = compute_prerequisite_closure(snapshot.node_count, pairs)
+        else:
+            closure = list(previous.closure)
+            for before, after in added_pairs:
+                add_prerequisite_to_closure(closure, before, after)
+
+        index = cls(snapshot, closure, pairs, max_trees)
+
+        changed_targets = set()
+        for key in old_snapshot.edges.keys() | snapshot.edges.keys():
+            old_edge = old_snapshot.edges.get(key)
+            new_edge = snapshot.edges.get(key)
+            if (old_edge is None or new_edge is None or
+                    calculate_path_weight(old_edge['edge_type'], old_edge['strength']) !=
+                    calculate_path_weight(new_edge['edge_type'], new_edge['strength'])):
+                changed_targets.add(snapshot.node_index[key[1]])
+
+        affected = set()
+        if changed_targets:
+            affected = reachable_from(old_snapshot, changed_targets) | reachable_from(snapshot, changed_targets)
+
+        with previous._trees_lock:
+            for target, tree in previous._trees.items():
+                if target not in affected:
+                    index._trees[target] = tree
+
+        logger.info(
+            f"Updated learning path index v{previous.version} -> v{snapshot.version}: "
+            f"+{len(added_pairs)}/-{len(removed_pairs)} prerequisite edges, "
+            f"{len(index._trees)} path trees reused"
+        )
+        return index
+
+    @classmethod
+    def from_payload(cls, snapshot: GraphSnapshot, payload: Dict[str, Any],
+                     max_trees: int = 4096) -> 'LearningPathIndex':
+        """Restore an index published to the cache by another process."""
+        index = cls(snapshot, payload['closure'], set(payload['pairs']), max_trees)
+        for target, tree in zip(payload['tree_targets'], payload['trees']):
+            index._trees[int(target)] = tree
+        return index
+
+    def to_payload(self) -> Dict[str, Any]:
+        """Serialize the index for the shared cache."""
+        with self._trees_lock:
+            targets = list(self._trees.keys())
+            trees = list(self._trees.values())
+        return {
+            'version': self.version,
+            'node_ids': self.snapshot.node_ids,
+            'closure': self.closure,
+            'pairs': list(self.pairs),
+            'tree_targets': np.array(targets, dtype=np.int32),
+            'trees': np.vstack(trees) if trees else np.empty((0, self.snapshot.node_count), dtype=np.int32),
+        }
+
+    @property
+    def tree_count(self) -> int:
+        return len(self._trees)
+
+    def prerequisite_ids(self, node_id: str) -> List[str]:
+        """
+        Get every transitive prerequisite of a node.
+
+        Args:
+            node_id: Node UUID string
+
+        Returns:
+            Prerequisite node UUID strings in learning order (fewest
+            prerequisites of their own first)
+        """
+        bits = self.closure[self.snapshot.node_index[node_id]]
+        if not bits:
+            return []
+
+        node_count = self.snapshot.node_count
+        packed = np.frombuffer(bits.to_bytes((node_count + 7) // 8, 'little'), dtype=np.uint8)
+        members = np.flatnonzero(np.unpackbits(packed, bitorder='little')[:node_count])
+        members = sorted(members.tolist(), key=lambda index: self.closure[index].bit_count())
+
+        return [self.snapshot.node_ids[index] for index in members]
+
+    def prerequisite_depth(self, node_id: str) -> int:
+        """Number of transitive prerequisites of a node."""
+        return self.closure[self.snapshot.node_index[node_id]].bit_count()
+
+    def path(self, start_id: str, end_id: str) -> Optional[List[str]]:
+        """
+        Get the cheapest path between two nodes from the target's path tree.
+
+        Args:
+            start_id: Starting node UUID string
+            end_id: Target node UUID string
+
+        Returns:
+            List of node UUID strings from start to end, or None if unreachable
+        """
+        start = self.snapshot.node_index[start_id]
+        end = self.snapshot.node_index[end_id]
+        tree = self.path_tree(end)
+
+        path = [start]
+        while path[-1] != end:
+            next_hop = int(tree[path[-1]])
+            if next_hop < 0 or len(path) > self.snapshot.node_count:
+                return None
+            path.append(next_hop)
+
+        return [self.snapshot.node_ids[index] for index in path]
+
+    def path_tree(self, target: int) -> np.ndarray:
+        """Get (computing if needed) the next-hop array towards a target index."""
+        with self._trees_lock:
+            tree = self._trees.get(target)
+            if tree is not None:
+                self._trees.move_to_end(target)
+                return tree
+
+        tree = self._compute_trees([target])[0]
+        self._store_trees([target], [tree])
+        return tree
+
+    def precompute_trees(self, targets: Optional[List[int]] = None) -> int:
+        """
+        Compute path trees for many targets in batched Dijkstra runs.
+
+        Args:
+            targets: Target node indices (default: all nodes, up to max_trees)
+
+        Returns:
+            Number of trees computed
+        """
+        if targets is None:
+            targets = list(range(min(self.snapshot.node_count, self.max_trees)))
+
+        with self._trees_lock:
+            targets = [target for target in targets if target not in self._trees]
+
+        for offset in range(0, len(targets), TREE_BATCH_SIZE):
+            batch = targets[offset:offset + TREE_BATCH_SIZE]
+            self._store_trees(batch, self._compute_trees(batch))
+
+        return len(targets)
+
+    def _store_trees(self, targets: List[int], trees: List[np.ndarray]):
+        with self._trees_lock:
+            for target, tree in zip(targets, trees):
+                self._trees[target] = tree
+                self._trees.move_to_end(target)
+            while len(self._trees) > self.max_trees:
+                self._trees.popitem(last=False)
+
+    def _compute_trees(self, targets: List[int]) -> List[np.ndarray]:
+        """
+        Run Dijkstra from each target over the reversed graph.
+
+        The predecessor of s in the reversed search is the next hop from s
+        towards the target in the original graph.
+        """
+        if SCIPY_AVAILABLE:
+            _, predecessors = csgraph.dijkstra(
+                self.snapshot.reverse_sparse_matrix(), directed=True,
+                indices=targets, return_predecessors=True
+            )
+            predecessors = np.atleast_2d(predecessors).astype(np.int32)
+            return [np.maximum(row, -1) for row in predecessors]
+
+        reversed_graph = self.snapshot.to_networkx().reverse(copy=False)
+        trees = []
+        for target in targets:
+            tree = np.full(self.snapshot.node_count, -1, dtype=np.int32)
+            predecessors, _ = nx.dijkstra_predecessor_and_distance(
+                reversed_graph, self.snapshot.node_ids[target], weight='weight'
+            )
+            for node_id, hops in predecessors.items():
+                if hops:
+                    tree[self.snapshot.node_index[node_id]] = self.snapshot.node_index[hops[0]]
+            trees.append(tree)
+        return trees
+
+
+class PathIndexService:
+    """
+    Process-wide holder of the LearningPathIndex for the current snapshot.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        graph_config = getattr(settings, 'KNOWLEDGE_GRAPH_CONFIG', {})
+        self.max_trees = graph_config.get('PATH_INDEX_MAX_TREES', 4096)
+        self.cache_timeout = graph_config.get('CACHE_TIMEOUT', 3600)
+        self.snapshot_service = GraphSnapshotService.get_instance()
+        self._index: Optional[LearningPathIndex] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls) -> 'PathIndexService':
+        """Get the path index service for this process."""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def get_index(self) -> LearningPathIndex:
+        """Return the index for the current graph snapshot, updating it if needed."""
+        snapshot = self.snapshot_service.get_snapshot()
+        index = self._index
+        if index is not None and index.version == snapshot.version:
+            return index
+
+        with self._lock:
+            index = self._index
+            if index is None or index.version != snapshot.version:
+                index = self._load_or_build(snapshot, index)
+                self._index = index
+
+        return index
+
+    def publish(self, index: LearningPathIndex):
+        """Store an index in the shared cache so other workers can reuse it."""
+        try:
+            cache.set(
+                PATH_INDEX_CACHE_KEY.format(version=index.version),
+                index.to_payload(),
+                timeout=self.cache_timeout
+            )
+        except Exception as e:
+            logger.warning(f"Could not publish learning path index: {str(e)}")
+
+    def _load_or_build(self, snapshot: GraphSnapshot,
+                       previous: Optional[LearningPathIndex]) -> LearningPathIndex:
+        try:
+            payload = cache.get(PATH_INDEX_CACHE_KEY.format(version=snapshot.version))
+        except Exception as e:
+            logger.warning(f"Learning path index cache unavailable: {str(e)}")
+            payload = None
+
+        if payload and payload.get('node_ids') == snapshot.node_ids:
+            return LearningPathIndex.from_payload(snapshot, payload, self.max_trees)
+
+        if previous is not None:
+            return LearningPathIndex.from_previous(previous, snapshot, self.max_trees)
+
+        return LearningPathIndex.build(snapshot, self.max_trees)
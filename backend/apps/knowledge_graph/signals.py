@@ -0,0 +1,29 @@
+# JAC Interactive Learning Platform - Core backend implementation by Cavin Otieno
+
+"""
+Knowledge Graph Signals - JAC Learning Platform
+
+Keeps the shared in-memory graph snapshot current by bumping the graph
+version whenever a knowledge node or edge is saved or deleted.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import KnowledgeNode, KnowledgeEdge
+from .services.graph_snapshot import bump_graph_version
+
+
+@receiver(post_save, sender=KnowledgeNode)
+@receiver(post_delete, sender=KnowledgeNode)
+@receiver(post_save, sender=KnowledgeEdge)
+@receiver(post_delete, sender=KnowledgeEdge)
+def invalidate_graph_snapshot(sender, instance, **kwargs):
+    """Bump the graph version once the change is committed"""
+    update_fields = kwargs.get('update_fields')
+    if update_fields and set(update_fields) <= {'view_count', 'traversal_count'}:
+        # Analytics counters do not change the graph structure
+        return
+
+    transaction.on_commit(bump_graph_version)
@@ -0,0 +1,245 @@
+# JAC Interactive Learning Platform - Core backend implementation by Cavin Otieno
+
+"""
+Knowledge graph tests for Django
+"""
+
+from django.test import SimpleTestCase
+import uuid
+
+import networkx as nx
+import numpy as np
+
+from .services.force_layout import ForceDirectedLayout
+from .services.graph_snapshot import GraphSnapshot
+from .services.graph_statistics import betweenness_pivot_count, calculate_graph_statistics
+from .services.path_index import LearningPathIndex
+
+
+def make_node(node_id, title):
+    """Build a snapshot node row like KnowledgeNode.objects.values() returns"""
+    return {
+        'id': node_id,
+        'title': title,
+        'node_type': 'concept',
+        'difficulty_level': 'beginner',
+        'x_position': 0.0,
+        'y_position': 0.0,
+        'z_position': 0.0,
+        'width': 1.0,
+        'height': 1.0,
+        'content_uri': '',
+        'jac_code': '',
+        'view_count': 0,
+    }
+
+
+def make_edge(source_id, target_id, edge_type='prerequisite', strength='moderate'):
+    """Build a snapshot edge row like KnowledgeEdge.objects.values() returns"""
+    return {
+        'id': uuid.uuid4(),
+        'source_node_id': source_id,
+        'target_node_id': target_id,
+        'edge_type': edge_type,
+        'strength': strength,
+        'edge_weight': 1.0,
+        'traversal_count': 0,
+        'curve_points': [],
+        'description': '',
+    }
+
+
+class GraphSnapshotTest(SimpleTestCase):
+    """
+    Test cases for the shared graph snapshot
+    """
+
+    def setUp(self):
+        """Set up a small graph: a -> b -> d, a -> c -> d (c path is cheaper)"""
+        self.ids = {name: uuid.uuid4() for name in 'abcde'}
+        nodes = [make_node(node_id, name) for name, node_id in self.ids.items()]
+        edges = [
+            make_edge(self.ids['a'], self.ids['b'], 'related'),
+            make_edge(self.ids['b'], self.ids['d'], 'related'),
+            make_edge(self.ids['a'], self.ids['c'], 'prerequisite', 'strong'),
+            make_edge(self.ids['c'], self.ids['d'], 'prerequisite', 'strong'),
+            # Edge to an inactive (missing) node is dropped
+            make_edge(self.ids['d'], uuid.uuid4()),
+        ]
+        self.snapshot = GraphSnapshot(3, nodes, edges)
+
+    def node_id(self, name):
+        return str(self.ids[name])
+
+    def test_snapshot_counts(self):
+        """Test node and edge counts ignore edges to unknown nodes"""
+        self.assertEqual(self.snapshot.version, 3)
+        self.assertEqual(self.snapshot.node_count, 5)
+        self.assertEqual(self.snapshot.edge_count, 4)
+
+    def test_csr_adjacency(self):
+        """Test CSR successors and predecessors"""
+        a = self.snapshot.node_index[self.node_id('a')]
+        d = self.snapshot.node_index[self.node_id('d')]
+
+        successors = {self.snapshot.node_ids[i] for i in self.snapshot.successors(a)}
+        predecessors = {self.snapshot.node_ids[i] for i in self.snapshot.predecessors(d)}
+
+        self.assertEqual(successors, {self.node_id('b'), self.node_id('c')})
+        self.assertEqual(predecessors, {self.node_id('b'), self.node_id('c')})
+
+    def test_shortest_path_prefers_cheaper_edges(self):
+        """Test Dijkstra over the CSR arrays"""
+        path = self.snapshot.shortest_path(self.node_id('a'), self.node_id('d'))
+        self.assertEqual(path, [self.node_id('a'), self.node_id('c'), self.node_id('d')])
+
+    def test_shortest_path_unreachable(self):
+        """Test unreachable targets return None"""
+        self.assertIsNone(self.snapshot.shortest_path(self.node_id('a'), self.node_id('e')))
+        self.assertEqual(self.snapshot.shortest_path(self.node_id('e'), self.node_id('e')), [self.node_id('e')])
+
+    def test_networkx_graph_is_frozen(self):
+        """Test the shared NetworkX view cannot be mutated"""
+        graph = self.snapshot.to_networkx()
+        self.assertEqual(graph.number_of_edges(), 4)
+        self.assertIs(graph, self.snapshot.to_networkx())
+        with self.assertRaises(Exception):
+            graph.add_node('x')
+
+
+class LearningPathIndexTest(SimpleTestCase):
+    """
+    Test cases for the precomputed prerequisite closure and path trees
+    """
+
+    def setUp(self):
+        """Set up a chain a -> b -> c with d depending on c and a cycle e <-> f"""
+        self.ids = {name: uuid.uuid4() for name in 'abcdef'}
+        self.nodes = [make_node(node_id, name) for name, node_id in self.ids.items()]
+        self.edges = [
+            make_edge(self.ids['a'], self.ids['b'], 'prerequisite'),
+            make_edge(self.ids['b'], self.ids['c'], 'leads_to'),
+            make_edge(self.ids['d'], self.ids['c'], 'depends_on'),
+            make_edge(self.ids['e'], self.ids['f'], 'prerequisite'),
+            make_edge(self.ids['f'], self.ids['e'], 'prerequisite'),
+            make_edge(self.ids['a'], self.ids['e'], 'related'),
+        ]
+        self.index = LearningPathIndex.build(GraphSnapshot(1, self.nodes, self.edges))
+
+    def node_id(self, name):
+        return str(self.ids[name])
+
+    def names(self, node_ids):
+        by_id = {str(node_id): name for name, node_id in self.ids.items()}
+        return [by_id[node_id] for node_id in node_ids]
+
+    def test_transitive_prerequisites_in_learning_order(self):
+        """Test the closure includes indirect prerequisites, earliest first"""
+        self.assertEqual(self.names(self.index.prerequisite_ids(self.node_id('d'))), ['a', 'b', 'c'])
+        self.assertEqual(self.index.prerequisite_ids(self.node_id('a')), [])
+
+    def test_related_edges_are_not_prerequisites(self):
+        """Test only prerequisite-like edges feed the closure"""
+        self.assertEqual(self.names(self.index.prerequisite_ids(self.node_id('e'))), ['f'])
+
+    def test_path_from_tree(self):
+        """Test paths are read from the target's shortest-path tree"""
+        path = self.index.path(self.node_id('a'), self.node_id('c'))
+        self.assertEqual(self.names(path), ['a', 'b', 'c'])
+        self.assertIsNone(self.index.path(self.node_id('c'), self.node_id('a')))
+
+    def test_incremental_update_matches_rebuild(self):
+        """Test adding and removing edges updates the closure like a full build"""
+        self.index.precompute_trees()
+        added = self.edges + [make_edge(self.ids['c'], self.ids['e'], 'prerequisite')]
+        updated = LearningPathIndex.from_previous(self.index, GraphSnapshot(2, self.nodes, added))
+        rebuilt = LearningPathIndex.build(GraphSnapshot(2, self.nodes, added))
+        self.assertEqual(updated.closure, rebuilt.closure)
+        self.assertEqual(self.names(updated.path(self.node_id('a'), self.node_id('f'))), ['a', 'e', 'f'])
+
+        removed = added[1:]
+        updated = LearningPathIndex.from_previous(updated, GraphSnapshot(3, self.nodes, removed))
+        rebuilt = LearningPathIndex.build(GraphSnapshot(3, self.nodes, removed))
+        self.assertEqual(updated.closure, rebuilt.closure)
+        self.assertIsNone(updated.path(self.node_id('a'), self.node_id('c')))
+
+
+class ForceDirectedLayoutTest(SimpleTestCase):
+    """
+    Test cases for the vectorized force-directed layout
+    """
+
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.node_count = 800
+        self.edges = rng.integers(0, self.node_count, (1600, 2))
+        self.edges = self.edges[self.edges[:, 0] != self.edges[:, 1]]
+
+    def test_layout_is_deterministic(self):
+        """Test the same seed gives the same layout"""
+        first = ForceDirectedLayout(max_iterations=10)
+        second = ForceDirectedLayout(max_iterations=10)
+        np.testing.assert_array_equal(
+            first.run(first.initial_positions(50), self.edges[:40] % 50),
+            second.run(second.initial_positions(50), self.edges[:40] % 50),
+        )
+
+    def test_warm_start_keeps_stored_positions(self):
+        """Test stored positions are reused and unplaced nodes get random ones"""
+        stored = np.zeros((3, 3))
+        stored[0] = [10.0, 20.0, 1.0]
+        start = ForceDirectedLayout().initial_positions(3, stored)
+        np.testing.assert_allclose(start[0], stored[0], atol=1e-2)
+        self.assertTrue(np.all(start[1:] != 0.0))
+
+    def test_grid_repulsion_matches_exact(self):
+        """Test the grid approximation stays close to exact repulsion"""
+        layout = ForceDirectedLayout(max_iterations=20, exact_max_nodes=0)
+        positions = layout.run(layout.initial_positions(self.node_count), self.edges)
+
+        exact = layout._exact_repulsion(positions)
+        approximate = layout._grid_repulsion(positions, layout._build_grid(positions))
+        error = np.linalg.norm(exact - approximate, axis=1) / np.linalg.norm(exact, axis=1).mean()
+        self.assertLess(np.median(error), 0.05)
+
+    def test_converged_layout_stops_early(self):
+        """Test iteration stops once nodes stop moving"""
+        layout = ForceDirectedLayout(max_iterations=500, tolerance=0.5)
+        layout.run(layout.initial_positions(20), np.array([[0, 1], [1, 2]]))
+        self.assertLess(layout.iterations_run, 500)
+
+
+class GraphStatisticsTest(SimpleTestCase):
+    """
+    Test cases for sampled graph statistics
+    """
+
+    def setUp(self):
+        self.graph = nx.gnm_random_graph(400, 1200, seed=3, directed=True)
+
+    def test_pivot_count(self):
+        """Test the pivot count follows the error bound and is capped at n"""
+        self.assertEqual(betweenness_pivot_count(400, 0.1, 0.1), 400)
+        self.assertEqual(betweenness_pivot_count(10000, 0.1, 0.1), 611)
+        self.assertEqual(betweenness_pivot_count(400, 0.2, 0.1), 113)
+        self.assertEqual(betweenness_pivot_count(10000, 0.0, 0.1), 10000)
+
+    def test_small_graph_is_exact(self):
+        """Test graphs smaller than the pivot count get exact statistics"""
+        stats = calculate_graph_statistics(self.graph)
+        undirected = self.graph.to_undirected()
+
+        self.assertTrue(stats['approximation']['exact'])
+        self.assertEqual(stats['diameter'], nx.diameter(undirected))
+        self.assertAlmostEqual(stats['average_shortest_path_length'],
+                               nx.average_shortest_path_length(undirected))
+
+    def test_sampled_betweenness_within_bound(self):
+        """Test sampled betweenness stays within the configured error"""
+        stats = calculate_graph_statistics(self.graph, epsilon=0.2, delta=0.1)
+        exact = nx.betweenness_centrality(self.graph)
+
+        self.assertFalse(stats['approximation']['exact'])
+        for entry in stats['top_betweenness_central_nodes']:
+            self.assertLess(abs(entry['centrality'] - exact[entry['node_id']]), 0.2)
+        self.assertLessEqual(stats['diameter'], nx.diameter(self.graph.to_undirected()))
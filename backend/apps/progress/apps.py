@@ -5,4 +5,8 @@ from django.apps import AppConfig
 
 class ProgressConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'apps.progress'
\ No newline at end of file
+    name = 'apps.progress'
+
+    def ready(self):
+        """Import signals when the app is ready"""
+        import apps.progress.signals
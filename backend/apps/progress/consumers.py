@@ -31,7 +31,7 @@ class DashboardConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         """Handle WebSocket connection"""
         self.session_id = str(uuid.uuid4())
-        self.monitoring_service = RealtimeMonitoringService()
+        self.monitoring_service = RealtimeMonitoringService.get_instance()
         
         # Get user from scope
         self.user = self.scope["user"]
@@ -63,6 +63,9 @@ class DashboardConsumer(AsyncWebsocketConsumer):
                 'session_id': self.session_id,
                 'message': 'Dashboard monitoring started'
             }))
+            
+            # Send initial dashboard data; later changes are pushed to the group
+            await self.send(text_data=json.dumps(result['initial_data'], default=str))
         else:
             await self.close()
     
@@ -163,6 +166,7 @@ class AlertConsumer(AsyncWebsocketConsumer):
             self.alert_group_name,
             self.channel_name
         )
+        await RealtimeMonitoringService.get_instance().add_listener(self.scope['user'].id)
         
         await self.accept()
         
@@ -174,6 +178,8 @@ class AlertConsumer(AsyncWebsocketConsumer):
     
     async def disconnect(self, close_code):
         """Handle WebSocket disconnection"""
+        if not isinstance(self.scope["user"], AnonymousUser):
+            await RealtimeMonitoringService.get_instance().remove_listener(self.scope['user'].id)
         await self.channel_layer.group_discard(
             self.alert_group_name,
             self.channel_name
@@ -209,8 +215,8 @@ class AlertConsumer(AsyncWebsocketConsumer):
             
             # Update notification in database
             await database_sync_to_async(
-                ProgressNotification.objects.filter
-            )(id=alert_id, user=self.scope['user']).update(is_read=True)
+                lambda: ProgressNotification.objects.filter(id=alert_id, user=self.scope['user']).update(is_read=True)
+            )()
             
         except Exception as e:
             print(f"Error acknowledging alert: {e}")
@@ -235,11 +241,14 @@ class RealtimeMetricsConsumer(AsyncWebsocketConsumer):
             self.metrics_group_name,
             self.channel_name
         )
+        await RealtimeMonitoringService.get_instance().add_listener(self.scope['user'].id)
         
         await self.accept()
     
     async def disconnect(self, close_code):
         """Handle WebSocket disconnection"""
+        if not isinstance(self.scope["user"], AnonymousUser):
+            await RealtimeMonitoringService.get_instance().remove_listener(self.scope['user'].id)
         await self.channel_layer.group_discard(
             self.metrics_group_name,
             self.channel_name
@@ -280,11 +289,14 @@ class ActivityStreamConsumer(AsyncWebsocketConsumer):
             self.activity_group_name,
             self.channel_name
         )
+        await RealtimeMonitoringService.get_instance().add_listener(self.scope['user'].id)
         
         await self.accept()
     
     async def disconnect(self, close_code):
         """Handle WebSocket disconnection"""
+        if not isinstance(self.scope["user"], AnonymousUser):
+            await RealtimeMonitoringService.get_instance().remove_listener(self.scope['user'].id)
         await self.channel_layer.group_discard(
             self.activity_group_name,
             self.channel_name
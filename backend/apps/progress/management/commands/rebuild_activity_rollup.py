@@ -0,0 +1,64 @@
+# JAC Interactive Learning Platform - Core backend implementation by Cavin Otieno
+
+"""
+Management Command - Rebuild Activity Rollup
+
+Recomputes learners' daily activity rollup and streak totals from their
+module progress and assessment history. The rollup is normally maintained
+incrementally as activity is saved; use this to backfill it ahead of first
+reads or to repair it after bulk data changes that bypass model signals.
+
+Usage:
+    python manage.py rebuild_activity_rollup
+    python manage.py rebuild_activity_rollup --user 42 --user 43
+    python manage.py rebuild_activity_rollup --missing-only
+
+Author: Cavin Otieno
+Created: 2025-11-26
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from apps.progress.models import ActivityStreak
+from apps.progress.services.activity_rollup_service import ActivityRollupService
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily activity rollup and streak totals from learner history'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            type=int,
+            action='append',
+            default=[],
+            help='Only rebuild this learner (repeatable)',
+        )
+        parser.add_argument(
+            '--missing-only',
+            action='store_true',
+            help='Only build learners that have no rollup yet',
+        )
+
+    def handle(self, *args, **options):
+        """Handle the management command"""
+        users = User.objects.order_by('pk')
+        if options['user']:
+            users = users.filter(pk__in=options['user'])
+        if options['missing_only']:
+            users = users.exclude(pk__in=ActivityStreak.objects.values('user_id'))
+
+        service = ActivityRollupService()
+        rebuilt = failed = 0
+        for user_id in users.values_list('pk', flat=True).iterator():
+            if service.rebuild(user_id) is None:
+                failed += 1
+            else:
+                rebuilt += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt activity rollup for {rebuilt} learners'))
+        if failed:
+            self.stdout.write(self.style.WARNING(f'{failed} learners failed, see the log for details'))
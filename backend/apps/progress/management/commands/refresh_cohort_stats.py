@@ -0,0 +1,41 @@
+# JAC Interactive Learning Platform - Core backend implementation by Cavin Otieno
+
+"""
+Management Command - Refresh Cohort Statistics
+
+Recomputes the comparison metrics of learners whose activity changed since
+the last refresh and rebuilds the distributions of the cohorts they belong
+to. Scheduled through the progress.refresh_cohort_stats Celery task.
+
+Usage:
+    python manage.py refresh_cohort_stats
+    python manage.py refresh_cohort_stats --full
+
+Author: Cavin Otieno
+Created: 2025-11-26
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.progress.services.cohort_stats_service import CohortStatsService
+
+
+class Command(BaseCommand):
+    help = 'Refresh materialized learner metrics and cohort distributions'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Recompute every learner, not only those with new activity',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        counts = CohortStatsService().refresh(full=options['full'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Refreshed {counts['learners']} learners and {counts['distributions']} distributions "
+            f"in {time.perf_counter() - started:.2f}s"
+        ))
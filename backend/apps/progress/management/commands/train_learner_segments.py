@@ -0,0 +1,66 @@
+# JAC Interactive Learning Platform - Core backend implementation by Cavin Otieno
+
+"""
+Management Command - Train Learner Segments
+
+Segments every learner active in the last SEGMENT_WINDOW_DAYS with
+MiniBatchKMeans and stores the centroids, segment profiles and each
+learner's segment label. Clustering requests only read the result; run
+this on a schedule through the progress.train_learner_segments Celery task.
+
+Usage:
+    python manage.py train_learner_segments
+    python manage.py train_learner_segments --learning-path <uuid> --learning-path <uuid>
+    python manage.py train_learner_segments --clusters 5
+
+Author: Cavin Otieno
+Created: 2025-11-26
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.progress.services.learner_segmentation import LearnerSegmentationService, SKLEARN_AVAILABLE
+from apps.progress.services.model_registry import scope_for_path
+from apps.progress.services.predictive_analytics_service import PredictiveAnalyticsService
+
+
+class Command(BaseCommand):
+    help = 'Segment all active learners and store centroids and segment labels'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--learning-path',
+            action='append',
+            default=[],
+            help='Also segment the learners of this learning path (repeatable)',
+        )
+        parser.add_argument(
+            '--clusters',
+            type=int,
+            default=None,
+            help='Number of segments (default: best silhouette up to SEGMENT_MAX_CLUSTERS)',
+        )
+
+    def handle(self, *args, **options):
+        """Handle the management command"""
+        if not SKLEARN_AVAILABLE:
+            raise CommandError('scikit-learn is required to train learner segments')
+
+        segmenter = LearnerSegmentationService(PredictiveAnalyticsService())
+        for learning_path_id in [None] + options['learning_path']:
+            scope = scope_for_path(learning_path_id)
+            started = time.monotonic()
+            segmentation = segmenter.train(learning_path_id, options['clusters'])
+            if segmentation is None:
+                self.stdout.write(self.style.WARNING(f'{scope}: not enough active learners, skipped'))
+                continue
+
+            silhouette = f'{segmentation.silhouette:.3f}' if segmentation.silhouette is not None else 'n/a'
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'{scope}: {len(segmentation.centroids)} segments from {segmentation.sample_size} learners '
+                    f'in {time.monotonic() - started:.1f}s (silhouette {silhouette})'
+                )
+            )
@@ -13,6 +13,12 @@ Models:
 - UserProgressMetric: Individual user progress metrics
 - ProgressGoal: User-defined learning goals
 - ProgressNotification: Progress-related notifications
+- DailyActivity: Per-user daily activity rollup
+- ActivityStreak: Per-user streak, days-active and session totals
+- LearnerMetricSnapshot: Per-learner cohort comparison metrics
+- CohortMetricDistribution: Sorted cohort metric values for percentiles
+- LearnerSegmentation: Fitted learner segmentation (centroids and profiles)
+- LearnerSegment: Per-learner segment label
 
 Author: Cavin Otieno
 Created: 2025-11-25
@@ -381,4 +387,178 @@ class ProgressNotification(models.Model):
         ]
     
     def __str__(self):
-        return f"{self.notification_type} - {self.user.username} - {self.created_at.date()}"
\ No newline at end of file
+        return f"{self.notification_type} - {self.user.username} - {self.created_at.date()}"
+
+
+class DailyActivity(models.Model):
+    """
+    One learner's tracked activity on one day, maintained incrementally
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='daily_activity')
+    day = models.DateField()
+    
+    # Activity Totals
+    events = models.PositiveIntegerField(default=0)
+    minutes = models.FloatField(default=0.0)
+    best_score = models.FloatField(null=True, blank=True)  # Best assessment percentage of the day
+    sessions = models.PositiveIntegerField(default=0)  # Sessions started on this day
+    
+    # Timestamps
+    first_activity_at = models.DateTimeField(null=True, blank=True)
+    last_activity_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'progress_daily_activity'
+        unique_together = ['user', 'day']
+        ordering = ['-day']
+        indexes = [
+            models.Index(fields=['user', '-day']),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.day} ({self.events} events)"
+
+
+class ActivityStreak(models.Model):
+    """
+    Precomputed learning streak and engagement totals of a learner
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='activity_streak')
+    
+    # Streaks (current_streak is the run of consecutive days ending on last_active_day)
+    current_streak = models.PositiveIntegerField(default=0)
+    longest_streak = models.PositiveIntegerField(default=0)
+    streak_started_on = models.DateField(null=True, blank=True)
+    last_active_day = models.DateField(null=True, blank=True)
+    
+    # Engagement Totals
+    days_active = models.PositiveIntegerField(default=0)
+    session_count = models.PositiveIntegerField(default=0)
+    total_events = models.PositiveIntegerField(default=0)
+    total_minutes = models.FloatField(default=0.0)
+    
+    # Timestamps
+    last_activity_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'progress_activity_streak'
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.current_streak} day streak"
+    
+    def streak_on(self, day) -> int:
+        """Streak still alive on a day: the learner was active that day or the day before"""
+        if self.last_active_day is None or (day - self.last_active_day).days > 1:
+            return 0
+        return self.current_streak
+
+
+class LearnerMetricSnapshot(models.Model):
+    """
+    A learner's comparison metrics within one cohort, refreshed by CohortStatsService
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='metric_snapshots')
+    scope = models.CharField(max_length=36, blank=True)  # Learning path id, or blank for the whole institution
+    
+    # Comparison Metrics
+    completion_rate = models.FloatField(default=0.0)  # Percentage of started modules completed
+    average_score = models.FloatField(null=True, blank=True)
+    learning_velocity = models.PositiveIntegerField(default=0)  # Modules worked on in the velocity window
+    engagement_level = models.PositiveIntegerField(default=0)  # Distinct days with module activity
+    
+    computed_at = models.DateTimeField()
+    
+    class Meta:
+        db_table = 'progress_learner_metric_snapshot'
+        unique_together = ['user', 'scope']
+        indexes = [
+            models.Index(fields=['scope']),
+            models.Index(fields=['computed_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.scope or 'institution'}"
+
+
+class CohortMetricDistribution(models.Model):
+    """
+    Sorted sample of one metric over a cohort, for O(log n) percentile lookups
+    
+    Holds every value for small cohorts and evenly spaced order statistics
+    for large ones.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    scope = models.CharField(max_length=36, blank=True)  # Learning path id, or blank for the whole institution
+    metric = models.CharField(max_length=50)
+    
+    # Distribution
+    sample_size = models.PositiveIntegerField(default=0)
+    mean = models.FloatField(default=0.0)
+    points = models.JSONField(default=list)  # Ascending values or quantile points
+    
+    refreshed_at = models.DateTimeField()
+    
+    class Meta:
+        db_table = 'progress_cohort_metric_distribution'
+        unique_together = ['scope', 'metric']
+    
+    def __str__(self):
+        return f"{self.scope or 'institution'} - {self.metric} ({self.sample_size} learners)"
+
+
+class LearnerSegmentation(models.Model):
+    """
+    Learner segmentation fitted offline by LearnerSegmentationService
+    
+    Stores what requests need to segment learners without refitting: the
+    feature scaling, the centroids and a profile of every segment.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    scope = models.CharField(max_length=50, unique=True)  # 'global' or 'path-<learning path id>'
+    
+    # Fitted Model
+    feature_names = models.JSONField(default=list)
+    scaler_mean = models.JSONField(default=list)
+    scaler_scale = models.JSONField(default=list)
+    centroids = models.JSONField(default=list)  # One row of scaled feature values per segment
+    
+    # Segment Profiles and Quality
+    profiles = models.JSONField(default=list)
+    feature_importance = models.JSONField(default=dict)
+    sample_size = models.PositiveIntegerField(default=0)
+    silhouette = models.FloatField(null=True, blank=True)
+    inertia = models.FloatField(default=0.0)
+    
+    trained_at = models.DateTimeField()
+    
+    class Meta:
+        db_table = 'progress_learner_segmentation'
+    
+    def __str__(self):
+        return f"{self.scope}: {len(self.centroids)} segments from {self.sample_size} learners"
+
+
+class LearnerSegment(models.Model):
+    """
+    A learner's segment in a segmentation, from training or nearest centroid assignment
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='learner_segments')
+    scope = models.CharField(max_length=50)
+    segment = models.PositiveSmallIntegerField()
+    distance = models.FloatField(default=0.0)  # Distance to the segment centroid in scaled feature space
+    assigned_at = models.DateTimeField()
+    
+    class Meta:
+        db_table = 'progress_learner_segment'
+        unique_together = ['user', 'scope']
+        indexes = [
+            models.Index(fields=['scope', 'segment']),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.scope} segment {self.segment}"
@@ -0,0 +1,304 @@
+# JAC Interactive Learning Platform - Core backend implementation by Cavin Otieno
+
+"""
+Activity Rollup Service - JAC Learning Platform
+
+Maintains the per-learner daily activity rollup (DailyActivity) and the
+precomputed streak and engagement totals (ActivityStreak) that back
+streaks, days active and session counts.
+
+Every tracked activity (a completed module or a completed assessment
+attempt) is counted once, when it completes. It updates one DailyActivity
+row and the learner's ActivityStreak row under a row lock, so reading a streak is a single primary key lookup
+instead of a scan over the learner's history. A learner without a
+summary yet is rebuilt from their history on first read.
+
+Any other module progress update marks its day active without counting
+an event, so studying a module without finishing it still keeps a streak
+alive and counts towards days active, as the progress rows always did.
+
+Author: Cavin Otieno
+Created: 2025-11-26
+"""
+
+import logging
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import DailyActivity, ActivityStreak
+from apps.learning.models import UserModuleProgress, AssessmentAttempt as LearningAssessmentAttempt
+from apps.assessments.models import AssessmentAttempt
+
+logger = logging.getLogger(__name__)
+
+
+def duration_minutes(value) -> float:
+    """Minutes in a DurationField value (legacy rows may hold a bare 0)"""
+    if isinstance(value, timedelta):
+        return max(value.total_seconds() / 60, 0.0)
+    return 0.0
+
+
+def score_percentage(score: Optional[float], max_score: Optional[float]) -> Optional[float]:
+    """Assessment score as a percentage of its maximum"""
+    if score is None:
+        return None
+    if max_score:
+        return score / max_score * 100
+    return score
+
+
+def count_streaks(days: Iterable[date]) -> Tuple[int, Optional[date], int]:
+    """
+    Streaks in a set of active days.
+
+    Returns:
+        (run of consecutive days ending on the latest day, first day of that
+        run, longest run)
+    """
+    current, started_on, longest, previous = 0, None, 0, None
+    for day in sorted(set(days)):
+        if previous is not None and (day - previous).days == 1:
+            current += 1
+        else:
+            current, started_on = 1, day
+        longest = max(longest, current)
+        previous = day
+    return current, started_on, longest
+
+
+class ActivityRollupService:
+    """
+    Incremental daily activity rollup and streak tracking.
+    """
+
+    def __init__(self):
+        progress_config = getattr(settings, 'PROGRESS_ACTIVITY_CONFIG', {})
+        self.session_gap = timedelta(minutes=progress_config.get('SESSION_GAP_MINUTES', 30))
+
+    def record_activity(self, user_id, occurred_at: Optional[datetime] = None, minutes: float = 0.0,
+                        score: Optional[float] = None) -> Optional[ActivityStreak]:
+        """
+        Add one tracked activity to the learner's rollup.
+
+        Args:
+            user_id: Learner's primary key
+            occurred_at: When the activity happened (defaults to now)
+            minutes: Learning time the activity added
+            score: Assessment percentage, if the activity was graded
+
+        Returns:
+            The learner's updated ActivityStreak, or None if the rollup could
+            not be updated (the activity itself is never affected)
+        """
+        occurred_at = occurred_at or timezone.now()
+        day = timezone.localdate(occurred_at)
+
+        try:
+            # Savepoint, so a rollup failure cannot break the caller's transaction
+            with transaction.atomic():
+                # Locking the summary serializes concurrent updates of one learner
+                summary, created = ActivityStreak.objects.select_for_update().get_or_create(user_id=user_id)
+                if created:
+                    # First activity tracked for this learner: build from history, which already holds it
+                    return self._rebuild_locked(summary)
+
+                new_session = (
+                    summary.last_activity_at is None
+                    or occurred_at - summary.last_activity_at > self.session_gap
+                )
+
+                daily, new_day = DailyActivity.objects.get_or_create(
+                    user_id=user_id, day=day,
+                    defaults={'first_activity_at': occurred_at, 'last_activity_at': occurred_at}
+                )
+                daily.events += 1
+                daily.minutes += minutes
+                daily.sessions += int(new_session)
+                if score is not None and (daily.best_score is None or score > daily.best_score):
+                    daily.best_score = score
+                daily.first_activity_at = min(daily.first_activity_at or occurred_at, occurred_at)
+                daily.last_activity_at = max(daily.last_activity_at or occurred_at, occurred_at)
+                daily.save()
+
+                summary.total_events += 1
+                summary.total_minutes += minutes
+                summary.session_count += int(new_session)
+                summary.last_activity_at = max(summary.last_activity_at or occurred_at, occurred_at)
+                if new_day:
+                    summary.days_active += 1
+                    self._advance_streak(summary, day)
+                summary.save()
+                return summary
+        except Exception as e:
+            logger.error(f"Error updating activity rollup for user {user_id}: {str(e)}")
+            return None
+
+    def record_study_day(self, user_id, occurred_at: Optional[datetime] = None) -> Optional[ActivityStreak]:
+        """
+        Mark the day of a module progress update active in the learner's rollup.
+
+        The day counts towards streaks and days active; events, minutes and
+        sessions are left to record_activity().
+
+        Args:
+            user_id: Learner's primary key
+            occurred_at: When the progress was updated (defaults to now)
+
+        Returns:
+            The learner's ActivityStreak, or None if the rollup could not be
+            updated (the progress itself is never affected)
+        """
+        occurred_at = occurred_at or timezone.now()
+        day = timezone.localdate(occurred_at)
+
+        try:
+            # Most updates fall on a day that is already active
+            if DailyActivity.objects.filter(user_id=user_id, day=day).exists():
+                return None
+            with transaction.atomic():
+                summary, created = ActivityStreak.objects.select_for_update().get_or_create(user_id=user_id)
+                if created:
+                    return self._rebuild_locked(summary)
+
+                _, new_day = DailyActivity.objects.get_or_create(user_id=user_id, day=day)
+                if new_day:
+                    summary.days_active += 1
+                    self._advance_streak(summary, day)
+                    summary.save()
+                return summary
+        except Exception as e:
+            logger.error(f"Error updating activity rollup for user {user_id}: {str(e)}")
+            return None
+
+    def get_summary(self, user_id) -> Optional[ActivityStreak]:
+        """Learner's streak and engagement totals, rebuilt from history if never tracked"""
+        summary = ActivityStreak.objects.filter(user_id=user_id).first()
+        if summary is None:
+            summary = self.rebuild(user_id)
+        return summary
+
+    def current_streak(self, user_id, as_of: Optional[date] = None) -> int:
+        """Days in the learner's live streak (active on as_of or the day before)"""
+        summary = self.get_summary(user_id)
+        if summary is None:
+            return 0
+        return summary.streak_on(as_of or timezone.localdate())
+
+    def rebuild(self, user_id) -> Optional[ActivityStreak]:
+        """
+        Recompute a learner's rollup from their progress and assessment history.
+
+        Used to backfill learners tracked before the rollup existed and to
+        repair a rollup after bulk changes that bypass model signals.
+        """
+        try:
+            with transaction.atomic():
+                summary, _ = ActivityStreak.objects.select_for_update().get_or_create(user_id=user_id)
+                return self._rebuild_locked(summary)
+        except Exception as e:
+            logger.error(f"Error rebuilding activity rollup for user {user_id}: {str(e)}")
+            return None
+
+    def _advance_streak(self, summary: ActivityStreak, day: date):
+        """Extend or restart the streak for a newly active day"""
+        last_day = summary.last_active_day
+        if last_day is not None and day < last_day:
+            # An earlier day was filled in (late event); recount from the rollup
+            days = DailyActivity.objects.filter(user_id=summary.user_id).values_list('day', flat=True)
+            current, started_on, longest = count_streaks(days)
+            summary.current_streak, summary.streak_started_on = current, started_on
+            summary.longest_streak = max(summary.longest_streak, longest)
+            return
+
+        if last_day is not None and (day - last_day).days == 1:
+            summary.current_streak += 1
+        else:
+            summary.current_streak = 1
+            summary.streak_started_on = day
+        summary.last_active_day = day
+        summary.longest_streak = max(summary.longest_streak, summary.current_streak)
+
+    def _rebuild_locked(self, summary: ActivityStreak) -> ActivityStreak:
+        user_id = summary.user_id
+        events = self._history_events(user_id)
+
+        days: Dict[date, Dict[str, Any]] = {}
+        session_count, last_at = 0, None
+        for occurred_at, minutes, score in events:
+            new_session = last_at is None or occurred_at - last_at > self.session_gap
+            last_at = occurred_at
+            session_count += int(new_session)
+
+            day = timezone.localdate(occurred_at)
+            daily = days.setdefault(day, {
+                'events': 0, 'minutes': 0.0, 'best_score': None, 'sessions': 0,
+                'first_activity_at': occurred_at, 'last_activity_at': occurred_at,
+            })
+            daily['events'] += 1
+            daily['minutes'] += minutes
+            daily['sessions'] += int(new_session)
+            daily['last_activity_at'] = occurred_at
+            if score is not None and (daily['best_score'] is None or score > daily['best_score']):
+                daily['best_score'] = score
+
+        for day in self._history_study_days(user_id):
+            days.setdefault(day, {
+                'events': 0, 'minutes': 0.0, 'best_score': None, 'sessions': 0,
+                'first_activity_at': None, 'last_activity_at': None,
+            })
+
+        DailyActivity.objects.filter(user_id=user_id).delete()
+        DailyActivity.objects.bulk_create([
+            DailyActivity(user_id=user_id, day=day, **values) for day, values in days.items()
+        ])
+
+        current, started_on, longest = count_streaks(days)
+        summary.current_streak = current
+        summary.streak_started_on = started_on
+        summary.longest_streak = longest
+        summary.last_active_day = max(days) if days else None
+        summary.days_active = len(days)
+        summary.session_count = session_count
+        summary.total_events = len(events)
+        summary.total_minutes = sum(values['minutes'] for values in days.values())
+        summary.last_activity_at = last_at
+        summary.save()
+        return summary
+
+    @staticmethod
+    def _history_study_days(user_id) -> List[date]:
+        """Days of the latest update of each of the learner's module progress rows"""
+        return [
+            timezone.localdate(updated_at)
+            for updated_at in UserModuleProgress.objects.filter(user_id=user_id).values_list('updated_at', flat=True)
+        ]
+
+    @staticmethod
+    def _history_events(user_id) -> List[Tuple[datetime, float, Optional[float]]]:
+        """(time, minutes, score percentage) of every tracked activity, oldest first"""
+        events = [
+            (completed_at, duration_minutes(time_spent), None)
+            for completed_at, time_spent in UserModuleProgress.objects.filter(
+                user_id=user_id, completed_at__isnull=False
+            ).values_list('completed_at', 'time_spent')
+        ]
+        events.extend(
+            (completed_at, duration_minutes(time_spent), score_percentage(score, max_score))
+            for completed_at, time_spent, score, max_score in LearningAssessmentAttempt.objects.filter(
+                user_id=user_id, completed_at__isnull=False
+            ).values_list('completed_at', 'time_spent', 'score', 'max_score')
+        )
+        events.extend(
+            (completed_at, duration_minutes(completed_at - started_at) if started_at else 0.0,
+             score_percentage(score, max_score))
+            for completed_at, started_at, score, max_score in AssessmentAttempt.objects.filter(
+                user_id=user_id, completed_at__isnull=False
+            ).values_list('completed_at', 'started_at', 'score', 'max_score')
+        )
+        events.sort(key=lambda event: event[0])
+        return events
@@ -0,0 +1,263 @@
+# JAC Interactive Learning Platform - Core backend implementation by Cavin Otieno
+
+"""
+Analytics Data Context - JAC Learning Platform
+
+Per-request snapshot of one learner's history for the predictive analytics
+services. The learner's module progress and assessment attempts are loaded
+with one query each and every analysis filters those rows in memory instead
+of re-querying them.
+
+The context also memoizes whole analyses, so analyses that build on each
+other (success probability, completion time, retention risk and knowledge
+gaps all reuse the engagement and velocity analyses) compute them once per
+request, even when they run concurrently.
+
+Author: Cavin Otieno
+Created: 2025-11-26
+"""
+
+import time
+import logging
+import inspect
+import functools
+import threading
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from django.core.cache import cache
+from django.db.models import F
+
+from apps.learning.models import UserModuleProgress, AssessmentAttempt
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_CACHE_PREFIX = 'progress:analytics_watermark'
+
+# Numeric difficulty for Assessment.difficulty_level (modules use a 1-5 rating)
+ASSESSMENT_DIFFICULTY = {'beginner': 1, 'intermediate': 2, 'advanced': 3}
+
+PROGRESS_FIELDS = (
+    'id', 'module_id', 'status', 'time_spent', 'progress_percentage', 'overall_score',
+    'started_at', 'completed_at', 'created_at', 'updated_at',
+)
+
+ATTEMPT_FIELDS = (
+    'id', 'assessment_id', 'status', 'score', 'max_score', 'attempt_number', 'is_passed',
+    'started_at', 'completed_at', 'time_spent',
+)
+
+
+def analytics_watermark(user_id) -> str:
+    """
+    Current data watermark of a learner.
+
+    The watermark changes whenever the learner's progress or assessment data
+    is saved, so it can be part of any cache key derived from that data.
+    Watermarks are timestamps rather than counters, so an evicted watermark
+    never comes back with a value that old cache entries were stored under.
+    """
+    key = f'{WATERMARK_CACHE_PREFIX}:{user_id}'
+    try:
+        watermark = cache.get(key)
+        if watermark is None:
+            watermark = str(time.time_ns())
+            if not cache.add(key, watermark, None):
+                watermark = cache.get(key) or watermark
+        return watermark
+    except Exception as e:
+        logger.warning(f'Analytics watermark unavailable: {str(e)}')
+        return str(time.time_ns())
+
+
+def advance_analytics_watermark(user_id):
+    """Invalidate everything cached from a learner's data."""
+    try:
+        cache.set(f'{WATERMARK_CACHE_PREFIX}:{user_id}', str(time.time_ns()), None)
+    except Exception as e:
+        logger.warning(f'Could not advance analytics watermark for user {user_id}: {str(e)}')
+
+
+def _within(value: Optional[datetime], start: Optional[datetime], end: Optional[datetime]) -> bool:
+    if value is None:
+        return False
+    if start is not None and value < start:
+        return False
+    if end is not None and value >= end:
+        return False
+    return True
+
+
+class AnalyticsDataContext:
+    """
+    One learner's progress and assessment history, loaded once.
+
+    Progress rows carry the UserModuleProgress fields plus module_name,
+    difficulty_level (the module's 1-5 rating), learning_path_id and
+    performance_score (overall_score as a 0-1 fraction, or None).
+    Attempt rows carry the AssessmentAttempt fields plus topic,
+    difficulty_level and score as a 0-1 fraction of max_score, with the
+    original value in raw_score. Assessments are not tied to a learning
+    path, so attempts are never filtered by one.
+    """
+
+    def __init__(self, user, learning_path_id: Optional[int] = None):
+        self.user = user
+        self.learning_path_id = learning_path_id
+        self._lock = threading.Lock()
+        self._progress = None
+        self._attempts = None
+        self._results = {}
+
+    def matches(self, user, learning_path_id: Optional[int]) -> bool:
+        """Whether this context holds the data an analysis of (user, learning path) needs."""
+        return user.pk == self.user.pk and str(learning_path_id or '') == str(self.learning_path_id or '')
+
+    @property
+    def progress(self) -> List[Dict[str, Any]]:
+        """Module progress rows, oldest update first."""
+        if self._progress is None:
+            with self._lock:
+                if self._progress is None:
+                    self._progress = self._load_progress()
+        return self._progress
+
+    @property
+    def attempts(self) -> List[Dict[str, Any]]:
+        """Assessment attempt rows, oldest start first."""
+        if self._attempts is None:
+            with self._lock:
+                if self._attempts is None:
+                    self._attempts = self._load_attempts()
+        return self._attempts
+
+    def progress_between(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                         field: str = 'updated_at', status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Progress rows whose timestamp falls in [start, end).
+
+        Args:
+            start: Inclusive lower bound, or None
+            end: Exclusive upper bound, or None
+            field: Timestamp field to compare
+            status: Only rows with this status
+        """
+        return [
+            row for row in self.progress
+            if _within(row[field], start, end) and (status is None or row['status'] == status)
+        ]
+
+    def attempts_between(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                         field: str = 'completed_at') -> List[Dict[str, Any]]:
+        """Assessment attempts whose timestamp falls in [start, end)."""
+        return [row for row in self.attempts if _within(row[field], start, end)]
+
+    def historical_data(self) -> List[Dict[str, Any]]:
+        """Combined, date-ordered progress and assessment records for the ML models."""
+        return self.memoize(('historical_data',), self._build_historical_data)
+
+    def memoize(self, key, compute: Callable[[], Any]) -> Any:
+        """
+        Compute a value once per context.
+
+        Concurrent callers asking for the same key wait for the first one
+        instead of computing it again.
+        """
+        with self._lock:
+            future = self._results.get(key)
+            owner = future is None
+            if owner:
+                future = self._results[key] = Future()
+
+        if owner:
+            try:
+                future.set_result(compute())
+            except BaseException as e:
+                future.set_exception(e)
+        return future.result()
+
+    def _load_progress(self) -> List[Dict[str, Any]]:
+        query = UserModuleProgress.objects.filter(user=self.user)
+        if self.learning_path_id:
+            query = query.filter(module__learning_path_id=self.learning_path_id)
+
+        rows = list(query.order_by('updated_at').values(
+            *PROGRESS_FIELDS,
+            module_name=F('module__title'),
+            difficulty_level=F('module__difficulty_rating'),
+            learning_path_id=F('module__learning_path_id'),
+        ))
+        for row in rows:
+            row['performance_score'] = row['overall_score'] / 100 if row['overall_score'] is not None else None
+        return rows
+
+    def _load_attempts(self) -> List[Dict[str, Any]]:
+        rows = list(AssessmentAttempt.objects.filter(user=self.user).order_by('started_at').values(
+            *ATTEMPT_FIELDS,
+            topic=F('assessment__title'),
+            assessment_difficulty=F('assessment__difficulty_level'),
+        ))
+        for row in rows:
+            row['raw_score'] = row['score']
+            row['score'] = (row['score'] or 0) / row['max_score'] if row['max_score'] else 0
+            row['difficulty_level'] = ASSESSMENT_DIFFICULTY.get(row.pop('assessment_difficulty'), 1)
+        return rows
+
+    def _build_historical_data(self) -> List[Dict[str, Any]]:
+        records = []
+        for row in self.progress:
+            records.append({
+                'date': row['updated_at'].date(),
+                'type': 'progress',
+                'module_id': row['module_id'],
+                'status': row['status'],
+                'score': row['progress_percentage'],
+                'time_spent': row['time_spent'].total_seconds() / 60 if row['time_spent'] else 0,
+                'difficulty_level': row['difficulty_level'] or 1
+            })
+
+        for row in self.attempts:
+            if row['completed_at'] is None:
+                continue
+            records.append({
+                'date': row['completed_at'].date(),
+                'type': 'assessment',
+                'module_id': row['assessment_id'],
+                'score': row['raw_score'] or 0,
+                'max_score': row['max_score'],
+                'time_taken': row['time_spent'].total_seconds() / 60 if row['time_spent'] else 0,
+                'attempts': row['attempt_number'],
+                'difficulty_level': row['difficulty_level']
+            })
+
+        return sorted(records, key=lambda record: record['date'])
+
+
+def memoized_analysis(method):
+    """
+    Share an analysis through the service's data context.
+
+    When the service is bound to a context for the same learner and learning
+    path, the analysis runs once per distinct set of arguments (defaults
+    included) and later calls reuse its result.
+    """
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        arguments = dict(bound.arguments)
+        arguments.pop('self')
+
+        context = self.data_context
+        if context is None or not context.matches(arguments['user'], arguments.get('learning_path_id')):
+            return method(self, *args, **kwargs)
+
+        key = (method.__name__,) + tuple(
+            (name, value) for name, value in sorted(arguments.items()) if name != 'user'
+        )
+        return context.memoize(key, lambda: method(self, *args, **kwargs))
+
+    return wrapper
@@ -17,7 +17,9 @@ from typing import Dict, Any, List
 from datetime import datetime, timedelta
 from django.conf import settings
 from django.utils import timezone
-from django.contrib.auth.models import User
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.db import connection, close_old_connections
 from django.db.models import Q, Count, Avg, F
 from django.core.management.base import BaseCommand
 
@@ -26,6 +28,40 @@ from apps.learning.models import UserModuleProgress, AssessmentAttempt
 from .analytics_service import AnalyticsService
 from .realtime_monitoring_service import RealtimeMonitoringService
 
+User = get_user_model()
+
+# Learners whose assessments completed since a date trip a performance alert,
+# after a user id. Per learner, most recent first: the average of the last 3
+# scores, the average of the 3 before (or the latest score when there are at
+# most 3), and how many of the last 3 scores in a row are below the threshold.
+PERFORMANCE_SCAN_SQL = """
+    WITH ranked AS (
+        SELECT user_id, score,
+               ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY completed_at DESC) AS rn,
+               COUNT(*) OVER (PARTITION BY user_id) AS attempts
+        FROM {attempts}
+        WHERE status = %(status)s AND completed_at >= %(since)s
+          AND score IS NOT NULL AND user_id > %(after_user_id)s
+    ), trends AS (
+        SELECT user_id,
+               AVG(CASE WHEN rn <= 3 THEN score END) AS recent_avg,
+               AVG(CASE WHEN (attempts > 3 AND rn BETWEEN 4 AND 6) OR (attempts <= 3 AND rn = 1)
+                        THEN score END) AS older_avg,
+               COALESCE(
+                   MIN(CASE WHEN rn <= 3 AND score >= %(score_threshold)s THEN rn END) - 1,
+                   CASE WHEN MAX(attempts) < 3 THEN MAX(attempts) ELSE 3 END
+               ) AS low_run
+        FROM ranked
+        WHERE attempts >= 2 AND rn <= 6
+        GROUP BY user_id
+    )
+    SELECT user_id, recent_avg, older_avg, low_run
+    FROM trends
+    WHERE (recent_avg < %(score_threshold)s AND recent_avg < older_avg) OR low_run >= %(consecutive)s
+    ORDER BY user_id
+    LIMIT %(limit)s
+"""
+
 
 class BackgroundMonitoringService:
     """
@@ -34,9 +70,10 @@ class BackgroundMonitoringService:
     
     def __init__(self):
         self.analytics_service = AnalyticsService()
-        self.realtime_service = RealtimeMonitoringService()
+        self.realtime_service = RealtimeMonitoringService.get_instance()
         self.monitoring_active = False
         self.monitoring_tasks = []
+        self.scan_chunk_size = getattr(settings, 'PROGRESS_MONITORING_CONFIG', {}).get('SCAN_CHUNK_SIZE', 1000)
         
         # Alert thresholds
         self.alert_thresholds = {
@@ -118,181 +155,177 @@ class BackgroundMonitoringService:
                 await asyncio.sleep(300)  # Wait 5 minutes on error
     
     async def _monitor_user_performance(self) -> None:
-        """Monitor user performance for potential issues"""
+        """Raise performance alerts for every learner whose recent scores trip a threshold"""
         try:
-            # Get all active users (users with recent activity)
-            active_users = User.objects.filter(
-                learning_assessment_attempts__completed_at__gte=timezone.now() - timedelta(days=30)
-            ).distinct()
-            
-            for user in active_users:
-                await self._check_user_performance_trends(user)
-                
+            created = await sync_to_async(self._sweep, thread_sensitive=False)(
+                self._performance_alert_candidates, self._performance_alerts
+            )
+            print(f"Created {created} performance alerts")
         except Exception as e:
             print(f"Error monitoring user performance: {e}")
     
-    async def _check_user_performance_trends(self, user: User) -> None:
-        """Check individual user's performance trends"""
-        try:
-            # Get recent assessment performance
-            recent_assessments = AssessmentAttempt.objects.filter(
-                user=user,
-                completed_at__gte=timezone.now() - timedelta(days=7),
-                status='completed'
-            ).order_by('-completed_at')
-            
-            if recent_assessments.count() < 2:
-                return
-            
-            # Analyze performance trends
-            scores = [a.score for a in recent_assessments if a.score is not None]
-            
-            if len(scores) < 2:
-                return
-            
-            # Check for performance decline
-            recent_scores = scores[:3]  # Last 3 scores
-            older_scores = scores[3:6] if len(scores) > 3 else scores[:max(1, len(scores)//2)]
-            
-            if recent_scores and older_scores:
-                recent_avg = sum(recent_scores) / len(recent_scores)
-                older_avg = sum(older_scores) / len(older_scores)
-                
-                decline_threshold = self.alert_thresholds['performance_decline']['score_threshold']
-                
-                if recent_avg < decline_threshold and recent_avg < older_avg:
-                    await self._trigger_performance_alert(user, recent_avg, older_avg)
-            
-            # Check for consecutive low scores
-            consecutive_low_scores = 0
-            for score in recent_scores:
-                if score < decline_threshold:
-                    consecutive_low_scores += 1
-                else:
-                    break
-            
-            if consecutive_low_scores >= self.alert_thresholds['performance_decline']['consecutive_days']:
-                await self._trigger_consecutive_low_scores_alert(user, consecutive_low_scores)
-                
-        except Exception as e:
-            print(f"Error checking performance trends for user {user.id}: {e}")
+    def _performance_alert_candidates(self, after_user_id, limit: int) -> List[Dict[str, Any]]:
+        """
+        Learners after a user id whose last week of assessments trips a
+        performance threshold, in one window-function query
+        """
+        thresholds = self.alert_thresholds['performance_decline']
+        with connection.cursor() as cursor:
+            cursor.execute(PERFORMANCE_SCAN_SQL.format(attempts=AssessmentAttempt._meta.db_table), {
+                'status': 'completed',
+                'since': timezone.now() - timedelta(days=7),
+                'after_user_id': after_user_id,
+                'score_threshold': thresholds['score_threshold'],
+                'consecutive': thresholds['consecutive_days'],
+                'limit': limit,
+            })
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
     
-    async def _trigger_performance_alert(self, user: User, recent_avg: float, older_avg: float) -> None:
-        """Trigger performance decline alert"""
-        alert_message = f"Performance decline detected: Current average {recent_avg:.1f}% vs previous {older_avg:.1f}%"
+    def _performance_alerts(self, candidate: Dict[str, Any]) -> List[ProgressNotification]:
+        thresholds = self.alert_thresholds['performance_decline']
+        alerts = []
+        recent_avg, older_avg = candidate['recent_avg'], candidate['older_avg']
         
-        await self._create_progress_notification(
-            user=user,
-            notification_type='progress_alert',
-            priority='high',
-            title='Performance Decline Alert',
-            message=alert_message,
-            data={
-                'recent_average': recent_avg,
-                'previous_average': older_avg,
-                'decline_amount': older_avg - recent_avg
-            }
-        )
-    
-    async def _trigger_consecutive_low_scores_alert(self, user: User, consecutive_count: int) -> None:
-        """Trigger consecutive low scores alert"""
-        alert_message = f"Low performance detected in {consecutive_count} consecutive assessments. Consider additional practice."
+        # Check for performance decline
+        if recent_avg < thresholds['score_threshold'] and recent_avg < older_avg:
+            alerts.append(self._progress_notification(
+                user_id=candidate['user_id'],
+                priority='high',
+                title='Performance Decline Alert',
+                message=f"Performance decline detected: Current average {recent_avg:.1f}% vs previous {older_avg:.1f}%",
+                data={
+                    'recent_average': recent_avg,
+                    'previous_average': older_avg,
+                    'decline_amount': older_avg - recent_avg
+                }
+            ))
         
-        await self._create_progress_notification(
-            user=user,
-            notification_type='progress_alert',
-            priority='medium',
-            title='Consistent Low Performance',
-            message=alert_message,
-            data={
-                'consecutive_low_scores': consecutive_count,
-                'suggested_action': 'additional_practice'
-            }
-        )
+        # Check for consecutive low scores
+        if candidate['low_run'] >= thresholds['consecutive_days']:
+            alerts.append(self._progress_notification(
+                user_id=candidate['user_id'],
+                priority='medium',
+                title='Consistent Low Performance',
+                message=f"Low performance detected in {candidate['low_run']} consecutive assessments. Consider additional practice.",
+                data={
+                    'consecutive_low_scores': candidate['low_run'],
+                    'suggested_action': 'additional_practice'
+                }
+            ))
+        return alerts
     
     async def _monitor_user_engagement(self) -> None:
-        """Monitor user engagement levels"""
+        """Raise engagement alerts for every learner whose daily activity trips a threshold"""
         try:
-            # Get users with activity in the last 30 days
-            active_users = User.objects.filter(
-                learning_module_progress__updated_at__gte=timezone.now() - timedelta(days=30)
-            ).distinct()
-            
-            for user in active_users:
-                await self._check_user_engagement(user)
-                
+            created = await sync_to_async(self._sweep, thread_sensitive=False)(
+                self._engagement_alert_candidates, self._engagement_alerts
+            )
+            print(f"Created {created} engagement alerts")
         except Exception as e:
             print(f"Error monitoring user engagement: {e}")
     
-    async def _check_user_engagement(self, user: User) -> None:
-        """Check individual user's engagement levels"""
-        try:
-            # Calculate daily activity for the last 7 days
-            daily_activities = {}
-            for i in range(7):
-                date = (timezone.now() - timedelta(days=i)).date()
-                activities_count = UserModuleProgress.objects.filter(
-                    user=user,
-                    updated_at__date=date
-                ).count()
-                daily_activities[date] = activities_count
-            
-            # Check for engagement drop
-            recent_days_activities = sum(daily_activities[date] for date in list(daily_activities.keys())[:3])
-            older_days_activities = sum(daily_activities[date] for date in list(daily_activities.keys())[3:6])
-            
-            activity_threshold = self.alert_thresholds['engagement_drop']['activity_threshold']
-            consecutive_days = self.alert_thresholds['engagement_drop']['consecutive_days']
-            
-            # Check for multiple consecutive days with low activity
-            consecutive_low_days = 0
-            for date in sorted(daily_activities.keys(), reverse=True):
-                if daily_activities[date] < activity_threshold:
-                    consecutive_low_days += 1
-                else:
-                    break
-            
-            if consecutive_low_days >= consecutive_days:
-                await self._trigger_engagement_alert(user, consecutive_low_days)
-            
-            # Check for overall engagement drop
-            if recent_days_activities == 0 and older_days_activities > 0:
-                await self._trigger_engagement_drop_alert(user, older_days_activities)
-                
-        except Exception as e:
-            print(f"Error checking user engagement for user {user.id}: {e}")
-    
-    async def _trigger_engagement_alert(self, user: User, consecutive_low_days: int) -> None:
-        """Trigger engagement alert for consecutive low activity"""
-        alert_message = f"Low engagement detected for {consecutive_low_days} consecutive days. Consider setting a regular study schedule."
+    def _engagement_alert_candidates(self, after_user_id, limit: int) -> List[Dict[str, Any]]:
+        """
+        Learners after a user id, active in the last 30 days, whose activity
+        over the last 7 days trips an engagement threshold, in one grouped query
+        """
+        thresholds = self.alert_thresholds['engagement_drop']
+        activity_threshold = thresholds['activity_threshold']
+        today = timezone.localdate()
         
-        await self._create_progress_notification(
-            user=user,
-            notification_type='progress_alert',
-            priority='medium',
-            title='Engagement Alert',
-            message=alert_message,
-            data={
-                'consecutive_low_days': consecutive_low_days,
-                'suggested_action': 'schedule_regular_study'
-            }
+        # Activities on each of the last 7 days, today first
+        daily_activity = {
+            f'day_{i}': Count('id', filter=Q(updated_at__date=today - timedelta(days=i)))
+            for i in range(7)
+        }
+        consecutive_low = Q(**{f'day_{i}__lt': activity_threshold for i in range(thresholds['consecutive_days'])})
+        activity_drop = Q(day_0=0, day_1=0, day_2=0) & (Q(day_3__gt=0) | Q(day_4__gt=0) | Q(day_5__gt=0))
+        
+        candidates = (
+            UserModuleProgress.objects
+            .filter(updated_at__gte=timezone.now() - timedelta(days=30), user_id__gt=after_user_id)
+            .values('user_id')
+            .annotate(**daily_activity)
+            .filter(consecutive_low | activity_drop)
+            .order_by('user_id')[:limit]
         )
+        return list(candidates)
     
-    async def _trigger_engagement_drop_alert(self, user: User, previous_activity: int) -> None:
-        """Trigger engagement drop alert"""
-        alert_message = f"Learning activity has dropped significantly. Previously averaging {previous_activity/3:.1f} activities per day."
+    def _engagement_alerts(self, candidate: Dict[str, Any]) -> List[ProgressNotification]:
+        thresholds = self.alert_thresholds['engagement_drop']
+        daily_activity = [candidate[f'day_{i}'] for i in range(7)]
+        alerts = []
         
-        await self._create_progress_notification(
-            user=user,
-            notification_type='progress_alert',
-            priority='medium',
-            title='Activity Drop Alert',
-            message=alert_message,
-            data={
-                'previous_daily_average': previous_activity / 3,
-                'current_activity': 0
-            }
+        # Check for multiple consecutive days with low activity
+        consecutive_low_days = next(
+            (i for i, count in enumerate(daily_activity) if count >= thresholds['activity_threshold']),
+            len(daily_activity)
         )
+        if consecutive_low_days >= thresholds['consecutive_days']:
+            alerts.append(self._progress_notification(
+                user_id=candidate['user_id'],
+                priority='medium',
+                title='Engagement Alert',
+                message=f"Low engagement detected for {consecutive_low_days} consecutive days. Consider setting a regular study schedule.",
+                data={
+                    'consecutive_low_days': consecutive_low_days,
+                    'suggested_action': 'schedule_regular_study'
+                }
+            ))
+        
+        # Check for overall engagement drop
+        recent_days_activities = sum(daily_activity[:3])
+        older_days_activities = sum(daily_activity[3:6])
+        if recent_days_activities == 0 and older_days_activities > 0:
+            alerts.append(self._progress_notification(
+                user_id=candidate['user_id'],
+                priority='medium',
+                title='Activity Drop Alert',
+                message=f"Learning activity has dropped significantly. Previously averaging {older_days_activities/3:.1f} activities per day.",
+                data={
+                    'previous_daily_average': older_days_activities / 3,
+                    'current_activity': 0
+                }
+            ))
+        return alerts
+    
+    def _sweep(self, find_candidates, build_alerts) -> int:
+        """
+        Page through alert candidates by user id and bulk insert their alerts
+        
+        A learner who still has an unexpired alert with the same title is
+        not alerted again.
+        
+        Returns:
+            Number of alerts created
+        """
+        created = 0
+        after_user_id = 0
+        try:
+            while True:
+                candidates = find_candidates(after_user_id, self.scan_chunk_size)
+                if not candidates:
+                    return created
+                after_user_id = candidates[-1]['user_id']
+                
+                alerts = [alert for candidate in candidates for alert in build_alerts(candidate)]
+                open_alerts = set(
+                    ProgressNotification.objects.filter(
+                        user_id__in=[candidate['user_id'] for candidate in candidates],
+                        notification_type='progress_alert',
+                        title__in={alert.title for alert in alerts},
+                        expires_at__gt=timezone.now()
+                    ).values_list('user_id', 'title')
+                )
+                alerts = [alert for alert in alerts if (alert.user_id, alert.title) not in open_alerts]
+                ProgressNotification.objects.bulk_create(alerts, batch_size=1000)
+                created += len(alerts)
+                
+                if len(candidates) < self.scan_chunk_size:
+                    return created
+        finally:
+            close_old_connections()
     
     async def _generate_daily_analytics(self) -> None:
         """Generate daily analytics for all active users"""
@@ -403,34 +436,28 @@ class BackgroundMonitoringService:
         except Exception as e:
             print(f"Error cleaning up old alerts: {e}")
     
-    async def _create_progress_notification(
+    def _progress_notification(
         self,
-        user: User,
-        notification_type: str,
+        user_id,
         priority: str,
         title: str,
         message: str,
         data: Dict[str, Any] = None
-    ) -> None:
-        """Create progress notification"""
-        try:
-            notification = ProgressNotification.objects.create(
-                user=user,
-                notification_type=notification_type,
-                priority=priority,
-                title=title,
-                message=message,
-                data=data or {},
-                is_sent=True,
-                sent_at=timezone.now(),
-                expires_at=timezone.now() + timedelta(days=7)  # Expire after 7 days
-            )
-            
-            # Send real-time notification if user is active
-            # This would integrate with the WebSocket service
-            
-        except Exception as e:
-            print(f"Error creating progress notification: {e}")
+    ) -> ProgressNotification:
+        """Unsaved progress alert, sent and expiring after 7 days"""
+        now = timezone.now()
+        # Real-time delivery to active users would integrate with the WebSocket service
+        return ProgressNotification(
+            user_id=user_id,
+            notification_type='progress_alert',
+            priority=priority,
+            title=title,
+            message=message,
+            data=data or {},
+            is_sent=True,
+            sent_at=now,
+            expires_at=now + timedelta(days=7)  # Expire after 7 days
+        )
 
 
 class MonitoringManagementCommand(BaseCommand):
@@ -0,0 +1,214 @@
+# JAC Interactive Learning Platform - Core backend implementation by Cavin Otieno
+
+"""
+Cohort Statistics Service - JAC Learning Platform
+
+Materializes the metrics learners are compared on (completion rate,
+average score, learning velocity and engagement) for the whole
+institution and for each learning path, so peer comparisons and rankings
+read precomputed distributions instead of recomputing every learner.
+
+refresh() recomputes LearnerMetricSnapshot rows only for learners whose
+metrics changed since the previous refresh, with grouped aggregates, then
+re-sorts each affected cohort's values into a CohortMetricDistribution.
+A percentile is then a binary search over at most QUANTILE_POINTS values.
+
+Author: Cavin Otieno
+Created: 2025-11-26
+"""
+
+import bisect
+import logging
+from datetime import timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.db.models import Avg, Count, Max, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from ..models import LearnerMetricSnapshot, CohortMetricDistribution
+from apps.learning.models import UserModuleProgress, AssessmentAttempt
+
+logger = logging.getLogger(__name__)
+
+INSTITUTION = ''
+METRICS = ('completion_rate', 'average_score', 'learning_velocity', 'engagement_level')
+
+
+def percentile_in(points: List[float], value: float) -> int:
+    """Mid-rank percentile of a value among ascending points, O(log n)"""
+    if not points:
+        return 50
+    lower = bisect.bisect_left(points, value)
+    equal = bisect.bisect_right(points, value, lo=lower) - lower
+    return int(round((lower + 0.5 * equal) / len(points) * 100))
+
+
+def sketch(values: List[float], max_points: int) -> List[float]:
+    """Ascending values, thinned to evenly spaced order statistics past max_points"""
+    if len(values) <= max_points:
+        return values
+    last = len(values) - 1
+    return [values[round(i * last / (max_points - 1))] for i in range(max_points)]
+
+
+class CohortStatsService:
+    """
+    Refreshes and queries the materialized cohort metric distributions
+    """
+
+    def __init__(self):
+        cohort_config = getattr(settings, 'PROGRESS_COHORT_CONFIG', {})
+        self.quantile_points = cohort_config.get('QUANTILE_POINTS', 2048)
+        self.velocity_window = timedelta(days=cohort_config.get('VELOCITY_WINDOW_DAYS', 30))
+
+    def refresh(self, full: bool = False) -> Dict[str, int]:
+        """
+        Bring snapshots and distributions up to date
+
+        Args:
+            full: Recompute every learner instead of only those whose
+                activity changed since the last refresh
+
+        Returns:
+            Number of learners recomputed and distributions rebuilt
+        """
+        started_at = timezone.now()
+        last_refresh = None if full else LearnerMetricSnapshot.objects.aggregate(
+            latest=Max('computed_at')
+        )['latest']
+
+        user_ids = self._changed_users(last_refresh, started_at)
+        if user_ids is not None and not user_ids:
+            return {'learners': 0, 'distributions': 0}
+
+        learners, scopes = self._recompute(user_ids, started_at)
+        distributions = self._rebuild_distributions(scopes, started_at)
+
+        logger.info(f"Refreshed cohort stats: {learners} learners, {distributions} distributions")
+        return {'learners': learners, 'distributions': distributions}
+
+    def get_distributions(self, scope: str = INSTITUTION) -> Dict[str, CohortMetricDistribution]:
+        """Distributions of every metric in a cohort, by metric name"""
+        return {
+            distribution.metric: distribution
+            for distribution in CohortMetricDistribution.objects.filter(scope=scope or INSTITUTION)
+        }
+
+    def rank(self, metrics: Dict[str, float], scope: str = INSTITUTION) -> Dict[str, int]:
+        """Percentile of each given metric value within a cohort"""
+        distributions = self.get_distributions(scope)
+        return {
+            metric: percentile_in(distributions[metric].points, value)
+            for metric, value in metrics.items()
+            if value is not None and metric in distributions and distributions[metric].sample_size
+        }
+
+    def summarize(self, distribution: CohortMetricDistribution) -> Dict[str, float]:
+        """Mean, median and range of a cohort metric"""
+        points = distribution.points
+        return {
+            'mean': distribution.mean,
+            'median': points[len(points) // 2] if points else 0.0,
+            'min': points[0] if points else 0.0,
+            'max': points[-1] if points else 0.0,
+            'sample_size': distribution.sample_size,
+        }
+
+    def _changed_users(self, last_refresh, now) -> Optional[Set[Any]]:
+        """Learners whose metrics may differ from their snapshots; None means everyone"""
+        if last_refresh is None:
+            return None
+
+        # New activity, plus activity ageing out of the velocity window since the last refresh
+        progress_users = UserModuleProgress.objects.filter(
+            Q(updated_at__gte=last_refresh)
+            | Q(updated_at__gte=last_refresh - self.velocity_window, updated_at__lt=now - self.velocity_window)
+        ).values_list('user_id', flat=True).distinct()
+        attempt_users = AssessmentAttempt.objects.filter(
+            Q(started_at__gte=last_refresh) | Q(completed_at__gte=last_refresh)
+        ).values_list('user_id', flat=True).distinct()
+        # Learners whose progress was deleted have nothing left that changed
+        orphaned_users = LearnerMetricSnapshot.objects.filter(scope=INSTITUTION).exclude(
+            user_id__in=UserModuleProgress.objects.values('user_id')
+        ).values_list('user_id', flat=True)
+        return set(progress_users) | set(attempt_users) | set(orphaned_users)
+
+    def _recompute(self, user_ids: Optional[Set[Any]], now) -> Tuple[int, Set[str]]:
+        """Upsert the snapshots of some or all learners; returns the learner count and scopes touched"""
+        progress = UserModuleProgress.objects.all()
+        attempts = AssessmentAttempt.objects.filter(score__isnull=False)
+        if user_ids is not None:
+            progress = progress.filter(user_id__in=user_ids)
+            attempts = attempts.filter(user_id__in=user_ids)
+
+        metric_aggregates = {
+            'total': Count('id'),
+            'completed': Count('id', filter=Q(status='completed')),
+            'recent': Count('id', filter=Q(updated_at__gte=now - self.velocity_window)),
+            'active_days': Count(TruncDate('updated_at'), distinct=True),
+        }
+        # Scores are not tied to a learning path, so every cohort uses the overall average
+        average_scores = dict(attempts.values_list('user_id').annotate(average=Avg('score')).order_by())
+
+        rows = [
+            (INSTITUTION, row) for row in progress.values('user_id').annotate(**metric_aggregates).order_by()
+        ] + [
+            (str(row['module__learning_path_id']), row)
+            for row in progress.values('user_id', 'module__learning_path_id').annotate(**metric_aggregates).order_by()
+        ]
+        snapshots = [
+            LearnerMetricSnapshot(
+                user_id=row['user_id'],
+                scope=scope,
+                completion_rate=row['completed'] / row['total'] * 100 if row['total'] else 0.0,
+                average_score=average_scores.get(row['user_id']),
+                learning_velocity=row['recent'],
+                engagement_level=row['active_days'],
+                computed_at=now,
+            )
+            for scope, row in rows
+        ]
+        LearnerMetricSnapshot.objects.bulk_create(
+            snapshots,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['user', 'scope'],
+            update_fields=[*METRICS, 'computed_at'],
+        )
+
+        # Snapshots of recomputed learners not rewritten here left their cohort
+        stale = LearnerMetricSnapshot.objects.filter(computed_at__lt=now)
+        if user_ids is not None:
+            stale = stale.filter(user_id__in=user_ids)
+        scopes = {snapshot.scope for snapshot in snapshots}
+        scopes.update(stale.values_list('scope', flat=True).distinct())
+        stale.delete()
+        return sum(1 for snapshot in snapshots if snapshot.scope == INSTITUTION), scopes
+
+    def _rebuild_distributions(self, scopes: Iterable[str], now) -> int:
+        """Re-sort the metric values of each scope into its distributions"""
+        distributions = []
+        for scope in scopes:
+            for metric in METRICS:
+                values = list(
+                    LearnerMetricSnapshot.objects.filter(scope=scope, **{f'{metric}__isnull': False})
+                    .order_by(metric).values_list(metric, flat=True)
+                )
+                distributions.append(CohortMetricDistribution(
+                    scope=scope,
+                    metric=metric,
+                    sample_size=len(values),
+                    mean=sum(values) / len(values) if values else 0.0,
+                    points=sketch([float(value) for value in values], self.quantile_points),
+                    refreshed_at=now,
+                ))
+        CohortMetricDistribution.objects.bulk_create(
+            distributions,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=['scope', 'metric'],
+            update_fields=['sample_size', 'mean', 'points', 'refreshed_at'],
+        )
+        return len(distributions)
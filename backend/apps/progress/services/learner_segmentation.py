@@ -0,0 +1,303 @@
+# JAC Interactive Learning Platform - Core backend implementation by Cavin Otieno
+
+"""
+Learner Segmentation - JAC Learning Platform
+
+Segments every active learner with MiniBatchKMeans, offline, through the
+train_learner_segments command (or its Celery task), and stores the result
+for PredictiveAnalyticsService.perform_learning_analytics_clustering.
+
+- The feature matrix of the whole population comes from two grouped
+  queries (module progress and assessment attempts per learner), not from
+  per-learner analyses.
+- Training stores the feature scaling, the centroids, a profile of each
+  segment and every learner's segment label.
+- Requests read the stored segmentation; a learner without a label is
+  assigned to the nearest centroid, which costs one learner's two queries.
+
+Author: Cavin Otieno
+Created: 2025-11-26
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Avg, Count, F, Max, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+try:
+    from sklearn.cluster import MiniBatchKMeans
+    from sklearn.metrics import silhouette_score
+    from sklearn.preprocessing import StandardScaler
+    SKLEARN_AVAILABLE = True
+except ImportError:
+    SKLEARN_AVAILABLE = False
+
+from ..models import LearnerSegmentation, LearnerSegment
+from .model_registry import GLOBAL_SCOPE, scope_for_path
+from apps.learning.models import UserModuleProgress, AssessmentAttempt
+
+logger = logging.getLogger(__name__)
+
+# Columns of the segmentation feature matrix
+SEGMENT_FEATURES = [
+    'completion_rate', 'avg_performance', 'activity_level', 'engagement_score',
+    'velocity_score', 'assessment_success_rate', 'retention_protection',
+]
+
+
+def segmentation_matrix(since: datetime, learning_path_id=None,
+                        user_ids: Optional[List[Any]] = None) -> Tuple[List[Any], np.ndarray]:
+    """
+    SEGMENT_FEATURES of the learners with module activity since a date
+
+    Returns:
+        Learner ids and the matching rows of the feature matrix
+    """
+    progress = UserModuleProgress.objects.filter(created_at__gte=since)
+    attempts = AssessmentAttempt.objects.filter(started_at__gte=since, score__isnull=False)
+    if learning_path_id:
+        progress = progress.filter(module__learning_path_id=learning_path_id)
+    if user_ids is not None:
+        progress = progress.filter(user_id__in=user_ids)
+        attempts = attempts.filter(user_id__in=user_ids)
+
+    rows = list(
+        progress.values('user_id').annotate(
+            modules=Count('id'),
+            completed=Count('id', filter=Q(status='completed')),
+            average_score=Avg('overall_score'),
+            active_days=Count(TruncDate('updated_at'), distinct=True),
+            last_activity=Max('updated_at'),
+        ).order_by('user_id')
+    )
+    assessments = {
+        row['user_id']: (row['attempts'], row['passed'])
+        for row in attempts.values('user_id').annotate(
+            attempts=Count('id'),
+            passed=Count('id', filter=Q(score__gte=F('passing_score'))),
+        ).order_by()
+    }
+
+    now = timezone.now()
+    window_days = max((now - since).total_seconds() / 86400, 1.0)
+    modules = np.array([row['modules'] for row in rows], dtype=float)
+    completed = np.array([row['completed'] for row in rows], dtype=float)
+    average_score = np.array([
+        row['average_score'] / 100 if row['average_score'] is not None else 0.5 for row in rows
+    ], dtype=float)
+    active_days = np.array([row['active_days'] for row in rows], dtype=float)
+    idle_days = np.array([
+        (now - row['last_activity']).total_seconds() / 86400 if row['last_activity'] else window_days
+        for row in rows
+    ], dtype=float)
+    attempted, passed = (
+        np.array([assessments.get(row['user_id'], (0, 0))[index] for row in rows], dtype=float)
+        for index in (0, 1)
+    )
+
+    matrix = np.column_stack([
+        completed / np.maximum(modules, 1),
+        average_score,
+        np.minimum(1.0, modules / 50),
+        np.minimum(1.0, active_days / window_days),
+        completed / (window_days / 7),  # Modules completed per week
+        np.where(attempted > 0, passed / np.maximum(attempted, 1), 0.5),
+        1 - np.clip(idle_days / window_days, 0.0, 1.0),
+    ]) if rows else np.empty((0, len(SEGMENT_FEATURES)))
+    return [row['user_id'] for row in rows], matrix
+
+
+class LearnerSegmentationService:
+    """
+    Trains, stores and applies learner segmentations
+    """
+
+    def __init__(self, analytics_service=None):
+        """
+        Args:
+            analytics_service: PredictiveAnalyticsService describing segments
+                and feature importance; only needed to train
+        """
+        analytics_config = getattr(settings, 'PREDICTIVE_ANALYTICS_CONFIG', {})
+        self.analytics_service = analytics_service
+        self.window = timedelta(days=analytics_config.get('SEGMENT_WINDOW_DAYS', 90))
+        self.min_learners = analytics_config.get('SEGMENT_MIN_LEARNERS', 10)
+        self.max_clusters = analytics_config.get('SEGMENT_MAX_CLUSTERS', 8)
+        self.batch_size = analytics_config.get('SEGMENT_BATCH_SIZE', 1024)
+        self.silhouette_sample = analytics_config.get('SEGMENT_SILHOUETTE_SAMPLE', 5000)
+        self.max_age = analytics_config.get('MODEL_MAX_AGE_DAYS', 7) * 86400
+
+    def train(self, learning_path_id=None, cluster_count: Optional[int] = None) -> Optional[LearnerSegmentation]:
+        """
+        Segment every active learner and store the segmentation and labels
+
+        Args:
+            learning_path_id: Segment activity in one learning path only
+            cluster_count: Number of segments, chosen by silhouette if None
+
+        Returns:
+            The stored segmentation, or None if there are too few learners
+        """
+        started_at = timezone.now()
+        user_ids, matrix = segmentation_matrix(started_at - self.window, learning_path_id)
+        if len(user_ids) < max(self.min_learners, 2):
+            return None
+
+        scaler = StandardScaler().fit(matrix)
+        scaled = scaler.transform(matrix)
+        cluster_count = min(cluster_count or self._choose_cluster_count(scaled), len(user_ids))
+        model = self._fit(scaled, cluster_count)
+        labels = model.predict(scaled)
+        distances = model.transform(scaled)[np.arange(len(labels)), labels]
+
+        silhouette = None
+        if len(np.unique(labels)) > 1:
+            silhouette = float(silhouette_score(
+                scaled, labels, sample_size=min(len(labels), self.silhouette_sample), random_state=42
+            ))
+
+        scope = scope_for_path(learning_path_id)
+        with transaction.atomic():
+            segmentation, _ = LearnerSegmentation.objects.update_or_create(
+                scope=scope,
+                defaults={
+                    'feature_names': SEGMENT_FEATURES,
+                    'scaler_mean': scaler.mean_.tolist(),
+                    'scaler_scale': scaler.scale_.tolist(),
+                    'centroids': model.cluster_centers_.tolist(),
+                    'profiles': self._profiles(scaled, labels, cluster_count, float(model.inertia_)),
+                    'feature_importance': self.analytics_service._analyze_feature_importance(
+                        scaled, labels, SEGMENT_FEATURES
+                    ),
+                    'sample_size': len(user_ids),
+                    'silhouette': silhouette,
+                    'inertia': float(model.inertia_),
+                    'trained_at': started_at,
+                }
+            )
+            LearnerSegment.objects.bulk_create(
+                [
+                    LearnerSegment(user_id=user_id, scope=scope, segment=int(label),
+                                   distance=float(distance), assigned_at=started_at)
+                    for user_id, label, distance in zip(user_ids, labels, distances)
+                ],
+                batch_size=2000,
+                update_conflicts=True,
+                unique_fields=['user', 'scope'],
+                update_fields=['segment', 'distance', 'assigned_at'],
+            )
+            # Learners no longer active in the window keep no label
+            LearnerSegment.objects.filter(scope=scope, assigned_at__lt=started_at).delete()
+
+        logger.info(f"Trained learner segmentation {scope}: {cluster_count} segments, {len(user_ids)} learners")
+        return segmentation
+
+    def get(self, learning_path_id=None) -> Optional[LearnerSegmentation]:
+        """Learning path segmentation if one was trained, else the global one"""
+        scopes = [scope_for_path(learning_path_id), GLOBAL_SCOPE] if learning_path_id else [GLOBAL_SCOPE]
+        segmentations = {s.scope: s for s in LearnerSegmentation.objects.filter(scope__in=scopes)}
+        return next((segmentations[scope] for scope in scopes if scope in segmentations), None)
+
+    def describe(self, segmentation: LearnerSegmentation) -> Dict[str, Any]:
+        """Scope and age of a segmentation, for responses"""
+        age_seconds = (timezone.now() - segmentation.trained_at).total_seconds()
+        return {
+            'status': 'stale' if age_seconds > self.max_age else 'current',
+            'scope': segmentation.scope,
+            'trained_at': segmentation.trained_at.isoformat(),
+            'age_seconds': int(age_seconds),
+            'learners': segmentation.sample_size,
+        }
+
+    def segment_for(self, segmentation: LearnerSegmentation, user_id) -> Optional[LearnerSegment]:
+        """
+        A learner's segment: the stored label, or the nearest centroid
+
+        Returns:
+            None when the learner has no activity in the window
+        """
+        label = LearnerSegment.objects.filter(user_id=user_id, scope=segmentation.scope).first()
+        if label is not None:
+            return label
+
+        learning_path_id = segmentation.scope[len('path-'):] if segmentation.scope != GLOBAL_SCOPE else None
+        user_ids, matrix = segmentation_matrix(timezone.now() - self.window, learning_path_id, [user_id])
+        if not user_ids:
+            return None
+
+        scaled = (matrix[0] - np.array(segmentation.scaler_mean)) / np.array(segmentation.scaler_scale)
+        distances = np.linalg.norm(np.array(segmentation.centroids) - scaled, axis=1)
+        segment = int(np.argmin(distances))
+        label, _ = LearnerSegment.objects.update_or_create(
+            user_id=user_id,
+            scope=segmentation.scope,
+            defaults={'segment': segment, 'distance': float(distances[segment]), 'assigned_at': timezone.now()}
+        )
+        return label
+
+    def _fit(self, scaled: np.ndarray, cluster_count: int):
+        return MiniBatchKMeans(
+            n_clusters=cluster_count, batch_size=self.batch_size, n_init=3, random_state=42
+        ).fit(scaled)
+
+    def _choose_cluster_count(self, scaled: np.ndarray) -> int:
+        """Segment count with the best silhouette, measured on a sample"""
+        max_clusters = min(self.max_clusters, len(scaled) // 5)
+        if max_clusters < 2:
+            return 2
+
+        best_count, best_score = 2, -1.0
+        for cluster_count in range(2, max_clusters + 1):
+            labels = self._fit(scaled, cluster_count).predict(scaled)
+            if len(np.unique(labels)) < 2:
+                continue
+            score = silhouette_score(
+                scaled, labels, sample_size=min(len(labels), self.silhouette_sample), random_state=42
+            )
+            if score > best_score:
+                best_count, best_score = cluster_count, score
+        return best_count
+
+    def _profiles(self, scaled: np.ndarray, labels: np.ndarray, cluster_count: int,
+                  inertia: float) -> List[Dict[str, Any]]:
+        """Size, feature statistics, dominant features and description of each segment"""
+        overall_means = scaled.mean(axis=0)
+        profiles = []
+        for cluster_id in range(cluster_count):
+            members = scaled[labels == cluster_id]
+            if len(members) == 0:
+                continue
+
+            means = members.mean(axis=0)
+            profile = {
+                'cluster_id': cluster_id,
+                'user_count': int(len(members)),
+                'percentage_of_total': float(len(members) / len(scaled) * 100),
+                'feature_means': means.tolist(),
+                'feature_stds': members.std(axis=0).tolist(),
+                'dominant_features': [
+                    {
+                        'feature': feature_name,
+                        'cluster_value': float(means[i]),
+                        'overall_mean': float(overall_means[i]),
+                        'deviation': float(means[i] - overall_means[i]),
+                        'significance': 'high' if abs(means[i] - overall_means[i]) > 1.0 else 'moderate'
+                    }
+                    for i, feature_name in enumerate(SEGMENT_FEATURES)
+                    if abs(means[i] - overall_means[i]) > 0.5  # Significant deviation
+                ],
+            }
+            profile['description'] = self.analytics_service._generate_cluster_description(profile, SEGMENT_FEATURES)
+
+            if len(members) > 1 and inertia > 0:
+                profile['cohesion'] = float(1 - np.sum((members - means) ** 2) / inertia)
+            else:
+                profile['cohesion'] = 1.0
+            profiles.append(profile)
+        return profiles
@@ -0,0 +1,347 @@
+# JAC Interactive Learning Platform - Core backend implementation by Cavin Otieno
+
+"""
+Predictive Model Registry - JAC Learning Platform
+
+Cohort-level prediction models for PredictiveAnalyticsService, trained
+offline by the train_predictive_models command (or its Celery task) and
+served read-only to requests.
+
+- Each training run is saved as a new version: a joblib file with the
+  fitted estimators and a JSON sidecar with the feature schema, training
+  statistics and held-out scores.
+- Web processes load the latest version lazily, once, and only look for a
+  newer one every MODEL_RELOAD_INTERVAL seconds.
+- Every prediction reports the version and age of the model that made it.
+
+Model files are pickles: MODEL_DIR must only be writable by the platform.
+
+Author: Cavin Otieno
+Created: 2025-11-26
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+try:
+    import joblib
+    from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
+    from sklearn.linear_model import LinearRegression, Ridge
+    from sklearn.preprocessing import PolynomialFeatures
+    from sklearn.pipeline import make_pipeline
+    from sklearn.model_selection import train_test_split
+    import sklearn
+    SKLEARN_AVAILABLE = True
+except ImportError:
+    SKLEARN_AVAILABLE = False
+
+try:
+    from statsmodels.tsa.holtwinters import ExponentialSmoothing
+    STATSMODELS_AVAILABLE = True
+except ImportError:
+    STATSMODELS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Columns of PredictiveAnalyticsService._engineer_features the cohort models use
+FEATURE_SCHEMA = [
+    'days_since_start', 'day_of_week', 'day_of_month', 'month', 'week_of_year',
+    'score_lag_1', 'score_lag_7', 'score_lag_30',
+    'score_rolling_mean_7', 'score_rolling_std_7', 'score_rolling_mean_30',
+    'cumulative_score', 'progress_rate', 'difficulty_normalized',
+    'time_spent', 'time_taken', 'attempts', 'max_score',
+]
+
+TREND_FEATURES = ['days_since_start', 'difficulty_normalized']
+
+# Holt smoothing parameters used until a cohort fit is available
+DEFAULT_SMOOTHING = {'smoothing_level': 0.5, 'smoothing_trend': 0.1}
+
+GLOBAL_SCOPE = 'global'
+
+
+def scope_for_path(learning_path_id: Optional[int]) -> str:
+    return f'path-{learning_path_id}' if learning_path_id else GLOBAL_SCOPE
+
+
+def feature_matrix(features_df: pd.DataFrame) -> np.ndarray:
+    """Align engineered features to FEATURE_SCHEMA (missing values are zero)."""
+    frame = features_df.reindex(columns=FEATURE_SCHEMA)
+    try:
+        matrix = frame.to_numpy(dtype=float, na_value=np.nan)
+    except (TypeError, ValueError):
+        # Non-numeric values in some column
+        matrix = frame.apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    # to_numpy() may return a read-only view of the frame, so build a new array
+    return np.where(np.isfinite(matrix), matrix, 0)
+
+
+def predict_rows(model, X: np.ndarray) -> np.ndarray:
+    """
+    Predict a few rows. For tree ensembles this reads the fitted trees
+    directly, which avoids estimator.predict()'s per-tree dispatch overhead
+    (most of the cost when only a handful of rows are scored).
+    """
+    estimators = getattr(model, 'estimators_', None)
+    if isinstance(model, RandomForestRegressor) and estimators is not None:
+        X32 = np.ascontiguousarray(X, dtype=np.float32)
+        return np.mean([tree.tree_.predict(X32).reshape(len(X32), -1)[:, 0] for tree in estimators], axis=0)
+    return model.predict(X)
+
+
+def holt_forecast(values: np.ndarray, horizon: int, smoothing_level: float, smoothing_trend: float) -> np.ndarray:
+    """Holt's linear trend forecast with fixed smoothing parameters."""
+    level, trend = float(values[0]), float(values[1] - values[0]) if len(values) > 1 else 0.0
+    for value in values[1:]:
+        previous_level = level
+        level = smoothing_level * value + (1 - smoothing_level) * (level + trend)
+        trend = smoothing_trend * (level - previous_level) + (1 - smoothing_trend) * trend
+    return level + trend * np.arange(1, horizon + 1)
+
+
+class ModelRegistry:
+    """
+    Versioned on-disk store of cohort models with a per-process cache.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, model_dir: Optional[Path] = None):
+        analytics_config = getattr(settings, 'PREDICTIVE_ANALYTICS_CONFIG', {})
+        self.model_dir = Path(model_dir or analytics_config.get('MODEL_DIR', Path(settings.BASE_DIR) / 'ml_models'))
+        self.keep_versions = analytics_config.get('MODEL_KEEP_VERSIONS', 3)
+        self.reload_interval = analytics_config.get('MODEL_RELOAD_INTERVAL', 60)
+        self.max_age = analytics_config.get('MODEL_MAX_AGE_DAYS', 7) * 86400
+
+        self._lock = threading.Lock()
+        self._loaded = {}
+        self._checked_at = {}
+
+    @classmethod
+    def get_instance(cls) -> 'ModelRegistry':
+        """Get the registry for this process."""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def get(self, scope: str) -> Optional[Dict[str, Any]]:
+        """
+        Latest model bundle for a scope, loaded on first use.
+
+        Returns:
+            Bundle with 'models' and 'metadata', or None if none was trained
+        """
+        now = time.monotonic()
+        with self._lock:
+            bundle = self._loaded.get(scope)
+            if bundle is not None and now - self._checked_at.get(scope, 0) < self.reload_interval:
+                return bundle
+            self._checked_at[scope] = now
+
+            versions = self.list_versions(scope)
+            if not versions:
+                self._loaded.pop(scope, None)
+                return None
+            if bundle is not None and bundle['metadata']['version'] == versions[-1]:
+                return bundle
+
+            try:
+                bundle = self._load(scope, versions[-1])
+            except Exception as e:
+                logger.error(f"Could not load predictive model {scope} v{versions[-1]}: {e}")
+                return self._loaded.get(scope)
+            self._loaded[scope] = bundle
+            return bundle
+
+    def get_for_path(self, learning_path_id: Optional[int]) -> Optional[Dict[str, Any]]:
+        """Learning path model if one was trained, else the global model."""
+        if learning_path_id:
+            bundle = self.get(scope_for_path(learning_path_id))
+            if bundle is not None:
+                return bundle
+        return self.get(GLOBAL_SCOPE)
+
+    def save(self, scope: str, models: Dict[str, Any], metadata: Dict[str, Any]) -> str:
+        """
+        Persist a trained bundle as a new version and prune old versions.
+
+        Returns:
+            The new version string
+        """
+        self.model_dir.mkdir(parents=True, exist_ok=True)
+        version = datetime.now(dt_timezone.utc).strftime('%Y%m%d%H%M%S%f')
+        metadata = {**metadata, 'scope': scope, 'version': version,
+                    'sklearn_version': sklearn.__version__}
+
+        model_path, metadata_path = self._paths(scope, version)
+        joblib.dump(models, f'{model_path}.tmp', compress=3)
+        os.replace(f'{model_path}.tmp', model_path)
+        # The sidecar is written last; a version without one is never loaded
+        with open(f'{metadata_path}.tmp', 'w', encoding='utf-8') as sidecar:
+            json.dump(metadata, sidecar, indent=2, default=str)
+        os.replace(f'{metadata_path}.tmp', metadata_path)
+
+        for old_version in self.list_versions(scope)[:-self.keep_versions]:
+            for path in self._paths(scope, old_version):
+                path.unlink(missing_ok=True)
+        return version
+
+    def list_versions(self, scope: str) -> List[str]:
+        """Complete versions stored for a scope, oldest first."""
+        if not self.model_dir.exists():
+            return []
+        prefix = f'{scope}-v'
+        return sorted(
+            name[len(prefix):-len('.json')]
+            for name in os.listdir(self.model_dir)
+            if name.startswith(prefix) and name.endswith('.json')
+        )
+
+    def describe(self, bundle: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Version and age of a bundle, for prediction responses."""
+        if bundle is None:
+            return {'status': 'untrained'}
+        metadata = bundle['metadata']
+        trained_at = datetime.fromisoformat(metadata['trained_at'])
+        age_seconds = (datetime.now(dt_timezone.utc) - trained_at).total_seconds()
+        return {
+            'status': 'stale' if age_seconds > self.max_age else 'current',
+            'scope': metadata['scope'],
+            'version': metadata['version'],
+            'trained_at': metadata['trained_at'],
+            'age_seconds': int(age_seconds),
+            'training_samples': metadata.get('sample_count', 0),
+        }
+
+    def _paths(self, scope: str, version: str):
+        base = self.model_dir / f'{scope}-v{version}'
+        return Path(f'{base}.joblib'), Path(f'{base}.json')
+
+    def _load(self, scope: str, version: str) -> Dict[str, Any]:
+        model_path, metadata_path = self._paths(scope, version)
+        with open(metadata_path, encoding='utf-8') as sidecar:
+            metadata = json.load(sidecar)
+        if metadata.get('feature_schema') != FEATURE_SCHEMA:
+            raise ValueError('feature schema does not match this code version')
+
+        models = joblib.load(model_path)
+        # Requests predict a handful of rows; thread start-up would dominate
+        for model in models.values():
+            if hasattr(model, 'n_jobs'):
+                model.n_jobs = 1
+        logger.info(f"Loaded predictive model {scope} v{version}")
+        return {'models': models, 'metadata': metadata}
+
+
+class CohortModelTrainer:
+    """
+    Fits the cohort models from the engineered features of many learners.
+    """
+
+    def __init__(self, service, min_samples: Optional[int] = None):
+        analytics_config = getattr(settings, 'PREDICTIVE_ANALYTICS_CONFIG', {})
+        self.service = service
+        self.min_samples = min_samples or analytics_config.get('MODEL_MIN_SAMPLES', 50)
+
+    def train(self, users: Iterable, learning_path_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Train every cohort model on the given learners.
+
+        Returns:
+            {'models': ..., 'metadata': ...}, or None if there is too little data
+        """
+        frames, series = [], []
+        for user in users:
+            historical_data = self.service._prepare_historical_data(user, learning_path_id)
+            if len(historical_data) < 10:
+                continue
+            features_df = self.service._engineer_features(historical_data)
+            if 'score' not in features_df.columns:
+                continue
+            frames.append(features_df)
+            series.append(features_df.set_index('date')['score'].resample('D').mean().ffill().dropna())
+
+        if not frames:
+            return None
+        features_df = pd.concat(frames, ignore_index=True)
+        if len(features_df) < self.min_samples:
+            return None
+
+        X = feature_matrix(features_df)
+        y = pd.to_numeric(features_df['score'], errors='coerce').fillna(0).values
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        trend_columns = [FEATURE_SCHEMA.index(name) for name in TREND_FEATURES]
+        day_column = FEATURE_SCHEMA.index('days_since_start')
+
+        models = {
+            'random_forest': RandomForestRegressor(n_estimators=100, random_state=42, max_depth=10, n_jobs=-1),
+            'gradient_boosting': GradientBoostingRegressor(n_estimators=100, learning_rate=0.1, random_state=42),
+            'linear_regression': LinearRegression(),
+            'polynomial': make_pipeline(PolynomialFeatures(degree=2), Ridge(alpha=1.0)),
+        }
+        columns = {
+            'random_forest': slice(None),
+            'gradient_boosting': slice(None),
+            'linear_regression': trend_columns,
+            'polynomial': [day_column],
+        }
+        scores = {}
+        for name, model in models.items():
+            model.fit(X_train[:, columns[name]], y_train)
+            scores[name] = float(model.score(X_test[:, columns[name]], y_test))
+
+        metadata = {
+            'trained_at': datetime.now(dt_timezone.utc).isoformat(),
+            'learning_path_id': learning_path_id,
+            'feature_schema': FEATURE_SCHEMA,
+            'trend_features': TREND_FEATURES,
+            'sample_count': int(len(X)),
+            'user_count': len(frames),
+            'scores': scores,
+            'feature_importance': {
+                name: dict(zip(FEATURE_SCHEMA, map(float, models[name].feature_importances_)))
+                for name in ('random_forest', 'gradient_boosting')
+            },
+            'linear_coefficients': dict(zip(TREND_FEATURES, map(float, models['linear_regression'].coef_))),
+            'linear_intercept': float(models['linear_regression'].intercept_),
+            'time_series': self._fit_smoothing(series),
+        }
+        return {'models': models, 'metadata': metadata}
+
+    @staticmethod
+    def _fit_smoothing(series: List[pd.Series]) -> Dict[str, float]:
+        """Median Holt smoothing parameters over learners with enough daily history."""
+        if not STATSMODELS_AVAILABLE:
+            return dict(DEFAULT_SMOOTHING)
+
+        levels, trends = [], []
+        for values in series[:200]:
+            if len(values) < 14:
+                continue
+            try:
+                params = ExponentialSmoothing(values, trend='add', seasonal=None).fit().params
+                levels.append(params['smoothing_level'])
+                trends.append(params['smoothing_trend'])
+            except Exception:
+                continue
+
+        if not levels:
+            return dict(DEFAULT_SMOOTHING)
+        return {
+            'smoothing_level': float(np.median(levels)),
+            'smoothing_trend': float(np.median(trends)),
+            'fitted_series': len(levels),
+        }
@@ -17,7 +17,7 @@ from datetime import datetime, timedelta
 import logging
 from django.utils import timezone
 from django.contrib.auth.models import User
-from django.db.models import Q, Count, Sum, Avg, Max, Min
+from django.db.models import Sum, Max, Min
 from django.db.models.functions import TruncDate, TruncWeek, TruncMonth
 import warnings
 warnings.filterwarnings('ignore')
@@ -26,13 +26,9 @@ warnings.filterwarnings('ignore')
 try:
     from scipy import stats
     from scipy.optimize import minimize_scalar
-    from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
-    from sklearn.linear_model import LinearRegression, Ridge, ElasticNet
-    from sklearn.preprocessing import StandardScaler, PolynomialFeatures
-    from sklearn.model_selection import train_test_split, cross_val_score
+    from sklearn.linear_model import ElasticNet
+    from sklearn.model_selection import train_test_split
     from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
-    from sklearn.cluster import KMeans
-    from statsmodels.tsa.holtwinters import ExponentialSmoothing
     from statsmodels.tsa.seasonal import seasonal_decompose
     from statsmodels.tsa.arima.model import ARIMA
     import joblib
@@ -42,9 +38,12 @@ except ImportError as e:
     SCIPY_AVAILABLE = False
 
 from ..models import LearningAnalytics
-from apps.learning.models import (
-    LearningPath, Module, UserLearningPath, UserModuleProgress, AssessmentAttempt
+from .analytics_context import AnalyticsDataContext, memoized_analysis
+from .model_registry import (
+    ModelRegistry, FEATURE_SCHEMA, TREND_FEATURES, feature_matrix, holt_forecast, predict_rows
 )
+from .learner_segmentation import LearnerSegmentationService
+from apps.learning.models import LearningPath, Module, UserLearningPath
 
 logger = logging.getLogger(__name__)
 
@@ -54,12 +53,24 @@ class PredictiveAnalyticsService:
     Advanced predictive analytics service with machine learning models
     """
     
-    def __init__(self):
+    def __init__(self, data_context: Optional[AnalyticsDataContext] = None):
         self.models = {}
         self.scalers = {}
         self.feature_importance = {}
         self.model_performance = {}
+        # Shared learner data for all analyses run through this instance
+        self.data_context = data_context
         
+    def _context_for(self, user: User, learning_path_id: Optional[int]) -> AnalyticsDataContext:
+        """
+        The bound data context when it covers this learner, otherwise a
+        context for this call only
+        """
+        if self.data_context is not None and self.data_context.matches(user, learning_path_id):
+            return self.data_context
+        return AnalyticsDataContext(user, learning_path_id)
+    
+    @memoized_analysis
     def generate_ml_predictions(
         self,
         user: User,
@@ -79,35 +90,14 @@ class PredictiveAnalyticsService:
             # Feature engineering
             features_df = self._engineer_features(historical_data)
             
-            # Train multiple models
-            predictions = {}
+            # Run the offline-trained cohort models (inference only)
+            model_bundle = ModelRegistry.get_instance().get_for_path(learning_path_id)
             
-            if SCIPY_AVAILABLE:
-                # Random Forest for non-linear patterns
-                rf_prediction = self._random_forest_prediction(features_df, prediction_horizon_days)
-                if rf_prediction:
-                    predictions['random_forest'] = rf_prediction
-                
-                # Gradient Boosting for complex patterns
-                gb_prediction = self._gradient_boosting_prediction(features_df, prediction_horizon_days)
-                if gb_prediction:
-                    predictions['gradient_boosting'] = gb_prediction
-                
-                # Linear regression for baseline
-                lr_prediction = self._linear_regression_prediction(features_df, prediction_horizon_days)
-                if lr_prediction:
-                    predictions['linear_regression'] = lr_prediction
-                
-                # Time series forecasting
-                ts_prediction = self._time_series_forecast(features_df, prediction_horizon_days)
-                if ts_prediction:
-                    predictions['time_series'] = ts_prediction
-                
-                # Polynomial regression for trend modeling
-                poly_prediction = self._polynomial_regression_prediction(features_df, prediction_horizon_days)
-                if poly_prediction:
-                    predictions['polynomial'] = poly_prediction
+            if SCIPY_AVAILABLE and model_bundle is not None:
+                predictions = self._cohort_model_predictions(model_bundle, features_df, prediction_horizon_days)
             else:
+                if SCIPY_AVAILABLE:
+                    logger.warning("No trained predictive models; run 'manage.py train_predictive_models'")
                 # Fallback to basic statistical methods
                 predictions = self._basic_statistical_predictions(features_df, prediction_horizon_days)
             
@@ -124,13 +114,15 @@ class PredictiveAnalyticsService:
                 'prediction_horizon_days': prediction_horizon_days,
                 'model_count': len(predictions),
                 'data_points_used': len(historical_data),
-                'features_engineered': len(features_df.columns) if not features_df.empty else 0
+                'features_engineered': len(features_df.columns) if not features_df.empty else 0,
+                'model_info': ModelRegistry.get_instance().describe(model_bundle)
             }
             
         except Exception as e:
             logger.error(f"ML prediction error: {e}")
             return self._generate_fallback_predictions([])
     
+    @memoized_analysis
     def analyze_historical_trends(
         self,
         user: User,
@@ -194,6 +186,7 @@ class PredictiveAnalyticsService:
             logger.error(f"Historical trend analysis error: {e}")
             return {'error': f'Trend analysis failed: {str(e)}'}
     
+    @memoized_analysis
     def adaptive_prediction_algorithm(
         self,
         user: User,
@@ -233,6 +226,7 @@ class PredictiveAnalyticsService:
             logger.error(f"Adaptive prediction error: {e}")
             return {'error': f'Adaptive prediction failed: {str(e)}'}
     
+    @memoized_analysis
     def statistical_confidence_calculations(
         self,
         user: User,
@@ -294,51 +288,7 @@ class PredictiveAnalyticsService:
         """
         Prepare comprehensive historical data for ML analysis
         """
-        # Get user progress data
-        progress_query = UserModuleProgress.objects.filter(user=user)
-        
-        if learning_path_id:
-            progress_query = progress_query.filter(module__learning_path_id=learning_path_id)
-        
-        progress_data = progress_query.select_related('module', 'user').order_by('updated_at')
-        
-        # Get assessment data
-        assessment_query = AssessmentAttempt.objects.filter(user=user)
-        
-        if learning_path_id:
-            assessment_query = assessment_query.filter(module__learning_path_id=learning_path_id)
-        
-        assessment_data = assessment_query.select_related('module', 'user').order_by('completed_at')
-        
-        # Combine and structure data
-        historical_records = []
-        
-        # Process progress data
-        for progress in progress_data:
-            historical_records.append({
-                'date': progress.updated_at.date(),
-                'type': 'progress',
-                'module_id': progress.module.id,
-                'status': progress.status,
-                'score': getattr(progress, 'completion_percentage', 0),
-                'time_spent': getattr(progress, 'time_spent_minutes', 0),
-                'difficulty_level': progress.module.difficulty_level if hasattr(progress.module, 'difficulty_level') else 1
-            })
-        
-        # Process assessment data
-        for assessment in assessment_data:
-            historical_records.append({
-                'date': assessment.completed_at.date(),
-                'type': 'assessment',
-                'module_id': assessment.module.id,
-                'score': assessment.score,
-                'max_score': assessment.max_score,
-                'time_taken': assessment.time_taken_minutes,
-                'attempts': assessment.attempt_number,
-                'difficulty_level': assessment.module.difficulty_level if hasattr(assessment.module, 'difficulty_level') else 1
-            })
-        
-        return sorted(historical_records, key=lambda x: x['date'])
+        return self._context_for(user, learning_path_id).historical_data()
     
     def _engineer_features(self, historical_data: List[Dict[str, Any]]) -> pd.DataFrame:
         """
@@ -383,242 +333,102 @@ class PredictiveAnalyticsService:
         
         return df
     
-    def _random_forest_prediction(
+    def _cohort_model_predictions(
         self,
+        model_bundle: Dict[str, Any],
         features_df: pd.DataFrame,
         prediction_horizon: int
-    ) -> Optional[Dict[str, Any]]:
+    ) -> Dict[str, Any]:
         """
-        Random Forest model for complex pattern prediction
+        Predict the next days' scores with the registry's cohort models
         """
         if features_df.empty or 'score' not in features_df.columns:
-            return None
+            return {}
         
-        try:
-            # Prepare features and target
-            feature_cols = [col for col in features_df.columns 
-                           if col not in ['date', 'score', 'type'] and not features_df[col].isna().all()]
-            
-            if len(feature_cols) < 3:
-                return None
-            
-            X = features_df[feature_cols].fillna(0)
-            y = features_df['score'].fillna(0)
-            
-            if len(X) < 10:
-                return None
-            
-            # Train Random Forest
-            rf_model = RandomForestRegressor(n_estimators=100, random_state=42, max_depth=10)
-            rf_model.fit(X, y)
-            
-            # Make predictions
-            last_features = X.iloc[-1:].copy()
-            predictions = []
-            
-            for i in range(min(prediction_horizon, 30)):  # Limit prediction horizon
-                pred = rf_model.predict(last_features)[0]
-                predictions.append(max(0, min(100, pred)))  # Constrain to valid score range
-                
-                # Update features for next prediction
-                last_features.iloc[0, 0] += 1  # Increment days
-                last_features['score_lag_1'] = pred
-            
-            return {
-                'model_type': 'random_forest',
-                'predictions': predictions,
-                'feature_importance': dict(zip(feature_cols, rf_model.feature_importances_)),
-                'model_score': rf_model.score(X, y)
-            }
-            
-        except Exception as e:
-            logger.error(f"Random Forest prediction error: {e}")
-            return None
-    
-    def _gradient_boosting_prediction(
-        self,
-        features_df: pd.DataFrame,
-        prediction_horizon: int
-    ) -> Optional[Dict[str, Any]]:
-        """
-        Gradient Boosting model for advanced pattern recognition
-        """
-        if features_df.empty or 'score' not in features_df.columns:
-            return None
+        models = model_bundle['models']
+        metadata = model_bundle['metadata']
+        horizon = min(prediction_horizon, 30)  # Limit prediction horizon
         
-        try:
-            feature_cols = [col for col in features_df.columns 
-                           if col not in ['date', 'score', 'type'] and not features_df[col].isna().all()]
-            
-            if len(feature_cols) < 3:
-                return None
-            
-            X = features_df[feature_cols].fillna(0)
-            y = features_df['score'].fillna(0)
-            
-            if len(X) < 10:
-                return None
-            
-            # Train Gradient Boosting
-            gb_model = GradientBoostingRegressor(n_estimators=100, learning_rate=0.1, random_state=42)
-            gb_model.fit(X, y)
-            
-            # Make predictions
-            last_features = X.iloc[-1:].copy()
-            predictions = []
-            
-            for i in range(min(prediction_horizon, 30)):
-                pred = gb_model.predict(last_features)[0]
-                predictions.append(max(0, min(100, pred)))
-                
-                # Update features
-                last_features.iloc[0, 0] += 1
-            
-            return {
-                'model_type': 'gradient_boosting',
-                'predictions': predictions,
-                'feature_importance': dict(zip(feature_cols, gb_model.feature_importances_)),
-                'model_score': gb_model.score(X, y)
-            }
-            
-        except Exception as e:
-            logger.error(f"Gradient Boosting prediction error: {e}")
-            return None
-    
-    def _linear_regression_prediction(
-        self,
-        features_df: pd.DataFrame,
-        prediction_horizon: int
-    ) -> Optional[Dict[str, Any]]:
-        """
-        Linear regression baseline model
-        """
-        if features_df.empty or 'score' not in features_df.columns:
-            return None
+        # One feature row per future day: the latest features, moved forward in time
+        future = np.repeat(feature_matrix(features_df.iloc[-1:]), horizon, axis=0)
+        day_column = FEATURE_SCHEMA.index('days_since_start')
+        future[:, day_column] += np.arange(1, horizon + 1)
+        trend_columns = [FEATURE_SCHEMA.index(name) for name in TREND_FEATURES]
+        
+        def constrain(values):
+            # Constrain to valid score range
+            return [float(max(0, min(100, value))) for value in values]
         
+        predictions = {}
         try:
-            # Use simple features for linear regression
-            simple_features = ['days_since_start', 'difficulty_normalized']
-            available_features = [f for f in simple_features if f in features_df.columns]
-            
-            if len(available_features) < 1:
-                return None
-            
-            X = features_df[available_features].fillna(0)
-            y = features_df['score'].fillna(0)
-            
-            if len(X) < 5:
-                return None
-            
-            # Train Linear Regression
-            lr_model = LinearRegression()
-            lr_model.fit(X, y)
-            
-            # Make predictions
-            predictions = []
-            last_day = features_df['days_since_start'].iloc[-1] if 'days_since_start' in features_df.columns else 0
-            
-            for i in range(min(prediction_horizon, 30)):
-                pred_features = np.array([[last_day + i, features_df['difficulty_normalized'].mean() if 'difficulty_normalized' in features_df.columns else 0.5]])
-                pred = lr_model.predict(pred_features)[0]
-                predictions.append(max(0, min(100, pred)))
+            for name in ('random_forest', 'gradient_boosting'):
+                predictions[name] = {
+                    'model_type': name,
+                    'predictions': constrain(predict_rows(models[name], future)),
+                    'feature_importance': metadata['feature_importance'][name],
+                    'model_score': metadata['scores'][name]
+                }
             
-            return {
+            predictions['linear_regression'] = {
                 'model_type': 'linear_regression',
-                'predictions': predictions,
-                'coefficients': dict(zip(available_features, lr_model.coef_)),
-                'intercept': lr_model.intercept_,
-                'model_score': lr_model.score(X, y)
+                'predictions': constrain(models['linear_regression'].predict(future[:, trend_columns])),
+                'coefficients': metadata['linear_coefficients'],
+                'intercept': metadata['linear_intercept'],
+                'model_score': metadata['scores']['linear_regression']
             }
             
+            predictions['polynomial'] = {
+                'model_type': 'polynomial_regression',
+                'predictions': constrain(models['polynomial'].predict(future[:, [day_column]])),
+                'polynomial_degree': 2,
+                'model_score': metadata['scores']['polynomial']
+            }
         except Exception as e:
-            logger.error(f"Linear regression prediction error: {e}")
-            return None
+            logger.error(f"Cohort model prediction error: {e}")
+        
+        ts_prediction = self._time_series_forecast(features_df, horizon, metadata['time_series'])
+        if ts_prediction:
+            predictions['time_series'] = ts_prediction
+        
+        return predictions
     
     def _time_series_forecast(
         self,
         features_df: pd.DataFrame,
-        prediction_horizon: int
+        prediction_horizon: int,
+        smoothing: Dict[str, float]
     ) -> Optional[Dict[str, Any]]:
         """
-        Time series forecasting using exponential smoothing
+        Time series forecasting using Holt exponential smoothing with
+        cohort-fitted smoothing parameters
         """
         if features_df.empty or 'score' not in features_df.columns or len(features_df) < 14:
             return None
         
         try:
             # Create time series
-            ts_data = features_df.set_index('date')['score'].resample('D').mean().fillna(method='ffill')
+            ts_data = features_df.set_index('date')['score'].resample('D').mean().ffill().dropna()
             
             if len(ts_data) < 14:
                 return None
             
-            # Exponential Smoothing
-            model = ExponentialSmoothing(ts_data, trend='add', seasonal=None)
-            fitted_model = model.fit()
-            
-            # Forecast
-            forecast = fitted_model.forecast(steps=min(prediction_horizon, 30))
-            forecast_values = [max(0, min(100, val)) for val in forecast]
+            forecast = holt_forecast(
+                ts_data.values.astype(float),
+                min(prediction_horizon, 30),
+                smoothing['smoothing_level'],
+                smoothing['smoothing_trend']
+            )
             
             return {
                 'model_type': 'time_series',
-                'predictions': forecast_values,
-                'model_aic': fitted_model.aic,
-                'model_bic': fitted_model.bic,
-                'model_params': fitted_model.params
+                'predictions': [float(max(0, min(100, val))) for val in forecast],
+                'model_params': smoothing
             }
             
         except Exception as e:
             logger.error(f"Time series forecast error: {e}")
             return None
     
-    def _polynomial_regression_prediction(
-        self,
-        features_df: pd.DataFrame,
-        prediction_horizon: int
-    ) -> Optional[Dict[str, Any]]:
-        """
-        Polynomial regression for non-linear trend modeling
-        """
-        if features_df.empty or 'days_since_start' not in features_df.columns or 'score' not in features_df.columns:
-            return None
-        
-        try:
-            X = features_df[['days_since_start']].values
-            y = features_df['score'].values
-            
-            if len(X) < 5:
-                return None
-            
-            # Polynomial features
-            poly_features = PolynomialFeatures(degree=2)
-            X_poly = poly_features.fit_transform(X)
-            
-            # Train Ridge regression for stability
-            model = Ridge(alpha=1.0)
-            model.fit(X_poly, y)
-            
-            # Make predictions
-            predictions = []
-            last_day = features_df['days_since_start'].iloc[-1]
-            
-            for i in range(min(prediction_horizon, 30)):
-                pred_features = poly_features.transform([[last_day + i]])
-                pred = model.predict(pred_features)[0]
-                predictions.append(max(0, min(100, pred)))
-            
-            return {
-                'model_type': 'polynomial_regression',
-                'predictions': predictions,
-                'polynomial_degree': 2,
-                'model_score': model.score(X_poly, y)
-            }
-            
-        except Exception as e:
-            logger.error(f"Polynomial regression prediction error: {e}")
-            return None
-    
     def _create_ensemble_prediction(self, predictions: Dict[str, Any]) -> Dict[str, Any]:
         """
         Combine multiple model predictions using weighted ensemble
@@ -786,12 +596,12 @@ class PredictiveAnalyticsService:
         df = df.set_index('date')
         
         if 'score' in df.columns:
-            return df['score'].resample('D').mean().fillna(method='ffill')
+            return df['score'].resample('D').mean().ffill()
         elif 'status' in df.columns:
             # Convert status to numerical progress
             status_map = {'completed': 1, 'in_progress': 0.5, 'not_started': 0}
             df['progress'] = df['status'].map(status_map).fillna(0)
-            return df['progress'].resample('D').mean().fillna(method='ffill')
+            return df['progress'].resample('D').mean().ffill()
         
         return pd.Series([1] * len(df), index=df.index)
     
@@ -1679,6 +1489,7 @@ class PredictiveAnalyticsService:
     # New Predictive Learning Models Integration
     # =========================================
     
+    @memoized_analysis
     def analyze_learning_velocity(self, user: User, learning_path_id: Optional[int] = None, 
                                  days_window: int = 30) -> Dict[str, Any]:
         """
@@ -1697,34 +1508,30 @@ class PredictiveAnalyticsService:
             start_date = end_date - timedelta(days=days_window)
             
             # Get user activity data
-            query_kwargs = {'user': user, 'created_at__gte': start_date}
-            if learning_path_id:
-                query_kwargs['learning_path_id'] = learning_path_id
+            context = self._context_for(user, learning_path_id)
                 
             # Collect velocity metrics from multiple sources
             velocity_data = []
             
             # Module completion velocity
-            module_data = list(UserModuleProgress.objects.filter(
-                **query_kwargs,
-                status='completed'
-            ).annotate(
-                days_since_start=F('completed_at') - F('started_at')
-            ).values())
+            module_data = [
+                item for item in context.progress_between(start_date, field='created_at', status='completed')
+                if item['completed_at'] and item['started_at']
+            ]
             
             for item in module_data:
                 velocity_data.append({
                     'type': 'module_completion',
-                    'value': 1 if item.get('days_since_start').days <= 1 else 0.5,
+                    'value': 1 if (item['completed_at'] - item['started_at']).days <= 1 else 0.5,
                     'timestamp': item['completed_at'],
                     'difficulty': item.get('difficulty_level', 1.0)
                 })
             
             # Assessment velocity
-            assessment_data = list(AssessmentAttempt.objects.filter(
-                **query_kwargs,
-                score__gte=0.7
-            ).values())
+            assessment_data = [
+                item for item in context.attempts_between(start_date, field='started_at')
+                if item['completed_at'] and item['score'] >= 0.7
+            ]
             
             for item in assessment_data:
                 velocity_data.append({
@@ -1829,6 +1636,7 @@ class PredictiveAnalyticsService:
             }
 
 
+    @memoized_analysis
     def analyze_engagement_patterns(self, user: User, learning_path_id: Optional[int] = None,
                                   analysis_depth: str = 'comprehensive') -> Dict[str, Any]:
         """
@@ -1847,20 +1655,13 @@ class PredictiveAnalyticsService:
             start_date = end_date - timedelta(days=90)  # 3 months of data
             
             # Build comprehensive query
-            query_kwargs = {'user': user, 'created_at__gte': start_date}
-            if learning_path_id:
-                query_kwargs['learning_path_id'] = learning_path_id
+            context = self._context_for(user, learning_path_id)
             
             # Collect engagement data from multiple sources
             engagement_data = []
             
             # Module interaction patterns
-            module_interactions = list(UserModuleProgress.objects.filter(
-                **query_kwargs
-            ).annotate(
-                interaction_duration=F('updated_at') - F('created_at'),
-                interaction_frequency=Count('id')
-            ).values())
+            module_interactions = context.progress_between(start_date, field='created_at')
             
             for item in module_interactions:
                 if item.get('updated_at') and item.get('created_at'):
@@ -1875,13 +1676,11 @@ class PredictiveAnalyticsService:
                     })
             
             # Assessment engagement
-            assessment_data = list(AssessmentAttempt.objects.filter(
-                **query_kwargs
-            ).values())
+            assessment_data = context.attempts_between(start_date, field='started_at')
             
             for item in assessment_data:
                 if item.get('completed_at'):
-                    duration = item.get('time_spent_seconds', 600) / 60  # minutes
+                    duration = item['time_spent'].total_seconds() / 60 if item['time_spent'] else 10  # minutes
                     engagement_data.append({
                         'type': 'assessment_engagement',
                         'duration': duration,
@@ -2059,6 +1858,7 @@ class PredictiveAnalyticsService:
             }
 
 
+    @memoized_analysis
     def model_success_probability(self, user: User, learning_path_id: Optional[int] = None,
                                 target_module_id: Optional[int] = None,
                                 time_horizon_days: int = 30) -> Dict[str, Any]:
@@ -2082,43 +1882,40 @@ class PredictiveAnalyticsService:
             features = {}
             
             # Historical performance features
-            historical_data = list(UserModuleProgress.objects.filter(
-                user=user,
-                created_at__gte=start_date,
-                **({'learning_path_id': learning_path_id} if learning_path_id else {})
-            ).aggregate(
-                completion_rate=Avg(Case(When(status='completed', then=Value(1)), default=Value(0))),
-                avg_performance=Avg('performance_score'),
-                total_modules=Count('id'),
-                completed_modules=Count('id', filter=Q(status='completed')),
-                avg_session_duration=Avg(F('updated_at') - F('created_at')),
-                recent_activity=Count('id', filter=Q(updated_at__gte=end_date - timedelta(days=30)))
-            ))
-            
-            if historical_data:
-                features.update(historical_data[0])
+            context = self._context_for(user, learning_path_id)
+            recent_start = end_date - timedelta(days=30)
+            
+            module_rows = context.progress_between(start_date, field='created_at')
+            if module_rows:
+                completed = [row for row in module_rows if row['status'] == 'completed']
+                performance = [row['performance_score'] for row in module_rows if row['performance_score'] is not None]
+                features.update({
+                    'completion_rate': len(completed) / len(module_rows),
+                    'avg_performance': float(np.mean(performance)) if performance else None,
+                    'total_modules': len(module_rows),
+                    'completed_modules': len(completed),
+                    'avg_session_duration': float(np.mean([
+                        (row['updated_at'] - row['created_at']).total_seconds() / 60 for row in module_rows
+                    ])),
+                    'recent_activity': sum(1 for row in module_rows if row['updated_at'] >= recent_start)
+                })
             
             # Assessment success patterns
-            assessment_data = list(AssessmentAttempt.objects.filter(
-                user=user,
-                created_at__gte=start_date,
-                **({'learning_path_id': learning_path_id} if learning_path_id else {})
-            ).aggregate(
-                assessment_success_rate=Avg(Case(When(score__gte=0.7, then=Value(1)), default=Value(0))),
-                avg_assessment_score=Avg('score'),
-                total_assessments=Count('id'),
-                recent_assessments=Count('id', filter=Q(completed_at__gte=end_date - timedelta(days=30))),
-                assessment_consistency=StdDev('score')
-            ))
-            
-            if assessment_data:
-                features.update(assessment_data[0])
+            assessment_rows = context.attempts_between(start_date, field='started_at')
+            if assessment_rows:
+                scores = [row['score'] for row in assessment_rows]
+                features.update({
+                    'assessment_success_rate': sum(1 for score in scores if score >= 0.7) / len(scores),
+                    'avg_assessment_score': float(np.mean(scores)),
+                    'total_assessments': len(assessment_rows),
+                    'recent_assessments': sum(
+                        1 for row in assessment_rows if row['completed_at'] and row['completed_at'] >= recent_start
+                    ),
+                    'assessment_consistency': float(np.std(scores, ddof=1)) if len(scores) > 1 else None
+                })
             
             # Learning velocity and consistency
-            recent_activity = UserModuleProgress.objects.filter(
-                user=user,
-                updated_at__gte=end_date - timedelta(days=30)
-            ).count()
+            recent_activity = len(context.progress_between(recent_start))
             
             features.update({
                 'recent_activity_level': recent_activity,
@@ -2374,6 +2171,7 @@ class PredictiveAnalyticsService:
             return 0.5
 
 
+    @memoized_analysis
     def predict_time_to_completion(self, user: User, learning_path_id: Optional[int] = None,
                                  target_module_id: Optional[int] = None,
                                  include_holidays: bool = True) -> Dict[str, Any]:
@@ -2394,6 +2192,9 @@ class PredictiveAnalyticsService:
             start_date = end_date - timedelta(days=180)  # 6 months of data
             
             # Get learning objectives data
+            context = self._context_for(user, learning_path_id)
+            completed_modules = len([row for row in context.progress if row['status'] == 'completed'])
+            
             if target_module_id:
                 # Single module completion prediction
                 modules_to_complete = 1
@@ -2402,17 +2203,11 @@ class PredictiveAnalyticsService:
             elif learning_path_id:
                 # Learning path completion prediction
                 total_modules = Module.objects.filter(learning_path_id=learning_path_id).count()
-                completed_modules = UserModuleProgress.objects.filter(
-                    user=user, learning_path_id=learning_path_id, status='completed'
-                ).count()
                 modules_to_complete = max(0, total_modules - completed_modules)
                 target_type = 'learning_path'
             else:
                 # General completion prediction
-                completed_modules = UserModuleProgress.objects.filter(
-                    user=user, status='completed'
-                ).count()
-                total_modules = UserModuleProgress.objects.filter(user=user).count()
+                total_modules = len(context.progress)
                 modules_to_complete = max(0, total_modules - completed_modules)
                 target_type = 'general'
             
@@ -2425,14 +2220,11 @@ class PredictiveAnalyticsService:
                 }
             
             # Historical completion time analysis
-            historical_completions = list(UserModuleProgress.objects.filter(
-                user=user,
-                status='completed',
-                created_at__gte=start_date,
-                **({'learning_path_id': learning_path_id} if learning_path_id else {})
-            ).annotate(
-                completion_time_days=(F('completed_at') - F('started_at'))
-            ).values('completion_time_days'))
+            historical_completions = [
+                {'completion_time_days': row['completed_at'] - row['started_at']}
+                for row in context.progress_between(start_date, field='created_at', status='completed')
+                if row['completed_at'] and row['started_at']
+            ]
             
             # Calculate completion velocity
             if historical_completions:
@@ -2492,11 +2284,12 @@ class PredictiveAnalyticsService:
             # 3. Difficulty adjustment based on historical performance
             if historical_completions and 'completion_time_days' in historical_completions[0]:
                 # Analyze difficulty progression
-                recent_performance = UserModuleProgress.objects.filter(
-                    user=user,
-                    updated_at__gte=end_date - timedelta(days=30),
-                    status='completed'
-                ).aggregate(avg_score=Avg('performance_score'))
+                recent_scores = [
+                    row['performance_score']
+                    for row in context.progress_between(end_date - timedelta(days=30), status='completed')
+                    if row['performance_score'] is not None
+                ]
+                recent_performance = {'avg_score': float(np.mean(recent_scores)) if recent_scores else None}
                 
                 if recent_performance['avg_score']:
                     performance_factor = recent_performance['avg_score']
@@ -2643,6 +2436,7 @@ class PredictiveAnalyticsService:
             }
 
 
+    @memoized_analysis
     def assess_retention_risk(self, user: User, learning_path_id: Optional[int] = None,
                             risk_horizon_days: int = 30) -> Dict[str, Any]:
         """
@@ -2664,16 +2458,12 @@ class PredictiveAnalyticsService:
             risk_indicators = {}
             
             # 1. Activity decline analysis
-            recent_activity = UserModuleProgress.objects.filter(
-                user=user,
-                updated_at__gte=end_date - timedelta(days=30)
-            ).count()
+            context = self._context_for(user, learning_path_id)
+            recent_start = end_date - timedelta(days=30)
+            older_start = end_date - timedelta(days=60)
             
-            older_activity = UserModuleProgress.objects.filter(
-                user=user,
-                updated_at__gte=end_date - timedelta(days=60),
-                updated_at__lt=end_date - timedelta(days=30)
-            ).count()
+            recent_activity = len(context.progress_between(recent_start))
+            older_activity = len(context.progress_between(older_start, recent_start))
             
             if older_activity > 0:
                 activity_trend = (recent_activity - older_activity) / older_activity
@@ -2699,21 +2489,17 @@ class PredictiveAnalyticsService:
                 risk_indicators['engagement_change'] = 0
             
             # 3. Performance decline analysis
-            recent_performance = UserModuleProgress.objects.filter(
-                user=user,
-                updated_at__gte=end_date - timedelta(days=30),
-                status='completed'
-            ).aggregate(avg_score=Avg('performance_score'))
-            
-            older_performance = UserModuleProgress.objects.filter(
-                user=user,
-                updated_at__gte=end_date - timedelta(days=60),
-                updated_at__lt=end_date - timedelta(days=30),
-                status='completed'
-            ).aggregate(avg_score=Avg('performance_score'))
-            
-            current_performance = recent_performance['avg_score'] or 0.5
-            past_performance = older_performance['avg_score'] or 0.5
+            recent_scores = [
+                row['performance_score'] for row in context.progress_between(recent_start, status='completed')
+                if row['performance_score'] is not None
+            ]
+            older_scores = [
+                row['performance_score'] for row in context.progress_between(older_start, recent_start, status='completed')
+                if row['performance_score'] is not None
+            ]
+            
+            current_performance = float(np.mean(recent_scores)) if recent_scores else 0.5
+            past_performance = float(np.mean(older_scores)) if older_scores else 0.5
             
             if past_performance > 0:
                 performance_change = (current_performance - past_performance) / past_performance
@@ -2740,10 +2526,9 @@ class PredictiveAnalyticsService:
             
             # 5. Streak analysis
             # Calculate learning streak
-            learning_dates = list(UserModuleProgress.objects.filter(
-                user=user,
-                updated_at__gte=end_date - timedelta(days=60)
-            ).dates('updated_at', 'day'))
+            learning_dates = sorted({
+                timezone.localtime(row['updated_at']).date() for row in context.progress_between(older_start)
+            })
             
             learning_dates.sort()
             
@@ -2778,16 +2563,9 @@ class PredictiveAnalyticsService:
             })
             
             # 6. Assessment failure patterns
-            failed_assessments = AssessmentAttempt.objects.filter(
-                user=user,
-                score__lt=0.6,
-                completed_at__gte=end_date - timedelta(days=30)
-            ).count()
-            
-            total_assessments = AssessmentAttempt.objects.filter(
-                user=user,
-                completed_at__gte=end_date - timedelta(days=30)
-            ).count()
+            recent_assessments = context.attempts_between(recent_start)
+            failed_assessments = sum(1 for row in recent_assessments if row['score'] < 0.6)
+            total_assessments = len(recent_assessments)
             
             failure_rate = failed_assessments / total_assessments if total_assessments > 0 else 0
             
@@ -3013,6 +2791,7 @@ class PredictiveAnalyticsService:
             }
 
 
+    @memoized_analysis
     def detect_knowledge_gaps(self, user: User, learning_path_id: Optional[int] = None,
                             analysis_depth: str = 'comprehensive') -> Dict[str, Any]:
         """
@@ -3031,19 +2810,13 @@ class PredictiveAnalyticsService:
             start_date = end_date - timedelta(days=120)  # 4 months of data
             
             # Get user's learning data
-            query_kwargs = {'user': user, 'created_at__gte': start_date}
-            if learning_path_id:
-                query_kwargs['learning_path_id'] = learning_path_id
+            context = self._context_for(user, learning_path_id)
             
             # 1. Assessment-based gap analysis
-            assessment_results = list(AssessmentAttempt.objects.filter(
-                **query_kwargs
-            ).values())
+            assessment_results = context.attempts_between(start_date, field='started_at')
             
             # 2. Module performance analysis
-            module_performance = list(UserModuleProgress.objects.filter(
-                **query_kwargs
-            ).values())
+            module_performance = context.progress_between(start_date, field='created_at')
             
             knowledge_gaps = []
             proficiency_scores = {}
@@ -3089,7 +2862,7 @@ class PredictiveAnalyticsService:
                 for module in module_performance:
                     module_id = module.get('module_id', 'unknown')
                     status = module.get('status', 'in_progress')
-                    performance = module.get('performance_score', 0)
+                    performance = module.get('performance_score') or 0
                     
                     if module_id not in module_data:
                         module_data[module_id] = {
@@ -3138,7 +2911,7 @@ class PredictiveAnalyticsService:
                 skill_progression = {}
                 
                 for module in module_performance:
-                    if module.get('difficulty_level') and module.get('performance_score', 0) > 0:
+                    if module.get('difficulty_level') and (module.get('performance_score') or 0) > 0:
                         difficulty = module['difficulty_level']
                         performance = module['performance_score']
                         
@@ -3303,139 +3076,42 @@ class PredictiveAnalyticsService:
 
     def perform_learning_analytics_clustering(self, learning_path_id: Optional[int] = None,
                                            cluster_count: Optional[int] = None,
-                                           feature_selection: str = 'comprehensive') -> Dict[str, Any]:
+                                           feature_selection: str = 'comprehensive',
+                                           user: Optional[User] = None) -> Dict[str, Any]:
         """
-        Perform K-Means clustering analysis for learner segmentation and pattern discovery.
+        Learner segmentation for pattern discovery, read from the stored segmentation.
+        
+        Segments are fitted over every active learner by the scheduled
+        train_learner_segments job; requests never fit a model. A learner
+        without a stored label is assigned to the nearest centroid.
         
         Args:
-            learning_path_id: Optional learning path to focus analysis on
-            cluster_count: Number of clusters (auto-detected if None)
-            feature_selection: 'basic', 'standard', or 'comprehensive'
+            learning_path_id: Learning path segmentation, if one was trained
+            cluster_count: Unused; the segment count is chosen at training time
+                (train_learner_segments --clusters)
+            feature_selection: Unused; every segmentation uses SEGMENT_FEATURES
+            user: Also report this learner's segment
             
         Returns:
             Dict with cluster analysis, learner segments, and insights
         """
         try:
-            end_date = timezone.now()
-            start_date = end_date - timedelta(days=90)  # 3 months of data
-            
-            # Collect learner data for clustering
-            users_data = []
-            users_metadata = []
-            
-            query_kwargs = {'created_at__gte': start_date}
-            if learning_path_id:
-                query_kwargs['learning_path_id'] = learning_path_id
-            
-            # Get all users with activity in the specified timeframe
-            active_users = User.objects.filter(
-                id__in=UserModuleProgress.objects.filter(**query_kwargs).values('user_id')
-            )
-            
-            if len(active_users) < 10:
+            segmenter = LearnerSegmentationService()
+            segmentation = segmenter.get(learning_path_id)
+            if segmentation is None:
                 return {
-                    'status': 'insufficient_data',
-                    'message': 'Not enough active users for meaningful clustering analysis',
-                    'minimum_required': 10,
-                    'current_users': len(active_users)
-                }
-            
-            # Extract features for each user
-            for user in active_users[:200]:  # Limit to 200 users for performance
-                user_features = self._extract_user_clustering_features(user, learning_path_id, feature_selection)
-                if user_features is not None:
-                    users_data.append(user_features)
-                    users_metadata.append({
-                        'user_id': user.id,
-                        'username': user.username,
-                        'email': user.email
-                    })
-            
-            if len(users_data) < 10:
-                return {
-                    'status': 'insufficient_data',
-                    'message': 'Not enough users with sufficient data for clustering',
-                    'processed_users': len(users_data)
-                }
-            
-            # Prepare feature matrix
-            feature_matrix = np.array(users_data)
-            
-            # Handle missing values
-            feature_matrix = np.nan_to_num(feature_matrix, nan=0.0, posinf=1.0, neginf=0.0)
-            
-            # Standardize features
-            scaler = StandardScaler()
-            feature_matrix_scaled = scaler.fit_transform(feature_matrix)
-            
-            # Determine optimal number of clusters if not specified
-            if cluster_count is None:
-                optimal_clusters = self._find_optimal_clusters(feature_matrix_scaled, max_clusters=min(8, len(users_data) // 5))
-            else:
-                optimal_clusters = cluster_count
-            
-            # Perform K-Means clustering
-            kmeans = KMeans(n_clusters=optimal_clusters, random_state=42, n_init=10)
-            cluster_labels = kmeans.fit_predict(feature_matrix_scaled)
-            
-            # Calculate cluster quality metrics
-            silhouette_avg = silhouette_score(feature_matrix_scaled, cluster_labels)
-            inertia = kmeans.inertia_
-            
-            # Analyze clusters
-            cluster_analysis = {}
-            for cluster_id in range(optimal_clusters):
-                cluster_mask = cluster_labels == cluster_id
-                cluster_users = [users_metadata[i] for i in range(len(users_metadata)) if cluster_mask[i]]
-                cluster_features = feature_matrix_scaled[cluster_mask]
-                
-                if len(cluster_features) > 0:
-                    # Calculate cluster characteristics
-                    cluster_stats = {
-                        'cluster_id': cluster_id,
-                        'user_count': len(cluster_users),
-                        'percentage_of_total': float(len(cluster_users) / len(users_data) * 100),
-                        'feature_means': np.mean(cluster_features, axis=0).tolist(),
-                        'feature_stds': np.std(cluster_features, axis=0).tolist()
+                    'status': 'untrained',
+                    'message': 'No learner segmentation has been trained yet (run train_learner_segments)',
+                    'clustering_results': {
+                        'optimal_clusters': 0,
+                        'total_users_analyzed': 0
                     }
-                    
-                    # Identify dominant features
-                    feature_names = self._get_feature_names(feature_selection)
-                    dominant_features = []
-                    
-                    for i, feature_name in enumerate(feature_names):
-                        cluster_mean = cluster_stats['feature_means'][i]
-                        overall_mean = np.mean(feature_matrix_scaled[:, i])
-                        
-                        if abs(cluster_mean - overall_mean) > 0.5:  # Significant deviation
-                            dominant_features.append({
-                                'feature': feature_name,
-                                'cluster_value': float(cluster_mean),
-                                'overall_mean': float(overall_mean),
-                                'deviation': float(cluster_mean - overall_mean),
-                                'significance': 'high' if abs(cluster_mean - overall_mean) > 1.0 else 'moderate'
-                            })
-                    
-                    cluster_stats['dominant_features'] = dominant_features
-                    
-                    # Generate cluster description
-                    cluster_description = self._generate_cluster_description(cluster_stats, feature_names)
-                    cluster_stats['description'] = cluster_description
-                    
-                    # Calculate cluster quality
-                    if len(cluster_features) > 1:
-                        cluster_inertia = np.sum((cluster_features - np.mean(cluster_features, axis=0))**2)
-                        cluster_stats['cohesion'] = float(1 - (cluster_inertia / inertia)) if inertia > 0 else 0.5
-                    else:
-                        cluster_stats['cohesion'] = 1.0
-                    
-                    cluster_analysis[f'cluster_{cluster_id}'] = cluster_stats
-            
-            # Feature importance analysis
-            feature_importance = self._analyze_feature_importance(feature_matrix_scaled, cluster_labels, feature_names)
+                }
             
-            # Cross-cluster comparison
-            cluster_comparisons = self._compare_clusters(cluster_analysis, feature_names)
+            cluster_analysis = {f"cluster_{profile['cluster_id']}": profile for profile in segmentation.profiles}
+            cluster_comparisons = self._compare_clusters(cluster_analysis, segmentation.feature_names)
+            silhouette_avg = segmentation.silhouette or 0.0
+            optimal_clusters = len(segmentation.centroids)
             
             # Generate insights and recommendations
             insights = []
@@ -3467,18 +3143,18 @@ class PredictiveAnalyticsService:
             recommendations.append(f"Focus resources on largest segment: {largest_cluster['cluster_id']} ({largest_cluster['user_count']} users)")
             recommendations.append(f"Provide specialized support for smallest segment: {smallest_cluster['cluster_id']} ({smallest_cluster['user_count']} users)")
             
-            return {
+            result = {
                 'status': 'success',
                 'clustering_results': {
                     'optimal_clusters': optimal_clusters,
                     'actual_clusters': len(cluster_analysis),
-                    'total_users_analyzed': len(users_data),
+                    'total_users_analyzed': segmentation.sample_size,
                     'silhouette_score': float(silhouette_avg),
-                    'inertia': float(inertia),
+                    'inertia': float(segmentation.inertia),
                     'clustering_quality': 'excellent' if silhouette_avg > 0.7 else 'good' if silhouette_avg > 0.5 else 'moderate' if silhouette_avg > 0.3 else 'poor'
                 },
                 'cluster_analysis': cluster_analysis,
-                'feature_importance': feature_importance,
+                'feature_importance': segmentation.feature_importance,
                 'cross_cluster_comparisons': cluster_comparisons,
                 'learner_segments': [
                     {
@@ -3492,11 +3168,22 @@ class PredictiveAnalyticsService:
                 ],
                 'insights': insights,
                 'recommendations': recommendations,
-                'methodology': 'K-Means clustering with standardized features and silhouette analysis',
-                'feature_selection': feature_selection,
-                'analysis_timestamp': end_date.isoformat()
+                'methodology': 'Mini-batch K-Means over all active learners with standardized features and silhouette analysis',
+                'feature_selection': 'segmentation',
+                'segmentation_info': segmenter.describe(segmentation),
+                'analysis_timestamp': timezone.now().isoformat()
             }
             
+            if user is not None:
+                segment = segmenter.segment_for(segmentation, user.id)
+                result['user_segment'] = {
+                    'segment_id': f'cluster_{segment.segment}',
+                    'distance_to_centroid': segment.distance,
+                    'assigned_at': segment.assigned_at.isoformat()
+                } if segment else None
+            
+            return result
+            
         except Exception as e:
             logger.error(f"Error performing clustering analysis: {e}")
             return {
@@ -3508,150 +3195,6 @@ class PredictiveAnalyticsService:
                 }
             }
     
-    def _extract_user_clustering_features(self, user: User, learning_path_id: Optional[int], 
-                                        feature_selection: str) -> Optional[List[float]]:
-        """Extract features for clustering from user data"""
-        try:
-            end_date = timezone.now()
-            start_date = end_date - timedelta(days=90)
-            
-            features = []
-            
-            query_kwargs = {'user': user, 'created_at__gte': start_date}
-            if learning_path_id:
-                query_kwargs['learning_path_id'] = learning_path_id
-            
-            # Basic features (always included)
-            if feature_selection in ['basic', 'standard', 'comprehensive']:
-                # Completion rate
-                total_modules = UserModuleProgress.objects.filter(**query_kwargs).count()
-                completed_modules = UserModuleProgress.objects.filter(**query_kwargs, status='completed').count()
-                completion_rate = completed_modules / total_modules if total_modules > 0 else 0
-                features.append(completion_rate)
-                
-                # Average performance
-                avg_performance = UserModuleProgress.objects.filter(
-                    **query_kwargs, performance_score__isnull=False
-                ).aggregate(avg_score=Avg('performance_score'))['avg_score'] or 0.5
-                features.append(avg_performance)
-                
-                # Activity level
-                activity_level = UserModuleProgress.objects.filter(**query_kwargs).count()
-                features.append(min(1.0, activity_level / 50))  # Normalized
-                
-                # Engagement score
-                engagement_analysis = self.analyze_engagement_patterns(user, learning_path_id)
-                engagement_score = engagement_analysis.get('engagement_score', 0.5) if engagement_analysis.get('status') == 'success' else 0.5
-                features.append(engagement_score)
-            
-            # Standard features
-            if feature_selection in ['standard', 'comprehensive']:
-                # Learning velocity
-                velocity_analysis = self.analyze_learning_velocity(user, learning_path_id)
-                velocity_score = velocity_analysis.get('velocity_score', 0.5) if velocity_analysis.get('status') == 'success' else 0.5
-                features.append(velocity_score)
-                
-                # Assessment success rate
-                assessment_data = AssessmentAttempt.objects.filter(**query_kwargs)
-                total_assessments = assessment_data.count()
-                successful_assessments = assessment_data.filter(score__gte=0.7).count()
-                assessment_success_rate = successful_assessments / total_assessments if total_assessments > 0 else 0.5
-                features.append(assessment_success_rate)
-                
-                # Session consistency
-                session_consistency = engagement_analysis.get('session_metrics', {}).get('consistency', 0.5) if engagement_analysis.get('status') == 'success' else 0.5
-                features.append(session_consistency)
-            
-            # Comprehensive features
-            if feature_selection == 'comprehensive':
-                # Retention risk
-                retention_analysis = self.assess_retention_risk(user, learning_path_id)
-                retention_risk = retention_analysis.get('risk_assessment', {}).get('overall_risk_score', 0.5) if retention_analysis.get('status') == 'success' else 0.5
-                features.append(1 - retention_risk)  # Invert for positive feature
-                
-                # Knowledge gap density
-                gap_analysis = self.detect_knowledge_gaps(user, learning_path_id)
-                gap_density = gap_analysis.get('knowledge_coverage', {}).get('gap_density', 0.5) if gap_analysis.get('status') == 'success' else 0.5
-                features.append(1 - gap_density)  # Invert for positive feature
-                
-                # Success probability
-                success_analysis = self.model_success_probability(user, learning_path_id)
-                success_probability = success_analysis.get('success_probability', 0.5) if success_analysis.get('status') == 'success' else 0.5
-                features.append(success_probability)
-            
-            # Ensure we have enough features for clustering
-            if len(features) < 3:
-                return None
-            
-            return features
-            
-        except Exception as e:
-            logger.error(f"Error extracting clustering features for user {user.id}: {e}")
-            return None
-    
-    def _get_feature_names(self, feature_selection: str) -> List[str]:
-        """Get feature names based on selection type"""
-        base_features = ['completion_rate', 'avg_performance', 'activity_level', 'engagement_score']
-        standard_features = ['velocity_score', 'assessment_success_rate', 'session_consistency']
-        comprehensive_features = ['retention_protection', 'knowledge_coverage', 'success_probability']
-        
-        if feature_selection == 'basic':
-            return base_features
-        elif feature_selection == 'standard':
-            return base_features + standard_features
-        else:  # comprehensive
-            return base_features + standard_features + comprehensive_features
-    
-    def _find_optimal_clusters(self, feature_matrix: np.ndarray, max_clusters: int = 8) -> int:
-        """Find optimal number of clusters using elbow method and silhouette analysis"""
-        try:
-            if len(feature_matrix) < 4:
-                return 2
-            
-            max_clusters = min(max_clusters, len(feature_matrix) // 2)
-            if max_clusters < 2:
-                return 2
-            
-            inertias = []
-            silhouette_scores = []
-            k_range = range(2, max_clusters + 1)
-            
-            for k in k_range:
-                kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
-                cluster_labels = kmeans.fit_predict(feature_matrix)
-                
-                inertias.append(kmeans.inertia_)
-                silhouette_avg = silhouette_score(feature_matrix, cluster_labels)
-                silhouette_scores.append(silhouette_avg)
-            
-            # Find elbow point in inertia
-            if len(inertias) >= 3:
-                # Simple elbow detection
-                deltas = [inertias[i] - inertias[i+1] for i in range(len(inertias)-1)]
-                second_deltas = [deltas[i] - deltas[i+1] for i in range(len(deltas)-1)]
-                
-                if second_deltas:
-                    elbow_index = second_deltas.index(max(second_deltas))
-                    elbow_clusters = k_range[elbow_index + 1]  # +1 because we start from 2
-                else:
-                    elbow_clusters = k_range[len(k_range)//2]
-            else:
-                elbow_clusters = k_range[len(k_range)//2]
-            
-            # Find best silhouette score
-            best_silhouette_index = silhouette_scores.index(max(silhouette_scores))
-            silhouette_clusters = k_range[best_silhouette_index]
-            
-            # Use silhouette score preference if reasonable, otherwise use elbow
-            if silhouette_scores[best_silhouette_index] > 0.3:
-                return silhouette_clusters
-            else:
-                return max(2, min(elbow_clusters, silhouette_clusters))
-                
-        except Exception as e:
-            logger.error(f"Error finding optimal clusters: {e}")
-            return min(4, max(2, len(feature_matrix) // 10))
-    
     def _generate_cluster_description(self, cluster_stats: Dict[str, Any], feature_names: List[str]) -> str:
         """Generate human-readable description for a cluster"""
         try:
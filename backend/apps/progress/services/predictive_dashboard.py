@@ -0,0 +1,206 @@
+# JAC Interactive Learning Platform - Core backend implementation by Cavin Otieno
+
+"""
+Predictive Dashboard Service - JAC Learning Platform
+
+Builds the comprehensive predictive analytics report. The report's sections
+are independent analyses, so they run concurrently on a bounded per-process
+thread pool and share one AnalyticsDataContext, which loads the learner's
+history once.
+
+- Each section is cached under (section, learner, learning path, parameters,
+  data watermark). Saving progress or an assessment attempt advances the
+  learner's watermark, so the next request recomputes instead of serving
+  stale analytics. Platform-wide sections (learner clustering) are cached
+  per learning path for a fixed time instead.
+- A request waits at most DASHBOARD_TIMEOUT for uncached sections. Sections
+  still running are reported as pending and finish in the background, so a
+  later request finds them in the cache.
+- Concurrent requests needing the same section share one computation.
+
+Author: Cavin Otieno
+Created: 2025-11-26
+"""
+
+import json
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future, wait
+from typing import Any, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+
+from .analytics_context import AnalyticsDataContext, analytics_watermark
+from .predictive_analytics_service import PredictiveAnalyticsService
+
+logger = logging.getLogger(__name__)
+
+SECTION_CACHE_PREFIX = 'progress:predictive'
+
+LEARNER_SCOPE = 'learner'
+PLATFORM_SCOPE = 'platform'
+
+# (section, service method, scope, keyword arguments built from the request parameters)
+DASHBOARD_SECTIONS = (
+    ('ml_predictions', 'generate_ml_predictions', LEARNER_SCOPE,
+     lambda params: {'prediction_horizon_days': params['prediction_horizon_days']}),
+    ('historical_trends', 'analyze_historical_trends', LEARNER_SCOPE,
+     lambda params: {'analysis_period_days': params['analysis_period_days']}),
+    ('adaptive_predictions', 'adaptive_prediction_algorithm', LEARNER_SCOPE,
+     lambda params: {}),
+    ('confidence_analysis', 'statistical_confidence_calculations', LEARNER_SCOPE,
+     lambda params: {'confidence_level': params['confidence_level']}),
+    ('learning_velocity', 'analyze_learning_velocity', LEARNER_SCOPE,
+     lambda params: {'days_window': min(params['analysis_period_days'], 30)}),
+    ('engagement_patterns', 'analyze_engagement_patterns', LEARNER_SCOPE,
+     lambda params: {'analysis_depth': 'comprehensive'}),
+    ('success_probability', 'model_success_probability', LEARNER_SCOPE,
+     lambda params: {'time_horizon_days': params['prediction_horizon_days']}),
+    ('time_to_completion', 'predict_time_to_completion', LEARNER_SCOPE,
+     lambda params: {'include_holidays': True}),
+    ('retention_risk', 'assess_retention_risk', LEARNER_SCOPE,
+     lambda params: {'risk_horizon_days': params['prediction_horizon_days']}),
+    ('knowledge_gaps', 'detect_knowledge_gaps', LEARNER_SCOPE,
+     lambda params: {'analysis_depth': 'comprehensive'}),
+    ('learning_clusters', 'perform_learning_analytics_clustering', PLATFORM_SCOPE,
+     lambda params: {'feature_selection': 'comprehensive'}),
+)
+
+
+class PredictiveDashboardService:
+    """
+    Concurrent, cached builder of the comprehensive predictive analytics report.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        predictive_config = getattr(settings, 'PREDICTIVE_ANALYTICS_CONFIG', {})
+        self.workers = predictive_config.get('DASHBOARD_WORKERS', 8)
+        self.timeout = predictive_config.get('DASHBOARD_TIMEOUT', 0.75)
+        self.section_ttl = predictive_config.get('SECTION_CACHE_TTL', 3600)
+        self.platform_section_ttl = predictive_config.get('PLATFORM_SECTION_CACHE_TTL', 1800)
+
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='predictive-dashboard')
+        # Reentrant: a section that is already done runs its callback inside submit()
+        self._lock = threading.RLock()
+        self._inflight = {}
+
+    @classmethod
+    def get_instance(cls) -> 'PredictiveDashboardService':
+        """Get the dashboard service for this process, starting its pool on first use."""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def build(self, user, learning_path_id: Optional[int] = None, prediction_horizon_days: int = 30,
+              analysis_period_days: int = 90, confidence_level: float = 0.95) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """
+        Build every section of the report.
+
+        Args:
+            user: User instance
+            learning_path_id: Optional learning path to focus on
+            prediction_horizon_days: Days ahead to predict
+            analysis_period_days: Days of history to analyze
+            confidence_level: Confidence level for interval estimates
+
+        Returns:
+            (results by section, source of each section: 'cached', 'computed',
+            'pending' or 'error')
+        """
+        params = {
+            'prediction_horizon_days': prediction_horizon_days,
+            'analysis_period_days': analysis_period_days,
+            'confidence_level': confidence_level,
+        }
+        watermark = analytics_watermark(user.id)
+        service = PredictiveAnalyticsService(data_context=AnalyticsDataContext(user, learning_path_id))
+
+        sections = {}
+        for name, method, scope, build_kwargs in DASHBOARD_SECTIONS:
+            kwargs = build_kwargs(params)
+            key = self._cache_key(name, scope, user.id, learning_path_id, kwargs, watermark)
+            sections[name] = (key, method, scope, kwargs)
+
+        try:
+            cached = cache.get_many([key for key, _, _, _ in sections.values()])
+        except Exception as e:
+            logger.warning(f'Predictive section cache unavailable: {str(e)}')
+            cached = {}
+
+        results, sources, futures = {}, {}, {}
+        for name, (key, method, scope, kwargs) in sections.items():
+            if key in cached:
+                results[name] = cached[key]
+                sources[name] = 'cached'
+                continue
+            if scope == LEARNER_SCOPE:
+                kwargs = {'user': user, 'learning_path_id': learning_path_id, **kwargs}
+            else:
+                kwargs = {'learning_path_id': learning_path_id, **kwargs}
+            ttl = self.section_ttl if scope == LEARNER_SCOPE else self.platform_section_ttl
+            futures[name] = self._submit(key, ttl, getattr(service, method), kwargs)
+
+        if futures:
+            wait(futures.values(), timeout=self.timeout)
+
+        for name, future in futures.items():
+            if not future.done():
+                results[name] = {
+                    'status': 'pending',
+                    'message': 'This analysis is still being computed, refresh shortly to include it'
+                }
+                sources[name] = 'pending'
+                continue
+            try:
+                results[name] = future.result()
+                sources[name] = 'computed'
+            except Exception as e:
+                logger.error(f'Predictive dashboard section {name} failed: {e}')
+                results[name] = {'error': f'Analysis failed: {str(e)}'}
+                sources[name] = 'error'
+
+        return results, sources
+
+    def _submit(self, key: str, ttl: int, analysis, kwargs: Dict[str, Any]) -> Future:
+        """Start a section, or join the computation already running for the same key."""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None:
+                future = self._executor.submit(self._compute, key, ttl, analysis, kwargs)
+                self._inflight[key] = future
+                future.add_done_callback(lambda _, key=key: self._forget(key))
+            return future
+
+    def _forget(self, key: str):
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    @staticmethod
+    def _compute(key: str, ttl: int, analysis, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Pool thread body: run one analysis and cache its result unless it failed."""
+        try:
+            result = analysis(**kwargs)
+            if not (isinstance(result, dict) and 'error' in result):
+                try:
+                    cache.set(key, result, ttl)
+                except Exception as e:
+                    logger.warning(f'Could not cache predictive section: {str(e)}')
+            return result
+        finally:
+            close_old_connections()
+
+    @staticmethod
+    def _cache_key(name: str, scope: str, user_id, learning_path_id, kwargs: Dict[str, Any], watermark: str) -> str:
+        digest = hashlib.sha256(json.dumps(kwargs, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+        path = learning_path_id or 'all'
+        if scope == PLATFORM_SCOPE:
+            return f'{SECTION_CACHE_PREFIX}:{name}:{PLATFORM_SCOPE}:{path}:{digest}'
+        return f'{SECTION_CACHE_PREFIX}:{name}:{user_id}:{path}:{digest}:{watermark}'
@@ -16,11 +16,11 @@ from django.conf import settings
 from django.utils import timezone
 from django.contrib.auth.models import User
 from django.db.models import Q, Count, Sum, Avg, Max, Min
-from django.db.models.functions import TruncDate
 from datetime import datetime, timedelta
 import logging
 
 from ..models import ProgressSnapshot, ProgressNotification, UserProgressMetric
+from .activity_rollup_service import ActivityRollupService, count_streaks
 from apps.learning.models import (
     LearningPath, Module, Lesson, UserLearningPath, UserModuleProgress
 )
@@ -36,6 +36,7 @@ class ProgressService:
     
     def __init__(self):
         self.snapshot_threshold_hours = 6  # Minimum hours between automatic snapshots
+        self.activity_rollup = ActivityRollupService()
     
     def create_user_snapshot(
         self,
@@ -503,78 +504,45 @@ class ProgressService:
     
     def _calculate_days_active(self, user: User, learning_path: Optional[LearningPath] = None) -> int:
         """Calculate number of days user has been active"""
-        queryset = UserModuleProgress.objects.filter(user=user)
-        
-        if learning_path:
-            queryset = queryset.filter(module__learning_path=learning_path)
+        if learning_path is None:
+            summary = self.activity_rollup.get_summary(user.id)
+            return summary.days_active if summary else 0
         
-        # Count distinct days with activity
-        active_days = queryset.dates('updated_at', 'day').count()
-        return active_days
+        # The rollup is platform-wide; path-scoped totals still come from the progress rows
+        queryset = UserModuleProgress.objects.filter(user=user, module__learning_path=learning_path)
+        return queryset.dates('updated_at', 'day').count()
     
     def _calculate_session_count(self, user: User, learning_path: Optional[LearningPath] = None) -> int:
         """Calculate number of learning sessions"""
-        queryset = UserModuleProgress.objects.filter(user=user)
-        
-        if learning_path:
-            queryset = queryset.filter(module__learning_path=learning_path)
-        
-        # Group by date to count sessions
-        sessions = queryset.annotate(
-            date=TruncDate('updated_at')
-        ).values('date').distinct().count()
+        if learning_path is None:
+            summary = self.activity_rollup.get_summary(user.id)
+            return summary.session_count if summary else 0
         
-        return sessions
+        # Without per-path sessions, each active day in the path counts as one session
+        queryset = UserModuleProgress.objects.filter(user=user, module__learning_path=learning_path)
+        return queryset.dates('updated_at', 'day').count()
     
     def _calculate_current_streak(self, user: User, learning_path: Optional[LearningPath] = None) -> int:
         """Calculate current learning streak in days"""
-        queryset = UserModuleProgress.objects.filter(user=user)
-        
-        if learning_path:
-            queryset = queryset.filter(module__learning_path=learning_path)
-        
-        # Get dates with activity, ordered descending
-        activity_dates = queryset.dates('updated_at', 'day').order_by('-day')
+        if learning_path is None:
+            return self.activity_rollup.current_streak(user.id)
         
-        if not activity_dates:
+        queryset = UserModuleProgress.objects.filter(user=user, module__learning_path=learning_path)
+        activity_dates = list(queryset.dates('updated_at', 'day'))
+        if not activity_dates or (timezone.localdate() - max(activity_dates)).days > 1:
             return 0
-        
-        # Calculate streak
-        streak = 1
-        current_date = activity_dates[0]
-        
-        for activity_date in activity_dates[1:]:
-            if (current_date - activity_date).days == 1:
-                streak += 1
-                current_date = activity_date
-            else:
-                break
-        
-        return streak
+        current, _, _ = count_streaks(activity_dates)
+        return current
     
     def _calculate_longest_streak(self, user: User, learning_path: Optional[LearningPath] = None) -> int:
         """Calculate longest learning streak"""
-        queryset = UserModuleProgress.objects.filter(user=user)
-        
-        if learning_path:
-            queryset = queryset.filter(module__learning_path=learning_path)
-        
-        activity_dates = list(queryset.dates('updated_at', 'day').order_by('day'))
-        
-        if not activity_dates:
-            return 0
-        
-        max_streak = 1
-        current_streak = 1
-        
-        for i in range(1, len(activity_dates)):
-            if (activity_dates[i] - activity_dates[i-1]).days == 1:
-                current_streak += 1
-                max_streak = max(max_streak, current_streak)
-            else:
-                current_streak = 1
+        if learning_path is None:
+            summary = self.activity_rollup.get_summary(user.id)
+            return summary.longest_streak if summary else 0
         
-        return max_streak
+        queryset = UserModuleProgress.objects.filter(user=user, module__learning_path=learning_path)
+        _, _, longest = count_streaks(queryset.dates('updated_at', 'day'))
+        return longest
     
     def _determine_learning_level(self, completion_percentage: float, avg_score: float) -> str:
         """Determine user's current learning level"""
@@ -6,34 +6,70 @@ Real-time Monitoring Service - JAC Learning Platform
 This service provides real-time performance monitoring, WebSocket connections,
 and live analytics for dashboard data feeds.
 
+Updates are event driven: saving module progress or completing an assessment
+attempt queues one compact change event after the transaction commits (see
+progress.signals). A Celery worker recomputes the metrics it changed and
+pushes the event with group_send to the learner's dashboard, activity,
+metrics and alert groups, together with those metrics and any alerts it
+triggered. Nothing polls, so database work follows learning activity rather
+than the number of open dashboards, and learners without an open socket
+cost nothing beyond a cache lookup per save.
+
+Open sockets are counted per learner and process in the shared cache, and
+a per-learner list of processes lets readers add the counts up. Each count
+expires after LISTENER_TTL unless its process refreshes it every
+LISTENER_HEARTBEAT seconds, so sockets of a crashed process stop being
+counted, and a process whose count expired or was evicted simply writes
+it again without touching the counts of the others.
+
 Author: Cavin Otieno
 Created: 2025-11-26
 """
 
-import json
 import uuid
 import asyncio
-from typing import Dict, Any, List, Optional, Set
-from datetime import datetime, timedelta
+import threading
+from collections import Counter
+from typing import Dict, Any, List, Optional
+from datetime import timedelta
 from django.conf import settings
 from django.utils import timezone
-from django.contrib.auth.models import User
-from django.db.models import Q, Count, Avg
+from django.db.models import Avg
 from django.core.cache import cache
 from channels.layers import get_channel_layer
+from channels.db import database_sync_to_async
 from asgiref.sync import async_to_sync
+import logging
+import numpy as np
 
-from ..models import ProgressSnapshot, LearningAnalytics, ProgressNotification
+from ..models import ProgressNotification
+from .activity_rollup_service import ActivityRollupService
 from apps.learning.models import UserModuleProgress, AssessmentAttempt
 
+logger = logging.getLogger(__name__)
+
+# Processes with open realtime sockets per user, and the count of each
+LISTENERS_CACHE_PREFIX = 'progress:realtime_listeners'
+# Seconds a process may hold the lock on a user's list of processes
+LISTENERS_LOCK_TIMEOUT = 5
+# Latest realtime metrics per user (also read by the realtime REST views)
+METRICS_CACHE_KEY = 'realtime_metrics_{user_id}'
+METRICS_CACHE_TTL = 300
+
+# Metrics whose change is not worth a push on its own
+VOLATILE_METRICS = ('last_updated',)
+
 
 class RealtimeMonitoringService:
     """
     Service for real-time performance monitoring and dashboard data feeds
     """
-    
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
     def __init__(self):
-        self.active_sessions = {}  # Track active user sessions
+        self.active_sessions = {}  # user_id -> {session_id: started_at} for sockets in this process
         self.monitoring_thresholds = {
             'low_performance': 60.0,
             'high_performance': 90.0,
@@ -41,237 +77,308 @@ class RealtimeMonitoringService:
             'consistency_threshold': 70.0
         }
         self.channel_layer = get_channel_layer()
-    
+        self.activity_rollup = ActivityRollupService()
+
+        realtime_config = getattr(settings, 'PROGRESS_REALTIME_CONFIG', {})
+        self.listener_ttl = realtime_config.get('LISTENER_TTL', 120)
+        self.heartbeat_interval = realtime_config.get('LISTENER_HEARTBEAT', 30)
+        self.listeners = Counter()  # user_id -> open sockets in this process
+        self.process_id = uuid.uuid4().hex
+        self._heartbeat = None
+
+    @classmethod
+    def get_instance(cls) -> 'RealtimeMonitoringService':
+        """Get the monitoring service shared by every consumer in this process"""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    # ------------------------------------------------------------------
+    # Socket sessions (called from consumers, on the event loop)
+    # ------------------------------------------------------------------
+
     async def start_user_monitoring(self, user_id: int, session_id: str) -> Dict[str, Any]:
-        """Start real-time monitoring for a user session"""
+        """Register a dashboard session and build its initial data"""
         try:
-            # Initialize session tracking
-            if user_id not in self.active_sessions:
-                self.active_sessions[user_id] = {}
-            
-            self.active_sessions[user_id][session_id] = {
-                'started_at': timezone.now(),
-                'last_activity': timezone.now(),
-                'activities': [],
-                'performance_metrics': {},
-                'alerts_triggered': set()
-            }
-            
-            # Send initial dashboard data
-            await self.send_initial_dashboard_data(user_id, session_id)
-            
-            # Start background monitoring task
-            asyncio.create_task(self._monitor_user_session(user_id, session_id))
-            
+            self.active_sessions.setdefault(user_id, {})[session_id] = timezone.now()
+            await self.add_listener(user_id)
+
+            dashboard_data = await database_sync_to_async(self.build_dashboard_snapshot)(user_id, session_id)
+
             return {
                 'success': True,
                 'session_id': session_id,
-                'monitoring_started': True
+                'monitoring_started': True,
+                'initial_data': dashboard_data
             }
-            
+
         except Exception as e:
             return {
                 'success': False,
                 'error': str(e)
             }
-    
+
     async def stop_user_monitoring(self, user_id: int, session_id: str) -> Dict[str, Any]:
-        """Stop real-time monitoring for a user session"""
+        """Unregister a dashboard session"""
         try:
-            if user_id in self.active_sessions and session_id in self.active_sessions[user_id]:
-                # Finalize session data
-                await self._finalize_session_data(user_id, session_id)
-                
-                # Remove session
-                del self.active_sessions[user_id][session_id]
-                
-                if not self.active_sessions[user_id]:
-                    del self.active_sessions[user_id]
-            
+            sessions = self.active_sessions.get(user_id, {})
+            if sessions.pop(session_id, None) is not None:
+                await self.remove_listener(user_id)
+            if not sessions:
+                self.active_sessions.pop(user_id, None)
+
             return {'success': True}
-            
+
         except Exception as e:
             return {'success': False, 'error': str(e)}
-    
-    async def send_initial_dashboard_data(self, user_id: int, session_id: str) -> None:
-        """Send initial dashboard data to user"""
+
+    async def add_listener(self, user_id: int) -> None:
+        """Count an open realtime socket of a user"""
+        self.listeners[user_id] += 1
         try:
-            user = User.objects.get(id=user_id)
-            
-            # Get current progress data
-            current_progress = await self._get_current_user_progress(user)
-            
-            # Get real-time metrics
-            realtime_metrics = await self._calculate_realtime_metrics(user)
-            
-            # Prepare dashboard data
-            dashboard_data = {
-                'type': 'dashboard_initial_data',
-                'session_id': session_id,
-                'timestamp': timezone.now().isoformat(),
-                'user_id': user_id,
-                'progress_summary': current_progress,
-                'realtime_metrics': realtime_metrics,
-                'alerts': await self._get_user_alerts(user),
-                'recommendations': await self._generate_realtime_recommendations(user)
-            }
-            
-            # Send via WebSocket
-            await self._send_to_user_channel(user_id, dashboard_data)
-            
+            await self._store_listeners(user_id)
         except Exception as e:
-            print(f"Error sending initial dashboard data: {e}")
-    
-    async def _monitor_user_session(self, user_id: int, session_id: str) -> None:
-        """Background task to monitor user session"""
-        monitoring_active = True
-        
-        while monitoring_active:
-            try:
-                # Check if session still exists
-                if user_id not in self.active_sessions or session_id not in self.active_sessions[user_id]:
-                    break
-                
-                session = self.active_sessions[user_id][session_id]
-                
-                # Update last activity
-                session['last_activity'] = timezone.now()
-                
-                # Check for new activities
-                await self._check_for_new_activities(user_id, session_id)
-                
-                # Update performance metrics
-                await self._update_performance_metrics(user_id, session_id)
-                
-                # Check alerts and thresholds
-                await self._check_alert_conditions(user_id, session_id)
-                
-                # Send periodic updates
-                await self._send_periodic_update(user_id, session_id)
-                
-                # Sleep for 30 seconds before next check
-                await asyncio.sleep(30)
-                
-            except Exception as e:
-                print(f"Error in monitoring session {session_id}: {e}")
-                await asyncio.sleep(60)  # Wait longer on error
-    
-    async def _check_for_new_activities(self, user_id: int, session_id: str) -> None:
-        """Check for new user activities since last check"""
-        session = self.active_sessions[user_id][session_id]
-        last_check = session.get('last_activity_check', timezone.now() - timedelta(minutes=1))
-        
-        # Check for new progress activities
-        new_progress = UserModuleProgress.objects.filter(
-            user_id=user_id,
-            updated_at__gt=last_check
-        ).order_by('-updated_at')[:5]
-        
-        # Check for new assessment attempts
-        new_assessments = AssessmentAttempt.objects.filter(
-            user_id=user_id,
-            completed_at__gt=last_check
-        ).order_by('-completed_at')[:3]
-        
-        new_activities = []
-        
-        for progress in new_progress:
-            new_activities.append({
-                'type': 'progress_update',
-                'module_id': progress.module.id,
-                'module_title': progress.module.title,
-                'status': progress.status,
-                'score': progress.score,
-                'timestamp': progress.updated_at.isoformat()
-            })
-        
-        for assessment in new_assessments:
-            new_activities.append({
-                'type': 'assessment_completed',
-                'assessment_id': assessment.assessment.id,
-                'score': assessment.score,
-                'max_score': assessment.max_score,
-                'time_spent': str(assessment.time_spent),
-                'timestamp': assessment.completed_at.isoformat() if assessment.completed_at else None
+            logger.warning(f'Could not register realtime listener: {str(e)}')
+
+        if self._heartbeat is None or self._heartbeat.done():
+            self._heartbeat = asyncio.ensure_future(self._refresh_listeners())
+
+    async def remove_listener(self, user_id: int) -> None:
+        """Uncount a closed realtime socket of a user"""
+        self.listeners[user_id] -= 1
+        if self.listeners[user_id] <= 0:
+            del self.listeners[user_id]
+        try:
+            if user_id in self.listeners:
+                await cache.aset(self._listener_key(user_id), self.listeners[user_id], self.listener_ttl)
+            else:
+                await cache.adelete(self._listener_key(user_id))
+        except Exception as e:
+            logger.warning(f'Could not unregister realtime listener: {str(e)}')
+
+    async def _refresh_listeners(self) -> None:
+        """Heartbeat: keep the counts of this process's open sockets from expiring"""
+        while self.listeners:
+            await asyncio.sleep(self.heartbeat_interval)
+            for user_id in list(self.listeners):
+                try:
+                    await self._store_listeners(user_id)
+                except Exception as e:
+                    logger.warning(f'Could not refresh realtime listeners: {str(e)}')
+
+    async def _store_listeners(self, user_id: int) -> None:
+        """Write this process's socket count for a user and make sure it is listed"""
+        sockets = self.listeners.get(user_id)
+        if not sockets:
+            return
+        await cache.aset(self._listener_key(user_id), sockets, self.listener_ttl)
+
+        processes_key = f'{LISTENERS_CACHE_PREFIX}:{user_id}'
+        if self.process_id in (await cache.aget(processes_key) or ()):
+            await cache.atouch(processes_key, self.listener_ttl)
+            return
+
+        # Adding to the list is a read-modify-write, so processes take turns
+        lock_key = f'{processes_key}:lock'
+        locked = False
+        for _ in range(LISTENERS_LOCK_TIMEOUT * 20):
+            locked = await cache.aadd(lock_key, self.process_id, LISTENERS_LOCK_TIMEOUT)
+            if locked:
+                break
+            await asyncio.sleep(0.05)
+        try:
+            processes = await cache.aget(processes_key) or []
+            # Processes whose count expired have no open sockets left
+            counts = await cache.aget_many([self._listener_key(user_id, process_id) for process_id in processes])
+            processes = [
+                process_id for process_id in processes
+                if self._listener_key(user_id, process_id) in counts and process_id != self.process_id
+            ]
+            await cache.aset(processes_key, processes + [self.process_id], self.listener_ttl)
+        finally:
+            if locked:
+                await cache.adelete(lock_key)
+
+    def _listener_key(self, user_id: int, process_id: Optional[str] = None) -> str:
+        return f'{LISTENERS_CACHE_PREFIX}:{user_id}:{process_id or self.process_id}'
+
+    def has_listeners(self, user_id: int) -> bool:
+        """Whether the user has an open realtime socket in any process"""
+        try:
+            processes = cache.get(f'{LISTENERS_CACHE_PREFIX}:{user_id}')
+            if not processes:
+                return False
+            counts = cache.get_many([self._listener_key(user_id, process_id) for process_id in processes])
+            return sum(counts.values()) > 0
+        except Exception:
+            # Without the counts we cannot tell, so publish
+            return True
+
+    def build_dashboard_snapshot(self, user_id: int, session_id: str) -> Dict[str, Any]:
+        """Initial dashboard data for a new session (blocking, run off the event loop)"""
+        realtime_metrics = cache.get(METRICS_CACHE_KEY.format(user_id=user_id))
+        if realtime_metrics is None:
+            realtime_metrics = self.calculate_realtime_metrics(user_id)
+            cache.set(METRICS_CACHE_KEY.format(user_id=user_id), realtime_metrics, timeout=METRICS_CACHE_TTL)
+
+        return {
+            'type': 'dashboard_initial_data',
+            'session_id': session_id,
+            'timestamp': timezone.now().isoformat(),
+            'user_id': user_id,
+            'progress_summary': self._get_current_user_progress(user_id),
+            'realtime_metrics': realtime_metrics,
+            'alerts': self._get_user_alerts(user_id),
+            'recommendations': self._generate_realtime_recommendations(user_id)
+        }
+
+    # ------------------------------------------------------------------
+    # Change events (called from progress.signals after commit)
+    # ------------------------------------------------------------------
+
+    def progress_event(self, progress: UserModuleProgress) -> Dict[str, Any]:
+        """Compact change event for a module progress save"""
+        return {
+            'type': 'progress_update',
+            'module_id': str(progress.module_id),
+            'status': progress.status,
+            'score': progress.overall_score,
+            'progress_percentage': progress.progress_percentage,
+            'timestamp': progress.updated_at.isoformat()
+        }
+
+    def assessment_event(self, attempt: AssessmentAttempt) -> Dict[str, Any]:
+        """Compact change event for a completed assessment attempt"""
+        return {
+            'type': 'assessment_completed',
+            'assessment_id': str(attempt.assessment_id),
+            'score': attempt.score,
+            'max_score': attempt.max_score,
+            'time_spent': str(attempt.time_spent),
+            'timestamp': attempt.completed_at.isoformat() if attempt.completed_at else None
+        }
+
+    def queue_activity(self, user_id: int, activity: Dict[str, Any]) -> None:
+        """
+        Hand a change event to a Celery worker, which publishes it.
+
+        Only the listener lookup runs in the saving request; the metrics and
+        alert queries of publish_activity run in the worker.
+        """
+        if not self.has_listeners(user_id):
+            return
+        try:
+            from config.celery import publish_realtime_activity_task
+            publish_realtime_activity_task.delay(user_id, activity)
+        except Exception as e:
+            logger.warning(f"Could not queue realtime activity for user {user_id}: {e}")
+
+    def publish_activity(self, user_id: int, activity: Dict[str, Any]) -> None:
+        """
+        Push a change event and what it changed to the user's open sockets.
+
+        Args:
+            user_id: Learner whose data changed
+            activity: Compact change event from progress_event/assessment_event
+        """
+        if not self.has_listeners(user_id):
+            return
+
+        try:
+            timestamp = timezone.now().isoformat()
+
+            self._send(f'user_{user_id}', {
+                'type': 'send_to_user',
+                'data': {'type': 'new_activities', 'activities': [activity], 'timestamp': timestamp}
             })
-        
-        if new_activities:
-            # Send new activities to user
-            activity_update = {
-                'type': 'new_activities',
-                'activities': new_activities,
-                'timestamp': timezone.now().isoformat()
+            self._send(f'activity_{user_id}', {'type': 'send_activity_update', 'activity': activity})
+
+            # Metrics: push only the values that changed
+            metrics_key = METRICS_CACHE_KEY.format(user_id=user_id)
+            previous = cache.get(metrics_key) or {}
+            metrics = self.calculate_realtime_metrics(user_id)
+            cache.set(metrics_key, metrics, timeout=METRICS_CACHE_TTL)
+
+            changes = {
+                name: value for name, value in metrics.items()
+                if name not in VOLATILE_METRICS and previous.get(name) != value
             }
-            
-            await self._send_to_user_channel(user_id, activity_update)
-            
-            # Add to session activities
-            session['activities'].extend(new_activities)
-            
-            # Keep only last 50 activities in memory
-            if len(session['activities']) > 50:
-                session['activities'] = session['activities'][-50:]
-        
-        # Update last check time
-        session['last_activity_check'] = timezone.now()
-    
-    async def _update_performance_metrics(self, user_id: int, session_id: str) -> None:
-        """Update real-time performance metrics"""
-        try:
-            user = User.objects.get(id=user_id)
-            
-            # Calculate updated metrics
-            metrics = await self._calculate_realtime_metrics(user)
-            
-            # Store in session
-            session = self.active_sessions[user_id][session_id]
-            session['performance_metrics'] = metrics
-            
-            # Update cache for persistence
-            cache_key = f"realtime_metrics_{user_id}"
-            cache.set(cache_key, metrics, timeout=300)  # 5 minutes
-            
+            if changes:
+                self._send(f'user_{user_id}', {
+                    'type': 'send_to_user',
+                    'data': {'type': 'metrics_update', 'changes': changes, 'timestamp': timestamp}
+                })
+                self._send(f'metrics_{user_id}', {'type': 'send_realtime_metrics', 'metrics': changes})
+
+            # Alerts triggered by this change
+            alerts = self._check_alert_conditions(previous, metrics)
+            for achievement in self._check_new_achievements(user_id, activity):
+                alerts.append({
+                    'type': 'achievement_alert',
+                    'severity': 'success',
+                    'message': f'Achievement unlocked: {achievement}',
+                    'timestamp': timestamp
+                })
+                self._send(f'activity_{user_id}', {
+                    'type': 'send_new_achievement',
+                    'achievement': {'name': achievement}
+                })
+
+            if alerts:
+                self._send(f'user_{user_id}', {
+                    'type': 'send_to_user',
+                    'data': {'type': 'alert_notification', 'alerts': alerts, 'timestamp': timestamp}
+                })
+                for alert in alerts:
+                    self._send(f'alerts_{user_id}', {'type': 'send_alert_notification', 'alert': alert})
+                    self._store_alert_notification(user_id, alert)
+
         except Exception as e:
-            print(f"Error updating performance metrics: {e}")
-    
-    async def _calculate_realtime_metrics(self, user: User) -> Dict[str, Any]:
+            logger.error(f"Error publishing realtime activity for user {user_id}: {e}")
+
+    # ------------------------------------------------------------------
+    # Metrics and alerts (blocking)
+    # ------------------------------------------------------------------
+
+    def calculate_realtime_metrics(self, user_id: int) -> Dict[str, Any]:
         """Calculate real-time performance metrics"""
         # Get recent activities (last 24 hours)
         yesterday = timezone.now() - timedelta(days=1)
-        
+
         recent_progress = UserModuleProgress.objects.filter(
-            user=user,
+            user_id=user_id,
             updated_at__gte=yesterday
         )
-        
-        recent_assessments = AssessmentAttempt.objects.filter(
-            user=user,
+
+        recent_scores = list(AssessmentAttempt.objects.filter(
+            user_id=user_id,
             completed_at__gte=yesterday
-        )
-        
+        ).values_list('score', flat=True))
+
         # Calculate metrics
         daily_activities = recent_progress.count()
-        daily_assessments = recent_assessments.count()
-        
+        daily_assessments = len(recent_scores)
+
         # Performance metrics
-        recent_scores = [a.score for a in recent_assessments if a.score is not None]
-        avg_recent_score = round(np.mean(recent_scores), 2) if recent_scores else 0
-        
+        recent_scores = [score for score in recent_scores if score is not None]
+        avg_recent_score = round(float(np.mean(recent_scores)), 2) if recent_scores else 0
+
         # Engagement metrics
-        today_activities = recent_progress.filter(
-            updated_at__gte=timezone.now().date()
-        ).count()
-        
+        today_start = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+        today_activities = recent_progress.filter(updated_at__gte=today_start).count()
+
         # Calculate trends (compare to previous period)
         two_days_ago = timezone.now() - timedelta(days=2)
         prev_day_progress = UserModuleProgress.objects.filter(
-            user=user,
+            user_id=user_id,
             updated_at__gte=two_days_ago,
             updated_at__lt=yesterday
         ).count()
-        
+
         activity_trend = 'increasing' if today_activities > prev_day_progress else 'stable' if today_activities == prev_day_progress else 'decreasing'
-        
+
         return {
             'daily_activities': daily_activities,
             'daily_assessments': daily_assessments,
@@ -280,163 +387,89 @@ class RealtimeMonitoringService:
             'engagement_level': min(100, today_activities * 20),  # Simple engagement calculation
             'last_updated': timezone.now().isoformat()
         }
-    
-    async def _check_alert_conditions(self, user_id: int, session_id: str) -> None:
-        """Check for alert conditions and trigger notifications"""
-        try:
-            user = User.objects.get(id=user_id)
-            session = self.active_sessions[user_id][session_id]
-            
-            alerts = []
-            
-            # Check performance alert
-            avg_recent_score = session['performance_metrics'].get('average_recent_score', 0)
-            if avg_recent_score < self.monitoring_thresholds['low_performance'] and 'low_performance' not in session['alerts_triggered']:
-                alerts.append({
-                    'type': 'performance_alert',
-                    'severity': 'warning',
-                    'message': f'Recent performance dropped to {avg_recent_score}% - consider additional practice',
-                    'timestamp': timezone.now().isoformat()
-                })
-                session['alerts_triggered'].add('low_performance')
-            
-            # Check engagement drop
-            activity_trend = session['performance_metrics'].get('activity_trend', 'stable')
-            if activity_trend == 'decreasing' and 'engagement_drop' not in session['alerts_triggered']:
-                alerts.append({
-                    'type': 'engagement_alert',
-                    'severity': 'info',
-                    'message': 'Learning activity has decreased - consider setting a study schedule',
-                    'timestamp': timezone.now().isoformat()
-                })
-                session['alerts_triggered'].add('engagement_drop')
-            
-            # Check for achievements
-            new_achievements = await self._check_new_achievements(user)
-            if new_achievements:
-                for achievement in new_achievements:
-                    alerts.append({
-                        'type': 'achievement_alert',
-                        'severity': 'success',
-                        'message': f'Achievement unlocked: {achievement}',
-                        'timestamp': timezone.now().isoformat()
-                    })
-            
-            # Send alerts if any
-            if alerts:
-                alert_message = {
-                    'type': 'alert_notification',
-                    'alerts': alerts,
-                    'timestamp': timezone.now().isoformat()
-                }
-                
-                await self._send_to_user_channel(user_id, alert_message)
-                
-                # Also store alerts in database
-                for alert in alerts:
-                    await self._store_alert_notification(user, alert)
-            
-        except Exception as e:
-            print(f"Error checking alert conditions: {e}")
-    
-    async def _check_new_achievements(self, user: User) -> List[str]:
-        """Check for new achievements based on recent activity"""
+
+    def _check_alert_conditions(self, previous: Dict[str, Any], metrics: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Alerts for thresholds the latest change crossed"""
+        alerts = []
+
+        # Check performance alert
+        avg_recent_score = metrics.get('average_recent_score', 0)
+        was_low = bool(previous.get('daily_assessments')) and previous.get('average_recent_score', 0) < self.monitoring_thresholds['low_performance']
+        if metrics.get('daily_assessments') and avg_recent_score < self.monitoring_thresholds['low_performance'] and not was_low:
+            alerts.append({
+                'type': 'performance_alert',
+                'severity': 'warning',
+                'message': f'Recent performance dropped to {avg_recent_score}% - consider additional practice',
+                'timestamp': timezone.now().isoformat()
+            })
+
+        # Check engagement drop
+        if metrics.get('activity_trend') == 'decreasing' and previous.get('activity_trend') != 'decreasing':
+            alerts.append({
+                'type': 'engagement_alert',
+                'severity': 'info',
+                'message': 'Learning activity has decreased - consider setting a study schedule',
+                'timestamp': timezone.now().isoformat()
+            })
+
+        return alerts
+
+    def _check_new_achievements(self, user_id: int, activity: Dict[str, Any]) -> List[str]:
+        """Achievements reached by the latest change"""
         achievements = []
-        
-        # Get recent progress
-        recent_progress = UserModuleProgress.objects.filter(
-            user=user,
-            status='completed',
-            updated_at__gte=timezone.now() - timedelta(days=1)
-        )
-        
+
+        if activity['type'] != 'progress_update':
+            return achievements
+
         # Check for first completion achievement
-        if recent_progress.exists() and not hasattr(user, '_checked_first_completion'):
+        if activity['status'] == 'completed':
             total_completed = UserModuleProgress.objects.filter(
-                user=user,
+                user_id=user_id,
                 status='completed'
             ).count()
-            
-            if total_completed == 1:
+
+            if total_completed == 1 and cache.add(f'realtime_achievement_{user_id}_first_completion', True, None):
                 achievements.append('First Module Completed')
-                user._checked_first_completion = True
-        
-        # Check for streak achievement
-        streak_days = await self._calculate_learning_streak(user)
-        if streak_days >= 7 and not hasattr(user, '_checked_week_streak'):
-            achievements.append('7-Day Learning Streak')
-            user._checked_week_streak = True
-        elif streak_days >= 30 and not hasattr(user, '_checked_month_streak'):
-            achievements.append('30-Day Learning Streak')
-            user._checked_month_streak = True
-        
+
+        # Check for streak achievement, once per day it holds
+        streak_days = self._calculate_learning_streak(user_id)
+        today = timezone.localdate().isoformat()
+        for days, name in ((30, '30-Day Learning Streak'), (7, '7-Day Learning Streak')):
+            if streak_days >= days:
+                if cache.add(f'realtime_achievement_{user_id}_streak_{days}_{today}', True, 86400):
+                    achievements.append(name)
+                break
+
         return achievements
-    
-    async def _calculate_learning_streak(self, user: User) -> int:
+
+    def _calculate_learning_streak(self, user_id: int) -> int:
         """Calculate current learning streak in days"""
-        streak = 0
-        current_date = timezone.now().date()
-        
-        while True:
-            day_activities = UserModuleProgress.objects.filter(
-                user=user,
-                updated_at__date=current_date - timedelta(days=streak)
-            ).exists()
-            
-            if day_activities:
-                streak += 1
-            else:
-                break
-        
-        return streak
-    
-    async def _send_periodic_update(self, user_id: int, session_id: str) -> None:
-        """Send periodic dashboard updates"""
+        return self.activity_rollup.current_streak(user_id)
+
+    def _send(self, group: str, message: Dict[str, Any]) -> None:
+        """Send a message to a channel layer group from synchronous code"""
+        if self.channel_layer is None:
+            return
         try:
-            session = self.active_sessions[user_id][session_id]
-            
-            update_data = {
-                'type': 'periodic_update',
-                'session_id': session_id,
-                'timestamp': timezone.now().isoformat(),
-                'metrics': session['performance_metrics'],
-                'recent_activities_count': len(session['activities']),
-                'session_duration_minutes': int((timezone.now() - session['started_at']).total_seconds() / 60)
-            }
-            
-            await self._send_to_user_channel(user_id, update_data)
-            
+            async_to_sync(self.channel_layer.group_send)(group, message)
         except Exception as e:
-            print(f"Error sending periodic update: {e}")
-    
-    async def _send_to_user_channel(self, user_id: int, data: Dict[str, Any]) -> None:
-        """Send data to user's WebSocket channel"""
-        try:
-            channel_name = f"user_{user_id}"
-            await self.channel_layer.group_send(
-                channel_name,
-                {
-                    'type': 'send_to_user',
-                    'data': data
-                }
-            )
-        except Exception as e:
-            print(f"Error sending to user channel {user_id}: {e}")
-    
-    async def _get_current_user_progress(self, user: User) -> Dict[str, Any]:
+            logger.warning(f"Error sending to channel group {group}: {e}")
+
+    def _get_current_user_progress(self, user_id: int) -> Dict[str, Any]:
         """Get current user progress summary"""
-        total_modules = UserModuleProgress.objects.filter(user=user).count()
-        completed_modules = UserModuleProgress.objects.filter(user=user, status='completed').count()
-        
+        statuses = list(UserModuleProgress.objects.filter(user_id=user_id).values_list('status', flat=True))
+        total_modules = len(statuses)
+        completed_modules = statuses.count('completed')
+
         progress_percentage = (completed_modules / max(total_modules, 1)) * 100
-        
+
         return {
             'total_modules': total_modules,
             'completed_modules': completed_modules,
             'progress_percentage': round(progress_percentage, 2),
             'current_level': self._determine_learning_level(progress_percentage)
         }
-    
+
     def _determine_learning_level(self, progress_percentage: float) -> str:
         """Determine learning level based on progress"""
         if progress_percentage >= 90:
@@ -449,14 +482,14 @@ class RealtimeMonitoringService:
             return 'Developing'
         else:
             return 'Beginner'
-    
-    async def _get_user_alerts(self, user: User) -> List[Dict[str, Any]]:
+
+    def _get_user_alerts(self, user_id: int) -> List[Dict[str, Any]]:
         """Get recent alerts for user"""
         recent_notifications = ProgressNotification.objects.filter(
-            user=user,
+            user_id=user_id,
             created_at__gte=timezone.now() - timedelta(hours=24)
         ).order_by('-created_at')[:5]
-        
+
         return [
             {
                 'type': notification.notification_type,
@@ -467,60 +500,37 @@ class RealtimeMonitoringService:
             }
             for notification in recent_notifications
         ]
-    
-    async def _generate_realtime_recommendations(self, user: User) -> List[str]:
+
+    def _generate_realtime_recommendations(self, user_id: int) -> List[str]:
         """Generate real-time recommendations"""
         recommendations = []
-        
+
         # Get recent performance
-        recent_assessments = AssessmentAttempt.objects.filter(
-            user=user,
+        avg_score = AssessmentAttempt.objects.filter(
+            user_id=user_id,
             completed_at__gte=timezone.now() - timedelta(days=7)
-        )
-        
-        if recent_assessments.exists():
-            avg_score = recent_assessments.aggregate(Avg('score'))['score__avg'] or 0
-            
+        ).aggregate(Avg('score'))['score__avg']
+
+        if avg_score is not None:
             if avg_score < 70:
                 recommendations.append("Focus on practice exercises to improve understanding")
             elif avg_score > 85:
                 recommendations.append("Great performance! Consider tackling advanced challenges")
-        
+
         return recommendations
-    
-    async def _finalize_session_data(self, user_id: int, session_id: str) -> None:
-        """Finalize session data before cleanup"""
-        try:
-            session = self.active_sessions[user_id][session_id]
-            
-            # Create progress snapshot
-            user = User.objects.get(id=user_id)
-            
-            ProgressSnapshot.objects.create(
-                user=user,
-                snapshot_date=timezone.now(),
-                total_activities=len(session['activities']),
-                session_count=1
-            )
-            
-        except Exception as e:
-            print(f"Error finalizing session data: {e}")
-    
-    async def _store_alert_notification(self, user: User, alert_data: Dict[str, Any]) -> None:
+
+    def _store_alert_notification(self, user_id: int, alert_data: Dict[str, Any]) -> None:
         """Store alert notification in database"""
         try:
             ProgressNotification.objects.create(
-                user=user,
-                notification_type=alert_data['type'],
-                priority=alert_data.get('severity', 'normal'),
-                title=alert_data.get('message', 'Alert'),
+                user_id=user_id,
+                notification_type='achievement_unlocked' if alert_data['type'] == 'achievement_alert' else 'progress_alert',
+                priority={'warning': 'high', 'success': 'normal'}.get(alert_data.get('severity'), 'low'),
+                title=alert_data.get('message', 'Alert')[:200],
                 message=alert_data['message'],
+                data={'alert_type': alert_data['type']},
                 is_sent=True,
                 sent_at=timezone.now()
             )
         except Exception as e:
-            print(f"Error storing alert notification: {e}")
-
-
-import numpy as np
-from scipy import stats
\ No newline at end of file
+            logger.error(f"Error storing alert notification: {e}")
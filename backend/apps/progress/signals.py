@@ -0,0 +1,92 @@
+# JAC Interactive Learning Platform - Core backend implementation by Cavin Otieno
+
+"""
+Progress Signals - JAC Learning Platform
+
+Django signals that keep cached progress analytics consistent with the
+learner data they were computed from, that maintain the daily activity
+rollup behind streaks, and that queue learner activity for open realtime
+dashboards once it is committed.
+
+Author: Cavin Otieno
+Created: 2025-11-26
+"""
+
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+
+from .services.analytics_context import advance_analytics_watermark
+from .services.activity_rollup_service import ActivityRollupService, duration_minutes, score_percentage
+from .services.realtime_monitoring_service import RealtimeMonitoringService
+
+
+@receiver(post_save, sender='learning.UserModuleProgress')
+@receiver(post_delete, sender='learning.UserModuleProgress')
+@receiver(post_save, sender='learning.AssessmentAttempt')
+@receiver(post_delete, sender='learning.AssessmentAttempt')
+def invalidate_predictive_analytics(sender, instance, **kwargs):
+    """Make cached predictive analytics of the learner stale once their data change is committed"""
+    # Advanced earlier, a concurrent read would cache the old rows under the new watermark
+    transaction.on_commit(partial(advance_analytics_watermark, instance.user_id))
+
+
+@receiver(post_save, sender='learning.UserModuleProgress')
+def publish_progress_activity(sender, instance, **kwargs):
+    """Push a module progress change to the learner's realtime dashboards"""
+    service = RealtimeMonitoringService.get_instance()
+    transaction.on_commit(partial(service.queue_activity, instance.user_id, service.progress_event(instance)))
+
+
+@receiver(post_save, sender='learning.AssessmentAttempt')
+def publish_assessment_activity(sender, instance, **kwargs):
+    """Push a completed assessment attempt to the learner's realtime dashboards"""
+    if instance.completed_at is None:
+        return
+    service = RealtimeMonitoringService.get_instance()
+    transaction.on_commit(partial(service.queue_activity, instance.user_id, service.assessment_event(instance)))
+
+
+@receiver(post_init, sender='learning.UserModuleProgress')
+@receiver(post_init, sender='learning.AssessmentAttempt')
+@receiver(post_init, sender='assessments.AssessmentAttempt')
+def remember_completion(sender, instance, **kwargs):
+    """Remember whether the module or attempt was already completed when loaded"""
+    # Deferred fields are skipped rather than loaded
+    instance._rollup_completed = instance.__dict__.get('completed_at') is not None
+
+
+@receiver(post_save, sender='learning.UserModuleProgress')
+def roll_up_progress_activity(sender, instance, **kwargs):
+    """
+    Count a module in the learner's daily rollup once, when it completes, as
+    rebuild() does; every save also marks the day of the update active
+    """
+    if 'completed_at' not in instance.__dict__ or 'time_spent' not in instance.__dict__:
+        return
+    service = ActivityRollupService()
+    if instance.completed_at is not None and not getattr(instance, '_rollup_completed', False):
+        service.record_activity(
+            instance.user_id, occurred_at=instance.completed_at, minutes=duration_minutes(instance.time_spent)
+        )
+        instance._rollup_completed = True
+    service.record_study_day(instance.user_id, occurred_at=instance.updated_at)
+
+
+@receiver(post_save, sender='learning.AssessmentAttempt')
+@receiver(post_save, sender='assessments.AssessmentAttempt')
+def roll_up_assessment_activity(sender, instance, **kwargs):
+    """Count an assessment attempt in the learner's daily rollup once, when it completes"""
+    if instance.completed_at is None or getattr(instance, '_rollup_completed', False):
+        return
+    if hasattr(instance, 'time_spent'):
+        minutes = duration_minutes(instance.time_spent)
+    else:
+        minutes = duration_minutes(instance.completed_at - instance.started_at) if instance.started_at else 0.0
+    ActivityRollupService().record_activity(
+        instance.user_id, occurred_at=instance.completed_at, minutes=minutes,
+        score=score_percentage(instance.score, instance.max_score)
+    )
+    instance._rollup_completed = True
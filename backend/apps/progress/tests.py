@@ -0,0 +1,898 @@
+# JAC Interactive Learning Platform - Core backend implementation by Cavin Otieno
+
+"""
+Progress tests for Django
+"""
+
+import json
+import random
+import asyncio
+import tempfile
+import threading
+from datetime import datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from apps.learning.models import Assessment, AssessmentAttempt, LearningPath, Module, UserModuleProgress
+from .models import (
+    ActivityStreak, CohortMetricDistribution, DailyActivity, LearnerMetricSnapshot, LearnerSegment,
+    ProgressNotification,
+)
+from .services.activity_rollup_service import ActivityRollupService
+from .services.analytics_context import AnalyticsDataContext, advance_analytics_watermark, analytics_watermark
+from .services.background_monitoring_service import BackgroundMonitoringService
+from .services.cohort_stats_service import INSTITUTION, CohortStatsService
+from .services.learner_segmentation import LearnerSegmentationService, segmentation_matrix
+from .services.model_registry import (
+    FEATURE_SCHEMA, GLOBAL_SCOPE, CohortModelTrainer, ModelRegistry, feature_matrix, holt_forecast,
+    predict_rows, scope_for_path,
+)
+from .services.predictive_analytics_service import PredictiveAnalyticsService
+from .services.predictive_dashboard import DASHBOARD_SECTIONS, PredictiveDashboardService
+from .services.realtime_monitoring_service import LISTENERS_CACHE_PREFIX, RealtimeMonitoringService
+
+try:
+    from statsmodels.tsa.holtwinters import ExponentialSmoothing
+    STATSMODELS_AVAILABLE = True
+except ImportError:
+    STATSMODELS_AVAILABLE = False
+
+User = get_user_model()
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+IN_MEMORY_CHANNEL_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+
+def create_learning_path(modules=6, name='JAC Basics'):
+    """A learning path with its modules"""
+    author, _ = User.objects.get_or_create(username='author', defaults={'email': 'author@example.com'})
+    learning_path = LearningPath.objects.create(name=name, estimated_duration=10, created_by=author)
+    for order in range(modules):
+        Module.objects.create(
+            learning_path=learning_path, title=f'{name} {order}', description='', order=order,
+            duration_minutes=30, difficulty_rating=1 + order % 5
+        )
+    return learning_path
+
+
+def create_module_history(user, learning_path, seed=0, days=60):
+    """Randomized module progress of a learner, spread over the last days"""
+    rng = random.Random(seed)
+    now = timezone.now()
+    for module in learning_path.modules.all():
+        started_at = now - timedelta(days=rng.randint(1, days))
+        completed = rng.random() < 0.6
+        progress = UserModuleProgress.objects.create(
+            user=user, module=module,
+            status='completed' if completed else 'in_progress',
+            started_at=started_at,
+            completed_at=started_at + timedelta(days=rng.randint(0, 3)) if completed else None,
+            overall_score=rng.randint(40, 100),
+            progress_percentage=100 if completed else rng.randint(0, 90),
+            time_spent=timedelta(minutes=rng.randint(10, 90)),
+        )
+        updated_at = started_at + timedelta(hours=rng.randint(1, 48))
+        UserModuleProgress.objects.filter(pk=progress.pk).update(
+            created_at=started_at, updated_at=min(updated_at, now)
+        )
+
+
+class FeatureHistoryService:
+    """Stand-in for PredictiveAnalyticsService serving synthetic engineered features"""
+
+    def __init__(self, days=30):
+        self.days = days
+
+    def _prepare_historical_data(self, user, learning_path_id):
+        rng = np.random.default_rng(user)
+        dates = pd.date_range('2025-01-01', periods=self.days, freq='D')
+        return pd.DataFrame({
+            'date': dates,
+            'score': np.clip(50 + np.arange(self.days) + rng.normal(0, 5, self.days), 0, 100),
+            'time_spent': rng.integers(10, 60, self.days),
+            'difficulty_level': rng.integers(1, 4, self.days),
+        })
+
+    def _engineer_features(self, df):
+        df = df.copy()
+        df['days_since_start'] = (df['date'] - df['date'].min()).dt.days
+        df['difficulty_normalized'] = df['difficulty_level'] / df['difficulty_level'].max()
+        df['score_lag_1'] = df['score'].shift(1)
+        df['score_rolling_mean_7'] = df['score'].rolling(7, min_periods=1).mean()
+        return df
+
+
+class ModelRegistryTest(SimpleTestCase):
+    """Test the versioned on-disk store of cohort models"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.registry = ModelRegistry(Path(directory.name))
+        self.registry.reload_interval = 0
+        self.registry.keep_versions = 2
+        self.bundle = CohortModelTrainer(FeatureHistoryService(), min_samples=50).train(range(6))
+
+    def test_trainer_skips_too_little_data(self):
+        """Fewer than min_samples rows train nothing"""
+        self.assertIsNone(CohortModelTrainer(FeatureHistoryService(), min_samples=10_000).train(range(2)))
+        self.assertIsNone(CohortModelTrainer(FeatureHistoryService(days=5), min_samples=1).train(range(2)))
+
+    def test_saved_bundle_predicts_like_the_trained_one(self):
+        """A loaded version answers exactly like the models that were fitted"""
+        self.registry.save(GLOBAL_SCOPE, self.bundle['models'], self.bundle['metadata'])
+        loaded = self.registry.get(GLOBAL_SCOPE)
+
+        rows = feature_matrix(FeatureHistoryService()._engineer_features(
+            FeatureHistoryService()._prepare_historical_data(99, None)
+        ).tail(5))
+        for name in ('random_forest', 'gradient_boosting'):
+            np.testing.assert_allclose(
+                predict_rows(loaded['models'][name], rows), self.bundle['models'][name].predict(rows)
+            )
+        self.assertEqual(loaded['metadata']['feature_schema'], FEATURE_SCHEMA)
+
+    def test_versions_are_pruned_and_reloaded(self):
+        """The newest version is served and only keep_versions are kept"""
+        versions = [
+            self.registry.save('path-3', self.bundle['models'], self.bundle['metadata']) for _ in range(3)
+        ]
+        self.assertEqual(self.registry.list_versions('path-3'), versions[1:])
+        self.assertEqual(self.registry.get('path-3')['metadata']['version'], versions[-1])
+
+        # Learning paths without a model fall back to the global one
+        self.assertIsNone(self.registry.get_for_path(4))
+        self.assertEqual(self.registry.get_for_path(3)['metadata']['scope'], scope_for_path(3))
+
+    def test_incompatible_version_keeps_the_loaded_one(self):
+        """A version trained for another feature schema is not served"""
+        good = self.registry.save(GLOBAL_SCOPE, self.bundle['models'], self.bundle['metadata'])
+        self.assertEqual(self.registry.get(GLOBAL_SCOPE)['metadata']['version'], good)
+
+        self.registry.save(GLOBAL_SCOPE, self.bundle['models'], {**self.bundle['metadata'], 'feature_schema': ['x']})
+        self.assertEqual(self.registry.get(GLOBAL_SCOPE)['metadata']['version'], good)
+
+    def test_describe_reports_age(self):
+        """Old models are reported as stale"""
+        self.assertEqual(self.registry.describe(None), {'status': 'untrained'})
+
+        trained_at = datetime.now(dt_timezone.utc) - timedelta(days=30)
+        metadata = {**self.bundle['metadata'], 'trained_at': trained_at.isoformat()}
+        self.registry.save(GLOBAL_SCOPE, self.bundle['models'], metadata)
+        description = self.registry.describe(self.registry.get(GLOBAL_SCOPE))
+        self.assertEqual(description['status'], 'stale')
+        self.assertGreaterEqual(description['age_seconds'], 30 * 86400)
+
+        sidecar = self.registry.model_dir / f"{GLOBAL_SCOPE}-v{description['version']}.json"
+        self.assertEqual(json.loads(sidecar.read_text())['scope'], GLOBAL_SCOPE)
+
+
+class PredictionHelpersTest(SimpleTestCase):
+    """Test the fast prediction paths against the library implementations"""
+
+    def test_feature_matrix_aligns_columns(self):
+        """Missing, non-numeric and infinite values become zero"""
+        matrix = feature_matrix(pd.DataFrame({'attempts': ['3', 'x'], 'time_spent': [np.inf, 2.0]}))
+        self.assertEqual(matrix.shape, (2, len(FEATURE_SCHEMA)))
+        self.assertEqual(matrix[0, FEATURE_SCHEMA.index('attempts')], 3)
+        self.assertEqual(matrix[1, FEATURE_SCHEMA.index('attempts')], 0)
+        self.assertEqual(matrix[0, FEATURE_SCHEMA.index('time_spent')], 0)
+
+    def test_holt_forecast_matches_statsmodels(self):
+        """Fixed-parameter Holt smoothing agrees with statsmodels' Holt model"""
+        if not STATSMODELS_AVAILABLE:
+            self.skipTest('statsmodels is not installed')
+        values = np.array([50, 55, 53, 60, 62, 61, 65, 70, 68, 72, 75, 74, 78, 80], dtype=float)
+        fitted = ExponentialSmoothing(
+            values[1:], trend='add', initialization_method='known',
+            initial_level=values[0], initial_trend=values[1] - values[0]
+        ).fit(smoothing_level=0.5, smoothing_trend=0.1, optimized=False)
+
+        np.testing.assert_allclose(holt_forecast(values, 7, 0.5, 0.1), fitted.forecast(7))
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class AnalyticsDataContextTest(TestCase):
+    """Test sharing one learner's history between analyses"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='learner', email='learner@example.com', password='x')
+        self.learning_path = create_learning_path()
+        other_path = create_learning_path(modules=3, name='Walkers')
+        create_module_history(self.user, self.learning_path, seed=1)
+        create_module_history(self.user, other_path, seed=2)
+
+    def test_rows_match_the_database(self):
+        """The snapshot holds the learner's progress in the learning path, oldest update first"""
+        context = AnalyticsDataContext(self.user, self.learning_path.id)
+        expected = list(UserModuleProgress.objects.filter(
+            user=self.user, module__learning_path=self.learning_path
+        ).order_by('updated_at').values_list('id', flat=True))
+
+        self.assertEqual([row['id'] for row in context.progress], expected)
+        self.assertEqual(len(AnalyticsDataContext(self.user).progress), 9)
+        self.assertEqual(context.progress_between(status='completed'),
+                         [row for row in context.progress if row['status'] == 'completed'])
+
+    def test_shared_context_matches_separate_queries(self):
+        """Analyses over a shared snapshot equal the same analyses loading their own data"""
+        shared = PredictiveAnalyticsService(data_context=AnalyticsDataContext(self.user, self.learning_path.id))
+        separate = PredictiveAnalyticsService()
+        with mock.patch('django.utils.timezone.now', return_value=timezone.now()):
+            for method in ('analyze_learning_velocity', 'analyze_engagement_patterns',
+                           'model_success_probability', 'assess_retention_risk'):
+                with self.subTest(method=method):
+                    result = getattr(shared, method)(self.user, self.learning_path.id)
+                    self.assertNotIn('error', result)
+                    self.assertEqual(result, getattr(separate, method)(self.user, self.learning_path.id))
+
+    def test_history_is_loaded_once(self):
+        """Later analyses on the same context reuse the loaded rows and results"""
+        service = PredictiveAnalyticsService(data_context=AnalyticsDataContext(self.user, self.learning_path.id))
+        service.analyze_engagement_patterns(self.user, self.learning_path.id)
+        with self.assertNumQueries(0):
+            first = service.analyze_learning_velocity(self.user, self.learning_path.id)
+            self.assertIs(service.analyze_learning_velocity(self.user, self.learning_path.id), first)
+
+    def test_concurrent_callers_share_one_computation(self):
+        """memoize() runs a computation once however many threads ask for it"""
+        context = AnalyticsDataContext(self.user)
+        calls = []
+        release = threading.Event()
+
+        def compute():
+            calls.append(1)
+            release.wait(5)
+            return {'value': 1}
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(context.memoize(('key',), compute)))
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{'value': 1}] * 4)
+
+
+class FakeAnalyticsService:
+    """PredictiveAnalyticsService stand-in counting each section it computes"""
+
+    calls = []
+    delays = {}
+    failures = set()
+
+    def __init__(self, data_context=None):
+        self.data_context = data_context
+
+    def __getattr__(self, method):
+        def analysis(**kwargs):
+            FakeAnalyticsService.calls.append(method)
+            if method in self.delays:
+                self.delays[method].wait(5)
+            if method in self.failures:
+                raise RuntimeError(f'{method} failed')
+            return {'method': method, 'learning_path_id': kwargs.get('learning_path_id')}
+        return analysis
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class AnalyticsWatermarkTest(TestCase):
+    """Test invalidating cached analytics when learner data changes"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='learner', email='learner@example.com', password='x')
+        self.module = create_learning_path(modules=1).modules.get()
+
+    def test_watermark_moves_after_commit(self):
+        """Readers during the saving transaction keep the old watermark, matching the rows they see"""
+        watermark = analytics_watermark(self.user.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            UserModuleProgress.objects.create(user=self.user, module=self.module, status='in_progress')
+            self.assertEqual(analytics_watermark(self.user.id), watermark)
+        self.assertNotEqual(analytics_watermark(self.user.id), watermark)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class PredictiveDashboardServiceTest(SimpleTestCase):
+    """Test the concurrent, cached predictive dashboard"""
+
+    def setUp(self):
+        cache.clear()
+        FakeAnalyticsService.calls = []
+        FakeAnalyticsService.delays = {}
+        FakeAnalyticsService.failures = set()
+        patcher = mock.patch('apps.progress.services.predictive_dashboard.PredictiveAnalyticsService',
+                             FakeAnalyticsService)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.dashboard = PredictiveDashboardService()
+        self.dashboard.timeout = 5
+        self.addCleanup(self.dashboard._executor.shutdown, wait=True)
+        self.user = mock.Mock(id=7, pk=7)
+
+    def test_sections_are_cached_until_the_data_changes(self):
+        """A second build is served from the cache; new learner data recomputes it"""
+        results, sources = self.dashboard.build(self.user, learning_path_id=3)
+        self.assertEqual(set(results), {name for name, _, _, _ in DASHBOARD_SECTIONS})
+        self.assertEqual(set(sources.values()), {'computed'})
+        self.assertEqual(results['ml_predictions'], {'method': 'generate_ml_predictions', 'learning_path_id': 3})
+
+        cached_results, sources = self.dashboard.build(self.user, learning_path_id=3)
+        self.assertEqual(set(sources.values()), {'cached'})
+        self.assertEqual(cached_results, results)
+        self.assertEqual(len(FakeAnalyticsService.calls), len(DASHBOARD_SECTIONS))
+
+        advance_analytics_watermark(self.user.id)
+        _, sources = self.dashboard.build(self.user, learning_path_id=3)
+        self.assertEqual(sources['learning_clusters'], 'cached')
+        self.assertEqual({source for name, source in sources.items() if name != 'learning_clusters'}, {'computed'})
+
+    def test_failed_sections_are_reported_and_not_cached(self):
+        """A failing analysis does not take the others down and is retried next time"""
+        FakeAnalyticsService.failures = {'detect_knowledge_gaps'}
+        results, sources = self.dashboard.build(self.user)
+        self.assertEqual(sources['knowledge_gaps'], 'error')
+        self.assertIn('detect_knowledge_gaps failed', results['knowledge_gaps']['error'])
+
+        FakeAnalyticsService.failures = set()
+        _, sources = self.dashboard.build(self.user)
+        self.assertEqual(sources['knowledge_gaps'], 'computed')
+
+    def test_slow_sections_finish_in_the_background(self):
+        """Sections past the timeout are pending, then served from the cache"""
+        release = threading.Event()
+        FakeAnalyticsService.delays = {'perform_learning_analytics_clustering': release}
+        self.dashboard.timeout = 0.2
+
+        results, sources = self.dashboard.build(self.user)
+        self.assertEqual(sources['learning_clusters'], 'pending')
+        self.assertEqual(results['learning_clusters']['status'], 'pending')
+
+        release.set()
+        self.dashboard._executor.shutdown(wait=True)
+        self.dashboard._executor = type(self.dashboard._executor)(max_workers=1)
+        _, sources = self.dashboard.build(self.user)
+        self.assertEqual(sources['learning_clusters'], 'cached')
+        self.assertEqual(FakeAnalyticsService.calls.count('perform_learning_analytics_clustering'), 1)
+
+
+def count_listener(user_id, process_id='other-process'):
+    """Count an open realtime socket of the user in another web process"""
+    cache.set(f'{LISTENERS_CACHE_PREFIX}:{user_id}', [process_id])
+    cache.set(f'{LISTENERS_CACHE_PREFIX}:{user_id}:{process_id}', 1)
+
+
+@override_settings(CACHES=LOCMEM_CACHE, PROGRESS_REALTIME_CONFIG={'LISTENER_TTL': 60, 'LISTENER_HEARTBEAT': 0.05})
+class RealtimeListenerTest(SimpleTestCase):
+    """Test counting open realtime sockets across processes"""
+
+    def setUp(self):
+        cache.clear()
+        self.service = RealtimeMonitoringService()
+        self.key = self.service._listener_key(7)
+
+    @async_to_sync
+    async def test_count_follows_open_sockets(self):
+        """Sockets are counted until the last one closes"""
+        await self.service.add_listener(7)
+        await self.service.add_listener(7)
+        self.assertEqual(cache.get(self.key), 2)
+        self.assertEqual(cache.get(f'{LISTENERS_CACHE_PREFIX}:7'), [self.service.process_id])
+        self.assertTrue(self.service.has_listeners(7))
+
+        await self.service.remove_listener(7)
+        self.assertTrue(self.service.has_listeners(7))
+        await self.service.remove_listener(7)
+        self.assertFalse(self.service.has_listeners(7))
+        self.assertEqual(self.service.listeners, {})
+
+    @async_to_sync
+    async def test_count_expires_without_heartbeat(self):
+        """A process that stops refreshing its sockets stops counting"""
+        await self.service.add_listener(7)
+        self.service._heartbeat.cancel()
+        cache.touch(self.key, 0.05)
+        await asyncio.sleep(0.1)
+        self.assertFalse(self.service.has_listeners(7))
+
+    @async_to_sync
+    async def test_heartbeat_restores_an_expired_count(self):
+        """Live sockets are counted again after the keys expired or were evicted"""
+        await self.service.add_listener(7)
+        await self.service.add_listener(7)
+        cache.clear()
+
+        await asyncio.sleep(0.15)
+        self.assertEqual(cache.get(self.key), 2)
+        self.assertTrue(self.service.has_listeners(7))
+
+        await self.service.remove_listener(7)
+        await self.service.remove_listener(7)
+        await asyncio.sleep(0.1)
+        self.assertTrue(self.service._heartbeat.done())
+
+    @async_to_sync
+    async def test_every_process_counts_again_after_expiry(self):
+        """Once the counts expire, each process restores its own sockets"""
+        other_process = RealtimeMonitoringService()
+        await self.service.add_listener(7)
+        await other_process.add_listener(7)
+        cache.clear()
+
+        await asyncio.sleep(0.15)
+        await self.service.remove_listener(7)
+        self.assertTrue(self.service.has_listeners(7))
+        await other_process.remove_listener(7)
+        self.assertFalse(self.service.has_listeners(7))
+
+    def test_activity_is_queued_only_for_listeners(self):
+        """The saving request only checks for listeners and hands the event to Celery"""
+        with mock.patch('config.celery.publish_realtime_activity_task') as task:
+            self.service.queue_activity(7, {'type': 'progress_update'})
+            task.delay.assert_not_called()
+
+            count_listener(7)
+            self.service.queue_activity(7, {'type': 'progress_update'})
+            task.delay.assert_called_once_with(7, {'type': 'progress_update'})
+
+
+@override_settings(CACHES=LOCMEM_CACHE, CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS)
+class RealtimePublishTest(TestCase):
+    """Test pushing progress changes to open realtime sockets"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='learner', email='learner@example.com', password='x')
+        self.learning_path = create_learning_path(modules=3)
+        self.service = RealtimeMonitoringService()
+        self.channel_layer = self.service.channel_layer = get_channel_layer()
+        count_listener(self.user.id)
+
+    def subscribe(self, *groups):
+        channel = async_to_sync(self.channel_layer.new_channel)()
+        for group in groups:
+            async_to_sync(self.channel_layer.group_add)(f'{group}_{self.user.id}', channel)
+        return channel
+
+    def receive(self, channel):
+        return async_to_sync(self.channel_layer.receive)(channel)
+
+    def test_save_queues_event_after_commit(self):
+        """A progress save hands its change event to the worker once committed"""
+        module = self.learning_path.modules.first()
+        with mock.patch.object(RealtimeMonitoringService, 'get_instance', return_value=self.service), \
+                mock.patch('config.celery.publish_realtime_activity_task') as task:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                UserModuleProgress.objects.create(user=self.user, module=module, status='completed',
+                                                  overall_score=80, progress_percentage=100,
+                                                  time_spent=timedelta(minutes=20))
+                task.delay.assert_not_called()
+        self.assertTrue(callbacks)
+        user_id, activity = task.delay.call_args.args
+        self.assertEqual(user_id, self.user.id)
+        self.assertEqual((activity['module_id'], activity['status']), (str(module.id), 'completed'))
+        json.dumps(activity)
+
+    def test_publish_pushes_changed_metrics(self):
+        """The worker pushes the activity and the metrics that changed, and nothing unchanged"""
+        module = self.learning_path.modules.first()
+        progress = UserModuleProgress.objects.create(user=self.user, module=module, status='in_progress',
+                                                     time_spent=timedelta(minutes=20))
+        activity = self.service.progress_event(progress)
+        dashboard, metrics_socket = self.subscribe('user'), self.subscribe('metrics')
+
+        self.service.publish_activity(self.user.id, activity)
+        self.assertEqual(self.receive(dashboard)['data'], {
+            'type': 'new_activities', 'activities': [activity], 'timestamp': mock.ANY
+        })
+        changes = self.receive(dashboard)['data']['changes']
+        expected = self.service.calculate_realtime_metrics(self.user.id)
+        self.assertEqual(changes, {name: value for name, value in expected.items() if name != 'last_updated'})
+        self.assertEqual(self.receive(metrics_socket)['metrics'], changes)
+
+        # Same data again: the activity is pushed, but no metrics update
+        self.service.publish_activity(self.user.id, activity)
+        self.assertEqual(self.receive(dashboard)['data']['type'], 'new_activities')
+        with self.assertRaises(asyncio.TimeoutError):
+            async_to_sync(asyncio.wait_for)(self.channel_layer.receive(metrics_socket), 0.1)
+
+    def test_no_listeners_no_work(self):
+        """Without open sockets publishing does not query anything"""
+        cache.delete(f'{LISTENERS_CACHE_PREFIX}:{self.user.id}')
+        with self.assertNumQueries(0):
+            self.service.publish_activity(self.user.id, {'type': 'progress_update'})
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ActivityRollupTest(TestCase):
+    """Test the incremental activity rollup against a rebuild from history"""
+
+    SUMMARY_FIELDS = (
+        'current_streak', 'longest_streak', 'streak_started_on', 'last_active_day',
+        'days_active', 'session_count', 'total_events', 'total_minutes', 'last_activity_at',
+    )
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='learner', email='learner@example.com', password='x')
+        self.learning_path = create_learning_path(modules=5)
+
+    def snapshot(self):
+        summary = ActivityStreak.objects.values(*self.SUMMARY_FIELDS).get(user=self.user)
+        days = list(DailyActivity.objects.filter(user=self.user).order_by('day').values(
+            'day', 'events', 'minutes', 'sessions', 'best_score', 'first_activity_at', 'last_activity_at'
+        ))
+        return summary, days
+
+    def test_incremental_matches_rebuild(self):
+        """Saving modules many times counts each once, as the rebuild does"""
+        start = timezone.now() - timedelta(days=4)
+        for offset, module in enumerate(self.learning_path.modules.order_by('order')):
+            progress = UserModuleProgress.objects.create(user=self.user, module=module, status='in_progress',
+                                                         time_spent=timedelta(minutes=5))
+            for minutes in (15, 25):
+                progress.time_spent = timedelta(minutes=minutes)
+                progress.save()
+            if offset == 4:
+                continue
+            progress.status = 'completed'
+            progress.completed_at = start + timedelta(days=offset // 2, hours=offset)
+            progress.save()
+            # Reviewing a completed module is not another completion
+            UserModuleProgress.objects.get(pk=progress.pk).save()
+
+        incremental = self.snapshot()
+        self.assertEqual(incremental[0]['total_events'], 4)
+        self.assertEqual(incremental[0]['total_minutes'], 100)
+        ActivityRollupService().rebuild(self.user.id)
+        self.assertEqual(self.snapshot(), incremental)
+
+    def test_studying_without_completing_keeps_the_streak(self):
+        """Days with module progress but no completion still count as active"""
+        module = self.learning_path.modules.order_by('order').first()
+        progress = UserModuleProgress.objects.create(user=self.user, module=module, status='in_progress')
+        now = timezone.now()
+        for days_ago in (2, 1, 0):
+            with mock.patch('django.utils.timezone.now', return_value=now - timedelta(days=days_ago)):
+                progress.time_spent = timedelta(minutes=10 * (3 - days_ago))
+                progress.save()
+
+        summary = ActivityStreak.objects.get(user=self.user)
+        self.assertEqual((summary.current_streak, summary.days_active), (3, 3))
+        self.assertEqual((summary.total_events, summary.total_minutes, summary.session_count), (0, 0, 0))
+        self.assertEqual(ActivityRollupService().current_streak(self.user.id), 3)
+
+
+@override_settings(CACHES=LOCMEM_CACHE, PROGRESS_COHORT_CONFIG={'QUANTILE_POINTS': 2048, 'VELOCITY_WINDOW_DAYS': 14})
+class CohortStatsTest(TestCase):
+    """Test the materialized cohort metric distributions"""
+
+    COMPARED_METRICS = ('completion_rate', 'learning_velocity', 'engagement_level')
+
+    def setUp(self):
+        self.learning_paths = [create_learning_path(modules=5, name=name) for name in ('JAC Basics', 'OSP')]
+        self.users = []
+        for index in range(8):
+            user = User.objects.create_user(username=f'learner{index}', email=f'learner{index}@example.com', password='x')
+            for learning_path in self.learning_paths[:1 + index % 2]:
+                create_module_history(user, learning_path, seed=index, days=40)
+            self.users.append(user)
+        self.service = CohortStatsService()
+
+    def learner_metrics(self, user, learning_path=None):
+        """Metrics of one learner as the progress tracker computes them from their records"""
+        from apps.agents.progress_tracker import ProgressTrackerAgent
+        progress = UserModuleProgress.objects.filter(user=user)
+        if learning_path is not None:
+            progress = progress.filter(module__learning_path=learning_path)
+        metrics = ProgressTrackerAgent()._calculate_user_metrics_for_comparison(
+            user, {'user': {'id': user.id}, 'progress_data': list(progress), 'assessment_data': []}
+        )
+        return {metric: metrics[metric] for metric in self.COMPARED_METRICS}
+
+    def snapshot(self):
+        snapshots = {
+            (row.pop('user_id'), row.pop('scope')): row
+            for row in LearnerMetricSnapshot.objects.values('user_id', 'scope', *self.COMPARED_METRICS)
+        }
+        distributions = set(CohortMetricDistribution.objects.values_list('scope', 'metric', 'sample_size', 'mean'))
+        points = {
+            (scope, metric): points for scope, metric, points in CohortMetricDistribution.objects.values_list(
+                'scope', 'metric', 'points'
+            )
+        }
+        return snapshots, distributions, points
+
+    def test_snapshots_match_learner_metrics(self):
+        """Each snapshot holds the metrics computed from the learner's own records"""
+        self.service.refresh(full=True)
+        for user in self.users:
+            with self.subTest(user=user.username):
+                snapshot = LearnerMetricSnapshot.objects.values(*self.COMPARED_METRICS).get(user=user, scope=INSTITUTION)
+                self.assertEqual(snapshot, self.learner_metrics(user))
+                for learning_path in self.learning_paths:
+                    snapshot = LearnerMetricSnapshot.objects.filter(
+                        user=user, scope=str(learning_path.id)
+                    ).values(*self.COMPARED_METRICS).first()
+                    if snapshot is not None:
+                        self.assertEqual(snapshot, self.learner_metrics(user, learning_path))
+
+    def test_rank_matches_peer_percentile(self):
+        """Ranks agree with a mid-rank percentile over every learner's metrics"""
+        self.service.refresh(full=True)
+        peers = [self.learner_metrics(user) for user in self.users]
+        for user in self.users:
+            metrics = self.learner_metrics(user)
+            expected = {}
+            for metric, value in metrics.items():
+                below = sum(1 for peer in peers if peer[metric] < value)
+                equal = sum(1 for peer in peers if peer[metric] == value)
+                expected[metric] = int(round((below + 0.5 * equal) / len(peers) * 100))
+            with self.subTest(user=user.username):
+                self.assertEqual(self.service.rank(metrics), expected)
+
+    def test_peer_velocity_uses_window(self):
+        """Peer comparison turns the learner's and the cohort's velocity into per-day rates over the same window"""
+        from apps.agents.progress_tracker import ProgressTrackerAgent
+        self.service.refresh(full=True)
+        user = self.users[3]
+        progress = list(UserModuleProgress.objects.filter(user=user))
+        recent = sum(1 for p in progress if p.updated_at >= timezone.now() - timedelta(days=14))
+        peers = [self.learner_metrics(peer)['learning_velocity'] for peer in self.users]
+
+        agent = ProgressTrackerAgent()
+        distributions = self.service.get_distributions()
+        with mock.patch.object(agent.cohort_stats, 'get_distributions', return_value=distributions):
+            comparison = async_to_sync(agent._analyze_peer_performance)(
+                user, {'progress_data': progress, 'assessment_data': []}
+            )
+        self.assertEqual(comparison['learning_velocity']['user'], round(recent / 14, 3))
+        self.assertEqual(comparison['learning_velocity']['peer_average'], round(sum(peers) / len(peers) / 14, 3))
+
+    def test_incremental_refresh_matches_full(self):
+        """Refreshing only changed learners gives the same cohorts as recomputing everyone"""
+        self.service.refresh(full=True)
+        progress = UserModuleProgress.objects.filter(user=self.users[0], status='in_progress').first()
+        progress.status = 'completed'
+        progress.completed_at = timezone.now()
+        progress.save()
+        UserModuleProgress.objects.filter(user=self.users[1]).delete()
+
+        self.assertEqual(self.service.refresh()['learners'], 1)
+        incremental = self.snapshot()
+        self.service.refresh(full=True)
+        self.assertEqual(self.snapshot(), incremental)
+
+
+@override_settings(CACHES=LOCMEM_CACHE, PREDICTIVE_ANALYTICS_CONFIG={'SEGMENT_WINDOW_DAYS': 90, 'SEGMENT_MIN_LEARNERS': 10})
+class LearnerSegmentationTest(TestCase):
+    """Test the set-based segmentation features and stored segments"""
+
+    def setUp(self):
+        self.learning_paths = [create_learning_path(modules=5, name=name) for name in ('JAC Basics', 'OSP')]
+        self.users = []
+        for index in range(12):
+            user = User.objects.create_user(username=f'learner{index}', email=f'learner{index}@example.com', password='x')
+            for learning_path in self.learning_paths[:1 + index % 2]:
+                create_module_history(user, learning_path, seed=index, days=120)
+            self.users.append(user)
+        self.since = timezone.now() - timedelta(days=90)
+
+    def learner_features(self, user, learning_path_id=None):
+        """SEGMENT_FEATURES of one learner from their own rows, as the per-learner extraction built them"""
+        context = AnalyticsDataContext(user, learning_path_id)
+        module_rows = context.progress_between(self.since, field='created_at')
+        if not module_rows:
+            return None
+        window_days = (timezone.now() - self.since).total_seconds() / 86400
+
+        total_modules = len(module_rows)
+        completed_modules = sum(1 for row in module_rows if row['status'] == 'completed')
+        performance = [row['performance_score'] for row in module_rows if row['performance_score'] is not None]
+        assessment_data = context.attempts_between(self.since, field='started_at')
+        successful_assessments = sum(1 for row in assessment_data if row['score'] >= 0.7)
+        active_days = len({timezone.localdate(row['updated_at']) for row in module_rows})
+        idle_days = (timezone.now() - max(row['updated_at'] for row in module_rows)).total_seconds() / 86400
+        return [
+            completed_modules / total_modules,
+            float(np.mean(performance)) if performance else 0.5,
+            min(1.0, total_modules / 50),
+            min(1.0, active_days / window_days),
+            completed_modules / (window_days / 7),
+            successful_assessments / len(assessment_data) if assessment_data else 0.5,
+            1 - min(max(idle_days / window_days, 0.0), 1.0),
+        ]
+
+    def test_matrix_matches_learner_features(self):
+        """The grouped feature matrix has each learner's row as computed from their own records"""
+        for learning_path_id in (None, self.learning_paths[1].id):
+            user_ids, matrix = segmentation_matrix(self.since, learning_path_id)
+            expected = {user.id: self.learner_features(user, learning_path_id) for user in self.users}
+            self.assertEqual(user_ids, sorted(user_id for user_id, row in expected.items() if row is not None))
+            for user_id, row in zip(user_ids, matrix):
+                with self.subTest(learning_path_id=learning_path_id, user_id=user_id):
+                    np.testing.assert_allclose(row, expected[user_id], atol=1e-6)
+
+    def test_new_learner_gets_nearest_centroid(self):
+        """A learner without a stored label is assigned the segment training gave them"""
+        segmenter = LearnerSegmentationService(PredictiveAnalyticsService())
+        segmentation = segmenter.train(cluster_count=3)
+        self.assertEqual(segmentation.sample_size, len(self.users))
+        trained = dict(LearnerSegment.objects.values_list('user_id', 'segment'))
+
+        LearnerSegment.objects.all().delete()
+        for user in self.users:
+            with self.subTest(user=user.username):
+                self.assertEqual(segmenter.segment_for(segmentation, user.id).segment, trained[user.id])
+
+    def test_clustering_reads_stored_segmentation(self):
+        """Requests report the trained segments without fitting a model"""
+        service = PredictiveAnalyticsService()
+        self.assertEqual(service.perform_learning_analytics_clustering()['status'], 'untrained')
+        LearnerSegmentationService(service).train(cluster_count=3)
+
+        with mock.patch.object(LearnerSegmentationService, '_fit') as fit:
+            result = service.perform_learning_analytics_clustering(user=self.users[0])
+        fit.assert_not_called()
+        self.assertEqual(result['status'], 'success')
+        self.assertEqual(result['clustering_results']['total_users_analyzed'], len(self.users))
+        self.assertEqual(
+            result['user_segment']['segment_id'],
+            f"cluster_{LearnerSegment.objects.get(user=self.users[0]).segment}"
+        )
+
+
+def insert_with_module(instance, module):
+    """Insert a learning assessment row; the model lacks the module column its migrations create"""
+    fields = instance._meta.concrete_fields
+    columns = [field.column for field in fields] + ['module_id']
+    values = [field.get_db_prep_save(field.pre_save(instance, True), connection) for field in fields]
+    values.append(Module._meta.pk.get_db_prep_save(module.pk, connection))
+    with connection.cursor() as cursor:
+        cursor.execute('INSERT INTO {} ({}) VALUES ({})'.format(
+            connection.ops.quote_name(instance._meta.db_table),
+            ', '.join(connection.ops.quote_name(column) for column in columns),
+            ', '.join(['%s'] * len(columns)),
+        ), values)
+    return instance
+
+
+@override_settings(CACHES=LOCMEM_CACHE, PROGRESS_MONITORING_CONFIG={'SCAN_CHUNK_SIZE': 3})
+class AlertScanTest(TestCase):
+    """Test the set-based alert scans against the per-learner checks they replaced"""
+
+    def setUp(self):
+        learning_path = create_learning_path(modules=8)
+        modules = list(learning_path.modules.all())
+        assessment = insert_with_module(Assessment(title='Walkers quiz', description=''), modules[0])
+        now = timezone.now()
+        self.users = []
+        for index in range(20):
+            rng = random.Random(index)
+            user = User.objects.create_user(username=f'learner{index}', email=f'learner{index}@example.com', password='x')
+            # Days since the learner was last active, and how well they score
+            idle_days, low_scores = rng.randint(0, 5), index % 2
+            for module in rng.sample(modules, rng.randint(0, len(modules))):
+                progress = UserModuleProgress.objects.create(user=user, module=module, time_spent=timedelta(minutes=10))
+                days_ago = idle_days + rng.choice([0, 1, 3, 40])
+                UserModuleProgress.objects.filter(pk=progress.pk).update(updated_at=now - timedelta(days=days_ago, minutes=5))
+            for attempt in range(rng.randint(0, 8)):
+                insert_with_module(AssessmentAttempt(
+                    user=user, assessment=assessment, attempt_number=attempt + 1,
+                    status='completed' if rng.random() < 0.9 else 'in_progress',
+                    score=None if rng.random() < 0.1 else rng.randint(30, 65 if low_scores else 100),
+                    completed_at=now - timedelta(days=rng.randint(0, 9), hours=attempt), time_spent=timedelta(0),
+                ), modules[0])
+            self.users.append(user)
+        self.service = BackgroundMonitoringService()
+
+    def sweep(self, find_candidates, build_alerts):
+        """Alerts of a sweep over every learner, paged SCAN_CHUNK_SIZE learners at a time"""
+        created = self.service._sweep(find_candidates, build_alerts)
+        alerts = {
+            (alert['user_id'], alert['title']): {
+                key: round(value, 6) if isinstance(value, float) else value for key, value in alert['data'].items()
+            }
+            for alert in ProgressNotification.objects.values('user_id', 'title', 'data')
+        }
+        self.assertEqual(created, len(alerts))
+        self.assertGreater(len({user_id for user_id, _ in alerts}), self.service.scan_chunk_size)
+        return alerts
+
+    def performance_alerts(self, user):
+        """The per-learner performance check the scan replaced"""
+        thresholds = self.service.alert_thresholds['performance_decline']
+        recent_assessments = AssessmentAttempt.objects.filter(
+            user=user, completed_at__gte=timezone.now() - timedelta(days=7), status='completed'
+        ).order_by('-completed_at')
+        scores = [a.score for a in recent_assessments if a.score is not None]
+        if recent_assessments.count() < 2 or len(scores) < 2:
+            return {}
+
+        alerts = {}
+        recent_scores = scores[:3]
+        older_scores = scores[3:6] if len(scores) > 3 else scores[:max(1, len(scores) // 2)]
+        recent_avg = sum(recent_scores) / len(recent_scores)
+        older_avg = sum(older_scores) / len(older_scores)
+        if recent_avg < thresholds['score_threshold'] and recent_avg < older_avg:
+            alerts[user.id, 'Performance Decline Alert'] = {
+                'recent_average': round(recent_avg, 6),
+                'previous_average': round(older_avg, 6),
+                'decline_amount': round(older_avg - recent_avg, 6),
+            }
+        consecutive_low_scores = 0
+        for score in recent_scores:
+            if score >= thresholds['score_threshold']:
+                break
+            consecutive_low_scores += 1
+        if consecutive_low_scores >= thresholds['consecutive_days']:
+            alerts[user.id, 'Consistent Low Performance'] = {
+                'consecutive_low_scores': consecutive_low_scores, 'suggested_action': 'additional_practice'
+            }
+        return alerts
+
+    def engagement_alerts(self, user):
+        """The per-learner engagement check the scan replaced"""
+        thresholds = self.service.alert_thresholds['engagement_drop']
+        progress = UserModuleProgress.objects.filter(user=user)
+        if not progress.filter(updated_at__gte=timezone.now() - timedelta(days=30)).exists():
+            return {}
+        daily_activities = [
+            progress.filter(updated_at__date=timezone.localdate() - timedelta(days=i)).count() for i in range(7)
+        ]
+
+        alerts = {}
+        consecutive_low_days = 0
+        for count in daily_activities:
+            if count >= thresholds['activity_threshold']:
+                break
+            consecutive_low_days += 1
+        if consecutive_low_days >= thresholds['consecutive_days']:
+            alerts[user.id, 'Engagement Alert'] = {
+                'consecutive_low_days': consecutive_low_days, 'suggested_action': 'schedule_regular_study'
+            }
+        older_days_activities = sum(daily_activities[3:6])
+        if sum(daily_activities[:3]) == 0 and older_days_activities > 0:
+            alerts[user.id, 'Activity Drop Alert'] = {
+                'previous_daily_average': round(older_days_activities / 3, 6), 'current_activity': 0
+            }
+        return alerts
+
+    def test_performance_scan_matches_per_learner_checks(self):
+        """The window-function scan raises the alerts of the per-learner performance check"""
+        expected = {}
+        for user in self.users:
+            expected.update(self.performance_alerts(user))
+        self.assertEqual({title for _, title in expected}, {'Performance Decline Alert', 'Consistent Low Performance'})
+        alerts = self.sweep(self.service._performance_alert_candidates, self.service._performance_alerts)
+        self.assertEqual(alerts, expected)
+
+    def test_engagement_scan_matches_per_learner_checks(self):
+        """The grouped daily activity scan raises the alerts of the per-learner engagement check"""
+        expected = {}
+        for user in self.users:
+            expected.update(self.engagement_alerts(user))
+        self.assertEqual({title for _, title in expected}, {'Engagement Alert', 'Activity Drop Alert'})
+        alerts = self.sweep(self.service._engagement_alert_candidates, self.service._engagement_alerts)
+        self.assertEqual(alerts, expected)
+
+    def test_open_alerts_are_not_repeated(self):
+        """A second sweep does not alert learners again while their alerts are open"""
+        self.service._sweep(self.service._engagement_alert_candidates, self.service._engagement_alerts)
+        self.assertEqual(
+            self.service._sweep(self.service._engagement_alert_candidates, self.service._engagement_alerts), 0
+        )
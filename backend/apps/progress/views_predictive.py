@@ -22,6 +22,7 @@ from datetime import datetime, timedelta
 import logging
 
 from .services.predictive_analytics_service import PredictiveAnalyticsService
+from .services.predictive_dashboard import PredictiveDashboardService
 
 logger = logging.getLogger(__name__)
 
@@ -198,86 +199,15 @@ class ComprehensivePredictiveAnalyticsAPIView(APIView):
             analysis_period = int(request.query_params.get('analysis_period_days', 90))
             confidence_level = float(request.query_params.get('confidence_level', 0.95))
             
-            predictive_service = PredictiveAnalyticsService()
-            
-            # Generate all analytics components
-            results = {}
-            
-            # ML Predictions
-            results['ml_predictions'] = predictive_service.generate_ml_predictions(
-                user=request.user,
-                learning_path_id=learning_path_id,
-                prediction_horizon_days=prediction_horizon
-            )
-            
-            # Historical Trends
-            results['historical_trends'] = predictive_service.analyze_historical_trends(
-                user=request.user,
-                learning_path_id=learning_path_id,
-                analysis_period_days=analysis_period
-            )
-            
-            # Adaptive Predictions
-            results['adaptive_predictions'] = predictive_service.adaptive_prediction_algorithm(
-                user=request.user,
-                learning_path_id=learning_path_id
-            )
-            
-            # Confidence Calculations
-            results['confidence_analysis'] = predictive_service.statistical_confidence_calculations(
+            # Generate all analytics components concurrently, reusing cached sections
+            results, sections = PredictiveDashboardService.get_instance().build(
                 user=request.user,
                 learning_path_id=learning_path_id,
+                prediction_horizon_days=prediction_horizon,
+                analysis_period_days=analysis_period,
                 confidence_level=confidence_level
             )
             
-            # Learning Velocity Analysis (NEW)
-            results['learning_velocity'] = predictive_service.analyze_learning_velocity(
-                user=request.user,
-                learning_path_id=learning_path_id,
-                days_window=min(analysis_period, 30)
-            )
-            
-            # Engagement Pattern Analysis (NEW)
-            results['engagement_patterns'] = predictive_service.analyze_engagement_patterns(
-                user=request.user,
-                learning_path_id=learning_path_id,
-                analysis_depth='comprehensive'
-            )
-            
-            # Success Probability Modeling (NEW)
-            results['success_probability'] = predictive_service.model_success_probability(
-                user=request.user,
-                learning_path_id=learning_path_id,
-                time_horizon_days=prediction_horizon
-            )
-            
-            # Time-to-Completion Prediction (NEW)
-            results['time_to_completion'] = predictive_service.predict_time_to_completion(
-                user=request.user,
-                learning_path_id=learning_path_id,
-                include_holidays=True
-            )
-            
-            # Retention Risk Assessment (NEW)
-            results['retention_risk'] = predictive_service.assess_retention_risk(
-                user=request.user,
-                learning_path_id=learning_path_id,
-                risk_horizon_days=prediction_horizon
-            )
-            
-            # Knowledge Gap Detection (NEW)
-            results['knowledge_gaps'] = predictive_service.detect_knowledge_gaps(
-                user=request.user,
-                learning_path_id=learning_path_id,
-                analysis_depth='comprehensive'
-            )
-            
-            # K-Means Clustering Analysis (NEW)
-            results['learning_clusters'] = predictive_service.perform_learning_analytics_clustering(
-                learning_path_id=learning_path_id,
-                feature_selection='comprehensive'
-            )
-            
             # Generate summary insights
             results['summary_insights'] = self._generate_summary_insights(results)
             
@@ -289,7 +219,8 @@ class ComprehensivePredictiveAnalyticsAPIView(APIView):
                     'analysis_period_days': analysis_period,
                     'confidence_level': confidence_level,
                     'generated_at': timezone.now(),
-                    'user_id': request.user.id
+                    'user_id': request.user.id,
+                    'sections': sections
                 }
             })
             
@@ -32,6 +32,7 @@ from django.core.cache import cache
 from .services.realtime_monitoring_service import RealtimeMonitoringService
 from .services.predictive_analytics_service import PredictiveAnalyticsService
 from .services.progress_service import ProgressService
+from .services.activity_rollup_service import ActivityRollupService
 from .models import ProgressNotification, LearningAnalytics
 from apps.learning.models import UserModuleProgress, AssessmentAttempt
 
@@ -45,7 +46,7 @@ class RealTimeDashboardAPIView(APIView):
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.realtime_service = RealtimeMonitoringService()
+        self.realtime_service = RealtimeMonitoringService.get_instance()
     
     def get(self, request):
         """Get real-time dashboard data"""
@@ -611,7 +612,7 @@ class PerformanceAlertsAPIView(APIView):
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.realtime_service = RealtimeMonitoringService()
+        self.realtime_service = RealtimeMonitoringService.get_instance()
     
     def get(self, request):
         """Get live performance alerts"""
@@ -955,21 +956,7 @@ class PerformanceAlertsAPIView(APIView):
     
     def _calculate_learning_streak(self, user: User) -> int:
         """Calculate current learning streak"""
-        streak = 0
-        current_date = timezone.now().date()
-        
-        while True:
-            day_activities = UserModuleProgress.objects.filter(
-                user=user,
-                updated_at__date=current_date - timedelta(days=streak)
-            ).exists()
-            
-            if day_activities:
-                streak += 1
-            else:
-                break
-        
-        return streak
+        return ActivityRollupService().current_streak(user.id)
 
 
 class TrendAnalysisAPIView(APIView):
@@ -1605,7 +1592,7 @@ class TrendAnalysisAPIView(APIView):
             
             # Learning clusters analysis
             try:
-                individual_predictions['learning_clusters'] = self.predictive_service.perform_learning_analytics_clustering(user)
+                individual_predictions['learning_clusters'] = self.predictive_service.perform_learning_analytics_clustering(user=user)
             except Exception as e:
                 individual_predictions['learning_clusters'] = {'error': str(e)}
             
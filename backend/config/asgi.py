@@ -20,6 +20,7 @@ django_asgi_app = get_asgi_application()
 
 # Import WebSocket routing
 from apps.progress.routing import websocket_urlpatterns
+from apps.jac_execution.routing import websocket_urlpatterns as execution_websocket_urlpatterns
 from channels.routing import ProtocolTypeRouter, URLRouter
 from channels.auth import AuthMiddlewareStack
 
@@ -27,7 +28,7 @@ application = ProtocolTypeRouter({
     "http": django_asgi_app,
     "websocket": AuthMiddlewareStack(
         URLRouter(
-            websocket_urlpatterns
+            websocket_urlpatterns + execution_websocket_urlpatterns
         )
     ),
 })
\ No newline at end of file
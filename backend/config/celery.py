@@ -59,6 +59,78 @@ def debug_task(self):
     print(f'Request: {self.request!r}')
     return "Celery is working!"
 
+# Offline training for the predictive analytics model registry
+@celery_app.task(bind=True, name='progress.train_predictive_models')
+def train_predictive_models_task(self, learning_path_ids=None):
+    """Train cohort prediction models and store a new registry version"""
+    from django.core.management import call_command
+    
+    args = []
+    for learning_path_id in learning_path_ids or []:
+        args += ['--learning-path', str(learning_path_id)]
+    call_command('train_predictive_models', *args)
+    return "Predictive models trained"
+
+# Scheduled learner segmentation for the clustering analytics
+@celery_app.task(bind=True, name='progress.train_learner_segments')
+def train_learner_segments_task(self, learning_path_ids=None, clusters=None):
+    """Segment all active learners and store centroids and segment labels"""
+    from django.core.management import call_command
+    
+    args = []
+    for learning_path_id in learning_path_ids or []:
+        args += ['--learning-path', str(learning_path_id)]
+    if clusters:
+        args += ['--clusters', str(clusters)]
+    call_command('train_learner_segments', *args)
+    return "Learner segments trained"
+
+# Realtime dashboard pushes, moved out of the request that saved the progress
+@celery_app.task(bind=True, name='progress.publish_realtime_activity', ignore_result=True)
+def publish_realtime_activity_task(self, user_id, activity):
+    """Recompute a learner's realtime metrics and push a change event to their open sockets"""
+    from apps.progress.services.realtime_monitoring_service import RealtimeMonitoringService
+    
+    RealtimeMonitoringService.get_instance().publish_activity(user_id, activity)
+
+# Periodic refresh of the materialized cohort statistics
+@celery_app.task(bind=True, name='progress.refresh_cohort_stats')
+def refresh_cohort_stats_task(self, full=False):
+    """Recompute changed learner metrics and their cohort distributions"""
+    from django.core.management import call_command
+    
+    args = ['--full'] if full else []
+    call_command('refresh_cohort_stats', *args)
+    return "Cohort statistics refreshed"
+
+# Periodic resync of the leaderboards with the gamification tables
+@celery_app.task(bind=True, name='gamification.rebuild_leaderboards')
+def rebuild_leaderboards_task(self):
+    """Repopulate every leaderboard sorted set from the database"""
+    from django.core.management import call_command
+    
+    call_command('rebuild_leaderboards')
+    return "Leaderboards rebuilt"
+
+# Fallback drain of the gamification event outbox when no worker command runs
+@celery_app.task(bind=True, name='gamification.process_events')
+def process_gamification_events_task(self):
+    """Apply every pending gamification event and purge old processed ones"""
+    from django.core.management import call_command
+    
+    call_command('process_gamification_events', once=True)
+    return "Gamification events processed"
+
+# Periodic refresh of the autocomplete suggestions shared by all workers
+@celery_app.task(bind=True, name='search.rebuild_autocomplete')
+def rebuild_autocomplete_task(self):
+    """Aggregate search query stats, then rebuild the autocomplete index and publish its snapshot"""
+    from django.core.management import call_command
+    
+    call_command('aggregate_search_queries')
+    call_command('rebuild_autocomplete')
+    return "Autocomplete index rebuilt"
+
 # Example task for content processing
 @celery_app.task(bind=True, name='content.process_content')
 def process_content_task(self, content_id):
@@ -35,6 +35,7 @@ DJANGO_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',  # Full-text search and trigram lookups
 ]
 
 THIRD_PARTY_APPS = [
@@ -60,6 +61,7 @@ LOCAL_APPS = [
     'apps.gamification',
     'apps.collaboration',  # Re-enabled
     'apps.management',
+    'search',  # Indexed search, suggestions and search analytics
 ]
 
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
@@ -96,6 +98,16 @@ TEMPLATES = [
 WSGI_APPLICATION = 'config.wsgi.application'
 ASGI_APPLICATION = 'config.asgi.application'
 
+# Channel layer shared by all web processes (WebSocket groups)
+CHANNEL_LAYERS = {
+    'default': {
+        'BACKEND': 'channels_redis.core.RedisChannelLayer',
+        'CONFIG': {
+            'hosts': [config('REDIS_URL', default='redis://redis:6379/1')],
+        },
+    },
+}
+
 # Database
 # Database Configuration - PostgreSQL for production/Docker
 # SQLite commented out for PostgreSQL setup
@@ -308,6 +320,16 @@ KNOWLEDGE_GRAPH_CONFIG = {
     'MAX_NODES_PER_GRAPH': 1000,
     'MAX_EDGES_PER_GRAPH': 5000,
     'CACHE_TIMEOUT': 3600,  # 1 hour
+    'SNAPSHOT_VERSION_CHECK_INTERVAL': 1.0,  # seconds between graph version checks
+    'PATH_INDEX_MAX_TREES': 4096,  # shortest-path trees kept per worker
+    'LAYOUT_MAX_ITERATIONS': 50,
+    'LAYOUT_TOLERANCE': 0.5,  # stop once no node moves further than this
+    'LAYOUT_SEED': 42,
+    'LAYOUT_EXACT_MAX_NODES': 500,  # larger graphs use grid-approximated repulsion
+    'STATISTICS_BETWEENNESS_EPSILON': 0.1,  # max error of sampled betweenness
+    'STATISTICS_BETWEENNESS_DELTA': 0.1,  # probability the error bound is exceeded
+    'STATISTICS_CACHE_TIMEOUT': 7 * 24 * 3600,  # 1 week
+    'STATISTICS_REFRESH_TIMEOUT': 600,  # lock held while one worker recomputes
 }
 
 # JAC Execution Configuration
@@ -316,6 +338,104 @@ JAC_EXECUTION_CONFIG = {
     'MAX_EXECUTION_TIME': 30,  # seconds
     'MAX_MEMORY_USAGE': 128,  # MB
     'SANDBOX_ENABLED': True,
+    'SECURITY_SETTINGS_TTL': 60,  # seconds between SecuritySettings reloads
+    'WORKER_POOL_ENABLED': True,  # run code on warm sandbox workers
+    'WORKER_POOL_SIZE': 4,  # warm workers per web process
+    'WORKER_MAX_RUNS': 200,  # jobs before a worker is replaced
+    'WORKER_QUEUE_SIZE': 16,  # jobs allowed to wait for a worker
+    'WORKER_QUEUE_TIMEOUT': 10,  # seconds a job may wait for a worker
+    'WORKER_MAX_OPEN_FILES': 32,
+    'EXECUTION_QUEUE_RUNNERS': 4,  # threads running queued executions per web process
+    'EXECUTION_QUEUE_SIZE': 32,  # queued executions allowed to wait per web process
+    'EXECUTION_JOB_TTL': 3600,  # seconds live job state is kept for status polls
+    'RESULT_CACHE_ENABLED': True,  # reuse results of identical deterministic runs
+    'RESULT_CACHE_TTL': 86400,  # seconds a result stays in the shared cache
+    'RESULT_CACHE_L1_SIZE': 512,  # results kept in each process
+    'RESULT_CACHE_L1_TTL': 300,  # seconds a result stays in a process
+    'TEST_MAX_CASES': 50,  # test cases graded per submission
+    'TEST_MAX_FAILURES': 0,  # skip remaining cases after this many failures (0 = run all)
+}
+
+# Predictive Analytics Configuration
+PREDICTIVE_ANALYTICS_CONFIG = {
+    'MODEL_DIR': config('PREDICTIVE_MODEL_DIR', default=str(BASE_DIR / 'ml_models')),
+    'MODEL_KEEP_VERSIONS': 3,  # versions kept per scope
+    'MODEL_RELOAD_INTERVAL': 60,  # seconds between checks for a newer version
+    'MODEL_MAX_AGE_DAYS': 7,  # older models are reported as stale
+    'MODEL_MIN_SAMPLES': 50,  # training rows needed to fit a cohort model
+    'DASHBOARD_WORKERS': 8,  # threads computing dashboard sections per process
+    'DASHBOARD_TIMEOUT': 0.75,  # seconds a dashboard request waits for uncached sections
+    'SECTION_CACHE_TTL': 3600,  # per-learner sections, also invalidated on new progress
+    'PLATFORM_SECTION_CACHE_TTL': 1800,  # platform-wide sections (learner clustering)
+    'SEGMENT_WINDOW_DAYS': 90,  # activity that makes a learner part of the segmentation
+    'SEGMENT_MIN_LEARNERS': 10,
+    'SEGMENT_MAX_CLUSTERS': 8,
+    'SEGMENT_BATCH_SIZE': 1024,  # MiniBatchKMeans batch size
+    'SEGMENT_SILHOUETTE_SAMPLE': 5000,  # learners sampled to score a segment count
+}
+
+# Learner Activity Rollup
+PROGRESS_ACTIVITY_CONFIG = {
+    'SESSION_GAP_MINUTES': 30,  # inactivity that starts a new learning session
+}
+
+# Realtime dashboard sockets
+PROGRESS_REALTIME_CONFIG = {
+    'LISTENER_TTL': 120,  # seconds an open-socket count lives without a heartbeat
+    'LISTENER_HEARTBEAT': 30,  # seconds between refreshes of this process's socket counts
+}
+
+# Background progress monitoring
+PROGRESS_MONITORING_CONFIG = {
+    'SCAN_CHUNK_SIZE': 1000,  # alerted learners fetched per keyset page of an alert scan
+}
+
+# Materialized cohort statistics for peer comparison and ranking
+PROGRESS_COHORT_CONFIG = {
+    'QUANTILE_POINTS': 2048,  # values kept per cohort metric distribution
+    'VELOCITY_WINDOW_DAYS': 30,
+}
+
+# Gamification leaderboards, precomputed in Redis sorted sets
+GAMIFICATION_LEADERBOARD_CONFIG = {
+    'REDIS_URL': config('LEADERBOARD_REDIS_URL', default=config('REDIS_URL', default='redis://redis:6379/1')),
+    'KEY_PREFIX': 'gamification:leaderboard',
+    'SOCKET_TIMEOUT': 0.5,  # seconds before reads fall back to the database
+    'MAX_PAGE_SIZE': 100,
+    'WEEKLY_RETENTION_WEEKS': 5,
+}
+
+# Gamification points ledger
+GAMIFICATION_POINTS_CONFIG = {
+    'BALANCE_CACHE_TTL': 300,  # seconds a cached balance snapshot is served
+    'TRANSACTION_BATCH_SIZE': 1000,  # ledger rows per bulk insert
+}
+
+# Gamification event outbox, drained by the process_gamification_events worker
+GAMIFICATION_EVENT_CONFIG = {
+    'BATCH_SIZE': 200,  # events applied per transaction
+    'POLL_INTERVAL': 2.0,  # seconds the worker sleeps when the outbox is empty
+    'MAX_ATTEMPTS': 5,  # failures before an event is parked
+    'RETENTION_DAYS': 7,  # processed events kept before purging
+}
+
+# Search Configuration
+SEARCH_CONFIG = {
+    'BACKEND': config('SEARCH_BACKEND', default='auto'),  # auto, postgres, bm25 or scan
+    'FIELD_BOOSTS': {'title': 4.0, 'tags': 2.0, 'description': 1.5, 'body': 1.0},
+    'TEXT_SEARCH_CONFIG': 'english',  # PostgreSQL text search configuration
+    'TRIGRAM_WEIGHT': 0.5,  # share of title trigram similarity in the PostgreSQL score
+    'BM25_K1': 1.2,
+    'BM25_B': 0.75,
+    'AUTOCOMPLETE_RELOAD_INTERVAL': 30,  # seconds between checks for a newer snapshot
+    'AUTOCOMPLETE_MIN_QUERY_COUNT': 2,
+    'AUTOCOMPLETE_MAX_QUERIES': 5000,
+    'AUTOCOMPLETE_TITLE_WEIGHT': 5.0,  # per point of document popularity
+    'QUERY_LOG_ASYNC': True,  # buffer search analytics and write them in batches
+    'QUERY_LOG_BATCH_SIZE': 200,
+    'QUERY_LOG_FLUSH_INTERVAL': 5.0,  # seconds
+    'QUERY_LOG_MAX_BUFFER': 10000,  # events kept per process before the oldest are dropped
+    'QUERY_STATS_WINDOW_DAYS': 90,
 }
 
 # Agent Configuration
@@ -343,6 +463,28 @@ AGENT_CONFIG = {
     'ORCHESTRATOR': {
         'cache_timeout': 60,    # 1 minute
         'coordination_timeout': 10,
+    },
+    'LLM_CLIENT': {
+        'backend': config('LLM_BACKEND', default='gemini'),  # gemini or stub (local, for load tests)
+        'max_concurrency': 8,   # concurrent LLM calls per process
+        'request_timeout': 60,
+        'agent_timeout': 30,    # per agent in multi-agent collaboration
+        'stub_latency': 0.5,
+    },
+    'RESPONSE_CACHE': {
+        'enabled': True,
+        'ttl': 86400,           # 24 hours
+        'semantic_enabled': False,  # also reuse answers to similar questions
+        'similarity_threshold': 0.85,  # cosine similarity of character n-gram vectors
+        'max_semantic_entries': 5000,  # questions remembered per process
+        'exact_text_agents': ['code_reviewer'],  # inputs are code: keyed on the exact text, no semantic hits
+    },
+    'TASK_SCHEDULER': {
+        'workers': 10,          # task worker threads per process
+        'per_agent_concurrency': 2,
+        'per_agent_limits': {'system_orchestrator': 1},
+        'poll_interval': 5,     # seconds between checks for tasks queued by other processes
+        'stale_after': 3600,    # in-progress tasks older than this are requeued at startup
     }
 }
 
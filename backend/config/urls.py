@@ -74,6 +74,8 @@ urlpatterns = [
     path('api/jac-execution/', include('apps.jac_execution.urls')),
     # Knowledge Graph API (re-enabled)
     path('api/knowledge-graph/', include('apps.knowledge_graph.urls')),
+    # Search, suggestions and search history
+    path('api/search/', include('search.urls')),
     # path('api/ai-agents/', include('apps.api_endpoints.ai_agents_urls')),  # AI Multi-Agent System (commented out temporarily)
     
     # Fallback endpoints without /api/ prefix (for frontend compatibility)
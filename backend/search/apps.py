@@ -4,4 +4,9 @@ from django.apps import AppConfig
 class SearchConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'search'
-    verbose_name = 'Search System'
\ No newline at end of file
+    verbose_name = 'Search System'
+
+    def ready(self):
+        """Keep search documents in sync with their sources"""
+        from .signals import connect_signals
+        connect_signals()
@@ -0,0 +1,47 @@
+"""
+Pluggable search backends for JAC Learning Platform
+
+SEARCH_CONFIG['BACKEND'] selects the backend: 'postgres' (full-text and
+trigram indexes), 'bm25' (in-process inverted index), 'scan' (unindexed
+database scans) or 'auto', which picks postgres on PostgreSQL and bm25
+otherwise.
+"""
+
+import threading
+
+from django.db import connection
+from django.utils.module_loading import import_string
+
+from .base import BaseSearchBackend, search_config, tokenize
+
+BACKENDS = {
+    'postgres': 'search.backends.postgres.PostgresSearchBackend',
+    'bm25': 'search.backends.bm25.BM25SearchBackend',
+    'scan': 'search.backends.scan.ScanSearchBackend',
+}
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_search_backend(name: str = None) -> BaseSearchBackend:
+    """
+    Shared instance of a search backend
+
+    Args:
+        name: Backend name or dotted class path; defaults to SEARCH_CONFIG['BACKEND']
+    """
+    name = name or search_config().get('BACKEND', 'auto')
+    if name == 'auto':
+        name = 'postgres' if connection.vendor == 'postgresql' else 'bm25'
+
+    backend = _backends.get(name)
+    if backend is None:
+        with _backends_lock:
+            backend = _backends.get(name)
+            if backend is None:
+                backend = _backends[name] = import_string(BACKENDS.get(name, name))()
+    return backend
+
+
+__all__ = ['BaseSearchBackend', 'BACKENDS', 'get_search_backend', 'tokenize']
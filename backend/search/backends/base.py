@@ -0,0 +1,95 @@
+"""
+Search backend interface for JAC Learning Platform
+"""
+
+import re
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.conf import settings
+
+from ..documents import DOCUMENT_TYPES
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+DEFAULT_FIELD_BOOSTS = {
+    'title': 4.0,
+    'tags': 2.0,
+    'description': 1.5,
+    'body': 1.0,
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens of a text"""
+    return TOKEN_RE.findall((text or '').lower())
+
+
+def search_config() -> Dict[str, Any]:
+    return getattr(settings, 'SEARCH_CONFIG', {})
+
+
+class BaseSearchBackend:
+    """
+    A search backend answers queries from SearchDocument rows
+
+    Backends rank and paginate without loading every match, and compute
+    facets from the index rather than from the source tables.
+    """
+    name = None
+
+    def __init__(self):
+        self.field_boosts = {**DEFAULT_FIELD_BOOSTS, **search_config().get('FIELD_BOOSTS', {})}
+
+    def search(self, query: str, content_types: Optional[List[str]] = None,
+               limit: int = 20, offset: int = 0) -> Dict[str, Any]:
+        """
+        Find documents matching any query term
+
+        Args:
+            query: Search query string
+            content_types: Only search these content types (optional)
+            limit: Maximum number of results
+            offset: Number of results to skip
+
+        Returns:
+            Dictionary with the page of results, the total number of matches
+            and facet counts over all matches
+        """
+        raise NotImplementedError
+
+    def document_saved(self, document) -> None:
+        """Called after a SearchDocument was created or updated"""
+
+    def documents_rebuilt(self, content_types: Iterable[str]) -> None:
+        """Called after the documents of some content types were rebuilt in bulk"""
+
+    def documents_deleted(self, content_types: Iterable[str]) -> None:
+        """Called after documents of some content types were deleted"""
+
+    @staticmethod
+    def content_type_filter(content_types: Optional[List[str]]) -> List[str]:
+        if not content_types:
+            return list(DOCUMENT_TYPES)
+        return [content_type for content_type in content_types if content_type in DOCUMENT_TYPES]
+
+    @staticmethod
+    def result_from_document(document, relevance: float) -> Dict[str, Any]:
+        return {
+            'content_type': document.content_type,
+            'content_id': document.object_id,
+            'title': document.title,
+            'description': document.description,
+            'url': document.url,
+            'tags': document.tags,
+            'relevance_score': round(min(max(relevance, 0.0), 1.0), 4),
+            'popularity_score': document.popularity_score,
+            'metadata': document.metadata,
+        }
+
+    @staticmethod
+    def build_facets(content_type_counts: Dict[str, int], difficulty_counts: Dict[str, int]) -> Dict[str, Any]:
+        return {
+            'content_types': dict(content_type_counts),
+            'difficulty': {level: count for level, count in difficulty_counts.items() if level},
+            'total_results': sum(content_type_counts.values()),
+        }
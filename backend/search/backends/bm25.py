@@ -0,0 +1,237 @@
+"""
+In-process BM25 search backend for JAC Learning Platform
+Inverted index over SearchDocument rows, for SQLite deployments and tests
+"""
+
+import math
+import time
+import heapq
+import bisect
+import threading
+import uuid
+from datetime import timedelta
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+from ..models import SearchDocument
+from .base import BaseSearchBackend, search_config, tokenize
+
+INDEXED_FIELDS = ('title', 'tags', 'description', 'body')
+
+# Documents saved this long before the newest indexed one are re-read on
+# refresh, covering transactions that committed after a later save
+REFRESH_OVERLAP = timedelta(seconds=5)
+
+# Changed whenever documents are deleted, so every process reloads its index
+DELETIONS_CACHE_KEY = 'search:bm25:deletions'
+
+
+class BM25SearchBackend(BaseSearchBackend):
+    """
+    BM25F ranking over an in-memory inverted index
+
+    The index is loaded from SearchDocument on first use. At most every
+    REFRESH_INTERVAL seconds a query first catches up with documents saved
+    since (by any process), and reloads the index when any process deleted
+    documents. Each query term matches the indexed words it is a prefix of, as
+    with the PostgreSQL backend.
+    """
+    name = 'bm25'
+
+    def __init__(self):
+        super().__init__()
+        config = search_config()
+        self.k1 = config.get('BM25_K1', 1.2)
+        self.b = config.get('BM25_B', 0.75)
+        self.max_prefix_expansions = config.get('MAX_PREFIX_EXPANSIONS', 20)
+        self.refresh_interval = config.get('REFRESH_INTERVAL', 1.0)
+
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._checked_at = 0.0
+        self._deletions = None
+        self._clear()
+
+    def search(self, query: str, content_types: Optional[List[str]] = None,
+               limit: int = 20, offset: int = 0) -> Dict[str, Any]:
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return {'results': [], 'total_results': 0, 'facets': self.build_facets({}, {})}
+
+        allowed = set(self.content_type_filter(content_types))
+        with self._lock:
+            self._refresh()
+            scores = self._score(terms, allowed)
+            content_type_counts = Counter(map(self._content_types.__getitem__, scores))
+            difficulty_counts = Counter(map(self._difficulties.__getitem__, scores))
+            best = max(scores.values(), default=0.0)
+            ranked = [
+                (self._pks[slot], score)
+                for slot, score in heapq.nlargest(offset + limit, scores.items(), key=lambda item: item[1])[offset:]
+            ]
+
+        if not scores:
+            return {'results': [], 'total_results': 0, 'facets': self.build_facets({}, {})}
+
+        documents = SearchDocument.objects.defer('body', 'search_vector').in_bulk([pk for pk, _ in ranked])
+        results = [
+            self.result_from_document(documents[pk], score / best)
+            for pk, score in ranked if pk in documents
+        ]
+
+        return {
+            'results': results,
+            'total_results': len(scores),
+            'facets': self.build_facets(content_type_counts, difficulty_counts),
+        }
+
+    def documents_rebuilt(self, content_types) -> None:
+        # A rebuild deletes the documents of unsearchable objects
+        self.documents_deleted(content_types)
+        with self._lock:
+            self._loaded = False
+
+    def documents_deleted(self, content_types) -> None:
+        cache.set(DELETIONS_CACHE_KEY, uuid.uuid4().hex, None)
+        with self._lock:
+            self._checked_at = 0.0
+
+    def _score(self, terms: List[str], allowed: set) -> Dict[int, float]:
+        total_documents = len(self._slots)
+        if total_documents == 0:
+            return {}
+        filtered = len(allowed) < len(self.content_type_filter(None))
+
+        scores = defaultdict(float)
+        for term in terms:
+            for indexed_term in self._expand(term):
+                postings = self._postings.get(indexed_term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (total_documents - len(postings) + 0.5) / (len(postings) + 0.5))
+                if filtered:
+                    for slot, weight in postings.items():
+                        if self._content_types[slot] in allowed:
+                            scores[slot] += idf * weight
+                else:
+                    for slot, weight in postings.items():
+                        scores[slot] += idf * weight
+        return scores
+
+    def _expand(self, term: str) -> List[str]:
+        """Indexed words starting with a term, the term itself first"""
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        start = bisect.bisect_left(self._vocabulary, term)
+        expansions = []
+        for word in self._vocabulary[start:start + self.max_prefix_expansions]:
+            if not word.startswith(term):
+                break
+            expansions.append(word)
+        return expansions
+
+    def _refresh(self) -> None:
+        if self._loaded and time.monotonic() - self._checked_at < self.refresh_interval:
+            return
+        self._checked_at = time.monotonic()
+
+        # Read before loading, so a delete during the load is seen next time
+        deletions = cache.get(DELETIONS_CACHE_KEY)
+        stats = SearchDocument.objects.aggregate(count=Count('id'), latest=Max('updated_at'))
+        if not self._loaded or deletions != self._deletions:
+            # First use, or documents were deleted since the index was loaded
+            self._clear()
+            self._load(SearchDocument.objects.all())
+            self._loaded = True
+        elif stats['latest'] is not None and (self._latest is None or stats['latest'] > self._latest):
+            self._load(SearchDocument.objects.filter(updated_at__gte=self._latest - REFRESH_OVERLAP)
+                       if self._latest else SearchDocument.objects.all())
+
+        if len(self._slots) != stats['count']:
+            # Documents were deleted without remove_document(), e.g. in bulk
+            self._clear()
+            self._load(SearchDocument.objects.all())
+        self._deletions = deletions
+
+    def _load(self, queryset) -> None:
+        rows = queryset.values_list('pk', 'content_type', 'difficulty', 'updated_at', *INDEXED_FIELDS)
+        loaded = []
+        for pk, content_type, difficulty, updated_at, *fields in rows.iterator():
+            self._remove(pk)
+            loaded.append(self._add(pk, content_type, difficulty, dict(zip(INDEXED_FIELDS, fields))))
+            if self._latest is None or updated_at > self._latest:
+                self._latest = updated_at
+        # Weigh once every loaded document counts towards the average lengths
+        for slot in loaded:
+            self._weigh(slot)
+        self._vocabulary = None
+
+    def _add(self, pk, content_type: str, difficulty: str, fields: Dict[str, Any]) -> int:
+        lengths, frequencies = {}, defaultdict(dict)
+        for field in INDEXED_FIELDS:
+            value = fields[field]
+            tokens = tokenize(' '.join(map(str, value)) if field == 'tags' else value)
+            lengths[field] = len(tokens)
+            self._field_lengths[field] += len(tokens)
+            for term, frequency in Counter(tokens).items():
+                frequencies[term][field] = frequency
+
+        # Postings refer to documents by slot: integers hash far faster than UUIDs
+        if self._free_slots:
+            slot = self._free_slots.pop()
+            self._pks[slot], self._content_types[slot], self._difficulties[slot] = pk, content_type, difficulty
+        else:
+            slot = len(self._pks)
+            self._pks.append(pk)
+            self._content_types.append(content_type)
+            self._difficulties.append(difficulty)
+        self._slots[pk] = (slot, lengths, frequencies)
+        return slot
+
+    def _weigh(self, slot: int) -> None:
+        """Store a document's saturated term weights, using the current average field lengths"""
+        total_documents = len(self._slots)
+        average_lengths = {
+            field: (self._field_lengths[field] / total_documents) or 1.0 for field in INDEXED_FIELDS
+        }
+        _, lengths, frequencies = self._slots[self._pks[slot]]
+        norms = {
+            field: self.field_boosts[field] / (1 - self.b + self.b * lengths[field] / average_lengths[field])
+            for field in INDEXED_FIELDS
+        }
+        for term, field_frequencies in frequencies.items():
+            weighted = sum(norms[field] * frequency for field, frequency in field_frequencies.items())
+            self._postings[term][slot] = weighted * (self.k1 + 1) / (weighted + self.k1)
+
+    def _remove(self, pk) -> None:
+        document = self._slots.pop(pk, None)
+        if document is None:
+            return
+        slot, lengths, frequencies = document
+        for field, length in lengths.items():
+            self._field_lengths[field] -= length
+        for term in frequencies:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(slot, None)
+                if not postings:
+                    del self._postings[term]
+        self._pks[slot] = None
+        self._free_slots.append(slot)
+
+    def _clear(self) -> None:
+        # term -> {slot -> saturated BM25F weight}; a query only scales these by idf
+        self._postings = defaultdict(dict)
+        # document pk -> (slot, {field -> length}, {term -> {field -> frequency}})
+        self._slots = {}
+        # Per slot; the slots of replaced documents are reused by the next documents added
+        self._pks = []
+        self._content_types = []
+        self._difficulties = []
+        self._free_slots = []
+        self._field_lengths = Counter()
+        self._vocabulary = None
+        self._latest = None
@@ -0,0 +1,87 @@
+"""
+Database scan search backend for JAC Learning Platform
+The original search algorithm, kept as a baseline for benchmarks
+"""
+
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from django.db.models import Q
+
+from ..documents import DOCUMENT_TYPES
+from .base import BaseSearchBackend
+
+# Matches read per content type (users are capped lower)
+SCAN_LIMITS = {'user': 20}
+DEFAULT_SCAN_LIMIT = 50
+
+
+class ScanSearchBackend(BaseSearchBackend):
+    """
+    Queries every source table with icontains per term, ranks the matches
+    in Python and paginates the combined list. Needs no index, but costs
+    grow with catalog size and query length.
+    """
+    name = 'scan'
+
+    def search(self, query: str, content_types: Optional[List[str]] = None,
+               limit: int = 20, offset: int = 0) -> Dict[str, Any]:
+        terms = query.lower().split()
+        all_results = []
+        content_type_counts = defaultdict(int)
+        difficulty_counts = defaultdict(int)
+
+        for content_type in self.content_type_filter(content_types):
+            document_type = DOCUMENT_TYPES[content_type]
+            q_objects = Q()
+            for term in terms:
+                for field in document_type.scan_fields:
+                    q_objects |= Q(**{f'{field}__icontains': term})
+
+            for instance in document_type.get_queryset().filter(q_objects)[:SCAN_LIMITS.get(content_type, DEFAULT_SCAN_LIMIT)]:
+                document = document_type.build(instance)
+                all_results.append({
+                    'content_type': content_type,
+                    'content_id': str(instance.pk),
+                    'title': document['title'],
+                    'description': document['description'],
+                    'url': document['url'],
+                    'tags': document['tags'],
+                    'relevance_score': self._calculate_relevance(query, document['title'], document['body']),
+                    'popularity_score': document['popularity_score'],
+                    'metadata': document['metadata'],
+                })
+                content_type_counts[content_type] += 1
+                difficulty_counts[document['difficulty']] += 1
+
+        all_results.sort(key=lambda result: result['relevance_score'], reverse=True)
+
+        return {
+            'results': all_results[offset:offset + limit],
+            'total_results': len(all_results),
+            'facets': self.build_facets(content_type_counts, difficulty_counts),
+        }
+
+    @staticmethod
+    def _calculate_relevance(query: str, title: str, content: str) -> float:
+        """
+        Calculate relevance score based on query term frequency in title and content
+        """
+        query_terms = query.lower().split()
+        title_lower = title.lower()
+        content_lower = (content or "").lower()
+
+        score = 0.0
+
+        # Title matches are weighted higher
+        for term in query_terms:
+            if term in title_lower:
+                score += 0.7
+            if term in content_lower:
+                score += 0.3
+
+        # Normalize by number of terms
+        if query_terms:
+            score = min(score / len(query_terms), 1.0)
+
+        return score
@@ -0,0 +1,289 @@
+"""
+Searchable document types for JAC Learning Platform
+Maps each searchable model to the fields stored in its SearchDocument
+"""
+
+from typing import Any, Dict, List, Optional
+
+from django.apps import apps
+
+
+def _summary(text: str, length: int = 200) -> str:
+    text = text or ''
+    return text[:length] + '...' if len(text) > length else text
+
+
+def _words(values) -> str:
+    """Flatten a JSON list of strings (or dicts with a title/name) into indexable text"""
+    if not values:
+        return ''
+    if isinstance(values, dict):
+        values = list(values.values())
+    if not isinstance(values, (list, tuple)):
+        return str(values)
+    words = []
+    for value in values:
+        if isinstance(value, dict):
+            value = value.get('title') or value.get('name') or ''
+        words.append(str(value))
+    return ' '.join(words)
+
+
+def _tag_list(values) -> List[str]:
+    if isinstance(values, (list, tuple)):
+        return [str(value) for value in values if isinstance(value, (str, int, float))]
+    return []
+
+
+class DocumentType:
+    """
+    How one model is indexed
+
+    Subclasses name the model and build the SearchDocument fields of an
+    instance; scan_fields lists the model fields the legacy database scan
+    matches query terms against. When watched_fields is set, saves that
+    only update other fields leave the document alone.
+    """
+    content_type = None
+    model_label = None
+    scan_fields = ()
+    watched_fields = None
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    def get_queryset(self):
+        """Objects that belong in the index"""
+        return self.model.objects.all()
+
+    def is_indexable(self, instance) -> bool:
+        return True
+
+    def build(self, instance) -> Dict[str, Any]:
+        """SearchDocument field values for an instance"""
+        raise NotImplementedError
+
+
+class LearningPathDocument(DocumentType):
+    content_type = 'learning_path'
+    model_label = 'learning.LearningPath'
+    scan_fields = ('name', 'description')
+
+    def get_queryset(self):
+        return self.model.objects.filter(is_published=True)
+
+    def is_indexable(self, instance) -> bool:
+        return instance.is_published
+
+    def build(self, instance) -> Dict[str, Any]:
+        return {
+            'title': instance.name,
+            'description': _summary(instance.description),
+            'body': instance.description,
+            'tags': _tag_list(instance.tags),
+            'url': f'/learning/paths/{instance.id}',
+            'difficulty': instance.difficulty_level,
+            'popularity_score': 0.8 if instance.is_featured else 0.5,
+            'metadata': {
+                'difficulty': instance.difficulty_level,
+                'estimated_duration': instance.estimated_duration,
+                'prerequisites': instance.prerequisites or [],
+            },
+        }
+
+
+class ModuleDocument(DocumentType):
+    content_type = 'module'
+    model_label = 'learning.Module'
+    scan_fields = ('title', 'description', 'content')
+
+    def get_queryset(self):
+        return self.model.objects.filter(is_published=True)
+
+    def is_indexable(self, instance) -> bool:
+        return instance.is_published
+
+    def build(self, instance) -> Dict[str, Any]:
+        rating = instance.difficulty_rating or 1
+        return {
+            'title': instance.title,
+            'description': _summary(instance.description),
+            'body': f"{instance.description}\n{instance.content}\n{_words(instance.jac_concepts)}",
+            'tags': _tag_list(instance.jac_concepts),
+            'url': f'/learning/modules/{instance.id}',
+            'difficulty': 'beginner' if rating <= 2 else 'intermediate' if rating == 3 else 'advanced',
+            'popularity_score': 0.7,
+            'metadata': {
+                'difficulty_rating': instance.difficulty_rating,
+                'duration_minutes': instance.duration_minutes,
+                'learning_path_id': str(instance.learning_path_id),
+            },
+        }
+
+
+class LessonDocument(DocumentType):
+    content_type = 'lesson'
+    model_label = 'learning.Lesson'
+    scan_fields = ('title', 'content')
+
+    def get_queryset(self):
+        return self.model.objects.filter(is_published=True)
+
+    def is_indexable(self, instance) -> bool:
+        return instance.is_published
+
+    def build(self, instance) -> Dict[str, Any]:
+        return {
+            'title': instance.title,
+            'description': _summary(instance.content),
+            'body': instance.content,
+            'tags': [],
+            'url': f'/learning/lessons/{instance.id}',
+            'difficulty': '',
+            'popularity_score': 0.6,
+            'metadata': {
+                'type': instance.lesson_type,
+                'duration': instance.estimated_duration,
+                'module_id': str(instance.module_id),
+            },
+        }
+
+
+class AssessmentDocument(DocumentType):
+    content_type = 'assessment'
+    model_label = 'assessments.Assessment'
+    scan_fields = ('title', 'description')
+
+    def get_queryset(self):
+        return self.model.objects.filter(is_published=True)
+
+    def is_indexable(self, instance) -> bool:
+        return instance.is_published
+
+    def build(self, instance) -> Dict[str, Any]:
+        return {
+            'title': instance.title,
+            'description': _summary(instance.description),
+            'body': instance.description,
+            'tags': [],
+            'url': f'/assessments/{instance.id}',
+            'difficulty': instance.difficulty_level,
+            'popularity_score': 0.7,
+            'metadata': {
+                'type': instance.assessment_type,
+                'difficulty': instance.difficulty_level,
+                'time_limit': instance.time_limit,
+                'max_attempts': instance.max_attempts,
+            },
+        }
+
+
+class KnowledgeNodeDocument(DocumentType):
+    content_type = 'knowledge_node'
+    model_label = 'knowledge_graph.KnowledgeNode'
+    scan_fields = ('title', 'description')
+
+    def get_queryset(self):
+        return self.model.objects.filter(is_active=True)
+
+    def is_indexable(self, instance) -> bool:
+        return instance.is_active
+
+    def build(self, instance) -> Dict[str, Any]:
+        return {
+            'title': instance.title,
+            'description': _summary(instance.description),
+            'body': f"{instance.description}\n{_words(instance.learning_objectives)}",
+            'tags': [],
+            'url': f'/knowledge-graph/node/{instance.id}',
+            'difficulty': instance.difficulty_level,
+            'popularity_score': 0.5,
+            'metadata': {
+                'node_type': instance.node_type,
+                'difficulty': instance.difficulty_level,
+                'view_count': instance.view_count,
+            },
+        }
+
+
+class ContentDocument(DocumentType):
+    content_type = 'content'
+    model_label = 'content.Content'
+    scan_fields = ('title', 'description', 'topic')
+
+    def get_queryset(self):
+        return self.model.objects.filter(is_published=True)
+
+    def is_indexable(self, instance) -> bool:
+        return instance.is_published
+
+    def build(self, instance) -> Dict[str, Any]:
+        return {
+            'title': instance.title,
+            'description': _summary(instance.description),
+            'body': f"{instance.description}\n{instance.topic}",
+            'tags': _tag_list(instance.tags),
+            'url': f'/content/{instance.pk}',
+            'difficulty': instance.difficulty_level,
+            'popularity_score': 0.8 if instance.is_featured else 0.5,
+            'metadata': {
+                'content_type': instance.content_type,
+                'topic': instance.topic,
+                'author_id': str(instance.created_by_id) if instance.created_by_id else None,
+            },
+        }
+
+
+class UserDocument(DocumentType):
+    content_type = 'user'
+    model_label = 'users.User'
+    # Only public profile fields: every learner can search users
+    scan_fields = ('username', 'first_name', 'last_name')
+    # Logins and activity tracking save users constantly
+    watched_fields = ('username', 'first_name', 'last_name', 'is_active')
+
+    def get_queryset(self):
+        return self.model.objects.filter(is_active=True)
+
+    def is_indexable(self, instance) -> bool:
+        return instance.is_active
+
+    def build(self, instance) -> Dict[str, Any]:
+        full_name = f"{instance.first_name} {instance.last_name}".strip()
+        return {
+            'title': full_name if instance.first_name and instance.last_name else instance.username,
+            'description': f"@{instance.username}",
+            'body': f"{instance.username} {full_name}",
+            'tags': ['user'],
+            'url': f'/profile/{instance.username}',
+            'difficulty': '',
+            'popularity_score': 0.3,
+            'metadata': {
+                'username': instance.username,
+                'is_instructor': getattr(instance, 'is_instructor', False),
+            },
+        }
+
+
+DOCUMENT_TYPES = {
+    document_type.content_type: document_type
+    for document_type in (
+        LearningPathDocument(),
+        ModuleDocument(),
+        LessonDocument(),
+        AssessmentDocument(),
+        KnowledgeNodeDocument(),
+        ContentDocument(),
+        UserDocument(),
+    )
+}
+
+
+def document_type_for(instance) -> Optional[DocumentType]:
+    """Document type indexing an instance's model, if any"""
+    label = instance._meta.label
+    for document_type in DOCUMENT_TYPES.values():
+        if document_type.model_label == label:
+            return document_type
+    return None
@@ -0,0 +1,32 @@
+"""
+Aggregate the search query log for JAC Learning Platform
+
+Recomputes the per-query counts used by autocomplete and the popular
+searches endpoint.
+
+Usage:
+    python manage.py aggregate_search_queries
+    python manage.py aggregate_search_queries --days 30
+"""
+
+from django.core.management.base import BaseCommand
+
+from search.services.query_log import aggregate_query_stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute search query stats from the search query log'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=None,
+            help="Days of searches to count (default: SEARCH_CONFIG['QUERY_STATS_WINDOW_DAYS'])",
+        )
+
+    def handle(self, *args, **options):
+        counts = aggregate_query_stats(options['days'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {counts['written']} search query stats, removed {counts['removed']}"
+        ))
@@ -0,0 +1,71 @@
+"""
+Benchmark search backends for JAC Learning Platform
+
+Times the configured search backend against the unindexed database scan on
+the current catalog and reports how much their top results overlap.
+
+Usage:
+    python manage.py benchmark_search
+    python manage.py benchmark_search --query "jac walkers" --query graph --iterations 50
+    python manage.py benchmark_search --backend bm25 --baseline scan
+"""
+
+import time
+import statistics
+
+from django.core.management.base import BaseCommand
+
+from search.backends import get_search_backend
+
+DEFAULT_QUERIES = ('jac', 'walker', 'graph nodes', 'data spatial programming', 'introduction to jac basics')
+
+
+class Command(BaseCommand):
+    help = 'Compare search latency and results of two search backends'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--query', action='append', default=[], help='Query to run (repeatable)')
+        parser.add_argument('--iterations', type=int, default=20, help='Timed runs per query and backend')
+        parser.add_argument('--limit', type=int, default=20, help='Results per page')
+        parser.add_argument('--backend', default=None, help='Backend to measure (default: configured)')
+        parser.add_argument('--baseline', default='scan', help='Backend to compare against')
+
+    def handle(self, *args, **options):
+        queries = options['query'] or DEFAULT_QUERIES
+        backend = get_search_backend(options['backend'])
+        baseline = get_search_backend(options['baseline'])
+
+        # Warm up, so index loading is not part of the measurement
+        backend.search(queries[0], limit=options['limit'])
+
+        self.stdout.write(
+            f"{'query':<32} {baseline.name + ' ms':>12} {backend.name + ' ms':>12} {'speedup':>8} {'overlap':>8}"
+        )
+        baseline_totals, backend_totals = [], []
+        for query in queries:
+            baseline_ms, baseline_found = self._measure(baseline, query, options)
+            backend_ms, backend_found = self._measure(backend, query, options)
+            baseline_totals.append(baseline_ms)
+            backend_totals.append(backend_ms)
+
+            baseline_ids = {(r['content_type'], r['content_id']) for r in baseline_found['results']}
+            backend_ids = {(r['content_type'], r['content_id']) for r in backend_found['results']}
+            overlap = len(baseline_ids & backend_ids) / len(baseline_ids) if baseline_ids else 1.0
+            self.stdout.write(
+                f'{query[:32]:<32} {baseline_ms:>12.2f} {backend_ms:>12.2f} '
+                f'{baseline_ms / backend_ms if backend_ms else 0:>7.1f}x {overlap:>8.0%}'
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'median {baseline.name} {statistics.median(baseline_totals):.2f} ms, '
+            f'{backend.name} {statistics.median(backend_totals):.2f} ms'
+        ))
+
+    @staticmethod
+    def _measure(backend, query, options):
+        timings = []
+        for _ in range(options['iterations']):
+            started = time.perf_counter()
+            found = backend.search(query, limit=options['limit'])
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings), found
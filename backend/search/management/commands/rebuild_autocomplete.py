@@ -0,0 +1,21 @@
+"""
+Rebuild the autocomplete index for JAC Learning Platform
+
+Run periodically (the search.rebuild_autocomplete Celery task) so new
+titles and popular queries reach every worker's suggestions.
+
+Usage:
+    python manage.py rebuild_autocomplete
+"""
+
+from django.core.management.base import BaseCommand
+
+from search.services.autocomplete import AutocompleteService
+
+
+class Command(BaseCommand):
+    help = 'Rebuild and publish the autocomplete suggestion index'
+
+    def handle(self, *args, **options):
+        index = AutocompleteService.get_instance().build()
+        self.stdout.write(self.style.SUCCESS(f'Published {len(index)} autocomplete suggestions'))
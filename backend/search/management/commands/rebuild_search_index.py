@@ -0,0 +1,40 @@
+"""
+Rebuild the search index for JAC Learning Platform
+
+Usage:
+    python manage.py rebuild_search_index
+    python manage.py rebuild_search_index --content-type module --content-type lesson
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from search.documents import DOCUMENT_TYPES
+from search.services.search_index import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild search documents from the searchable models'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--content-type',
+            action='append',
+            default=[],
+            help=f"Only rebuild this content type (repeatable): {', '.join(DOCUMENT_TYPES)}",
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Documents written per query',
+        )
+
+    def handle(self, *args, **options):
+        unknown = set(options['content_type']) - set(DOCUMENT_TYPES)
+        if unknown:
+            raise CommandError(f"Unknown content types: {', '.join(sorted(unknown))}")
+
+        indexed = rebuild_index(options['content_type'] or None, batch_size=options['batch_size'])
+        for content_type, count in indexed.items():
+            self.stdout.write(f'{content_type}: {count}')
+        self.stdout.write(self.style.SUCCESS(f'Indexed {sum(indexed.values())} search documents'))
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.8 on 2026-10-16 19:17
+
+import django.contrib.postgres.search
+import uuid
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+def create_gin_indexes(apps, schema_editor):
+    # Full-text and trigram GIN indexes only exist on PostgreSQL
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS search_docu_vector_gin ON search_documents USING GIN (search_vector)'
+    )
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS search_docu_title_trgm ON search_documents USING GIN (title gin_trgm_ops)'
+    )
+
+
+def drop_gin_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS search_docu_vector_gin')
+    schema_editor.execute('DROP INDEX IF EXISTS search_docu_title_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0002_rename_search_queries_query_idx_search_quer_query_50e46f_idx_and_more'),
+    ]
+
+    operations = [
+        # No-op on other databases
+        TrigramExtension(),
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('content_type', models.CharField(choices=[('learning_path', 'Learning Path'), ('module', 'Module'), ('lesson', 'Lesson'), ('assessment', 'Assessment'), ('knowledge_node', 'Knowledge Node'), ('content', 'Content'), ('user', 'User')], max_length=20)),
+                ('object_id', models.CharField(help_text='Primary key of the source object', max_length=255)),
+                ('title', models.CharField(max_length=255)),
+                ('description', models.TextField(blank=True, help_text='Summary shown in results')),
+                ('body', models.TextField(blank=True, help_text='Full text indexed for search')),
+                ('tags', models.JSONField(blank=True, default=list)),
+                ('url', models.CharField(max_length=500)),
+                ('difficulty', models.CharField(blank=True, max_length=30)),
+                ('popularity_score', models.FloatField(default=0.0)),
+                ('metadata', models.JSONField(blank=True, default=dict)),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Search Document',
+                'verbose_name_plural': 'Search Documents',
+                'db_table': 'search_documents',
+                'indexes': [models.Index(fields=['content_type'], name='search_docu_content_f18e4e_idx'), models.Index(fields=['updated_at'], name='search_docu_updated_9b7d01_idx')],
+                'unique_together': {('content_type', 'object_id')},
+            },
+        ),
+        migrations.RunPython(create_gin_indexes, drop_gin_indexes),
+    ]
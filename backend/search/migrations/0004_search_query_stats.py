@@ -0,0 +1,37 @@
+# Generated by Django 5.2.8 on 2026-10-16 19:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0003_search_document'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='searchquery',
+            name='latency_ms',
+            field=models.FloatField(blank=True, help_text='Time taken to serve the search', null=True),
+        ),
+        migrations.CreateModel(
+            name='SearchQueryStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('query', models.CharField(help_text='Lowercased search query text', max_length=255, unique=True)),
+                ('search_count', models.PositiveIntegerField(default=0)),
+                ('result_count', models.PositiveIntegerField(default=0, help_text='Searches that found results')),
+                ('click_count', models.PositiveIntegerField(default=0, help_text='Searches followed by a result click')),
+                ('last_searched_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Search Query Stat',
+                'verbose_name_plural': 'Search Query Stats',
+                'db_table': 'search_query_stats',
+                'ordering': ['-search_count'],
+                'indexes': [models.Index(fields=['-search_count'], name='search_quer_search__d7308d_idx'), models.Index(fields=['-result_count'], name='search_quer_result__0d30e6_idx')],
+            },
+        ),
+    ]
@@ -5,6 +5,7 @@ Handles search functionality across all content types
 
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchVectorField
 from django.utils import timezone
 import uuid
 
@@ -22,6 +23,7 @@ class SearchQuery(models.Model):
     # Search metadata
     results_count = models.PositiveIntegerField(default=0, help_text='Number of results found')
     clicked_result = models.CharField(max_length=255, null=True, blank=True, help_text='URL or identifier of clicked result')
+    latency_ms = models.FloatField(null=True, blank=True, help_text='Time taken to serve the search')
     
     # Timing
     created_at = models.DateTimeField(auto_now_add=True)
@@ -40,6 +42,35 @@ class SearchQuery(models.Model):
         return f"Search: {self.query}"
 
 
+class SearchQueryStat(models.Model):
+    """
+    Aggregated counts of one normalized search query
+
+    Recomputed from SearchQuery by the aggregate_search_queries job and read
+    by autocomplete and the popular searches endpoint instead of the raw log.
+    """
+    query = models.CharField(max_length=255, unique=True, help_text='Lowercased search query text')
+    search_count = models.PositiveIntegerField(default=0)
+    result_count = models.PositiveIntegerField(default=0, help_text='Searches that found results')
+    click_count = models.PositiveIntegerField(default=0, help_text='Searches followed by a result click')
+    last_searched_at = models.DateTimeField()
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'search_query_stats'
+        verbose_name = 'Search Query Stat'
+        verbose_name_plural = 'Search Query Stats'
+        ordering = ['-search_count']
+        indexes = [
+            models.Index(fields=['-search_count']),
+            models.Index(fields=['-result_count']),
+        ]
+    
+    def __str__(self):
+        return f"{self.query}: {self.search_count}"
+
+
 class SearchResult(models.Model):
     """
     Represents a search result item
@@ -86,4 +117,51 @@ class SearchResult(models.Model):
         ]
     
     def __str__(self):
-        return f"{self.content_type}: {self.title}"
\ No newline at end of file
+        return f"{self.content_type}: {self.title}"
+
+
+class SearchDocument(models.Model):
+    """
+    Denormalized, indexed copy of one searchable item
+
+    Documents are kept in sync with their source objects by signals and are
+    what every search backend queries and returns, so a search never touches
+    the source tables.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    
+    # Source identification
+    content_type = models.CharField(max_length=20, choices=SearchResult.CONTENT_TYPE_CHOICES)
+    object_id = models.CharField(max_length=255, help_text='Primary key of the source object')
+    
+    # Indexed fields, boosted per field by SEARCH_CONFIG['FIELD_BOOSTS']
+    title = models.CharField(max_length=255)
+    description = models.TextField(blank=True, help_text='Summary shown in results')
+    body = models.TextField(blank=True, help_text='Full text indexed for search')
+    tags = models.JSONField(default=list, blank=True)
+    
+    # Result payload and facets
+    url = models.CharField(max_length=500)
+    difficulty = models.CharField(max_length=30, blank=True)
+    popularity_score = models.FloatField(default=0.0)
+    metadata = models.JSONField(default=dict, blank=True)
+    
+    # Weighted tsvector, maintained by the PostgreSQL backend only
+    search_vector = SearchVectorField(null=True, blank=True)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'search_documents'
+        verbose_name = 'Search Document'
+        verbose_name_plural = 'Search Documents'
+        unique_together = ['content_type', 'object_id']
+        indexes = [
+            models.Index(fields=['content_type']),
+            models.Index(fields=['updated_at']),
+        ]
+        # GIN indexes on search_vector and title (trigram) are created by
+        # migration 0003 on PostgreSQL only
+    
+    def __str__(self):
+        return f"{self.content_type}: {self.title}"
@@ -72,6 +72,11 @@ class SearchResponseSerializer(serializers.Serializer):
     """
     Serializer for search responses
     """
+    search_id = serializers.UUIDField(
+        required=False,
+        allow_null=True,
+        help_text='Identifies this search when tracking a click on one of its results'
+    )
     query = serializers.CharField()
     results = SearchResultSerializer(many=True)
     total_results = serializers.IntegerField()
@@ -93,4 +98,17 @@ class SearchSuggestionSerializer(serializers.Serializer):
     suggestions = serializers.ListField(
         child=serializers.CharField(),
         help_text='List of suggested search terms'
-    )
\ No newline at end of file
+    )
+
+
+class SearchClickSerializer(serializers.Serializer):
+    """
+    Serializer for result click tracking requests
+    """
+    search_id = serializers.UUIDField(
+        help_text='search_id of the search response the result was clicked in'
+    )
+    result_url = serializers.CharField(
+        max_length=255,
+        help_text='URL of the clicked result'
+    )
@@ -0,0 +1,224 @@
+"""
+Autocomplete service for JAC Learning Platform
+Popularity-ranked prefix suggestions from an in-memory index
+"""
+
+import time
+import bisect
+import heapq
+import pickle
+import zlib
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from django.core.cache import cache
+from django.db import connection
+
+from ..backends import search_config
+from ..models import SearchDocument, SearchQueryStat
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_CACHE_KEY = 'search:autocomplete:snapshot'
+VERSION_CACHE_KEY = 'search:autocomplete:version'
+BUILD_LOCK_CACHE_KEY = 'search:autocomplete:building'
+
+# Suggestions are titles of these content types plus popular queries
+TITLE_CONTENT_TYPES = ('learning_path', 'module', 'lesson', 'assessment', 'knowledge_node', 'content')
+
+
+class AutocompleteIndex:
+    """
+    Suggestions ranked by weight, looked up by the prefix of any of their words
+
+    Every suggestion is keyed once per word, by the lowercased text from
+    that word to the end, and the keys are kept sorted so a prefix is a
+    bisected range. Short prefixes match large ranges, so their top
+    suggestions are precomputed.
+    """
+
+    def __init__(self, suggestions: List[Tuple[str, float]], max_results: int = 20, precomputed_length: int = 3):
+        self.suggestions = suggestions
+        self.max_results = max_results
+        self.precomputed_length = precomputed_length
+
+        entries = []
+        for position, (text, _) in enumerate(suggestions):
+            lowered = text.lower()
+            for start in self._word_starts(lowered):
+                entries.append((lowered[start:], position))
+        entries.sort()
+        self._keys = [key for key, _ in entries]
+        self._positions = [position for _, position in entries]
+
+        self._top = {}
+        for key, position in entries:
+            for length in range(1, min(len(key), precomputed_length) + 1):
+                self._top.setdefault(key[:length], set()).add(position)
+        self._top = {
+            prefix: self._best(positions, max_results) for prefix, positions in self._top.items()
+        }
+
+    def __len__(self):
+        return len(self.suggestions)
+
+    def complete(self, prefix: str, limit: int = 10) -> List[str]:
+        """Highest weighted suggestions with a word starting with prefix"""
+        prefix = ' '.join(prefix.lower().split())
+        if not prefix:
+            return []
+        if len(prefix) <= self.precomputed_length and limit <= self.max_results:
+            return [self.suggestions[position][0] for position in self._top.get(prefix, [])[:limit]]
+
+        start = bisect.bisect_left(self._keys, prefix)
+        end = bisect.bisect_left(self._keys, prefix + '\uffff', lo=start)
+        positions = set(self._positions[start:end])
+        return [self.suggestions[position][0] for position in self._best(positions, limit)]
+
+    def dumps(self) -> bytes:
+        """Compact snapshot: only the weighted suggestions, the lookup tables are rebuilt on load"""
+        return zlib.compress(pickle.dumps(self.suggestions, protocol=pickle.HIGHEST_PROTOCOL))
+
+    @classmethod
+    def loads(cls, snapshot: bytes, **kwargs) -> 'AutocompleteIndex':
+        return cls(pickle.loads(zlib.decompress(snapshot)), **kwargs)
+
+    def _best(self, positions, limit: int) -> List[int]:
+        return heapq.nsmallest(limit, positions, key=lambda position: (-self.suggestions[position][1], position))
+
+    @staticmethod
+    def _word_starts(text: str) -> List[int]:
+        return [index for index, char in enumerate(text) if char.isalnum() and (index == 0 or not text[index - 1].isalnum())]
+
+
+class AutocompleteService:
+    """
+    Shares one autocomplete index per process
+
+    build() aggregates titles and query counts into a snapshot stored in the
+    cache; every worker loads the newest snapshot at most every
+    AUTOCOMPLETE_RELOAD_INTERVAL seconds, so keystrokes never query the
+    database. Before any snapshot exists, the first keystroke starts a
+    build in a background thread and suggestions stay empty until it is
+    published.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        config = search_config()
+        self.reload_interval = config.get('AUTOCOMPLETE_RELOAD_INTERVAL', 30)
+        self.min_query_count = config.get('AUTOCOMPLETE_MIN_QUERY_COUNT', 2)
+        self.max_queries = config.get('AUTOCOMPLETE_MAX_QUERIES', 5000)
+        self.title_weight = config.get('AUTOCOMPLETE_TITLE_WEIGHT', 5.0)
+
+        self._lock = threading.Lock()
+        self._index = None
+        self._version = None
+        self._checked_at = 0.0
+
+    @classmethod
+    def get_instance(cls) -> 'AutocompleteService':
+        """Get the autocomplete service of this process"""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[str]:
+        """
+        Get suggestions for a partially typed query
+
+        Args:
+            prefix: Text typed so far
+            limit: Maximum number of suggestions
+
+        Returns:
+            Suggestions, most popular first
+        """
+        index = self._current_index()
+        if index is None:
+            return []
+        return index.complete(prefix, limit)
+
+    def build(self) -> AutocompleteIndex:
+        """Aggregate suggestions from the search index and query log and publish a snapshot"""
+        started = time.perf_counter()
+        weights = {}
+
+        titles = SearchDocument.objects.filter(
+            content_type__in=TITLE_CONTENT_TYPES
+        ).values_list('title', 'popularity_score')
+        for title, popularity in titles.iterator():
+            self._add(weights, title, popularity * self.title_weight)
+
+        for query, count in self._query_counts():
+            self._add(weights, query, count)
+
+        suggestions = sorted(((text, weight) for text, weight in weights.values()), key=lambda item: -item[1])
+        index = AutocompleteIndex(suggestions)
+
+        version = str(time.time_ns())
+        try:
+            cache.set_many({SNAPSHOT_CACHE_KEY: index.dumps(), VERSION_CACHE_KEY: version}, None)
+        except Exception as e:
+            logger.warning(f"Could not publish autocomplete snapshot: {e}")
+        with self._lock:
+            self._index, self._version, self._checked_at = index, version, time.monotonic()
+
+        logger.info(f"Built autocomplete index of {len(index)} suggestions in {time.perf_counter() - started:.2f}s")
+        return index
+
+    def _query_counts(self) -> List[Tuple[str, int]]:
+        """Most frequent recent queries that found results, from the aggregated query stats"""
+        return list(
+            SearchQueryStat.objects.filter(result_count__gte=self.min_query_count)
+            .order_by('-result_count')
+            .values_list('query', 'result_count')[:self.max_queries]
+        )
+
+    @staticmethod
+    def _add(weights: Dict[str, Tuple[str, float]], text: str, weight: float) -> None:
+        text = ' '.join((text or '').split())
+        if len(text) < 2:
+            return
+        key = text.lower()
+        display, existing = weights.get(key, (text, 0.0))
+        weights[key] = (display, existing + weight)
+
+    def _current_index(self) -> Optional[AutocompleteIndex]:
+        now = time.monotonic()
+        if self._index is not None and now - self._checked_at < self.reload_interval:
+            return self._index
+
+        with self._lock:
+            if self._index is not None and now - self._checked_at < self.reload_interval:
+                return self._index
+            self._checked_at = now
+            try:
+                version = cache.get(VERSION_CACHE_KEY)
+                if version is not None and version != self._version:
+                    snapshot = cache.get(SNAPSHOT_CACHE_KEY)
+                    if snapshot is not None:
+                        self._index, self._version = AutocompleteIndex.loads(snapshot), version
+            except Exception as e:
+                logger.warning(f"Could not load autocomplete snapshot: {e}")
+            index = self._index
+
+        if index is None and cache.add(BUILD_LOCK_CACHE_KEY, True, 300):
+            # No snapshot published yet: one worker builds it off the request,
+            # and every worker suggests nothing until it is available
+            threading.Thread(target=self._build_in_background, name='search-autocomplete-build', daemon=True).start()
+        return index
+
+    def _build_in_background(self) -> None:
+        try:
+            self.build()
+        except Exception as e:
+            logger.error(f"Error building autocomplete index: {e}")
+        finally:
+            cache.delete(BUILD_LOCK_CACHE_KEY)
+            connection.close()
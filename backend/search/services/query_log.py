@@ -0,0 +1,197 @@
+"""
+Search analytics logging for JAC Learning Platform
+Buffers search and click events in process and writes them in batches
+"""
+
+import uuid
+import atexit
+import logging
+import threading
+from collections import deque
+from datetime import timedelta
+from typing import Dict, Optional
+
+from django.db import close_old_connections
+from django.db.models import Count, Max, Q
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from ..backends import search_config
+from ..models import SearchQuery, SearchQueryStat
+
+logger = logging.getLogger(__name__)
+
+
+class SearchQueryLog:
+    """
+    Bounded in-process buffer of search analytics events
+
+    Searches and clicks are queued without touching the database. A
+    background thread writes them with bulk_create every
+    QUERY_LOG_FLUSH_INTERVAL seconds, or as soon as QUERY_LOG_BATCH_SIZE
+    events are waiting, and the buffer is flushed once more when the process
+    exits. When the database cannot keep up the oldest events are dropped
+    rather than holding up searches.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        config = search_config()
+        self.enabled = config.get('QUERY_LOG_ASYNC', True)
+        self.batch_size = config.get('QUERY_LOG_BATCH_SIZE', 200)
+        self.flush_interval = config.get('QUERY_LOG_FLUSH_INTERVAL', 5.0)
+        max_buffer = config.get('QUERY_LOG_MAX_BUFFER', 10000)
+
+        self._searches = deque(maxlen=max_buffer)
+        self._clicks = deque(maxlen=max_buffer)
+        self._dropped = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def get_instance(cls) -> 'SearchQueryLog':
+        """Get the search query log of this process"""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+                    atexit.register(cls._instance.flush)
+        return cls._instance
+
+    def record_search(self, query: str, user_id=None, results_count: int = 0,
+                      latency_ms: Optional[float] = None) -> uuid.UUID:
+        """Queue a served search; returns the id it is logged under"""
+        search = SearchQuery(
+            query=query[:255],
+            user_id=user_id,
+            results_count=results_count,
+            latency_ms=latency_ms,
+        )
+        self._queue(self._searches, search)
+        return search.id
+
+    def record_click(self, search_id, result_url: str) -> None:
+        """Queue a click on a result of the search logged under search_id"""
+        self._queue(self._clicks, (str(search_id), result_url[:255]))
+
+    def flush(self) -> int:
+        """
+        Write every queued event to the database
+
+        Returns:
+            Number of events written
+        """
+        with self._flush_lock:
+            with self._lock:
+                searches, clicks = list(self._searches), list(self._clicks)
+                self._searches.clear()
+                self._clicks.clear()
+                dropped, self._dropped = self._dropped, 0
+            if dropped:
+                logger.warning(f"Search query log buffer full, dropped {dropped} events")
+            if not searches and not clicks:
+                return 0
+
+            try:
+                # created_at is auto_now_add, so searches are timestamped when
+                # written, at most one flush interval after they were served
+                SearchQuery.objects.bulk_create(searches, batch_size=self.batch_size)
+                # Searches are written first, so a click finds the search it followed
+                latest_clicks = dict(clicks)
+                for search_id, result_url in latest_clicks.items():
+                    SearchQuery.objects.filter(id=search_id).update(clicked_result=result_url)
+            except Exception as e:
+                logger.error(f"Error writing {len(searches)} search events: {e}")
+                return 0
+            return len(searches) + len(latest_clicks)
+
+    def _queue(self, buffer: deque, event) -> None:
+        if not self.enabled:
+            self._write_now(buffer, event)
+            return
+
+        with self._lock:
+            if len(buffer) == buffer.maxlen:
+                self._dropped += 1
+            buffer.append(event)
+            pending = len(self._searches) + len(self._clicks)
+        self._ensure_thread()
+        if pending >= self.batch_size:
+            self._wakeup.set()
+
+    def _write_now(self, buffer: deque, event) -> None:
+        with self._lock:
+            buffer.append(event)
+        self.flush()
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='search-query-log', daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Error flushing search query log: {e}")
+
+
+def aggregate_query_stats(window_days: Optional[int] = None) -> Dict[str, int]:
+    """
+    Recompute SearchQueryStat from the search log
+
+    Queries are grouped case-insensitively over the last window_days days
+    (SEARCH_CONFIG['QUERY_STATS_WINDOW_DAYS']); stats of queries no longer
+    searched in that window are removed.
+
+    Returns:
+        Number of stats written and removed
+    """
+    if window_days is None:
+        window_days = search_config().get('QUERY_STATS_WINDOW_DAYS', 90)
+    started_at = timezone.now()
+
+    rows = (
+        SearchQuery.objects.filter(created_at__gte=started_at - timedelta(days=window_days))
+        .annotate(normalized=Lower('query'))
+        .values('normalized')
+        .annotate(
+            search_count=Count('id'),
+            result_count=Count('id', filter=Q(results_count__gt=0)),
+            click_count=Count('id', filter=Q(clicked_result__isnull=False)),
+            last_searched_at=Max('created_at'),
+        )
+        .order_by()
+    )
+    stats = [
+        SearchQueryStat(
+            query=row['normalized'],
+            search_count=row['search_count'],
+            result_count=row['result_count'],
+            click_count=row['click_count'],
+            last_searched_at=row['last_searched_at'],
+        )
+        for row in rows.iterator()
+    ]
+    SearchQueryStat.objects.bulk_create(
+        stats,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=['query'],
+        update_fields=['search_count', 'result_count', 'click_count', 'last_searched_at', 'updated_at'],
+    )
+    removed, _ = SearchQueryStat.objects.filter(updated_at__lt=started_at).delete()
+
+    logger.info(f"Aggregated {len(stats)} search query stats, removed {removed}")
+    return {'written': len(stats), 'removed': removed}
@@ -0,0 +1,102 @@
+"""
+Search index maintenance for JAC Learning Platform
+Keeps SearchDocument rows in sync with the searchable models
+"""
+
+import logging
+from typing import Dict, Iterable, Optional
+
+from django.utils import timezone
+
+from ..backends import get_search_backend
+from ..documents import DOCUMENT_TYPES, document_type_for
+from ..models import SearchDocument
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT_FIELDS = ('title', 'description', 'body', 'tags', 'url', 'difficulty', 'popularity_score', 'metadata')
+
+
+def index_instance(instance) -> Optional[SearchDocument]:
+    """
+    Create, update or remove the search document of a saved object
+
+    Returns:
+        The saved document, or None when the object is not searchable
+    """
+    document_type = document_type_for(instance)
+    if document_type is None:
+        return None
+    if not document_type.is_indexable(instance):
+        remove_instance(instance)
+        return None
+
+    document, _ = SearchDocument.objects.update_or_create(
+        content_type=document_type.content_type,
+        object_id=str(instance.pk),
+        defaults=document_type.build(instance),
+    )
+    get_search_backend().document_saved(document)
+    return document
+
+
+def remove_instance(instance) -> None:
+    """Remove the search document of an unpublished object"""
+    document_type = document_type_for(instance)
+    if document_type is not None:
+        remove_document(document_type.content_type, str(instance.pk))
+
+
+def remove_document(content_type: str, object_id: str) -> None:
+    """Remove a search document by its source"""
+    deleted, _ = SearchDocument.objects.filter(content_type=content_type, object_id=object_id).delete()
+    if deleted:
+        get_search_backend().documents_deleted([content_type])
+
+
+def rebuild_index(content_types: Optional[Iterable[str]] = None, batch_size: int = 500) -> Dict[str, int]:
+    """
+    Rebuild the search documents of some or all content types from their sources
+
+    Documents are upserted in batches and documents of objects that are no
+    longer searchable are removed.
+
+    Returns:
+        Number of documents indexed per content type
+    """
+    content_types = list(content_types or DOCUMENT_TYPES)
+    indexed = {}
+
+    for content_type in content_types:
+        document_type = DOCUMENT_TYPES[content_type]
+        started_at = timezone.now()
+        count = 0
+        batch = []
+
+        for instance in document_type.get_queryset().iterator(chunk_size=batch_size):
+            batch.append(SearchDocument(
+                content_type=content_type, object_id=str(instance.pk), **document_type.build(instance)
+            ))
+            if len(batch) >= batch_size:
+                count += _upsert(batch)
+                batch = []
+        if batch:
+            count += _upsert(batch)
+
+        # Every current document was just saved; older ones have no searchable source
+        SearchDocument.objects.filter(content_type=content_type, updated_at__lt=started_at).delete()
+        indexed[content_type] = count
+        logger.info(f"Indexed {count} {content_type} search documents")
+
+    get_search_backend().documents_rebuilt(content_types)
+    return indexed
+
+
+def _upsert(documents) -> int:
+    SearchDocument.objects.bulk_create(
+        documents,
+        update_conflicts=True,
+        unique_fields=['content_type', 'object_id'],
+        update_fields=[*DOCUMENT_FIELDS, 'updated_at'],
+    )
+    return len(documents)
@@ -0,0 +1,46 @@
+"""
+Search signals for JAC Learning Platform
+Keep search documents in sync with the searchable models
+"""
+
+import logging
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+
+from .documents import DOCUMENT_TYPES, document_type_for
+from .services.search_index import index_instance, remove_document
+
+logger = logging.getLogger(__name__)
+
+
+def update_search_document(sender, instance, update_fields=None, **kwargs):
+    """Reindex a searchable object once its save is committed"""
+    watched_fields = document_type_for(instance).watched_fields
+    if update_fields and watched_fields and not set(update_fields) & set(watched_fields):
+        return
+    transaction.on_commit(partial(_safely, index_instance, instance))
+
+
+def delete_search_document(sender, instance, **kwargs):
+    """Drop the search document of a deleted object once the delete is committed"""
+    # The instance loses its primary key once the delete completes
+    content_type = document_type_for(instance).content_type
+    transaction.on_commit(partial(_safely, remove_document, content_type, str(instance.pk)))
+
+
+def _safely(update, *args):
+    # A stale search document must never fail the write it follows
+    try:
+        update(*args)
+    except Exception as e:
+        logger.error(f"Error updating search index ({update.__name__}): {e}")
+
+
+def connect_signals():
+    for content_type, document_type in DOCUMENT_TYPES.items():
+        post_save.connect(update_search_document, sender=document_type.model_label,
+                          dispatch_uid=f'search_index_save_{content_type}')
+        post_delete.connect(delete_search_document, sender=document_type.model_label,
+                            dispatch_uid=f'search_index_delete_{content_type}')
@@ -0,0 +1,294 @@
+"""
+Search tests for JAC Learning Platform
+"""
+
+import uuid
+import random
+import threading
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from apps.learning.models import LearningPath, Module
+from .backends.bm25 import BM25SearchBackend
+from .backends.scan import ScanSearchBackend
+from .models import SearchDocument, SearchQuery, SearchQueryStat
+from .services.autocomplete import BUILD_LOCK_CACHE_KEY, AutocompleteIndex, AutocompleteService
+from .services.query_log import SearchQueryLog
+from .services.search_index import rebuild_index
+
+User = get_user_model()
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+CATALOG = [
+    ('Graph Walkers', 'Walkers traverse nodes and edges of a graph', ['walkers', 'graphs']),
+    ('Nodes and Edges', 'Declaring nodes, edges and their abilities', ['nodes']),
+    ('Object Spatial Programming', 'Data spatial programming moves computation to data', ['osp']),
+    ('Python Interop', 'Importing Python libraries from JAC programs', ['python']),
+]
+
+QUERIES = ['walkers', 'nodes edges', 'programming', 'python libraries', 'spatial data', 'missing']
+
+
+def create_catalog():
+    """A published learning path with one published module per catalog entry, indexed"""
+    author = User.objects.create_user(username='author', email='author@example.com', password='x')
+    learning_path = LearningPath.objects.create(
+        name='JAC Basics', description='Start programming with JAC', estimated_duration=10,
+        created_by=author, is_published=True
+    )
+    for order, (title, description, concepts) in enumerate(CATALOG):
+        Module.objects.create(
+            learning_path=learning_path, title=title, description=description, content=description,
+            jac_concepts=concepts, order=order, duration_minutes=30, difficulty_rating=2, is_published=True
+        )
+    rebuild_index(['learning_path', 'module'])
+    return learning_path
+
+
+@override_settings(CACHES=LOCMEM_CACHE, SEARCH_CONFIG={'BACKEND': 'bm25', 'REFRESH_INTERVAL': 0})
+class BM25SearchBackendTest(TestCase):
+    """Test the in-process BM25 backend"""
+
+    def setUp(self):
+        self.learning_path = create_catalog()
+        self.backend = BM25SearchBackend()
+
+    def matches(self, backend, query):
+        found = backend.search(query, limit=100)
+        return found['total_results'], {(result['content_type'], result['content_id']) for result in found['results']}
+
+    def save(self, module):
+        """Save a module and run the search index update it schedules on commit"""
+        with self.captureOnCommitCallbacks(execute=True):
+            module.save()
+
+    def test_matches_database_scan(self):
+        """Whole-word queries match the same documents as the database scan they replaced"""
+        scan = ScanSearchBackend()
+        for query in QUERIES:
+            with self.subTest(query=query):
+                self.assertEqual(self.matches(self.backend, query), self.matches(scan, query))
+
+    def test_ranks_title_matches_first(self):
+        """A title match outranks a body-only match"""
+        results = self.backend.search('walkers')['results']
+        self.assertEqual(results[0]['title'], 'Graph Walkers')
+        self.assertEqual(results[0]['relevance_score'], 1.0)
+
+    def test_refresh_matches_full_load(self):
+        """Documents saved after the first load are indexed as a full load indexes them"""
+        self.backend.search('walkers')
+        module = Module.objects.get(title='Python Interop')
+        for description in ('Calling Python from walkers', 'Calling Python modules from walkers'):
+            module.description = description
+            self.save(module)
+            self.backend.search('walkers')
+
+        fresh = BM25SearchBackend()
+        for query in QUERIES:
+            with self.subTest(query=query):
+                self.assertEqual(self.matches(self.backend, query), self.matches(fresh, query))
+
+    def test_refresh_reuses_slots(self):
+        """Re-indexing documents does not grow the index"""
+        self.backend.search('walkers')
+        slots = len(self.backend._pks)
+        module = Module.objects.get(title='Python Interop')
+        for version in range(5):
+            module.content = f'Revision {version}'
+            self.save(module)
+            self.backend.search('walkers')
+        self.assertEqual(len(self.backend._pks), slots)
+        self.assertEqual(sorted(map(str, filter(None, self.backend._pks))),
+                         sorted(map(str, SearchDocument.objects.values_list('pk', flat=True))))
+
+    def test_deleted_documents_are_dropped(self):
+        """Unpublishing an object removes it from the results"""
+        self.backend.search('walkers')
+        Module.objects.filter(title='Graph Walkers').update(is_published=False)
+        self.save(Module.objects.get(title='Graph Walkers'))
+        titles = [result['title'] for result in self.backend.search('walkers', limit=100)['results']]
+        self.assertNotIn('Graph Walkers', titles)
+
+    def test_delete_and_insert_between_refreshes(self):
+        """A deleted document is dropped even when another one keeps the document count unchanged"""
+        self.backend.search('walkers')
+        Module.objects.filter(title='Graph Walkers').update(is_published=False)
+        self.save(Module.objects.get(title='Graph Walkers'))
+        self.save(Module(
+            learning_path=self.learning_path, title='Walker Abilities', description='Abilities run by walkers',
+            content='Abilities run by walkers', jac_concepts=['walkers'], order=len(CATALOG),
+            duration_minutes=30, difficulty_rating=2, is_published=True
+        ))
+
+        titles = [result['title'] for result in self.backend.search('walkers', limit=100)['results']]
+        self.assertIn('Walker Abilities', titles)
+        self.assertNotIn('Graph Walkers', titles)
+        self.assertEqual(self.matches(self.backend, 'walkers'), self.matches(BM25SearchBackend(), 'walkers'))
+
+
+class AutocompleteIndexTest(SimpleTestCase):
+    """Test prefix lookups of the autocomplete index"""
+
+    WORDS = ['graph', 'graphs', 'walker', 'walkers', 'node', 'nodes', 'edge', 'jac', 'java', 'python', 'osp']
+
+    def setUp(self):
+        rng = random.Random(3)
+        self.suggestions = [
+            (' '.join(rng.choice(self.WORDS) for _ in range(rng.randint(1, 3))).title(), rng.randint(1, 50))
+            for _ in range(300)
+        ]
+        self.index = AutocompleteIndex(self.suggestions)
+
+    def brute_force(self, prefix, limit):
+        """The prefix scan the index replaced: any word of the text starts the prefix"""
+        prefix = ' '.join(prefix.lower().split())
+        if not prefix:
+            return []
+        matches = [
+            (position, text) for position, (text, _) in enumerate(self.suggestions)
+            if any(text.lower()[start:].startswith(prefix) for start in AutocompleteIndex._word_starts(text.lower()))
+        ]
+        matches.sort(key=lambda match: (-self.suggestions[match[0]][1], match[0]))
+        return [text for _, text in matches[:limit]]
+
+    def test_matches_brute_force(self):
+        """Short, long and multi-word prefixes return the same suggestions as a scan"""
+        for prefix in ['g', 'WA', 'jav', 'walk', 'graphs', 'node e', ' jac  java', 'python osp', 'x', '']:
+            for limit in (1, 5, 30):
+                with self.subTest(prefix=prefix, limit=limit):
+                    self.assertEqual(self.index.complete(prefix, limit), self.brute_force(prefix, limit))
+
+    def test_snapshot_round_trip(self):
+        """A loaded snapshot answers like the index it was taken from"""
+        loaded = AutocompleteIndex.loads(self.index.dumps())
+        self.assertEqual(len(loaded), len(self.index))
+        for prefix in ['g', 'walkers', 'node e']:
+            self.assertEqual(loaded.complete(prefix), self.index.complete(prefix))
+
+
+@override_settings(CACHES=LOCMEM_CACHE, SEARCH_CONFIG={'AUTOCOMPLETE_MIN_QUERY_COUNT': 2})
+class AutocompleteServiceTest(TestCase):
+    """Test building and sharing the autocomplete index"""
+
+    def setUp(self):
+        cache.clear()
+        create_catalog()
+        SearchQueryStat.objects.create(query='walkers tutorial', search_count=40, result_count=40,
+                                       last_searched_at=timezone.now())
+        SearchQueryStat.objects.create(query='walkers typo', search_count=40, result_count=1,
+                                       last_searched_at=timezone.now())
+
+    def test_build_combines_titles_and_queries(self):
+        """Titles and queries that found results are suggested, most popular first"""
+        AutocompleteService().build()
+        service = AutocompleteService()
+        self.assertEqual(service.suggest('walk'), ['walkers tutorial', 'Graph Walkers'])
+        self.assertEqual(service.suggest('JAC'), ['JAC Basics'])
+
+    def test_suggestions_need_no_queries(self):
+        """Another process serves suggestions from the published snapshot"""
+        AutocompleteService().build()
+        service = AutocompleteService()
+        with self.assertNumQueries(0):
+            self.assertEqual(service.suggest('python'), ['Python Interop'])
+
+    def test_first_keystroke_builds_in_background(self):
+        """Without a snapshot the first suggestion is empty and the index is built off the request"""
+        service = AutocompleteService()
+        release, built = threading.Event(), threading.Event()
+
+        def build():
+            release.wait(5)
+            built.set()
+
+        with mock.patch.object(service, 'build', side_effect=build) as build_index:
+            with self.assertNumQueries(0):
+                self.assertEqual(service.suggest('walk'), [])
+            self.assertIsNotNone(cache.get(BUILD_LOCK_CACHE_KEY))
+            release.set()
+            self.assertTrue(built.wait(5))
+        build_index.assert_called_once_with()
+
+
+@override_settings(CACHES=LOCMEM_CACHE, SEARCH_CONFIG={'QUERY_LOG_ASYNC': False})
+class SearchQueryLogTest(TestCase):
+    """Test writing search analytics"""
+
+    def test_click_updates_its_search_only(self):
+        """A click is stored on the search it followed, not on earlier searches of the same text"""
+        query_log = SearchQueryLog()
+        earlier = query_log.record_search('walkers', results_count=3)
+        search_id = query_log.record_search('walkers', results_count=3)
+        query_log.record_click(search_id, '/learning/modules/1')
+
+        self.assertEqual(
+            dict(SearchQuery.objects.values_list('id', 'clicked_result')),
+            {earlier: None, search_id: '/learning/modules/1'}
+        )
+
+
+@override_settings(CACHES=LOCMEM_CACHE, SEARCH_CONFIG={'BACKEND': 'bm25', 'REFRESH_INTERVAL': 0})
+class SearchAPITest(TestCase):
+    """Test the search endpoints"""
+
+    def setUp(self):
+        create_catalog()
+        self.user = User.objects.create_user(username='learner', email='learner@example.com', password='x')
+        self.client.force_login(self.user)
+
+    def test_search_requires_login(self):
+        """Anonymous requests cannot search or log clicks"""
+        self.client.logout()
+        for url in ('/api/search/search/search/', '/api/search/search/track_click/'):
+            with self.subTest(url=url):
+                response = self.client.post(url, {'query': 'walkers'}, content_type='application/json')
+                self.assertIn(response.status_code, (401, 403))
+
+    def test_user_documents_hold_public_profile_fields_only(self):
+        """Email addresses and staff flags are not indexed, shown or searchable"""
+        rebuild_index(['user'])
+        document = SearchDocument.objects.get(content_type='user', object_id=str(self.user.pk))
+        self.assertNotIn('learner@example.com', f'{document.description} {document.body} {document.metadata}')
+        self.assertNotIn('is_staff', document.metadata)
+
+        with mock.patch.object(SearchQueryLog, 'get_instance'):
+            response = self.client.post('/api/search/search/search/', {'query': 'example.com'},
+                                        content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], [])
+
+    def test_search_endpoint(self):
+        """The search API is routed and answers from the index"""
+        with mock.patch.object(SearchQueryLog, 'get_instance') as query_log:
+            response = self.client.post('/api/search/search/search/', {'query': 'walkers'},
+                                        content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['title'], 'Graph Walkers')
+        query_log.return_value.record_search.assert_called_once()
+
+    def test_track_click_by_search_id(self):
+        """A click names the search it followed by the search_id of its response"""
+        with mock.patch.object(SearchQueryLog, 'get_instance') as query_log:
+            query_log.return_value.record_search.return_value = search_id = uuid.uuid4()
+            response = self.client.post('/api/search/search/search/', {'query': 'walkers'},
+                                        content_type='application/json')
+            self.assertEqual(response.json()['search_id'], str(search_id))
+
+            response = self.client.post('/api/search/search/track_click/', {
+                'search_id': str(search_id), 'result_url': '/learning/modules/1'
+            }, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        query_log.return_value.record_click.assert_called_once_with(search_id, '/learning/modules/1')
+
+    def test_track_click_requires_search_id(self):
+        """Clicks without a valid search_id are rejected"""
+        for data in ({'query': 'walkers', 'result_url': '/x'}, {'search_id': 'walkers', 'result_url': '/x'}):
+            with self.subTest(data=data):
+                response = self.client.post('/api/search/search/track_click/', data, content_type='application/json')
+                self.assertEqual(response.status_code, 400)
@@ -6,17 +6,19 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Q
+from django.db.models import Count, Q
 from django.contrib.auth import get_user_model
 
-from .models import SearchQuery, SearchResult
+from .models import SearchQuery, SearchQueryStat, SearchResult
 from .serializers import (
     SearchRequestSerializer, 
+    SearchClickSerializer,
     SearchResponseSerializer, 
     SearchSuggestionSerializer,
     SearchQuerySerializer,
     SearchResultSerializer
 )
+from .services.query_log import SearchQueryLog
 from .services.search_service import SearchService
 
 User = get_user_model()
@@ -26,7 +28,7 @@ class SearchViewSet(viewsets.ViewSet):
     """
     ViewSet for handling search requests
     """
-    permission_classes = []
+    permission_classes = [IsAuthenticated]
     service = SearchService()
     
     @action(detail=False, methods=['post'])
@@ -43,15 +45,10 @@ class SearchViewSet(viewsets.ViewSet):
         limit = serializer.validated_data.get('limit', 20)
         offset = serializer.validated_data.get('offset', 0)
         
-        # Get current user (optional)
-        user = None
-        if request.user.is_authenticated:
-            user = request.user
-        
         # Perform search
         search_results = self.service.search(
             query=query,
-            user=user,
+            user=request.user,
             content_types=content_types,
             limit=limit,
             offset=offset
@@ -82,18 +79,19 @@ class SearchViewSet(viewsets.ViewSet):
         """
         Track user click on search result
         """
-        query = request.data.get('query')
-        result_url = request.data.get('result_url')
-        
-        if query and result_url:
-            try:
-                # Update search query with clicked result
-                SearchQuery.objects.filter(query=query).update(clicked_result=result_url)
-                return Response({'status': 'tracked'})
-            except Exception as e:
-                return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        serializer = SearchClickSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
-        return Response({'error': 'Missing query or result_url'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            # Written with the next batch of search events, to the logged search only
+            SearchQueryLog.get_instance().record_click(
+                serializer.validated_data['search_id'],
+                serializer.validated_data['result_url']
+            )
+            return Response({'status': 'tracked'})
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
 class SearchHistoryViewSet(viewsets.ReadOnlyModelViewSet):
@@ -127,11 +125,9 @@ class PopularSearchesViewSet(viewsets.ViewSet):
         """
         limit = int(request.query_params.get('limit', 10))
         
-        # Get most frequent search queries
-        popular_queries = (SearchQuery.objects
-                          .values('query')
-                          .annotate(count=models.Count('query'))
-                          .order_by('-count')
+        # Most frequent search queries, from the aggregated query stats
+        popular_queries = (SearchQueryStat.objects
+                          .order_by('-search_count')
                           .values_list('query', flat=True)[:limit])
         
         return Response({'popular_searches': list(popular_queries)})
@@ -150,7 +146,7 @@ class PopularSearchesViewSet(viewsets.ViewSet):
         recent_queries = (SearchQuery.objects
                          .filter(created_at__gte=timezone.now() - timedelta(days=1))
                          .values('query')
-                         .annotate(count=models.Count('query'))
+                         .annotate(count=Count('query'))
                          .order_by('-count')
                          .values_list('query', flat=True)[:limit])
         
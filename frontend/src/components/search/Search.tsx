@@ -58,7 +58,7 @@ export const Search: React.FC<SearchProps> = ({
   
   // Redux selectors
   const {
-    currentQuery,
+    searchId,
     results,
     isLoading,
     history,
@@ -190,14 +190,16 @@ export const Search: React.FC<SearchProps> = ({
   
   // Track result click
   const handleResultClick = useCallback((result: any) => {
-    dispatch(trackSearchResultClick({ query: currentQuery, url: result.url }));
+    if (searchId) {
+      dispatch(trackSearchResultClick({ searchId, url: result.url }));
+    }
     
     if (onResultClick) {
       onResultClick(result);
     } else {
       navigate(result.url);
     }
-  }, [dispatch, currentQuery, onResultClick, navigate]);
+  }, [dispatch, searchId, onResultClick, navigate]);
   
   // Get item at index for keyboard navigation
   const getItemAtIndex = (index: number) => {
@@ -54,6 +54,7 @@ const SearchResultsPage: React.FC = () => {
     isLoading, 
     totalResults,
     currentQuery,
+    searchId,
     facets 
   } = useSelector(selectSearch);
   
@@ -153,7 +154,9 @@ const SearchResultsPage: React.FC = () => {
   
   // Handle result click
   const handleResultClick = (result: any) => {
-    searchService.trackClick(query, result.url, 'unknown');
+    if (searchId) {
+      searchService.trackClick(searchId, result.url);
+    }
     navigate(result.url);
   };
   
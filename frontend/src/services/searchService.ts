@@ -21,6 +21,7 @@ export interface SearchResult {
 }
 
 export interface SearchResponse {
+  search_id: string | null;
   query: string;
   results: SearchResult[];
   total_results: number;
@@ -102,12 +103,11 @@ class SearchService {
   /**
    * Track user click on search result
    */
-  async trackClick(query: string, resultId: string, resultType?: string): Promise<void> {
+  async trackClick(searchId: string, resultUrl: string): Promise<void> {
     try {
       await apiClient.post('/search/search/track_click/', {
-        query,
-        result_id: resultId,
-        result_type: resultType
+        search_id: searchId,
+        result_url: resultUrl
       });
     } catch (error: any) {
       console.error('Track click API error:', error);
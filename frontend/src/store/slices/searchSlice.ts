@@ -12,6 +12,7 @@ import searchService, { SearchResponse, SearchResult } from '../../services/sear
 interface SearchState {
   // Current search
   currentQuery: string;
+  searchId: string | null;
   results: SearchResult[];
   totalResults: number;
   isLoading: boolean;
@@ -36,6 +37,7 @@ interface SearchState {
 // Initial State
 const initialState: SearchState = {
   currentQuery: '',
+  searchId: null,
   results: [],
   totalResults: 0,
   isLoading: false,
@@ -100,10 +102,10 @@ export const fetchTrendingSearches = createAsyncThunk(
 
 export const trackSearchResultClick = createAsyncThunk(
   'search/trackResultClick',
-  async ({ query, url }: { query: string; url: string }, { rejectWithValue }) => {
+  async ({ searchId, url }: { searchId: string; url: string }, { rejectWithValue }) => {
     try {
-      await searchService.trackClick(query, url);
-      return { query, url };
+      await searchService.trackClick(searchId, url);
+      return { searchId, url };
     } catch (error: any) {
       return rejectWithValue(error.message || 'Failed to track click');
     }
@@ -203,6 +205,7 @@ const searchSlice = createSlice({
       })
       .addCase(performSearch.fulfilled, (state, action) => {
         state.isLoading = false;
+        state.searchId = action.payload.search_id;
         state.results = action.payload.results;
         state.totalResults = action.payload.total_results;
         